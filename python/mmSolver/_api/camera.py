@@ -257,6 +257,10 @@ class Camera(object):
         """
         Get the average deviation for all marker under the camera.
 
+        The deviation of each Marker is read from the cached keys of
+        the Marker's deviation animCurve (see
+        :py:mod:`mmSolver._api.deviationcache`).
+
         :returns: The deviation of the marker-to-bundle re-projection in pixels.
         :rtype: float
         """
@@ -296,11 +300,15 @@ class Camera(object):
             LOG.warning(msg, self)
             return dev
 
+        enable_time = None
+        if times is not None and len(times) > 0:
+            enable_time = times[0]
+
         total = 0
         dev_sum = 0.0
         mkr_list = self.get_marker_list()
         for mkr in mkr_list:
-            if not mkr.get_enable():
+            if not mkr.get_enable(time=enable_time):
                 continue
             dev_values = mkr.get_deviation(times=times)
             dev_sum += dev_values[0]
@@ -313,6 +321,10 @@ class Camera(object):
         """
         Get the maximum deviation (and frame) for all marker under the camera.
 
+        The deviation of each Marker is read from the cached keys of
+        the Marker's deviation animCurve (see
+        :py:mod:`mmSolver._api.deviationcache`).
+
         :param times: The times to query the deviation on, if not
                       given the current frame is used.
         :type times: float
@@ -30,10 +30,11 @@ import mmSolver.utils.configmaya as configmaya
 import mmSolver.utils.node as node_utils
 import mmSolver.utils.animcurve as anim_utils
 import mmSolver._api.utils as api_utils
-import mmSolver._api.compile as api_compile
+import mmSolver._api.compilecache as compilecache
 import mmSolver._api.excep as excep
 import mmSolver._api.constant as const
 import mmSolver._api.solveresult as solveresult
+import mmSolver._api.solveresultstore as solveresultstore
 import mmSolver._api.solverbase as solverbase
 import mmSolver._api.solverstep as solverstep
 import mmSolver._api.marker as marker
@@ -228,21 +229,36 @@ class Collection(object):
         return
 
     def get_last_solve_results(self):
+        """
+        Get the SolveResults from the last time the Collection was
+        executed.
+
+        The results are decoded when first requested, and re-used
+        until the results stored on the Collection change.
+
+        :rtype: SolveResultSet
+        """
         attr = const.COLLECTION_ATTR_LONG_NAME_SOLVER_RESULTS
         raw_data_list = self._get_attr_data(attr)
-        solres_list = []
+        solres_list = solveresult.SolveResultSet()
         for raw_data in raw_data_list:
+            if solveresultstore.is_encoded_solve_results(raw_data):
+                solres_list.extend(
+                    solveresultstore.decode_solve_results(raw_data))
+                continue
+            # Results stored by older versions of mmSolver.
             solres = solveresult.SolveResult(raw_data)
             solres_list.append(solres)
         return solres_list
 
     def _set_last_solve_results(self, solres_list):
         attr = const.COLLECTION_ATTR_LONG_NAME_SOLVER_RESULTS
-        raw_data_list = []
-        for solres in solres_list:
-            raw_data = solres.get_data_raw()
-            raw_data_list.append(raw_data)
-        self._set_attr_data(attr, raw_data_list)
+        sidecar_dir = solveresultstore.get_sidecar_directory()
+        data = solveresultstore.encode_solve_results(
+            solres_list,
+            name=self.get_node_uid(),
+            sidecar_dir=sidecar_dir)
+        self._set_attr_data(attr, [data])
         return
 
     ############################################################################
@@ -365,14 +381,16 @@ class Collection(object):
 
     def remove_solver_list(self, sol_list):
         assert isinstance(sol_list, list)
-        for sol in sol_list:
-            self.remove_solver(sol)
+        with configmaya.coalesce_node_option_writes():
+            for sol in sol_list:
+                self.remove_solver(sol)
         return
 
     def set_solver_list(self, sol_list):
         assert isinstance(sol_list, list)
-        self.clear_solver_list()
-        self.add_solver_list(sol_list)
+        with configmaya.coalesce_node_option_writes():
+            self.clear_solver_list()
+            self.add_solver_list(sol_list)
         return
 
     def clear_solver_list(self):
@@ -560,13 +578,8 @@ class Collection(object):
         """
         ret = False
         try:
-            col_node = self.get_node()
-            sol_list = self.get_solver_list()
-            mkr_list = self.get_marker_list()
-            attr_list = self.get_attribute_list()
-            api_compile.collection_compile(
-                col_node,
-                sol_list, mkr_list, attr_list,
+            compilecache.collection_compile_with_cache(
+                self,
                 withtest=True,
                 prog_fn=None, status_fn=None)
             ret = True
@@ -593,27 +606,54 @@ class Collection(object):
         return result
 
 
-def update_deviation_on_collection(col, solres_list):
+def _compute_deviation_curve(col, solres_list):
     """
-    Set keyframe data on the collection for the solver.
+    Calculate the deviation keyframes for the collection.
+
+    :rtype: (str, [float, ..], [float, ..])
     """
     node = col.get_node()
     frame_error_list = solveresult.merge_frame_error_list(solres_list)
     frame_list = []
     err_list = []
-    for frame, err in frame_error_list.items():
+    for frame, err in sorted(frame_error_list.items()):
         frame_list.append(frame)
         err_list.append(err)
     if len(frame_list) == len(err_list) == 0:
         frame_list.append(1)
         err_list.append(999.9)
     plug = '{0}.{1}'.format(node, const.MARKER_ATTR_LONG_NAME_DEVIATION)
-    try:
-        maya.cmds.setAttr(plug, lock=False)
-        anim_utils.create_anim_curve_node_apione(
-            frame_list, err_list,
-            node_attr=plug,
-            anim_type=OpenMayaAnim.MFnAnimCurve.kAnimCurveTU)
-    finally:
-        maya.cmds.setAttr(plug, lock=True)
+    return plug, frame_list, err_list
+
+
+def update_deviation_on_collection(col, solres_list):
+    """
+    Set keyframe data on the collection for the solver.
+    """
+    curve_data = [_compute_deviation_curve(col, solres_list)]
+    marker._set_deviation_anim_curves(curve_data)
+    return
+
+
+def update_deviation(col, mkr_list, solres_list):
+    """
+    Set the deviation keyframes on the Markers and Collection, after
+    a solve.
+
+    All the deviation animCurves are written together. When Maya's
+    undo queue is on, the keyframes are set in a single undo chunk
+    (see :py:func:`mmSolver._api.marker._set_deviation_anim_curves`).
+
+    :param col: The Collection that was solved.
+    :type col: Collection
+
+    :param mkr_list: Marker objects to update deviation on.
+    :type mkr_list: [Marker, ..]
+
+    :param solres_list: The solve results to calculate deviation from.
+    :type solres_list: [SolveResult, ..]
+    """
+    curve_data = marker._compute_deviation_curves(mkr_list, solres_list)
+    curve_data.append(_compute_deviation_curve(col, solres_list))
+    marker._set_deviation_anim_curves(curve_data)
     return
@@ -25,6 +25,7 @@ without waiting for the full compilation only to find an error on the
 first Action.
 """
 
+import hashlib
 import collections
 
 import maya.cmds
@@ -37,18 +38,25 @@ import mmSolver._api.utils as api_utils
 import mmSolver._api.action as api_action
 import mmSolver._api.solverbase as solverbase
 import mmSolver._api.marker as marker
+import mmSolver._api.markerutils as markerutils
 import mmSolver._api.attribute as attribute
+import mmSolver._api.enableindex as enableindex
 
 LOG = mmSolver.logger.get_logger()
 
 
-def markersAndCameras_compile_flags(mkr_list):
+def markersAndCameras_compile_flags(mkr_list, frame_list=None):
     """
     Compile mmSolver command flags for 'marker' and 'camera'.
 
     :param mkr_list: List of Markers to compile.
     :type mkr_list: [Marker, ..]
 
+    :param frame_list: Frame numbers to be solved. Markers that are
+                       not enabled on any of these frames are skipped.
+                       If None, all Markers are compiled.
+    :type frame_list: [int, ..] or None
+
     :return:
         Tuple of both 'marker' and 'camera' flags, ready for the
         mmSolver command.
@@ -62,6 +70,12 @@ def markersAndCameras_compile_flags(mkr_list):
         assert isinstance(mkr, marker.Marker)
         mkr_node = mkr.get_node()
         assert isinstance(mkr_node, basestring)
+        if (frame_list is not None
+                and enableindex.count_enabled_frames(mkr, frame_list) == 0):
+            msg = 'Marker is not enabled on any frame, skipping; mkr_node={0}'
+            msg = msg.format(repr(mkr_node))
+            LOG.debug(msg)
+            continue
         bnd = mkr.get_bundle()
         if bnd is None:
             msg = 'Cannot find bundle from marker, skipping; mkr_node={0}'
@@ -323,6 +337,159 @@ def frames_compile_flags(frm_list, frame_use_tags):
     return frames
 
 
+def _find_connected_components(mkr_attr_map, num_mkr, num_attr):
+    """
+    Find the connected components of a Marker/Attribute bipartite graph.
+
+    Markers are graph nodes with index '0' to 'num_mkr - 1', and
+    Attributes are graph nodes with index 'num_mkr' to
+    'num_mkr + num_attr - 1'. An edge exists between a Marker and an
+    Attribute when the Attribute affects the Marker.
+
+    :param mkr_attr_map: Boolean matrix of size 'markers x attrs', as
+                         returned by 'find_marker_attr_mapping'.
+    :type mkr_attr_map: [[bool, ..], ..]
+
+    :param num_mkr: Number of Markers in the mapping.
+    :type num_mkr: int
+
+    :param num_attr: Number of Attributes in the mapping.
+    :type num_attr: int
+
+    :returns: List of components, each component is a tuple of Marker
+              indices and Attribute indices, both sorted. Components
+              are ordered by the lowest Marker index (or Attribute
+              index, if the component has no Markers).
+    :rtype: [([int, ..], [int, ..]), ..]
+    """
+    # Union-Find (disjoint set) with path compression.
+    parents = list(range(num_mkr + num_attr))
+
+    def find(x):
+        root = x
+        while parents[root] != root:
+            root = parents[root]
+        while parents[x] != root:
+            parents[x], x = root, parents[x]
+        return root
+
+    for i in range(num_mkr):
+        row = mkr_attr_map[i]
+        for j in range(num_attr):
+            if row[j] is not True:
+                continue
+            root_a = find(i)
+            root_b = find(num_mkr + j)
+            if root_a != root_b:
+                parents[max(root_a, root_b)] = min(root_a, root_b)
+
+    components = collections.OrderedDict()
+    for x in range(num_mkr + num_attr):
+        root = find(x)
+        if root not in components:
+            components[root] = ([], [])
+        if x < num_mkr:
+            components[root][0].append(x)
+        else:
+            components[root][1].append(x - num_mkr)
+    return list(components.values())
+
+
+def split_into_independent_components(mkr_list, attr_list,
+                                      mkr_attr_map=None):
+    """
+    Split Markers and Attributes into groups that can be solved
+    independently of each other.
+
+    Two Markers are in the same group if they are (transitively)
+    affected by the same Attribute. For example, two object tracks
+    and a camera track sharing no Attributes will be split into three
+    groups. Solving the groups independently is much faster than
+    solving them all together, because the cost of the solver grows
+    much faster than the number of parameters.
+
+    Markers not affected by any Attribute (such as Markers without a
+    Bundle), and Attributes that do not affect any Marker, cannot be
+    solved, and are not returned.
+
+    :param mkr_list: Markers to split.
+    :type mkr_list: [Marker, ..]
+
+    :param attr_list: Attributes to split.
+    :type attr_list: [Attribute, ..]
+
+    :param mkr_attr_map: The mapping of 'mkr_list' to 'attr_list', as
+                         returned by
+                         :py:func:`mmSolver._api.markerutils.find_marker_attr_mapping`,
+                         or None to compute the mapping.
+    :type mkr_attr_map: [[bool, ..], ..] or None
+
+    :returns: List of Marker and Attribute lists; each pair of lists
+              is an independent group. The order of the Markers and
+              Attributes is the same as the order given.
+    :rtype: [([Marker, ..], [Attribute, ..]), ..]
+    """
+    assert isinstance(mkr_list, (list, tuple))
+    assert isinstance(attr_list, (list, tuple))
+    if len(mkr_list) == 0 or len(attr_list) == 0:
+        return []
+
+    if mkr_attr_map is None:
+        mkr_attr_map = markerutils.find_marker_attr_mapping(
+            mkr_list,
+            attr_list
+        )
+    components = _find_connected_components(
+        mkr_attr_map,
+        len(mkr_list),
+        len(attr_list)
+    )
+
+    groups = []
+    for mkr_indices, attr_indices in components:
+        if len(mkr_indices) == 0:
+            for j in attr_indices:
+                LOG.warning(
+                    'No markers found affecting attribute. attr=%r',
+                    attr_list[j].get_name())
+            continue
+        if len(attr_indices) == 0:
+            for i in mkr_indices:
+                LOG.debug(
+                    'No attributes found affecting marker. mkr=%r',
+                    mkr_list[i].get_node())
+            continue
+        new_mkr_list = [mkr_list[i] for i in mkr_indices]
+        new_attr_list = [attr_list[j] for j in attr_indices]
+        groups.append((new_mkr_list, new_attr_list))
+    return groups
+
+
+def _get_solver_frame_numbers(sol_list):
+    """
+    Get all the frame numbers used by the Solvers.
+
+    :param sol_list: Solvers to query.
+    :type sol_list: [SolverBase, ..]
+
+    :returns: Sorted list of unique frame numbers.
+    :rtype: [int, ..]
+    """
+    frame_nums = set()
+    for sol in sol_list:
+        frm_list = []
+        if hasattr(sol, 'get_frame_list'):
+            frm_list += sol.get_frame_list() or []
+        if hasattr(sol, 'get_root_frame_list'):
+            frm_list += sol.get_root_frame_list() or []
+        if hasattr(sol, 'get_single_frame'):
+            frm = sol.get_single_frame()
+            if frm is not None:
+                frm_list.append(frm)
+        frame_nums |= set([int(frm.get_number()) for frm in frm_list])
+    return list(sorted(frame_nums))
+
+
 def collection_compile(col_node, sol_list, mkr_list, attr_list,
                        withtest=False,
                        prog_fn=None,
@@ -359,25 +526,105 @@ def collection_compile(col_node, sol_list, mkr_list, attr_list,
         msg = msg.format(repr(col_node))
         raise excep.NotValid(msg)
 
-    # Compile all the solvers
+    # Compile all the solvers, with Marker enable values read once and
+    # shared by all solvers.
     msg = 'Collection is not valid, failed to compile solver;'
     msg += ' collection={0}'
     msg = msg.format(repr(col_node))
-    for sol in sol_enabled_list:
-        assert isinstance(sol, solverbase.SolverBase)
-        for action, vaction in sol.compile(mkr_list, attr_list,
-                                           withtest=withtest):
-            if not isinstance(action, api_action.Action):
-                raise excep.NotValid(msg)
-            assert action.func is not None
-            assert action.args is not None
-            assert action.kwargs is not None
-            action_list.append(action)
-            vaction_list.append(vaction)
+    frame_list = _get_solver_frame_numbers(sol_enabled_list)
+    with enableindex.active_index_context(mkr_list, frame_list=frame_list):
+        for sol in sol_enabled_list:
+            assert isinstance(sol, solverbase.SolverBase)
+            generator = sol.compile(mkr_list, attr_list, withtest=withtest)
+            for action, vaction in generator:
+                if not isinstance(action, api_action.Action):
+                    raise excep.NotValid(msg)
+                assert action.func is not None
+                assert action.args is not None
+                assert action.kwargs is not None
+                action_list.append(action)
+                vaction_list.append(vaction)
     assert len(action_list) == len(vaction_list)
     return action_list, vaction_list
 
 
+def _hash_string(value):
+    if not isinstance(value, bytes):
+        value = value.encode('utf-8')
+    return hashlib.sha1(value).hexdigest()
+
+
+def group_frames_by_signature(mkr_list, frame_nums):
+    """
+    Group frames by the exact set of active Markers on each frame.
+
+    A Marker is active on a frame when it is enabled and has a weight
+    greater than zero.
+
+    :param mkr_list: Markers to test for activity.
+    :type mkr_list: [Marker, ..]
+
+    :param frame_nums: Frame numbers to group.
+    :type frame_nums: [int, ..]
+
+    :returns: The frame numbers for each unique frame signature, in
+              order of first appearance.
+    :rtype: collections.OrderedDict
+    """
+    groups = collections.OrderedDict()
+    for frm_num in frame_nums:
+        active_mkr_nodes = [m.get_node()
+                            for m in mkr_list
+                            if (enableindex.get_enable(m, frm_num)
+                                and enableindex.get_weight(m, frm_num) > 0)]
+        hash_string = str(len(active_mkr_nodes))
+        hash_string += '#'.join(active_mkr_nodes)
+        signature = _hash_string(hash_string)
+        if signature not in groups:
+            groups[signature] = []
+        groups[signature].append(frm_num)
+    return groups
+
+
+def compute_solver_signature(sol, mkr_list, attr_list):
+    """
+    Compute a signature for the validation of a solver.
+
+    The signature contains the Attributes solved (and their lock
+    state), and the number of frames with each unique set of active
+    Markers. Solvers with the same signature have the same number of
+    parameters and errors, so validating one solver validates all of
+    them.
+
+    :param sol: The solver to compute the signature for.
+    :type sol: Solver
+
+    :param mkr_list: The list of Markers used for compiling.
+    :type mkr_list: [Marker, ..]
+
+    :param attr_list: The list of Attribute used for compiling.
+    :type attr_list: [Attribute, ..]
+
+    :rtype: str
+    """
+    frame_nums = [frm.get_number() for frm in sol.get_frame_list()]
+    groups = group_frames_by_signature(mkr_list, frame_nums)
+    parts = [type(sol).__name__]
+    getters = [
+        'get_attributes_use_animated',
+        'get_attributes_use_static',
+        'get_frames_use_tags',
+    ]
+    for getter in getters:
+        if hasattr(sol, getter):
+            parts.append(repr(getattr(sol, getter)()))
+    parts += ['{0}:{1}'.format(attr.get_name(full_path=True),
+                               int(attr.is_locked()))
+              for attr in attr_list]
+    parts += ['{0}:{1}'.format(k, len(v)) for k, v in sorted(groups.items())]
+    return _hash_string('|'.join(parts))
+
+
 def create_compile_solver_cache():
     """
     Create the cache for use with the 'compile_solver_with_cache' function.
@@ -402,12 +649,12 @@ def compile_solver_with_cache(sol, mkr_list, attr_list, withtest, cache):
     >>> cache = mmSolver._api.compile.create_compile_solver_cache()
     >>> compile_solver_with_cache(sol, mkr_list, attr_list, withtest, cache)
 
-    Compile unique list of frames to withtest the solver when it changes,
-    for example a marker turns off, then only sample the unique sets of
-    markers. This will reduce the compile/testing time considerably,
-    and because we know there are no changes in the structure or number of
-    errors, we can copy the same mmSolver kwargs multiple times (with the
-    frames argument set differently).
+    Frames are grouped by the exact set of active Markers (see
+    :py:func:`compute_solver_signature`), and the validation Actions
+    are compiled once for each unique signature. Solvers with the same
+    signature yield the same validation Action objects, so each
+    validation Action is only run once and the result is shared by
+    all frames in the group.
 
     :param sol: The solver to compile.
     :type sol: Solver
@@ -423,33 +670,20 @@ def compile_solver_with_cache(sol, mkr_list, attr_list, withtest, cache):
               second Action is for validation of the solve.
     :rtype: (Action, Action or None)
     """
-    frame_list = sol.get_frame_list()
     if cache is None or withtest is False:
         for action, vaction in sol.compile(mkr_list, attr_list,
                                            withtest=withtest):
             yield action, vaction
     else:
-        # Get frame with lowest number of active markers.
-        min_num_of_active_mkr_nodes = 999999999
-        min_list_of_active_mkr_nodes = []
-        for frm in frame_list:
-            frm_num = frm.get_number()
-            active_mkr_nodes = [m.get_node()
-                                for m in mkr_list
-                                if m.get_enable(frm_num)]
-            if len(active_mkr_nodes) < min_num_of_active_mkr_nodes:
-                min_list_of_active_mkr_nodes = active_mkr_nodes
-
-        hash_string = str(len(min_list_of_active_mkr_nodes))
-        hash_string += '#'.join(min_list_of_active_mkr_nodes)
-        vaction_list = cache.get(hash_string, None)
+        signature = compute_solver_signature(sol, mkr_list, attr_list)
+        vaction_list = cache.get(signature, None)
 
         # Compile if our testing action is not in the cache.
         if vaction_list is None:
             # Add to the cache
             for action, vaction in sol.compile(mkr_list, attr_list,
                                                withtest=True):
-                cache[hash_string].append(vaction)
+                cache[signature].append(vaction)
                 yield action, vaction
         else:
             # Re-use the cache
@@ -0,0 +1,303 @@
+# Copyright (C) 2019 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Compile cache - re-use the compiled Actions of a Collection when
+nothing has changed.
+
+Compiling a Collection queries every Marker, Attribute and frame in
+the Maya scene, which is slow. The Actions compiled for a Collection
+are stored against a hash of the Collection content:
+
+- The Solver list data stored on the Collection node.
+
+- The Collection members (names and node UUIDs).
+
+- The enable and weight values of Markers. For animated values, the
+  number of keys and the first and last keys of the animCurve are
+  used (see
+  :py:func:`mmSolver._api.deviationcache.get_anim_curve_check`),
+  because keys set with the Maya API do not trigger the animCurve
+  callbacks.
+
+- The lock state and the minimum and maximum values of Attributes.
+
+- A counter that is increased each time the cache is invalidated.
+
+- The node dependency index identifier (see
+  :py:func:`mmSolver.utils.nodeaffects.get_dependency_index_id`),
+  which changes with DAG, connection, name and scene changes.
+
+The cache is invalidated by Maya callbacks when animCurves are edited.
+Changes that are not detected require the cache to be cleared with
+:py:func:`invalidate_collection_compile_cache`.
+
+The cache is only used while the callbacks exist, because otherwise
+we cannot know when the cache is invalid.
+"""
+
+import hashlib
+
+import maya.cmds
+import maya.OpenMaya as OpenMaya
+import maya.OpenMayaAnim as OpenMayaAnim
+
+import mmSolver.logger
+import mmSolver.utils.node as node_utils
+import mmSolver.utils.nodeaffects as affects_utils
+import mmSolver._api.constant as const
+import mmSolver._api.compile as api_compile
+import mmSolver._api.deviationcache as deviationcache
+
+
+LOG = mmSolver.logger.get_logger()
+
+__CACHE = dict()
+__CACHE_COUNTER = 0
+__CALLBACK_IDS = []
+
+
+def invalidate_collection_compile_cache(*args):
+    """
+    Remove all compiled Actions stored in the cache.
+
+    This function may be used directly as a Maya callback function;
+    all arguments are ignored.
+    """
+    global __CACHE
+    global __CACHE_COUNTER
+    __CACHE = dict()
+    __CACHE_COUNTER += 1
+    return
+
+
+def add_compile_cache_callbacks():
+    """
+    Add the Maya callbacks used to invalidate the compile cache.
+
+    If the callbacks have already been added, nothing happens.
+
+    :returns: True if the callbacks exist, False otherwise.
+    :rtype: bool
+    """
+    global __CALLBACK_IDS
+    if len(__CALLBACK_IDS) > 0:
+        return True
+    invalidate_collection_compile_cache()
+    func = invalidate_collection_compile_cache
+    callback_ids = []
+    try:
+        callback_ids.append(
+            OpenMayaAnim.MAnimMessage.addAnimCurveEditedCallback(func))
+        msgs = [
+            OpenMaya.MSceneMessage.kBeforeNew,
+            OpenMaya.MSceneMessage.kBeforeOpen,
+        ]
+        for msg in msgs:
+            callback_ids.append(
+                OpenMaya.MSceneMessage.addCallback(msg, func))
+    except RuntimeError:
+        LOG.warning('Could not add compile cache callbacks.')
+        for callback_id in callback_ids:
+            OpenMaya.MMessage.removeCallback(callback_id)
+        return False
+    __CALLBACK_IDS = callback_ids
+    return True
+
+
+def remove_compile_cache_callbacks():
+    """
+    Remove the Maya callbacks used to invalidate the compile cache.
+
+    After the callbacks are removed the compile cache is cleared and
+    no longer used.
+    """
+    global __CALLBACK_IDS
+    for callback_id in __CALLBACK_IDS:
+        OpenMaya.MMessage.removeCallback(callback_id)
+    __CALLBACK_IDS = []
+    invalidate_collection_compile_cache()
+    return
+
+
+def _get_marker_values_hash_string(mkr_nodes):
+    """
+    Get the enable and weight values of Markers as a string.
+
+    Animated values are summarised by the number of keys and the first
+    and last keys of the animCurve. AnimCurves without a time input
+    (such as driven keys) are summarised by their key values.
+    """
+    values = []
+    attr_names = [
+        const.MARKER_ATTR_LONG_NAME_ENABLE,
+        const.MARKER_ATTR_LONG_NAME_WEIGHT,
+    ]
+    for mkr_node in mkr_nodes:
+        for attr_name in attr_names:
+            node_attr = '{0}.{1}'.format(mkr_node, attr_name)
+            plug = node_utils.get_as_plug_apione(node_attr)
+            if plug is None:
+                continue
+            if plug.isDestination():
+                src_plugs = OpenMaya.MPlugArray()
+                plug.connectedTo(src_plugs, True, False)
+                src_node = src_plugs[0].node()
+                if src_node.hasFn(OpenMaya.MFn.kAnimCurve):
+                    anim_curve_fn = OpenMayaAnim.MFnAnimCurve(src_node)
+                    if anim_curve_fn.isTimeInput() is True:
+                        check = deviationcache.get_anim_curve_check(
+                            anim_curve_fn)
+                    else:
+                        num_keys = anim_curve_fn.numKeys()
+                        check = [anim_curve_fn.value(i)
+                                 for i in range(num_keys)]
+                    values.append(repr(check))
+                else:
+                    values.append('c')
+            else:
+                values.append(repr(plug.asDouble()))
+    return '#'.join(values)
+
+
+def _get_attribute_values_hash_string(attr_names):
+    """
+    Get the lock state and the minimum and maximum values of
+    Attributes as a string.
+    """
+    values = []
+    for node_attr in attr_names:
+        plug = node_utils.get_as_plug_apione(node_attr)
+        if plug is None:
+            continue
+        check_parents = True
+        check_children = True
+        free = plug.isFreeToChange(check_parents, check_children)
+        values.append(str(free == OpenMaya.MPlug.kFreeToChange))
+
+        node_name, _, attr_name = node_attr.partition('.')
+        for exists_flag, value_flag in [('minExists', 'minimum'),
+                                        ('maxExists', 'maximum')]:
+            kwargs = {'node': node_name, exists_flag: True}
+            exists = maya.cmds.attributeQuery(attr_name, **kwargs)
+            value = None
+            if exists is True:
+                kwargs = {'node': node_name, value_flag: True}
+                value = maya.cmds.attributeQuery(attr_name, **kwargs)
+            values.append(repr(value))
+    return '#'.join(values)
+
+
+def compute_collection_content_hash(col, withtest):
+    """
+    Compute a hash of the Collection content used by compilation.
+
+    :param col: The Collection to compute the hash for.
+    :type col: Collection
+
+    :param withtest: Is the compile expected to create validation
+                     Actions?
+    :type withtest: bool
+
+    :returns: The hash string, or None if the hash cannot be computed.
+    :rtype: str or None
+    """
+    global __CACHE_COUNTER
+    col_node = col.get_node()
+    if col_node is None:
+        return None
+    index_id = affects_utils.get_dependency_index_id()
+    if index_id is None:
+        return None
+
+    plug = '{0}.{1}'.format(
+        col_node, const.COLLECTION_ATTR_LONG_NAME_SOLVER_LIST)
+    solver_data = maya.cmds.getAttr(plug) or ''
+    members = maya.cmds.sets(col_node, query=True) or []
+    members = sorted(maya.cmds.ls(members, long=True) or [])
+    uuids = maya.cmds.ls(members, uuid=True) or []
+    mkr_nodes = [m for m in members if '.' not in m]
+    attr_names = [m for m in members if '.' in m]
+
+    parts = [
+        str(col.get_node_uid()),
+        str(bool(withtest)),
+        str(__CACHE_COUNTER),
+        str(index_id),
+        solver_data,
+        '#'.join(members),
+        '#'.join(uuids),
+        _get_marker_values_hash_string(mkr_nodes),
+        _get_attribute_values_hash_string(attr_names),
+    ]
+    value = '|'.join(parts)
+    if not isinstance(value, bytes):
+        value = value.encode('utf-8')
+    return hashlib.sha1(value).hexdigest()
+
+
+def collection_compile_with_cache(col, withtest=False,
+                                  prog_fn=None, status_fn=None):
+    """
+    Compile the Collection, re-using the last compiled Actions if the
+    Collection content has not changed.
+
+    See :py:func:`mmSolver._api.compile.collection_compile` for
+    details of compiling.
+
+    :param col: The Collection to compile.
+    :type col: Collection
+
+    :param withtest: Should validation tests be generated?
+    :type withtest: bool
+
+    :param prog_fn: Progress function callback.
+    :type prog_fn: callable or None
+
+    :param status_fn: Status message function callback.
+    :type status_fn: callable or None
+
+    :return: List of solver Actions and validation Actions.
+    :rtype: ([Action, ..], [Action or None, ..])
+    """
+    global __CACHE
+    col_node = col.get_node()
+    content_hash = None
+    exists = add_compile_cache_callbacks()
+    exists = exists and affects_utils.add_dependency_index_callbacks()
+    if exists is True:
+        content_hash = compute_collection_content_hash(col, withtest)
+    if content_hash is not None:
+        value = __CACHE.get(col.get_node_uid())
+        if value is not None and value[0] == content_hash:
+            LOG.debug('Compile cache hit: col=%r', col_node)
+            return list(value[1]), list(value[2])
+
+    sol_list = col.get_solver_list()
+    mkr_list = col.get_marker_list()
+    attr_list = col.get_attribute_list()
+    action_list, vaction_list = api_compile.collection_compile(
+        col_node,
+        sol_list, mkr_list, attr_list,
+        withtest=withtest,
+        prog_fn=prog_fn,
+        status_fn=status_fn)
+
+    if content_hash is not None:
+        value = (content_hash, list(action_list), list(vaction_list))
+        __CACHE[col.get_node_uid()] = value
+    return action_list, vaction_list
@@ -180,6 +180,9 @@ SOLVER_STD_BLOCK_ITERATION_NUM_DEFAULT_VALUE = 3
 SOLVER_STD_ROOT_ITERATION_NUM_DEFAULT_VALUE = 100
 SOLVER_STD_ANIM_ITERATION_NUM_DEFAULT_VALUE = 100
 SOLVER_STD_LINEUP_ITERATION_NUM_DEFAULT_VALUE = 100
+SOLVER_STD_USE_HIERARCHY_BLOCKS_DEFAULT_VALUE = False
+SOLVER_STD_HIERARCHY_REFINE_DEFAULT_VALUE = True
+SOLVER_STD_SPLIT_COMPONENTS_DEFAULT_VALUE = False
 
 
 # Execute validation mode
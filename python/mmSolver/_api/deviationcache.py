@@ -0,0 +1,249 @@
+# Copyright (C) 2019 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Deviation cache - read the keys of deviation animCurves once.
+
+Deviation animCurves are keyed on every frame solved, so most
+deviation queries are for frames that have a key. The keys of each
+animCurve are read once into arrays, and queries at key times are
+answered from the arrays; other times are evaluated on the animCurve.
+Frame range queries are answered by slicing the arrays.
+
+The cache is invalidated by Maya callbacks when animCurves are edited
+(including undo and redo) and when a new scene is created or opened.
+Deviation curves written with the Maya API (after a solve) invalidate
+the cache directly. Other Maya API edits do not run the callbacks, so
+each cached animCurve is also checked against its number of keys, and
+the time and value of its first and last keys, before it is used. The
+cache is only used while the callbacks exist.
+"""
+
+import array
+import bisect
+
+import maya.OpenMaya as OpenMaya
+import maya.OpenMayaAnim as OpenMayaAnim
+
+import mmSolver.logger
+
+
+LOG = mmSolver.logger.get_logger()
+
+__CACHE = dict()
+__CALLBACK_IDS = []
+
+
+def invalidate_deviation_cache(*args):
+    """
+    Remove all animCurve keys stored in the cache.
+
+    This function may be used directly as a Maya callback function;
+    all arguments are ignored.
+    """
+    global __CACHE
+    __CACHE = dict()
+    return
+
+
+def add_deviation_cache_callbacks():
+    """
+    Add the Maya callbacks used to invalidate the deviation cache.
+
+    If the callbacks have already been added, nothing happens.
+
+    :returns: True if the callbacks exist, False otherwise.
+    :rtype: bool
+    """
+    global __CALLBACK_IDS
+    if len(__CALLBACK_IDS) > 0:
+        return True
+    invalidate_deviation_cache()
+    func = invalidate_deviation_cache
+    callback_ids = []
+    try:
+        callback_ids.append(
+            OpenMayaAnim.MAnimMessage.addAnimCurveEditedCallback(func))
+        msgs = [
+            OpenMaya.MSceneMessage.kBeforeNew,
+            OpenMaya.MSceneMessage.kBeforeOpen,
+            OpenMaya.MSceneMessage.kAfterUndo,
+            OpenMaya.MSceneMessage.kAfterRedo,
+        ]
+        for msg in msgs:
+            callback_ids.append(
+                OpenMaya.MSceneMessage.addCallback(msg, func))
+    except RuntimeError:
+        LOG.warning('Could not add deviation cache callbacks.')
+        for callback_id in callback_ids:
+            OpenMaya.MMessage.removeCallback(callback_id)
+        return False
+    __CALLBACK_IDS = callback_ids
+    return True
+
+
+def remove_deviation_cache_callbacks():
+    """
+    Remove the Maya callbacks used to invalidate the deviation cache.
+
+    After the callbacks are removed the cache is cleared and no longer
+    used.
+    """
+    global __CALLBACK_IDS
+    for callback_id in __CALLBACK_IDS:
+        OpenMaya.MMessage.removeCallback(callback_id)
+    __CALLBACK_IDS = []
+    invalidate_deviation_cache()
+    return
+
+
+def _read_anim_curve_keys(anim_curve_fn):
+    """
+    Read the key times and values of an animCurve.
+
+    :returns: Key times (in UI units), key values and a map of key time
+              to key index.
+    :rtype: (array.array, array.array, {float: int})
+    """
+    unit = OpenMaya.MTime.uiUnit()
+    num_keys = anim_curve_fn.numKeys()
+    times = array.array('d', [0.0] * num_keys)
+    values = array.array('d', [0.0] * num_keys)
+    for i in range(num_keys):
+        times[i] = anim_curve_fn.time(i).asUnits(unit)
+        values[i] = anim_curve_fn.value(i)
+    index = dict((t, i) for i, t in enumerate(times))
+    return times, values, index
+
+
+def get_anim_curve_check(anim_curve_fn):
+    """
+    Get a cheap summary of an animCurve, used to detect changes.
+
+    :returns: The number of keys, and the time and value of the first
+              and last keys.
+    :rtype: tuple
+    """
+    num_keys = anim_curve_fn.numKeys()
+    if num_keys == 0:
+        return (num_keys, )
+    unit = OpenMaya.MTime.uiUnit()
+    last = num_keys - 1
+    return (
+        num_keys,
+        anim_curve_fn.time(0).asUnits(unit),
+        anim_curve_fn.value(0),
+        anim_curve_fn.time(last).asUnits(unit),
+        anim_curve_fn.value(last),
+    )
+
+
+def get_anim_curve_keys(anim_curve_fn):
+    """
+    Get the key times and values of an animCurve, from the cache if
+    possible.
+
+    :param anim_curve_fn: The animCurve to query.
+    :type anim_curve_fn: maya.OpenMayaAnim.MFnAnimCurve
+
+    :returns: Key times (in UI units), key values and a map of key time
+              to key index.
+    :rtype: (array.array, array.array, {float: int})
+    """
+    if add_deviation_cache_callbacks() is False:
+        return _read_anim_curve_keys(anim_curve_fn)
+    handle = OpenMaya.MObjectHandle(anim_curve_fn.object())
+    key = handle.hashCode()
+    check = get_anim_curve_check(anim_curve_fn)
+    value = __CACHE.get(key)
+    if value is not None and value[0].isValid() and value[1] == check:
+        return value[2]
+    keys = _read_anim_curve_keys(anim_curve_fn)
+    __CACHE[key] = (handle, check, keys)
+    return keys
+
+
+def get_frame_range_values(anim_curve_fn, start_frame=None, end_frame=None):
+    """
+    Get the value of an animCurve on every frame between the first
+    and last keys.
+
+    When the animCurve has a key on every frame of the range, the
+    values are sliced from the cached keys, otherwise the frames are
+    evaluated with :py:func:`evaluate_anim_curve`.
+
+    :param anim_curve_fn: The animCurve to query.
+    :type anim_curve_fn: maya.OpenMayaAnim.MFnAnimCurve
+
+    :param start_frame: Do not return frames before this frame, or
+                        None to start at the first key.
+    :type start_frame: int or float or None
+
+    :param end_frame: Do not return frames after this frame
+                      (inclusive), or None to end at the last key.
+    :type end_frame: int or float or None
+
+    :returns: The frame numbers and the value on each frame.
+    :rtype: ([int, ..], [float, ..])
+    """
+    times, values, _ = get_anim_curve_keys(anim_curve_fn)
+    if len(times) == 0:
+        return [], []
+    first_frame = int(times[0])
+    last_frame = int(times[-1])
+    if start_frame is not None:
+        first_frame = max(first_frame, int(start_frame))
+    if end_frame is not None:
+        last_frame = min(last_frame, int(end_frame))
+    if first_frame > last_frame:
+        return [], []
+
+    frames = list(range(first_frame, last_frame + 1))
+    start = bisect.bisect_left(times, float(first_frame))
+    end = bisect.bisect_right(times, float(last_frame))
+    if times[start:end] == array.array('d', frames):
+        return frames, list(values[start:end])
+    return frames, evaluate_anim_curve(anim_curve_fn, frames)
+
+
+def evaluate_anim_curve(anim_curve_fn, frames):
+    """
+    Evaluate an animCurve at many frames.
+
+    Frames with a key are looked up from the cached keys, other frames
+    are evaluated on the animCurve.
+
+    :param anim_curve_fn: The animCurve to evaluate.
+    :type anim_curve_fn: maya.OpenMayaAnim.MFnAnimCurve
+
+    :param frames: Frames to evaluate.
+    :type frames: [float, ..]
+
+    :returns: The value for each frame.
+    :rtype: [float, ..]
+    """
+    _, values, index = get_anim_curve_keys(anim_curve_fn)
+    unit = OpenMaya.MTime.uiUnit()
+    result = [None] * len(frames)
+    for i, frame in enumerate(frames):
+        key_index = index.get(float(frame))
+        if key_index is not None:
+            result[i] = values[key_index]
+        else:
+            frame_time = OpenMaya.MTime(float(frame), unit)
+            result[i] = anim_curve_fn.evaluate(frame_time)
+    return result
@@ -0,0 +1,561 @@
+# Copyright (C) 2019 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Marker enable index - fast queries of Marker enable and weight values
+over many frames.
+
+Querying a Marker's enable value with 'maya.cmds.getAttr' at a
+specific time is slow, and compiling a Collection asks the same
+questions many times, for each Marker and each frame. The
+:py:class:`MarkerEnableIndex` reads each Marker's enable and weight
+values for all frames once (using the animCurve directly, without
+evaluating the Maya DG), and answers all queries from memory.
+
+During compilation of a Collection an index is made 'active', and the
+module-level query functions (such as :py:func:`get_enable`) use the
+active index. When no index is active, the module-level functions
+query the Marker directly.
+"""
+
+import array
+from contextlib import contextmanager
+
+import maya.cmds
+import maya.OpenMaya as OpenMaya
+import maya.OpenMayaAnim as OpenMayaAnim
+
+import mmSolver.logger
+import mmSolver.utils.node as node_utils
+import mmSolver.utils.time as time_utils
+import mmSolver._api.constant as const
+
+
+LOG = mmSolver.logger.get_logger()
+
+__ACTIVE_INDEX = None
+
+
+def _is_constant_span(anim_fn, index, values):
+    """
+    Is the animCurve value constant between key 'index' and the next
+    key?
+
+    :rtype: bool
+    """
+    out_type = anim_fn.outTangentType(index)
+    if out_type == OpenMayaAnim.MFnAnimCurve.kTangentStep:
+        return True
+    if values[index] != values[index + 1]:
+        return False
+    flat_types = [
+        OpenMayaAnim.MFnAnimCurve.kTangentLinear,
+        OpenMayaAnim.MFnAnimCurve.kTangentFlat,
+    ]
+    in_type = anim_fn.inTangentType(index + 1)
+    return out_type in flat_types and in_type in flat_types
+
+
+def _is_time_anim_curve(anim_fn):
+    """
+    Is the animCurve evaluated with the scene time?
+
+    AnimCurves with a non-time input (such as driven keys) and
+    animCurves with a connected input (such as a time warp) are not.
+
+    :rtype: bool
+    """
+    if anim_fn.isTimeInput() is False:
+        return False
+    node_fn = OpenMaya.MFnDependencyNode(anim_fn.object())
+    input_plug = node_fn.findPlug('input')
+    return input_plug.isConnected() is False
+
+
+def _read_anim_curve_values(anim_fn, start_frame, end_frame):
+    """
+    Read the values of an animCurve for a range of frames.
+
+    The keys are read once. Frames on a key, and frames between keys
+    with a constant value (stepped keys, or equal keys with linear or
+    flat tangents) use the key values; only the remaining frames are
+    evaluated on the animCurve.
+
+    :returns: A value for each frame from start to end frame.
+    :rtype: [float, ..]
+    """
+    unit = OpenMaya.MTime.uiUnit()
+    num_keys = anim_fn.numKeys()
+    times = [anim_fn.time(i).asUnits(unit) for i in range(num_keys)]
+    values = [anim_fn.value(i) for i in range(num_keys)]
+    constant_spans = [_is_constant_span(anim_fn, i, values)
+                      for i in range(num_keys - 1)]
+    pre_constant = (anim_fn.preInfinityType()
+                    == OpenMayaAnim.MFnAnimCurve.kConstant)
+    post_constant = (anim_fn.postInfinityType()
+                     == OpenMayaAnim.MFnAnimCurve.kConstant)
+
+    frames = range(start_frame, end_frame + 1)
+    result = [None] * len(frames)
+    key_index = 0
+    for i, frame in enumerate(frames):
+        frame = float(frame)
+        while key_index < num_keys and times[key_index] <= frame:
+            key_index += 1
+        prev_index = key_index - 1
+        value = None
+        if num_keys == 0:
+            pass
+        elif key_index == 0:
+            if pre_constant is True:
+                value = values[0]
+        elif times[prev_index] == frame:
+            value = values[prev_index]
+        elif key_index == num_keys:
+            if post_constant is True:
+                value = values[prev_index]
+        elif constant_spans[prev_index] is True:
+            value = values[prev_index]
+        if value is None:
+            value = anim_fn.evaluate(OpenMaya.MTime(frame, unit))
+        result[i] = value
+    return result
+
+
+def read_plug_values(plug_name, start_frame, end_frame):
+    """
+    Read the values of a plug for a range of frames.
+
+    If the plug is driven by an animCurve evaluated with the scene
+    time, the animCurve keys are read directly, without evaluating the
+    Maya DG; only frames between keys that change value are evaluated
+    on the animCurve. If the plug is not connected, the static value
+    is used. Otherwise (including driven keys and time warped
+    animCurves) the plug is evaluated with a DG context for each
+    frame.
+
+    :param plug_name: The 'node.attr' to query.
+    :type plug_name: str
+
+    :param start_frame: First frame to query.
+    :type start_frame: int
+
+    :param end_frame: Last frame to query (inclusive).
+    :type end_frame: int
+
+    :returns: A value for each frame from start to end frame.
+    :rtype: [float, ..]
+    """
+    frames = range(start_frame, end_frame + 1)
+    plug = node_utils.get_as_plug_apione(plug_name)
+    if plug is None:
+        msg = 'Could not get plug: %r'
+        LOG.warning(msg, plug_name)
+        return [0.0] * len(frames)
+
+    src_plugs = OpenMaya.MPlugArray()
+    plug.connectedTo(src_plugs, True, False)
+    if src_plugs.length() == 0:
+        value = plug.asDouble()
+        return [value] * len(frames)
+
+    src_node = src_plugs[0].node()
+    if src_node.hasFn(OpenMaya.MFn.kAnimCurve):
+        anim_fn = OpenMayaAnim.MFnAnimCurve(src_node)
+        if _is_time_anim_curve(anim_fn) is True:
+            return _read_anim_curve_values(anim_fn, start_frame, end_frame)
+
+    # Not an animCurve of the scene time, the DG must be evaluated.
+    unit = OpenMaya.MTime.uiUnit()
+    values = [None] * len(frames)
+    for i, frame in enumerate(frames):
+        ctx = OpenMaya.MDGContext(OpenMaya.MTime(float(frame), unit))
+        values[i] = plug.asDouble(ctx)
+    return values
+
+
+class MarkerEnableIndex(object):
+    """
+    A Marker x frame index of enable and weight values.
+
+    The values of each Marker are read on first use, for all frames
+    in the index frame range. Frames outside the frame range are read
+    individually, and stored, when they are queried.
+
+    Example usage::
+
+        >>> idx = MarkerEnableIndex(mkr_list, frame_list=[1, 2, 3])
+        >>> idx.get_enable(mkr_list[0], 2)
+        1
+        >>> idx.get_enabled_marker_list(2)
+        [<Marker(...)>, ..]
+
+    """
+
+    def __init__(self, mkr_list, frame_list=None):
+        """
+        Create an index for the Markers given.
+
+        :param mkr_list: Markers to be indexed.
+        :type mkr_list: [Marker, ..]
+
+        :param frame_list: Frame numbers expected to be queried. If
+                           None, the Maya outer timeline range is
+                           used.
+        :type frame_list: [int, ..] or None
+        """
+        assert isinstance(mkr_list, (list, tuple))
+        if frame_list is None or len(frame_list) == 0:
+            start_frame, end_frame = time_utils.get_maya_timeline_range_outer()
+        else:
+            start_frame = int(min(frame_list))
+            end_frame = int(max(frame_list))
+        self._start_frame = start_frame
+        self._end_frame = end_frame
+
+        self._mkr_list = list(mkr_list)
+        self._mkr_nodes = [mkr.get_node() for mkr in self._mkr_list]
+        self._mkr_node_set = set(self._mkr_nodes)
+
+        # Per-marker data, keyed by marker node.
+        self._enable = {}
+        self._weight = {}
+        self._extra_enable = {}
+        self._extra_weight = {}
+        return
+
+    def get_marker_list(self):
+        """
+        The Markers in the index.
+
+        :rtype: [Marker, ..]
+        """
+        return list(self._mkr_list)
+
+    def get_marker_node_list(self):
+        """
+        The Marker nodes in the index.
+
+        :rtype: [str, ..]
+        """
+        return list(self._mkr_nodes)
+
+    def get_frame_range(self):
+        """
+        The range of frames read for each Marker.
+
+        :rtype: FrameRange
+        """
+        return time_utils.FrameRange(self._start_frame, self._end_frame)
+
+    def has_marker(self, mkr):
+        """
+        Is the Marker in the index?
+
+        :rtype: bool
+        """
+        return mkr.get_node() in self._mkr_node_set
+
+    def has_frames(self, frame_list):
+        """
+        Are the frames inside the index frame range?
+
+        :param frame_list: Frame numbers to check.
+        :type frame_list: [int, ..]
+
+        :rtype: bool
+        """
+        if len(frame_list) == 0:
+            return True
+        return (int(min(frame_list)) >= self._start_frame
+                and int(max(frame_list)) <= self._end_frame)
+
+    def _read_marker(self, mkr_node):
+        enable_values = read_plug_values(
+            '{0}.{1}'.format(mkr_node, const.MARKER_ATTR_LONG_NAME_ENABLE),
+            self._start_frame, self._end_frame)
+        weight_values = read_plug_values(
+            '{0}.{1}'.format(mkr_node, const.MARKER_ATTR_LONG_NAME_WEIGHT),
+            self._start_frame, self._end_frame)
+        # The enable attribute is an integer; values are rounded when
+        # given to the attribute.
+        self._enable[mkr_node] = array.array(
+            'B', [int(round(v)) > 0 for v in enable_values])
+        self._weight[mkr_node] = array.array('d', weight_values)
+        self._extra_enable[mkr_node] = {}
+        self._extra_weight[mkr_node] = {}
+        return
+
+    def _get_enable_array(self, mkr_node):
+        if mkr_node not in self._enable:
+            self._read_marker(mkr_node)
+        return self._enable[mkr_node]
+
+    def _get_weight_array(self, mkr_node):
+        if mkr_node not in self._weight:
+            self._read_marker(mkr_node)
+        return self._weight[mkr_node]
+
+    def get_enable(self, mkr, frame):
+        """
+        Get the enabled state of the Marker at a frame.
+
+        :param mkr: Marker to query.
+        :type mkr: Marker
+
+        :param frame: Frame number to query.
+        :type frame: int or float
+
+        :returns: The enabled state of the Marker; 1 or 0.
+        :rtype: int
+        """
+        mkr_node = mkr.get_node()
+        values = self._get_enable_array(mkr_node)
+        index = int(frame) - self._start_frame
+        if frame == int(frame) and 0 <= index < len(values):
+            return values[index]
+        extra = self._extra_enable[mkr_node]
+        if frame not in extra:
+            plug = '{0}.{1}'.format(mkr_node, const.MARKER_ATTR_LONG_NAME_ENABLE)
+            extra[frame] = int(maya.cmds.getAttr(plug, time=frame) > 0)
+        return extra[frame]
+
+    def get_weight(self, mkr, frame):
+        """
+        Get the weight of the Marker at a frame.
+
+        :param mkr: Marker to query.
+        :type mkr: Marker
+
+        :param frame: Frame number to query.
+        :type frame: int or float
+
+        :returns: The weight of the Marker.
+        :rtype: float
+        """
+        mkr_node = mkr.get_node()
+        values = self._get_weight_array(mkr_node)
+        index = int(frame) - self._start_frame
+        if frame == int(frame) and 0 <= index < len(values):
+            return values[index]
+        extra = self._extra_weight[mkr_node]
+        if frame not in extra:
+            plug = '{0}.{1}'.format(mkr_node, const.MARKER_ATTR_LONG_NAME_WEIGHT)
+            extra[frame] = maya.cmds.getAttr(plug, time=frame)
+        return extra[frame]
+
+    def get_enabled_frames(self, mkr, frame_list=None):
+        """
+        Get the frames the Marker is enabled.
+
+        :param mkr: Marker to query.
+        :type mkr: Marker
+
+        :param frame_list: Frames to consider, or None to use all
+                           frames in the index frame range.
+        :type frame_list: [int, ..] or None
+
+        :returns: The enabled frame numbers, in the order given.
+        :rtype: [int, ..]
+        """
+        if frame_list is None:
+            values = self._get_enable_array(mkr.get_node())
+            start = self._start_frame
+            return [start + i for i, v in enumerate(values) if v]
+        return [f for f in frame_list if self.get_enable(mkr, f)]
+
+    def count_enabled_frames(self, mkr, frame_list):
+        """
+        Count the number of frames the Marker is enabled.
+
+        :param mkr: Marker to query.
+        :type mkr: Marker
+
+        :param frame_list: Frames to consider.
+        :type frame_list: [int, ..]
+
+        :rtype: int
+        """
+        return sum(self.get_enable(mkr, f) for f in frame_list)
+
+    def get_enabled_marker_list(self, frame, mkr_list=None):
+        """
+        Get the Markers enabled at a frame.
+
+        :param frame: Frame number to query.
+        :type frame: int or float
+
+        :param mkr_list: Markers to consider, or None to use all
+                         Markers in the index.
+        :type mkr_list: [Marker, ..] or None
+
+        :returns: The enabled Markers, in the order given.
+        :rtype: [Marker, ..]
+        """
+        if mkr_list is None:
+            mkr_list = self._mkr_list
+        return [mkr for mkr in mkr_list if self.get_enable(mkr, frame)]
+
+
+def get_active_index():
+    """
+    Get the active Marker enable index.
+
+    :rtype: MarkerEnableIndex or None
+    """
+    global __ACTIVE_INDEX
+    return __ACTIVE_INDEX
+
+
+def set_active_index(value):
+    """
+    Set the active Marker enable index.
+
+    :param value: The index to use, or None to use no index.
+    :type value: MarkerEnableIndex or None
+    """
+    global __ACTIVE_INDEX
+    assert value is None or isinstance(value, MarkerEnableIndex)
+    __ACTIVE_INDEX = value
+    return
+
+
+@contextmanager
+def active_index_context(mkr_list, frame_list=None):
+    """
+    Create a Marker enable index and make it active, using a context
+    manager.
+
+    Example usage:
+    >>> with active_index_context(mkr_list, frame_list) as idx:
+    ...     get_enable(mkr_list[0], frame_list[0])
+
+    :param mkr_list: Markers to be indexed.
+    :type mkr_list: [Marker, ..]
+
+    :param frame_list: Frame numbers expected to be queried.
+    :type frame_list: [int, ..] or None
+
+    :return: Yields (returns) the active MarkerEnableIndex.
+    """
+    prev_index = get_active_index()
+    idx = MarkerEnableIndex(mkr_list, frame_list=frame_list)
+    set_active_index(idx)
+    try:
+        yield idx
+    finally:
+        set_active_index(prev_index)
+
+
+def get_enable(mkr, frame):
+    """
+    Get the enabled state of the Marker at a frame, using the active
+    index if possible.
+
+    :param mkr: Marker to query.
+    :type mkr: Marker
+
+    :param frame: Frame number to query.
+    :type frame: int or float
+
+    :rtype: int
+    """
+    idx = get_active_index()
+    if idx is not None and idx.has_marker(mkr):
+        return idx.get_enable(mkr, frame)
+    return mkr.get_enable(time=frame)
+
+
+def get_weight(mkr, frame):
+    """
+    Get the weight of the Marker at a frame, using the active index
+    if possible.
+
+    :param mkr: Marker to query.
+    :type mkr: Marker
+
+    :param frame: Frame number to query.
+    :type frame: int or float
+
+    :rtype: float
+    """
+    idx = get_active_index()
+    if idx is not None and idx.has_marker(mkr):
+        return idx.get_weight(mkr, frame)
+    return mkr.get_weight(time=frame)
+
+
+def count_enabled_frames(mkr, frame_list):
+    """
+    Count the number of frames the Marker is enabled, using the active
+    index if possible.
+
+    :param mkr: Marker to query.
+    :type mkr: Marker
+
+    :param frame_list: Frames to consider.
+    :type frame_list: [int, ..]
+
+    :rtype: int
+    """
+    idx = get_active_index()
+    if idx is not None and idx.has_marker(mkr):
+        return idx.count_enabled_frames(mkr, frame_list)
+    return sum(mkr.get_enable(time=f) for f in frame_list)
+
+
+def get_enabled_frames(mkr, frame_list):
+    """
+    Get the frames the Marker is enabled, using the active index if
+    possible.
+
+    If the active index does not contain the Marker or the frames,
+    the Marker enable values are read once for the frames given.
+
+    :param mkr: Marker to query.
+    :type mkr: Marker
+
+    :param frame_list: Frames to consider.
+    :type frame_list: [int, ..]
+
+    :returns: The enabled frame numbers, in the order given.
+    :rtype: [int, ..]
+    """
+    if len(frame_list) == 0:
+        return []
+    idx = get_active_index()
+    if (idx is None
+            or not idx.has_marker(mkr)
+            or not idx.has_frames(frame_list)):
+        idx = MarkerEnableIndex([mkr], frame_list=frame_list)
+    return idx.get_enabled_frames(mkr, frame_list=frame_list)
+
+
+def get_enabled_marker_list(mkr_list, frame):
+    """
+    Get the Markers enabled at a frame, using the active index if
+    possible.
+
+    :param mkr_list: Markers to consider.
+    :type mkr_list: [Marker, ..]
+
+    :param frame: Frame number to query.
+    :type frame: int or float
+
+    :rtype: [Marker, ..]
+    """
+    return [mkr for mkr in mkr_list if get_enable(mkr, frame)]
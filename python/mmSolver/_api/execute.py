@@ -37,9 +37,11 @@ import mmSolver.logger
 import mmSolver.utils.viewport as viewport_utils
 import mmSolver._api.state as api_state
 import mmSolver._api.utils as api_utils
-import mmSolver._api.compile as api_compile
+import mmSolver._api.compilecache as compilecache
 import mmSolver._api.excep as excep
+import mmSolver._api.executeparallel as executeparallel
 import mmSolver._api.solveresult as solveresult
+import mmSolver._api.validation as validation
 import mmSolver._api.action as api_action
 import mmSolver._api.solverbase as solverbase
 import mmSolver._api.collectionutils as collectionutils
@@ -56,9 +58,15 @@ ExecuteOptions = collections.namedtuple(
      'pre_solve_force_eval',
      'do_isolate',
      'display_grid',
-     'display_node_types')
+     'display_node_types',
+     'num_workers',
+     'refresh_interval')
 )
 
+# The default minimum number of seconds between viewport refreshes
+# while solving; at most 4 refreshes per second.
+REFRESH_INTERVAL_DEFAULT = 0.25
+
 
 def createExecuteOptions(verbose=False,
                          refresh=False,
@@ -67,7 +75,9 @@ def createExecuteOptions(verbose=False,
                          do_isolate=False,
                          pre_solve_force_eval=True,
                          display_grid=True,
-                         display_node_types=None):
+                         display_node_types=None,
+                         num_workers=0,
+                         refresh_interval=None):
     """
     Create :py:class:`ExecuteOptions` object.
 
@@ -107,9 +117,25 @@ def createExecuteOptions(verbose=False,
                                during solving. If an argument is not
                                given or is None, the object type
                                visibility will not be changed.
+
+    :param num_workers: The number of 'mayapy' worker processes used
+                        to solve independent Actions at the same time.
+                        A value of 0 or 1 solves all Actions in the
+                        current Maya session. See
+                        :py:mod:`mmSolver._api.executeparallel`.
+    :type num_workers: int
+
+    :param refresh_interval: The minimum number of seconds between
+                             viewport refreshes, when 'refresh' is
+                             True. The viewport is always refreshed
+                             after the last Action. If None,
+                             REFRESH_INTERVAL_DEFAULT is used.
+    :type refresh_interval: float or None
     """
     if display_node_types is None:
         display_node_types = dict()
+    if refresh_interval is None:
+        refresh_interval = REFRESH_INTERVAL_DEFAULT
     options = ExecuteOptions(
         verbose=verbose,
         refresh=refresh,
@@ -118,11 +144,105 @@ def createExecuteOptions(verbose=False,
         do_isolate=do_isolate,
         pre_solve_force_eval=pre_solve_force_eval,
         display_grid=display_grid,
-        display_node_types=display_node_types
+        display_node_types=display_node_types,
+        num_workers=num_workers,
+        refresh_interval=refresh_interval,
     )
     return options
 
 
+class RefreshScheduler(object):
+    """
+    Decides when the viewport should be refreshed while solving.
+
+    Refreshing the viewport after each Action can take longer than
+    the solve itself (for example with per-frame solves), so the
+    viewport is refreshed at most once per 'interval' seconds, and
+    always after the last Action. A skipped refresh is remembered, so
+    it can be made when solving stops (see
+    :py:meth:`has_pending_refresh`).
+
+    The number of refreshes and the time spent refreshing is recorded.
+    """
+
+    def __init__(self, interval=None):
+        """
+        :param interval: Minimum number of seconds between refreshes.
+        :type interval: float or None
+        """
+        if interval is None:
+            interval = REFRESH_INTERVAL_DEFAULT
+        self._interval = max(0.0, float(interval))
+        self._last_time = None
+        self._count = 0
+        self._skip_count = 0
+        self._duration = 0.0
+        self._pending = False
+
+    def should_refresh(self, is_last=False):
+        """
+        Should the viewport be refreshed now?
+
+        :param is_last: Is this refresh for the last Action?
+        :type is_last: bool
+
+        :rtype: bool
+        """
+        if is_last is True or self._last_time is None:
+            return True
+        elapsed = time.time() - self._last_time
+        if elapsed >= self._interval:
+            return True
+        self._skip_count += 1
+        self._pending = True
+        return False
+
+    def add_refresh(self, duration):
+        """
+        Record a refresh that has happened.
+
+        :param duration: Number of seconds spent refreshing.
+        :type duration: float
+        """
+        self._last_time = time.time()
+        self._count += 1
+        self._duration += duration
+        self._pending = False
+        return
+
+    def has_pending_refresh(self):
+        """
+        Has a refresh been skipped since the last refresh?
+
+        :rtype: bool
+        """
+        return self._pending
+
+    def get_refresh_count(self):
+        """
+        How many times has the viewport been refreshed?
+
+        :rtype: int
+        """
+        return self._count
+
+    def get_skip_count(self):
+        """
+        How many refresh requests have been skipped?
+
+        :rtype: int
+        """
+        return self._skip_count
+
+    def get_refresh_duration(self):
+        """
+        Total time spent refreshing the viewport, in seconds.
+
+        :rtype: float
+        """
+        return self._duration
+
+
 def preSolve_updateProgress(prog_fn, status_fn):
     """
     Initialise solver is running, and send info to the Maya GUI before
@@ -264,7 +384,7 @@ def preSolve_triggerEvaluation(action_list, cur_frame, options):
     return
 
 
-def postSolve_refreshViewport(options, frame):
+def postSolve_refreshViewport(options, frame, scheduler=None, is_last=False):
     """
     Refresh the viewport after a solve has finished.
 
@@ -275,6 +395,14 @@ def postSolve_refreshViewport(options, frame):
         The list of frame numbers, first item in list is used to
         refresh the viewport.
     :type frame: [int or float, ..]
+
+    :param scheduler: Limits how often the viewport is refreshed, and
+                      records the time spent refreshing. If None, the
+                      viewport is always refreshed.
+    :type scheduler: RefreshScheduler or None
+
+    :param is_last: Is this the last Action to be solved?
+    :type is_last: bool
     """
     LOG.debug(
         'postSolve_refreshViewport: '
@@ -286,6 +414,8 @@ def postSolve_refreshViewport(options, frame):
     # Refresh the Viewport.
     if options.refresh is not True:
         return
+    if scheduler is not None and not scheduler.should_refresh(is_last):
+        return
 
     s = time.time()
     maya.cmds.currentTime(
@@ -295,6 +425,8 @@ def postSolve_refreshViewport(options, frame):
     )
     maya.cmds.refresh()
     e = time.time()
+    if scheduler is not None:
+        scheduler.add_refresh(e - s)
     LOG.debug('Refresh Viewport; time=%r', e - s)
     return
 
@@ -430,13 +562,22 @@ def postSolve_setUpdateProgress(progress_min,
     return stop_solving
 
 
-def _run_validate_action(vaction):
+def _run_validate_action(vaction, analytic=True):
     """
     Call a single validate action, and see what happens.
 
+    When possible, the number of parameters and errors are counted
+    from the Maya scene directly (see
+    :py:mod:`mmSolver._api.validation`), otherwise the 'mmSolver'
+    command is run.
+
     :param vaction: Validation action object to be run.
     :type vaction: Action
 
+    :param analytic: Try to count the parameters and errors without
+                     running the 'mmSolver' command?
+    :type analytic: bool
+
     :return:
         A tuple of 3 parts; First, did the validation succeed (as
         boolean)? Second, the user message we present for the state.
@@ -470,11 +611,17 @@ def _run_validate_action(vaction):
     if vfunc_is_mmsolver is False:
         return valid, message, metrics
 
-    solve_data = vfunc(*vargs, **vkwargs)
-    solres = solveresult.SolveResult(solve_data)
-    print_stats = solres.get_print_stats()
-    num_param = print_stats.get('number_of_parameters', 0)
-    num_err = print_stats.get('number_of_errors', 0)
+    counts = None
+    if analytic is True:
+        counts = validation.count_parameters_and_errors(vkwargs)
+    if counts is not None:
+        num_param, num_err, num_frames = counts
+    else:
+        solve_data = vfunc(*vargs, **vkwargs)
+        solres = solveresult.SolveResult(solve_data)
+        print_stats = solres.get_print_stats()
+        num_param = print_stats.get('number_of_parameters', 0)
+        num_err = print_stats.get('number_of_errors', 0)
     metrics = (num_param, num_err, num_frames)
     if num_param == 0 or num_err == 0 or num_param > num_err:
         valid = False
@@ -486,10 +633,42 @@ def _run_validate_action(vaction):
     return valid, message, metrics
 
 
+def _run_validate_action_with_cache(vaction, cache):
+    """
+    Call a single validate action, re-using the result of the same
+    validation action object, if possible.
+
+    Solvers with the same validation signature are compiled with the
+    same validation action objects (see
+    :py:func:`mmSolver._api.compile.compile_solver_with_cache`).
+
+    See :py:func:`_run_validate_action` for more details.
+
+    :param vaction: Validation action object to be run.
+    :type vaction: Action
+
+    :param cache: Validation results keyed by the validation action
+                  object identity. The cache must only be used while
+                  the validation actions exist.
+    :type cache: dict
+
+    :rtype: (bool, str, (int, int, int))
+    """
+    key = id(vaction)
+    if key in cache:
+        return cache[key]
+    result = _run_validate_action(vaction)
+    cache[key] = result
+    return result
+
+
 def _run_validate_action_list(vaction_list):
     """
     Calls the validation functions attached to the Action list.
 
+    Each unique validation action is only run once, and the result is
+    shared by all Actions using it.
+
     See :py:func:`_run_validate_action` for more details.
 
     :param vaction_list: List of validate actions to call.
@@ -504,8 +683,9 @@ def _run_validate_action_list(vaction_list):
     valid = True
     message_list = []
     metrics_list = []
+    cache = dict()
     for vaction in vaction_list:
-        v, message, metrics = _run_validate_action(vaction)
+        v, message, metrics = _run_validate_action_with_cache(vaction, cache)
         metrics_list.append(metrics)
         message_list.append(message)
         if v is not True:
@@ -513,6 +693,39 @@ def _run_validate_action_list(vaction_list):
     return valid, message_list, metrics_list
 
 
+def _use_parallel_execution(action_list, options, validate_mode):
+    """
+    Should the Actions be executed by worker processes?
+
+    Only 'mmSolver' command Actions are run by worker processes, so
+    there must be more than one, and at least two of them must be
+    independent; when the solver Actions depend on each other in a
+    chain, the scene is not exported and no workers are started.
+    Other Actions are run between the solver Actions (see
+    :py:mod:`mmSolver._api.executeparallel`). 'at_runtime' validation
+    is always run in the current Maya session.
+
+    :returns: The dependencies of the Actions (see
+              :py:func:`mmSolver._api.executeparallel.compute_action_dependencies`),
+              or None if the Actions should be executed serially.
+    :rtype: [set of int, ..] or None
+    """
+    num_workers = getattr(options, 'num_workers', 0) or 0
+    if num_workers <= 1:
+        return None
+    if validate_mode == const.VALIDATE_MODE_AT_RUNTIME_VALUE:
+        return None
+    solver_count = len([x for x in action_list
+                        if api_action.action_func_is_mmSolver(x)])
+    if solver_count <= 1:
+        return None
+    deps_list = executeparallel.compute_action_dependencies(action_list)
+    if executeparallel.is_dependency_chain(action_list, deps_list):
+        LOG.debug('Solver Actions depend on each other, solving serially.')
+        return None
+    return deps_list
+
+
 def validate(col):
     """
     Validates the given collection state, is it ready for solving?
@@ -532,13 +745,8 @@ def validate(col):
 
     s = time.time()
     try:
-        col_node = col.get_node()
-        sol_list = col.get_solver_list()
-        mkr_list = col.get_marker_list()
-        attr_list = col.get_attribute_list()
-        action_list, vaction_list = api_compile.collection_compile(
-            col_node,
-            sol_list, mkr_list, attr_list,
+        action_list, vaction_list = compilecache.collection_compile_with_cache(
+            col,
             withtest=True,
             prog_fn=None,
             status_fn=None)
@@ -596,8 +804,10 @@ def execute(col,
                     messages to the user.
     :type info_fn: callable or None
 
-    :return: List of SolveResults from the executed collection.
-    :rtype: [SolverResult, ..]
+    :return: List of SolveResults from the executed collection. The
+             list is a SolveResultSet, which computes merged values
+             of all the SolveResults efficiently.
+    :rtype: SolveResultSet
     """
     if options is None:
         options = createExecuteOptions()
@@ -624,32 +834,29 @@ def execute(col,
     # Save current frame, to revert to later on.
     cur_frame = maya.cmds.currentTime(query=True)
 
+    refresh_scheduler = RefreshScheduler(options.refresh_interval)
+    refresh_frame = None
+    compile_duration = 0.0
     try:
         if options.disable_viewport_two is True:
             viewport_utils.set_viewport2_active_state(False)
         preSolve_updateProgress(prog_fn, status_fn)
 
         # Check for validity and compile actions.
-        solres_list = []
+        solres_list = solveresult.SolveResultSet()
         withtest = validate_mode in [const.VALIDATE_MODE_PRE_VALIDATE_VALUE,
                                      const.VALIDATE_MODE_AT_RUNTIME_VALUE]
-        col_node = col.get_node()
-        sol_list = col.get_solver_list()
-        mkr_list = col.get_marker_list()
-        attr_list = col.get_attribute_list()
         try:
             s = time.time()
-            action_list, vaction_list = api_compile.collection_compile(
-                col_node,
-                sol_list,
-                mkr_list,
-                attr_list,
+            action_list, vaction_list = compilecache.collection_compile_with_cache(
+                col,
                 withtest=withtest,
                 prog_fn=prog_fn,
                 status_fn=status_fn
             )
             e = time.time()
-            LOG.debug('compile time (execute): %r', e - s)
+            compile_duration = e - s
+            LOG.debug('compile time (execute): %r', compile_duration)
         except excep.NotValid as e:
             LOG.warning(e)
             return solres_list
@@ -665,73 +872,104 @@ def execute(col,
         preSolve_setIsolatedNodes(action_list, options, panels)
         preSolve_triggerEvaluation(action_list, cur_frame, options)
 
-        # Run Solver Actions...
-        start = 0
-        total = len(action_list)
-        for i, (action, vaction) in enumerate(zip(action_list, vaction_list)):
-            if isinstance(vaction, api_action.Action) and validate_mode == 'at_runtime':
-                valid, message, metrics = _run_validate_action(vaction)
-                if valid is not True:
-                    LOG.warn(message)
-                    return
-
-            func, args, kwargs = api_action.action_to_components(action)
-            func_is_mmsolver = api_action.action_func_is_mmSolver(action)
-
-            save_node_attrs = None
-            is_single_frame = None
-            if func_is_mmsolver is True:
-                frame = kwargs.get('frame')
-                collectionutils.run_status_func(info_fn, 'Evaluating frames %r' % frame)
-                if frame is None or len(frame) == 0:
-                    raise excep.NotValid
-
-                # Write solver flags to a debug file.
-                debug_file_path = kwargs.get('debugFile', None)
-                if debug_file_path is not None:
-                    options_file_path = debug_file_path.replace('.log', '.flags')
-                    text = pprint.pformat(kwargs)
-                    with open(options_file_path, 'w') as file_:
-                        file_.write(text)
-
-                # Overriding the verbosity, irrespective of what
-                # the solver verbosity value is set to.
-                if log_level is not None and log_level.lower() == 'verbose':
-                    kwargs['verbose'] = True
-
-                # HACK for single frame solves.
-                save_node_attrs = []
-                is_single_frame = collectionutils.is_single_frame(kwargs)
-                if is_single_frame is True:
-                    save_node_attrs = collectionutils.disconnect_animcurves(kwargs)
-
-            # Run Solver Maya plug-in command
-            solve_data = func(*args, **kwargs)
-
-            # Revert special HACK for single frame solves
-            if func_is_mmsolver is True:
-                if is_single_frame is True:
-                    collectionutils.reconnect_animcurves(kwargs, save_node_attrs)
-
-            # Create SolveResult.
-            solres = None
-            if solve_data is not None and func_is_mmsolver is True:
-                solres = solveresult.SolveResult(solve_data)
-                solres_list.append(solres)
-
-            # Update Progress
-            interrupt = postSolve_setUpdateProgress(
-                start, i, total, solres,
-                prog_fn, status_fn
-            )
-            if interrupt is True:
-                break
-
-            # Refresh the Viewport.
-            if func_is_mmsolver is True:
-                frame = kwargs.get('frame')
-                postSolve_refreshViewport(options, frame)
+        # Run Solver Actions in worker processes...
+        parallel_solres_list = None
+        deps_list = _use_parallel_execution(
+            action_list, options, validate_mode)
+        if deps_list is not None:
+            try:
+                parallel_solres_list = executeparallel.execute_action_list(
+                    action_list,
+                    options.num_workers,
+                    deps_list=deps_list,
+                    prog_fn=prog_fn,
+                    status_fn=status_fn)
+            except excep.NotValid as e:
+                LOG.warning('Parallel execution failed, solving serially: %s', e)
+        if parallel_solres_list is not None:
+            solres_list = solveresult.SolveResultSet(parallel_solres_list)
+        else:
+            # Run Solver Actions...
+            start = 0
+            total = len(action_list)
+            validate_cache = dict()
+            for i, (action, vaction) in enumerate(zip(action_list, vaction_list)):
+                if isinstance(vaction, api_action.Action) and validate_mode == 'at_runtime':
+                    valid, message, metrics = _run_validate_action_with_cache(
+                        vaction, validate_cache)
+                    if valid is not True:
+                        LOG.warn(message)
+                        return
+
+                func, args, kwargs = api_action.action_to_components(action)
+                func_is_mmsolver = api_action.action_func_is_mmSolver(action)
+
+                save_node_attrs = None
+                is_single_frame = None
+                if func_is_mmsolver is True:
+                    frame = kwargs.get('frame')
+                    collectionutils.run_status_func(info_fn, 'Evaluating frames %r' % frame)
+                    if frame is None or len(frame) == 0:
+                        raise excep.NotValid
+
+                    # Write solver flags to a debug file.
+                    debug_file_path = kwargs.get('debugFile', None)
+                    if debug_file_path is not None:
+                        options_file_path = debug_file_path.replace('.log', '.flags')
+                        text = pprint.pformat(kwargs)
+                        with open(options_file_path, 'w') as file_:
+                            file_.write(text)
+
+                    # Overriding the verbosity, irrespective of what
+                    # the solver verbosity value is set to.
+                    if log_level is not None and log_level.lower() == 'verbose':
+                        kwargs['verbose'] = True
+
+                    # HACK for single frame solves.
+                    save_node_attrs = []
+                    is_single_frame = collectionutils.is_single_frame(kwargs)
+                    if is_single_frame is True:
+                        save_node_attrs = collectionutils.disconnect_animcurves(kwargs)
+
+                # Run Solver Maya plug-in command
+                solve_data = func(*args, **kwargs)
+
+                # Revert special HACK for single frame solves
+                if func_is_mmsolver is True:
+                    if is_single_frame is True:
+                        collectionutils.reconnect_animcurves(kwargs, save_node_attrs)
+
+                # Create SolveResult.
+                solres = None
+                if solve_data is not None and func_is_mmsolver is True:
+                    solres = solveresult.SolveResult(solve_data)
+                    solres_list.append(solres)
+
+                # Update Progress
+                interrupt = postSolve_setUpdateProgress(
+                    start, i, total, solres,
+                    prog_fn, status_fn
+                )
+                if interrupt is True:
+                    break
+
+                # Refresh the Viewport.
+                if func_is_mmsolver is True:
+                    refresh_frame = kwargs.get('frame')
+                    is_last = i == (total - 1)
+                    postSolve_refreshViewport(
+                        options, refresh_frame,
+                        scheduler=refresh_scheduler,
+                        is_last=is_last)
     finally:
+        # Make sure the last solved frame is shown, even when the last
+        # Action is not a solve, or the solve is interrupted.
+        if (refresh_frame is not None
+                and refresh_scheduler.has_pending_refresh() is True):
+            postSolve_refreshViewport(
+                options, refresh_frame,
+                scheduler=refresh_scheduler,
+                is_last=True)
         postSolve_setViewportState(
             options, panel_objs, panel_node_type_vis
         )
@@ -749,6 +987,12 @@ def execute(col,
     # Store output information of the solver.
     end_time = time.time()
     duration = end_time - start_time
+    LOG.debug('Execute timing; total=%r compile=%r '
+              'refresh=%r refresh_count=%r refresh_skipped=%r',
+              duration, compile_duration,
+              refresh_scheduler.get_refresh_duration(),
+              refresh_scheduler.get_refresh_count(),
+              refresh_scheduler.get_skip_count())
     col._set_last_solve_timestamp(end_time)
     col._set_last_solve_duration(duration)
     col._set_last_solve_results(solres_list)
@@ -0,0 +1,880 @@
+# Copyright (C) 2019 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Parallel execution - run independent solver Actions in a pool of
+'mayapy' worker processes.
+
+The current Maya scene is exported once, and each worker process
+opens the exported scene once. The parent process schedules the
+Actions; an Action is only started after all the Actions it depends on
+have finished (see :py:func:`compute_action_dependencies`), so for
+example, root frame solves finish before the per-frame solves start.
+Single frame solves on different frames are independent, even when
+they solve the same animated Attributes, so the per-frame solves run
+in parallel. A per-frame solve therefore starts from the values
+interpolated between the keyframes written before it started, which
+may differ from a serial execution; only the start values differ.
+
+Each worker runs the 'mmSolver' command and sends back the solve
+result data and the solved Attribute values, as compact arrays of
+doubles. The values are sent to the other workers before they run any
+dependent Actions.
+
+Actions that do not run the 'mmSolver' command (for example deleting
+keyframes between root frames) are barriers; they are run after all
+earlier Actions, and before all later Actions. The parent process
+runs these Actions, and the workers replay them in their scene before
+running any later Action.
+
+The parent process writes the solved values and runs the non-solver
+Actions in the Maya scene after all the Actions have finished, so if
+parallel execution fails, the Maya scene is not changed and the
+Actions can be executed serially instead. The values are written with
+'maya.cmds', so they can be undone.
+"""
+
+import os
+import sys
+import json
+import array
+import base64
+import shutil
+import tempfile
+import threading
+import time
+import subprocess
+
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+import maya.cmds
+import maya.OpenMaya as OpenMaya
+import maya.OpenMayaAnim as OpenMayaAnim
+
+import mmSolver.logger
+import mmSolver.utils.node as node_utils
+import mmSolver.utils.nodeaffects as affects_utils
+import mmSolver.utils.animcurve as anim_utils
+import mmSolver._api.action as api_action
+import mmSolver._api.excep as excep
+import mmSolver._api.state as api_state
+import mmSolver._api.solveresult as solveresult
+import mmSolver._api.collectionutils as collectionutils
+
+
+LOG = mmSolver.logger.get_logger()
+
+# Prefix for lines of text in the worker communication protocol. Any
+# line not starting with the prefix (for example messages printed by
+# Maya) is ignored.
+MESSAGE_PREFIX = 'mmSolverWorker:'
+
+MESSAGE_TYPE_READY = 'ready'
+MESSAGE_TYPE_TASK = 'task'
+MESSAGE_TYPE_RESULT = 'result'
+MESSAGE_TYPE_ERROR = 'error'
+MESSAGE_TYPE_QUIT = 'quit'
+
+# How often (in seconds) the parent process checks for a user
+# interrupt while waiting for the workers.
+WORKER_POLL_SECONDS = 0.1
+
+# How long (in seconds) to wait for a worker process to exit, before
+# it is terminated, and then killed.
+WORKER_EXIT_TIMEOUT_SECONDS = 5.0
+
+
+def _encode_values(values):
+    """
+    Encode a list of floats into a compact string.
+    """
+    arr = array.array('d', values)
+    if hasattr(arr, 'tobytes'):
+        data = arr.tobytes()
+    else:
+        data = arr.tostring()
+    return base64.b64encode(data).decode('ascii')
+
+
+def _decode_values(text):
+    """
+    Decode a string created by :py:func:`_encode_values`.
+    """
+    data = base64.b64decode(text)
+    arr = array.array('d')
+    if hasattr(arr, 'frombytes'):
+        arr.frombytes(data)
+    else:
+        arr.fromstring(data)
+    return list(arr)
+
+
+def _get_anim_curve_object(plug):
+    """
+    Get the animCurve node directly driving the plug, or None.
+    """
+    src_plugs = OpenMaya.MPlugArray()
+    plug.connectedTo(src_plugs, True, False)
+    for i in range(src_plugs.length()):
+        src_node = src_plugs[i].node()
+        if src_node.hasFn(OpenMaya.MFn.kAnimCurve):
+            return src_node
+    return None
+
+
+def _query_attr_values(attr_name, frames):
+    """
+    Get the values of an Attribute, in internal units.
+
+    :param attr_name: The 'node.attr' to query.
+    :type attr_name: str
+
+    :param frames: The frames to query.
+    :type frames: [int, ..]
+
+    :returns: The frames and values; if the Attribute is not animated,
+              a single value with no frame is returned.
+    :rtype: ([int, ..] or None, [float, ..])
+    """
+    plug = node_utils.get_as_plug_apione(attr_name)
+    if plug is None:
+        return None, []
+    if _get_anim_curve_object(plug) is None:
+        return None, [plug.asDouble()]
+    unit = OpenMaya.MTime.uiUnit()
+    values = []
+    for f in frames:
+        ctx = OpenMaya.MDGContext(OpenMaya.MTime(float(f), unit))
+        values.append(plug.asDouble(ctx))
+    return list(frames), values
+
+
+def _set_attr_values(attr_name, frames, values):
+    """
+    Set the values of an Attribute in bulk, in internal units.
+
+    Animated Attributes have keyframes set on the existing animCurve,
+    static Attributes have the value set directly.
+
+    :param attr_name: The 'node.attr' to set.
+    :type attr_name: str
+
+    :param frames: The frames to set, or None for a static value.
+    :type frames: [int, ..] or None
+
+    :param values: The values to set.
+    :type values: [float, ..]
+    """
+    plug = node_utils.get_as_plug_apione(attr_name)
+    if plug is None:
+        LOG.warning('Could not set attribute values: %r', attr_name)
+        return
+    if frames is None:
+        if len(values) > 0:
+            plug.setDouble(values[0])
+        return
+    anim_curve_obj = _get_anim_curve_object(plug)
+    if anim_curve_obj is None:
+        LOG.warning('Attribute is no longer animated: %r', attr_name)
+        return
+    anim_fn = OpenMayaAnim.MFnAnimCurve(anim_curve_obj)
+    unit = OpenMaya.MTime.uiUnit()
+    key_index = {}
+    for i in range(anim_fn.numKeys()):
+        key_index[anim_fn.time(i).asUnits(unit)] = i
+    for f, v in zip(frames, values):
+        index = key_index.get(float(f))
+        if index is not None:
+            anim_fn.setValue(index, v)
+        else:
+            anim_fn.addKey(OpenMaya.MTime(float(f), unit), v)
+    return
+
+
+def _get_ui_unit_values(plug, values):
+    """
+    Convert values of a plug from internal units to UI units.
+    """
+    attr_obj = plug.attribute()
+    if attr_obj.hasFn(OpenMaya.MFn.kUnitAttribute) is False:
+        return list(values)
+    unit_type = OpenMaya.MFnUnitAttribute(attr_obj).unitType()
+    if unit_type == OpenMaya.MFnUnitAttribute.kAngle:
+        unit = OpenMaya.MAngle.uiUnit()
+        return [OpenMaya.MAngle(v).asUnits(unit) for v in values]
+    elif unit_type == OpenMaya.MFnUnitAttribute.kDistance:
+        unit = OpenMaya.MDistance.uiUnit()
+        return [OpenMaya.MDistance(v).asUnits(unit) for v in values]
+    return list(values)
+
+
+def _set_attr_values_undoable(values_list):
+    """
+    Set the values of many Attributes, in internal units, using
+    'maya.cmds' so the values can be undone.
+
+    When an Attribute is given more than once, the later values
+    replace the earlier values on the same frames. All the animated
+    Attributes are keyed with one call to
+    :py:func:`mmSolver.utils.animcurve.set_anim_curves_keys`.
+
+    :param values_list: The 'node.attr' to set, with the frames (or
+                        None for a static value) and the values.
+    :type values_list: [(str, [int, ..] or None, [float, ..]), ..]
+    """
+    attr_names = []
+    static_values = {}
+    anim_values = {}
+    for attr_name, frames, values in values_list:
+        plug = node_utils.get_as_plug_apione(attr_name)
+        if plug is None:
+            LOG.warning('Could not set attribute values: %r', attr_name)
+            continue
+        values = _get_ui_unit_values(plug, values)
+        if attr_name not in attr_names:
+            attr_names.append(attr_name)
+        if frames is None:
+            if len(values) > 0:
+                static_values[attr_name] = values[0]
+            continue
+        frame_values = anim_values.setdefault(attr_name, {})
+        for f, v in zip(frames, values):
+            frame_values[f] = v
+
+    curve_data = []
+    for attr_name in attr_names:
+        if attr_name in static_values:
+            maya.cmds.setAttr(attr_name, static_values[attr_name])
+        frame_values = anim_values.get(attr_name)
+        if frame_values is None:
+            continue
+        frames = sorted(frame_values.keys())
+        values = [frame_values[f] for f in frames]
+        curve_data.append((attr_name, frames, values))
+    if len(curve_data) > 0:
+        anim_utils.set_anim_curves_keys(curve_data)
+    return
+
+
+def _get_func_name(func):
+    """
+    Get the full name of a function, so it can be imported by a worker
+    process.
+
+    :returns: The 'module.function' name, or None if the function
+              cannot be imported.
+    :rtype: str or None
+    """
+    if isinstance(func, basestring):
+        return func
+    name = getattr(func, '__name__', None)
+    mod_name = getattr(func, '__module__', None)
+    if name is None or mod_name is None or name == '<lambda>':
+        return None
+    return '{0}.{1}'.format(mod_name, name)
+
+
+def _get_replay_action_data(action):
+    """
+    Get the data used to replay a non-solver Action in a worker process.
+
+    :raises NotValid: When the Action cannot be sent to a worker.
+
+    :rtype: dict
+    """
+    func_name = _get_func_name(action.func)
+    if func_name is None:
+        msg = 'Cannot replay Action in a worker process: %r'
+        raise excep.NotValid(msg % (action.func, ))
+    data = {
+        'func': func_name,
+        'args': list(action.args),
+        'kwargs': action.kwargs,
+    }
+    try:
+        json.dumps(data)
+    except (TypeError, ValueError):
+        msg = 'Cannot replay Action in a worker process: %r'
+        raise excep.NotValid(msg % (action.func, ))
+    return data
+
+
+def _apply_update(update):
+    """
+    Apply the solved values or replay the non-solver Action of a
+    finished Action, inside a worker process.
+    """
+    if 'values' in update:
+        for attr_name, frames, encoded in update['values']:
+            _set_attr_values(attr_name, frames, _decode_values(encoded))
+        return
+    data = update['action']
+    func = api_action.func_str_to_callable(data['func'])
+    # JSON converts tuples to lists; flags such as 'time' must be
+    # given as tuples.
+    kwargs = dict()
+    for key, value in data['kwargs'].items():
+        if isinstance(value, list):
+            value = tuple(value)
+        kwargs[str(key)] = value
+    func(*data['args'], **kwargs)
+    return
+
+
+def _get_action_frames(action):
+    return [int(f) for f in action.kwargs.get('frame') or []]
+
+
+def _get_action_attr_names(action):
+    attrs = action.kwargs.get('attr') or []
+    return [a[0] for a in attrs]
+
+
+def _get_long_plug_name(attr_name):
+    node = attr_name.partition('.')[0]
+    nodes = maya.cmds.ls(node, long=True) or [node]
+    attr = maya.cmds.attributeName(attr_name, long=True)
+    return nodes[0] + '.' + attr
+
+
+def _compute_action_info(action):
+    """
+    Get the frames, the written Attributes (animated and static) and
+    the Attributes that affect the Markers of a solver Action.
+    """
+    frames = set(_get_action_frames(action))
+    anim_writes = set()
+    static_writes = set()
+    for attr_name in _get_action_attr_names(action):
+        plug = node_utils.get_as_plug_apione(attr_name)
+        if plug is None:
+            continue
+        name = _get_long_plug_name(attr_name)
+        if _get_anim_curve_object(plug) is None:
+            static_writes.add(name)
+        else:
+            anim_writes.add(name)
+
+    affects = set()
+    markers = action.kwargs.get('marker') or []
+    cameras = dict((shp, tfm) for tfm, shp in action.kwargs.get('camera') or [])
+    for mkr_node, cam_shp_node, bnd_node in markers:
+        cam_tfm_node = cameras.get(cam_shp_node)
+        plugs = affects_utils.find_plugs_affecting_transform(
+            bnd_node, cam_tfm_node)
+        affects |= set(plugs)
+        plugs = affects_utils.find_plugs_affecting_transform(
+            mkr_node, None)
+        affects |= set(plugs)
+    return frames, anim_writes, static_writes, affects
+
+
+def _actions_conflict(info_a, info_b):
+    """
+    Do the Actions depend on each other?
+
+    Animated Attributes only conflict when both Actions solve a
+    single frame and the frames are different. Static Attributes have
+    the same value on all frames, and solves of many frames (such as
+    root frame solves) use the values interpolated between the
+    keyframes, so these conflict on any frame.
+    """
+    frames_a, anim_writes_a, static_writes_a, affects_a = info_a
+    frames_b, anim_writes_b, static_writes_b, affects_b = info_b
+    writes_a = anim_writes_a | static_writes_a
+    writes_b = anim_writes_b | static_writes_b
+    if len(frames_a) == 1 and len(frames_b) == 1 and frames_a != frames_b:
+        # A keyframe solved on one frame is not solved on the other.
+        writes_a = static_writes_a
+        writes_b = static_writes_b
+    if len(writes_a & writes_b) > 0:
+        return True
+    if len(writes_a & affects_b) > 0:
+        return True
+    if len(writes_b & affects_a) > 0:
+        return True
+    return False
+
+
+def compute_action_dependencies(action_list):
+    """
+    Find the Actions each Action depends on.
+
+    An Action depends on an earlier Action if either Action solves an
+    Attribute that the other Action solves or that affects the other
+    Action's Markers. Single frame solves on different frames only
+    depend on each other through static Attributes.
+
+    Actions that do not run the 'mmSolver' command depend on all
+    earlier Actions, and all later Actions depend on them.
+
+    :param action_list: The Actions to be executed, in order.
+    :type action_list: [Action, ..]
+
+    :returns: For each Action, the indices of the Actions it depends
+              on.
+    :rtype: [set of int, ..]
+    """
+    affects_utils.add_dependency_index_callbacks()
+    info_list = []
+    deps_list = []
+    for i, action in enumerate(action_list):
+        deps = set()
+        if api_action.action_func_is_mmSolver(action) is False:
+            info_list.append(None)
+            deps_list.append(set(range(i)))
+            continue
+        info = _compute_action_info(action)
+        for j in range(i):
+            other_info = info_list[j]
+            if other_info is None or _actions_conflict(info, other_info):
+                deps.add(j)
+        info_list.append(info)
+        deps_list.append(deps)
+    return deps_list
+
+
+def is_dependency_chain(action_list, deps_list):
+    """
+    Must the solver Actions run one after the other?
+
+    When each solver Action depends on the solver Action before it
+    (directly, or through a non-solver Action), no two solver Actions
+    can run at the same time, and parallel execution is slower than
+    serial execution.
+
+    :param action_list: The Actions to be executed, in order.
+    :type action_list: [Action, ..]
+
+    :param deps_list: The dependencies of each Action, as returned by
+                      :py:func:`compute_action_dependencies`.
+    :type deps_list: [set of int, ..]
+
+    :rtype: bool
+    """
+    prev_index = None
+    for i, action in enumerate(action_list):
+        if api_action.action_func_is_mmSolver(action) is False:
+            continue
+        if prev_index is not None:
+            deps = deps_list[i]
+            # Non-solver Actions depend on all earlier Actions.
+            after_prev = [j for j in deps if j >= prev_index]
+            if len(after_prev) == 0:
+                return False
+        prev_index = i
+    return True
+
+
+def get_mayapy_executable():
+    """
+    Get the file path to the 'mayapy' executable.
+
+    :returns: File path, or None if it cannot be found.
+    :rtype: str or None
+    """
+    exe_name = 'mayapy'
+    if sys.platform.startswith('win'):
+        exe_name = 'mayapy.exe'
+    maya_location = os.environ.get('MAYA_LOCATION')
+    if maya_location is not None:
+        path = os.path.join(maya_location, 'bin', exe_name)
+        if os.path.isfile(path):
+            return path
+    if os.path.basename(sys.executable).lower().startswith('mayapy'):
+        return sys.executable
+    return None
+
+
+class _Worker(object):
+    """
+    A 'mayapy' worker process, communicating with JSON lines over
+    standard input/output.
+    """
+
+    def __init__(self, index, exe_path, scene_path, result_queue):
+        self.index = index
+        self.sent_updates = 0
+        env = dict(os.environ)
+        paths = [p for p in sys.path if len(p) > 0]
+        env['PYTHONPATH'] = os.pathsep.join(paths)
+        args = [exe_path, '-m', __name__, scene_path]
+        self._process = subprocess.Popen(
+            args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=env,
+            universal_newlines=True,
+        )
+        self._thread = threading.Thread(
+            target=self._read_messages, args=(result_queue,))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _read_messages(self, result_queue):
+        stream = self._process.stdout
+        for line in iter(stream.readline, ''):
+            if not line.startswith(MESSAGE_PREFIX):
+                continue
+            try:
+                msg = json.loads(line[len(MESSAGE_PREFIX):])
+            except ValueError:
+                msg = {
+                    'type': MESSAGE_TYPE_ERROR,
+                    'message': 'Invalid worker message: %r' % line,
+                }
+            result_queue.put((self.index, msg))
+        # The process has ended.
+        result_queue.put((self.index, None))
+
+    def send(self, msg):
+        text = json.dumps(msg) + '\n'
+        self._process.stdin.write(text)
+        self._process.stdin.flush()
+
+    def _wait(self, timeout):
+        """
+        Wait for the process to exit.
+
+        :returns: True if the process has exited.
+        :rtype: bool
+        """
+        end_time = time.time() + timeout
+        while self._process.poll() is None:
+            if time.time() > end_time:
+                return False
+            time.sleep(WORKER_POLL_SECONDS)
+        return True
+
+    def close(self, busy=False):
+        """
+        Stop the worker process.
+
+        An idle worker is asked to quit. A busy worker (or a worker
+        that does not quit in time) is terminated, and then killed if
+        it still does not exit.
+
+        :param busy: Is the worker running a task?
+        :type busy: bool
+        """
+        if busy is False:
+            try:
+                self.send({'type': MESSAGE_TYPE_QUIT})
+                self._process.stdin.close()
+            except (IOError, OSError, ValueError):
+                pass
+            if self._wait(WORKER_EXIT_TIMEOUT_SECONDS) is True:
+                return
+        try:
+            self._process.terminate()
+            if self._wait(WORKER_EXIT_TIMEOUT_SECONDS) is False:
+                self._process.kill()
+                self._process.wait()
+        except OSError:
+            # The process has already exited.
+            pass
+        return
+
+
+def _run_workers(action_list, deps_list, worker_count,
+                 exe_path, scene_path,
+                 prog_fn=None,
+                 status_fn=None):
+    """
+    Run the Actions in worker processes, without changing the Maya
+    scene.
+
+    Non-solver Actions are not run; they are added to the updates
+    when all earlier Actions have finished, and replayed by the
+    workers.
+
+    :returns: The SolveResults for each Action index, and the updates
+              of each finished Action, in the order the Actions
+              finished. An update has the Action index ('id') and
+              either the solved values ('values') or the non-solver
+              Action to replay ('action').
+    :rtype: ({int: SolveResult}, [dict, ..])
+    """
+    is_solver = [api_action.action_func_is_mmSolver(action)
+                 for action in action_list]
+    replay_data = {}
+    for i, action in enumerate(action_list):
+        if is_solver[i] is False:
+            replay_data[i] = _get_replay_action_data(action)
+
+    result_queue = queue.Queue()
+    workers = []
+    running = {}
+    solres_map = {}
+    updates = []
+    try:
+        collectionutils.run_status_func(
+            status_fn, 'Starting %r solver workers' % worker_count)
+        for i in range(worker_count):
+            worker = _Worker(i, exe_path, scene_path, result_queue)
+            workers.append(worker)
+
+        total = len(action_list)
+        pending = list(range(total))
+        idle = []
+        done = set()
+        while len(done) < total:
+            # Non-solver Actions are barriers, and are replayed by the
+            # workers before any later Action.
+            for index in list(pending):
+                if is_solver[index] is True:
+                    continue
+                if (deps_list[index] <= done) is False:
+                    break
+                pending.remove(index)
+                done.add(index)
+                updates.append({'id': index, 'action': replay_data[index]})
+            if len(done) == total:
+                break
+
+            # Start all Actions that are ready.
+            while len(idle) > 0 and len(pending) > 0:
+                ready = [i for i in pending
+                         if is_solver[i] is True and deps_list[i] <= done]
+                if len(ready) == 0:
+                    break
+                index = ready[0]
+                pending.remove(index)
+                worker = workers[idle.pop(0)]
+                msg = {
+                    'type': MESSAGE_TYPE_TASK,
+                    'id': index,
+                    'kwargs': action_list[index].kwargs,
+                    'updates': updates[worker.sent_updates:],
+                }
+                worker.sent_updates = len(updates)
+                worker.send(msg)
+                running[index] = worker.index
+
+            if len(running) == 0 and len(idle) < len(workers):
+                # Waiting for workers to be ready.
+                pass
+            elif len(running) == 0:
+                msg = 'Parallel execution cannot make progress.'
+                raise excep.NotValid(msg)
+
+            try:
+                worker_index, msg = result_queue.get(
+                    timeout=WORKER_POLL_SECONDS)
+            except queue.Empty:
+                if api_state.get_user_interrupt() is True:
+                    LOG.warning('User interrupted parallel solve.')
+                    break
+                continue
+            if msg is None:
+                msg = 'Solver worker process ended unexpectedly: %r'
+                raise excep.NotValid(msg % worker_index)
+            msg_type = msg.get('type')
+            if msg_type == MESSAGE_TYPE_READY:
+                idle.append(worker_index)
+                continue
+            elif msg_type == MESSAGE_TYPE_ERROR:
+                msg = 'Solver worker failed: %s' % msg.get('message')
+                raise excep.NotValid(msg)
+            assert msg_type == MESSAGE_TYPE_RESULT
+
+            index = msg['id']
+            running.pop(index)
+            idle.append(worker_index)
+            done.add(index)
+            updates.append({'id': index, 'values': msg['values']})
+
+            solve_data = msg['solve_data']
+            if solve_data is not None:
+                solres_map[index] = solveresult.SolveResult(solve_data)
+
+            percent = int((float(len(done)) / total) * 100)
+            collectionutils.run_progress_func(prog_fn, percent)
+            if api_state.get_user_interrupt() is True:
+                LOG.warning('User interrupted parallel solve.')
+                break
+    finally:
+        busy_workers = set(running.values())
+        for worker in workers:
+            worker.close(busy=worker.index in busy_workers)
+    return solres_map, updates
+
+
+def execute_action_list(action_list,
+                        worker_count,
+                        deps_list=None,
+                        prog_fn=None,
+                        status_fn=None):
+    """
+    Execute solver Actions using a pool of worker processes.
+
+    :param action_list: The Actions to execute, in order.
+    :type action_list: [Action, ..]
+
+    :param worker_count: The number of worker processes to use.
+    :type worker_count: int
+
+    :param deps_list: The dependencies of each Action, or None to
+                      compute them with
+                      :py:func:`compute_action_dependencies`.
+    :type deps_list: [set of int, ..] or None
+
+    :param prog_fn: The function used report progress messages to
+                    the user.
+    :type prog_fn: callable or None
+
+    :param status_fn: The function used to report status messages
+                      to the user.
+    :type status_fn: callable or None
+
+    :raises NotValid: When the Actions cannot be executed in parallel,
+                      or a worker process fails. The Maya scene is
+                      not changed.
+
+    :returns: List of SolveResults, in the order of the Actions.
+    :rtype: [SolveResult, ..]
+    """
+    assert worker_count > 0
+    solver_count = len([x for x in action_list
+                        if api_action.action_func_is_mmSolver(x)])
+    if solver_count == 0:
+        raise excep.NotValid('No solver Actions to execute in parallel.')
+    exe_path = get_mayapy_executable()
+    if exe_path is None:
+        raise excep.NotValid('Cannot find the mayapy executable.')
+
+    if deps_list is None:
+        deps_list = compute_action_dependencies(action_list)
+    worker_count = min(worker_count, solver_count)
+
+    temp_dir = tempfile.mkdtemp(prefix='mmSolver_')
+    scene_path = os.path.join(temp_dir, 'scene.mb')
+    try:
+        maya.cmds.file(
+            scene_path,
+            exportAll=True,
+            preserveReferences=True,
+            type='mayaBinary',
+            force=True)
+        solres_map, updates = _run_workers(
+            action_list, deps_list, worker_count,
+            exe_path, scene_path,
+            prog_fn=prog_fn,
+            status_fn=status_fn)
+    except (RuntimeError, IOError, OSError, ValueError) as e:
+        msg = 'Parallel execution failed: %s' % e
+        raise excep.NotValid(msg)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    # Write solved values and run the non-solver Actions, in the
+    # order the Actions finished. The values between non-solver
+    # Actions are written together.
+    values_list = []
+    for update in updates:
+        if 'values' in update:
+            for attr_name, frames, encoded in update['values']:
+                values_list.append(
+                    (attr_name, frames, _decode_values(encoded)))
+            continue
+        _set_attr_values_undoable(values_list)
+        values_list = []
+        action = action_list[update['id']]
+        func, args, kwargs = api_action.action_to_components(action)
+        func(*args, **kwargs)
+    _set_attr_values_undoable(values_list)
+
+    solres_list = [solres_map[i] for i in sorted(solres_map.keys())]
+    return solres_list
+
+
+def _send_message(msg):
+    text = MESSAGE_PREFIX + json.dumps(msg) + '\n'
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+def _run_task(msg):
+    """
+    Run a solver task inside a worker process.
+    """
+    for update in msg.get('updates', []):
+        _apply_update(update)
+
+    # JSON converts tuples to lists; multi-use flags of the 'mmSolver'
+    # command are given as tuples.
+    kwargs = dict()
+    for key, value in msg['kwargs'].items():
+        if isinstance(value, list):
+            value = [tuple(v) if isinstance(v, list) else v for v in value]
+        kwargs[str(key)] = value
+
+    # The same work-around for single frame solves as the serial
+    # 'execute' function.
+    save_node_attrs = []
+    is_single_frame = collectionutils.is_single_frame(kwargs)
+    if is_single_frame is True:
+        save_node_attrs = collectionutils.disconnect_animcurves(kwargs)
+    solve_data = maya.cmds.mmSolver(**kwargs)
+    if is_single_frame is True:
+        collectionutils.reconnect_animcurves(kwargs, save_node_attrs)
+
+    action = api_action.Action(func=None, args=[], kwargs=kwargs)
+    frames = _get_action_frames(action)
+    values = []
+    for attr_name in _get_action_attr_names(action):
+        attr_frames, attr_values = _query_attr_values(attr_name, frames)
+        values.append((attr_name, attr_frames, _encode_values(attr_values)))
+    return {
+        'type': MESSAGE_TYPE_RESULT,
+        'id': msg['id'],
+        'solve_data': solve_data,
+        'values': values,
+    }
+
+
+def worker_main(scene_path):
+    """
+    Entry point for a worker process.
+
+    :param scene_path: The Maya scene to open.
+    :type scene_path: str
+    """
+    import maya.standalone
+    maya.standalone.initialize()
+    import mmSolver._api.utils as api_utils
+    api_utils.load_plugin()
+    maya.cmds.file(scene_path, open=True, force=True)
+    _send_message({'type': MESSAGE_TYPE_READY})
+    for line in iter(sys.stdin.readline, ''):
+        msg = json.loads(line)
+        if msg.get('type') == MESSAGE_TYPE_QUIT:
+            break
+        try:
+            result = _run_task(msg)
+        except Exception as e:
+            LOG.exception('Solver worker failed.')
+            result = {'type': MESSAGE_TYPE_ERROR, 'message': str(e)}
+        _send_message(result)
+    return
+
+
+if __name__ == '__main__':
+    worker_main(sys.argv[1])
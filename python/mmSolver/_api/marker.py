@@ -29,7 +29,10 @@ import mmSolver.logger
 import mmSolver.utils.node as node_utils
 import mmSolver.utils.animcurve as anim_utils
 import mmSolver.utils.time as time_utils
+import mmSolver.utils.undo as undo_utils
 import mmSolver._api.constant as const
+import mmSolver._api.deviationcache as deviationcache
+import mmSolver._api.enableindex as enableindex
 import mmSolver._api.utils as api_utils
 import mmSolver._api.excep as excep
 import mmSolver._api.bundle
@@ -543,10 +546,9 @@ class Marker(object):
 
         start_frame = int(min(enable_times))
         end_frame = int(max(enable_times))
-        for f in range(start_frame, end_frame + 1):
-            v = self.get_enable(time=f)
-            if v:
-                times.append(f)
+        values = enableindex.read_plug_values(plug, start_frame, end_frame)
+        times = [start_frame + i for i, v in enumerate(values)
+                 if int(round(v)) > 0]
         return times
 
     def get_weight(self, time=None):
@@ -573,6 +575,41 @@ class Marker(object):
             v = maya.cmds.getAttr(plug, time=time)
         return v
 
+    def _get_enabled_solved_deviation(self):
+        """
+        Get the deviation values on the frames the Marker is enabled
+        and solved (the deviation is greater than zero).
+
+        When a deviation animCurve exists, the values are read from
+        the cached keys of the animCurve (see
+        :py:mod:`mmSolver._api.deviationcache`), only inside the range
+        of the enabled frames.
+
+        :returns: The frame numbers and deviation values, in frame
+                  order.
+        :rtype: ([int, ..], [float, ..])
+        """
+        anim_curve_fn = self.get_deviation_anim_curve_fn()
+        if anim_curve_fn is None:
+            frames = sorted(self._get_enabled_solved_frames())
+            if len(frames) == 0:
+                return [], []
+            return frames, self.get_deviation(times=frames)
+
+        enable_frames = self.get_enabled_frames()
+        if len(enable_frames) == 0:
+            enable_frames = [maya.cmds.currentTime(query=True)]
+        enable_frames_set = set(enable_frames)
+        frames, dev_list = deviationcache.get_frame_range_values(
+            anim_curve_fn,
+            start_frame=min(enable_frames),
+            end_frame=max(enable_frames))
+        keys = [(frm, dev) for frm, dev in zip(frames, dev_list)
+                if dev > 0.0 and frm in enable_frames_set]
+        frames = [frm for frm, _ in keys]
+        dev_list = [dev for _, dev in keys]
+        return frames, dev_list
+
     def get_average_deviation(self):
         """
         Calculate a single float number (in pixels) representing the
@@ -580,11 +617,10 @@ class Marker(object):
         """
         dev = -1.0
 
-        frames = self._get_enabled_solved_frames()
-        if len(frames) == 0:
+        _, dev_list = self._get_enabled_solved_deviation()
+        if len(dev_list) == 0:
             return dev
 
-        dev_list = self.get_deviation(times=frames)
         dev = sum(dev_list) / len(dev_list)
         return dev
 
@@ -596,11 +632,10 @@ class Marker(object):
         max_dev = -1.0
         max_frm = -1.0
 
-        frames = self._get_enabled_solved_frames()
-        if len(frames) == 0:
+        frames, dev_list = self._get_enabled_solved_deviation()
+        if len(dev_list) == 0:
             return max_dev, max_frm
 
-        dev_list = self.get_deviation(times=frames)
         for dev, frm in zip(dev_list, frames):
             if dev > max_dev:
                 max_dev = dev
@@ -648,11 +683,9 @@ class Marker(object):
                                  frame_range_end + 1)
             enable_times = list(enable_times)
         else:
-            num_keys = anim_curve_fn.numKeys()
-            enable_times = [None] * num_keys
-            for i in range(num_keys):
-                mtime = anim_curve_fn.time(i)
-                enable_times[i] = int(mtime.value())
+            key_times, _, _ = deviationcache.get_anim_curve_keys(anim_curve_fn)
+            num_keys = len(key_times)
+            enable_times = [int(t) for t in key_times]
             if num_keys == 0:
                 enable_times = range(frame_range_start,
                                      frame_range_end + 1)
@@ -714,15 +747,10 @@ class Marker(object):
         anim_curve_fn = self.get_deviation_anim_curve_fn()
 
         dev_list = [None] * len(frames)
-        unit = OpenMaya.MTime.uiUnit()
         if anim_curve_fn is not None:
             # Evaluate Curve
-            unit = OpenMaya.MTime.uiUnit()
-            for i, frame in enumerate(frames):
-                frame_time = OpenMaya.MTime(float(frame), unit)
-                value = anim_curve_fn.evaluate(frame_time)
-                dev_list[i] = value
-
+            dev_list = deviationcache.evaluate_anim_curve(
+                anim_curve_fn, frames)
             self.set_deviation_anim_curve_fn(anim_curve_fn)
         else:
             # Note: We assume if there is not animCurve then the
@@ -752,15 +780,12 @@ class Marker(object):
         node = self.get_node()
         attr_name = const.MARKER_ATTR_LONG_NAME_DEVIATION
         plug = '{0}.{1}'.format(node, attr_name)
-        try:
-            maya.cmds.setAttr(plug, lock=False)
-            anim_curve_fn = anim_utils.create_anim_curve_node_apione(
-                times, values,
-                node_attr=plug,
-                anim_type=OpenMayaAnim.MFnAnimCurve.kAnimCurveTU)
-            self.set_deviation_anim_curve_fn(anim_curve_fn)
-        finally:
-            maya.cmds.setAttr(plug, lock=True)
+        anim_curve_fn_list = _set_deviation_anim_curves(
+            [(plug, list(times), list(values))])
+        anim_curve_fn = None
+        if anim_curve_fn_list is not None:
+            anim_curve_fn = anim_curve_fn_list[0]
+        self.set_deviation_anim_curve_fn(anim_curve_fn)
         return
 
     def get_colour_rgb(self):
@@ -1099,16 +1124,69 @@ class Marker(object):
         return
 
 
-def update_deviation_on_markers(mkr_list, solres_list):
+def _set_deviation_anim_curves(curve_data):
     """
-    Calculate marker deviation, and set it on the marker.
+    Replace the keyframes of many deviation animCurves.
 
-    :param mkr_list: Marker objects to update deviation on.
+    When Maya's undo queue is on, undoable commands are used, a few
+    commands per animCurve, in one undo chunk. The deviation plugs are
+    unlocked while the keys are set, and keys on other times are
+    removed. Otherwise the Maya API (one) is used, which is faster but
+    is not recorded in Maya's undo queue.
+
+    :param curve_data: The deviation plug to set keys on, with the
+                       times and values of the keys.
+    :type curve_data: [(str, [float, ..], [float, ..]), ..]
+
+    :returns: The MFnAnimCurve objects for each plug, when the Maya
+              API is used, otherwise None.
+    :rtype: [maya.OpenMayaAnim.MFnAnimCurve, ..] or None
+    """
+    animfn_list = None
+    undo_state = maya.cmds.undoInfo(query=True, state=True)
+    if undo_state is True:
+        with undo_utils.undo_chunk_context():
+            locked_plugs = [plug for plug, _, _ in curve_data
+                            if maya.cmds.getAttr(plug, lock=True)]
+            for plug in locked_plugs:
+                maya.cmds.setAttr(plug, lock=False)
+            try:
+                anim_utils.set_anim_curves_keys(curve_data)
+                for plug, times, _ in curve_data:
+                    key_times = maya.cmds.keyframe(
+                        plug, query=True, timeChange=True) or []
+                    old_times = set(key_times) - set([float(t) for t in times])
+                    if len(old_times) > 0:
+                        maya.cmds.cutKey(
+                            plug,
+                            time=[(t, t) for t in sorted(old_times)],
+                            clear=True)
+            finally:
+                for plug in locked_plugs:
+                    maya.cmds.setAttr(plug, lock=True)
+    else:
+        animfn_list = anim_utils.set_anim_curves_keys_apione(
+            curve_data,
+            anim_type=OpenMayaAnim.MFnAnimCurve.kAnimCurveTU)
+    deviationcache.invalidate_deviation_cache()
+    return animfn_list
+
+
+def _compute_deviation_curves(mkr_list, solres_list):
+    """
+    Calculate the marker deviation keyframes for many markers.
+
+    :param mkr_list: Marker objects to calculate deviation on.
     :type mkr_list: [Marker, ..]
 
     :param solres_list: The solve results to calculate deviation frames from.
     :type solres_list: [SolveResult, ..]
+
+    :returns: The deviation plug, frames and deviation values for each
+              marker with deviation.
+    :rtype: [(str, [int, ..], [float, ..]), ..]
     """
+    curve_data = []
     frame_list = solveresult.merge_frame_list(solres_list)
     frame_list = [int(x) for x in frame_list]
     frame_list_set = set(frame_list)
@@ -1138,5 +1216,27 @@ def update_deviation_on_markers(mkr_list, solres_list):
                     dev_list[i] = deviation_list[idx]
                     idx += 1
             assert idx == (len(deviation_list))
-            mkr.set_deviation(frm_list, dev_list)
+            plug = '{0}.{1}'.format(
+                mkr.get_node(), const.MARKER_ATTR_LONG_NAME_DEVIATION)
+            curve_data.append((plug, frm_list, dev_list))
+    return curve_data
+
+
+def update_deviation_on_markers(mkr_list, solres_list):
+    """
+    Calculate marker deviation, and set it on the marker.
+
+    The deviation animCurves of all markers are written together, see
+    :py:func:`_set_deviation_anim_curves`.
+
+    :param mkr_list: Marker objects to update deviation on.
+    :type mkr_list: [Marker, ..]
+
+    :param solres_list: The solve results to calculate deviation frames from.
+    :type solres_list: [SolveResult, ..]
+    """
+    curve_data = _compute_deviation_curves(mkr_list, solres_list)
+    if len(curve_data) == 0:
+        return
+    _set_deviation_anim_curves(curve_data)
     return
@@ -150,6 +150,8 @@ def find_marker_attr_mapping(mkr_list, attr_list):
     :param attr_list: Attributes to consider in mapping.
     :type attr_list: [Attribute, ..]
 
+    Markers without a Bundle are not affected by any Attribute.
+
     :returns: Boolean matrix of size 'markers x attrs'. Matrix index
               is 'mapping[marker_index][attr_index]', based on the
               index of the mkr_list and attr_list given.
@@ -157,6 +159,11 @@ def find_marker_attr_mapping(mkr_list, attr_list):
     """
     assert len(mkr_list) > 0
     s = time.time()
+    attr_names = []
+    for attr in attr_list:
+        assert isinstance(attr, attribute.Attribute)
+        attr_names.append(attr.get_name(full_path=True))
+
     mapping = []
     for i, mkr in enumerate(mkr_list):
         # Initialise mapping list size.
@@ -164,6 +171,9 @@ def find_marker_attr_mapping(mkr_list, attr_list):
         mapping.append(tmp)
 
         bnd = mkr.get_bundle()
+        if bnd is None:
+            LOG.debug('Marker has no Bundle. mkr=%r', mkr.get_node())
+            continue
         cam = mkr.get_camera()
         mkr_node = mkr.get_node()
         bnd_node = bnd.get_node()
@@ -178,9 +188,7 @@ def find_marker_attr_mapping(mkr_list, attr_list):
         assert isinstance(mkr_plugs, set)
         assert isinstance(bnd_plugs, set)
         plugs = set(mkr_plugs.union(bnd_plugs))
-        for j, attr in enumerate(attr_list):
-            assert isinstance(attr, attribute.Attribute)
-            attr_name = attr.get_name(full_path=True)
+        for j, attr_name in enumerate(attr_names):
             mapping[i][j] = attr_name in plugs
     e = time.time()
     num_iters = len(mkr_list)
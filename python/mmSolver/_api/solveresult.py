@@ -25,6 +25,7 @@ The information returned from a solve.
 
 """
 
+import array
 import collections
 import math
 import datetime
@@ -35,6 +36,11 @@ LOG = mmSolver.logger.get_logger()
 KEY_VALUE_SEP_CHAR = '='
 SPLIT_SEP_CHAR = '#'
 
+# Common warning message for incomplete command data.
+_INCOMPLETE_MSG = ('mmSolver data is incomplete, '
+                   'a solver error may have occurred: '
+                   'name={0} key={1} typ={2} value={3}')
+
 
 def parse_command_result(cmd_result):
     """
@@ -117,6 +123,120 @@ def _convert_to(name, key, typ, value, index):
     return v
 
 
+def _split_sections(cmd_result, skip_keys=None):
+    """
+    Group the lines of an 'mmSolver' command result by key, without
+    converting any values.
+
+    :param cmd_result: 'mmSolver' command result.
+    :type cmd_result: list of str
+
+    :param skip_keys: Keys to leave out of the sections.
+    :type skip_keys: (str, ..) or None
+
+    :return: Map of key to the (un-split) value strings of the key.
+    :rtype: {str: [str, ..]}
+    """
+    if skip_keys is None:
+        skip_keys = ()
+    sections = collections.defaultdict(list)
+    for res in cmd_result:
+        assert isinstance(res, (str, unicode))
+        key, _, value = res.partition(KEY_VALUE_SEP_CHAR)
+        if len(key) == 0 or key in skip_keys:
+            continue
+        sections[key].append(value)
+    return sections
+
+
+def _iter_key_values(cmd_result, key):
+    """
+    Get the values of the lines of an 'mmSolver' command result with
+    the key, split into lists.
+
+    :param cmd_result: 'mmSolver' command result.
+    :type cmd_result: list of str
+
+    :param key: The key of the lines to get.
+    :type key: str
+
+    :rtype: iterator of str or [str, ..]
+    """
+    for res in cmd_result:
+        line_key, _, value = res.partition(KEY_VALUE_SEP_CHAR)
+        if line_key != key:
+            continue
+        if SPLIT_SEP_CHAR in value:
+            value = value.split(SPLIT_SEP_CHAR)
+        yield value
+
+
+def _to_float(value):
+    """
+    Convert a string to a float, with NaN and infinity converted to
+    -1.0 (the same as :py:func:`_convert_to`).
+    """
+    v = float(value)
+    if math.isinf(v) or math.isnan(v):
+        return -1.0
+    return v
+
+
+def _format_line(key, values):
+    """
+    Format a line of 'mmSolver' command result data.
+    """
+    values = [v if isinstance(v, (str, unicode)) else repr(v)
+              for v in values]
+    return key + KEY_VALUE_SEP_CHAR + SPLIT_SEP_CHAR.join(values)
+
+
+# Command result keys stored as columns in the SolveResult.
+_COLUMN_KEYS = ('error_per_frame', 'error_per_marker_per_frame')
+
+# Sections of the 'mmSolver' command result; the nice names, command
+# result keys and value types.
+_SOLVER_STATS_NAME_KEYS = [
+    ('success', 'success', bool),
+    ('stop_message', 'reason_string', str),
+    ('stop_id', 'reason_num', int),
+    ('iteration_total_calls', 'iteration_num', int),
+    ('iteration_function_calls', 'iteration_function_num', int),
+    ('iteration_jacobian_calls', 'iteration_jacobian_num', int),
+    ('attempts', 'iteration_attempt_num', int),
+    ('user_interrupted', 'user_interrupted', bool),
+]
+
+_ERROR_STATS_NAME_KEYS = [
+    ('initial', 'error_initial', float),
+    ('maximum', 'error_maximum', float),
+    ('final', 'error_final', float),
+    ('final_average', 'error_final_average', float),
+    ('final_maximum', 'error_final_maximum', float),
+    ('final_minimum', 'error_final_minimum', float),
+    ('jt', 'error_jt', float),
+    ('dp', 'error_dp', float),
+]
+
+_TIMER_STATS_NAME_KEYS = [
+    ('solve_seconds', 'timer_solve', float),
+    ('function_seconds', 'timer_function', float),
+    ('jacobian_seconds', 'timer_jacobian', float),
+    ('parameter_seconds', 'timer_parameter', float),
+    ('error_seconds', 'timer_error', float),
+    ('solve_ticks', 'ticks_solve', int),
+    ('function_ticks', 'ticks_function', int),
+    ('jacobian_ticks', 'ticks_jacobian', int),
+    ('parameter_ticks', 'ticks_parameter', int),
+    ('error_ticks', 'ticks_error', int),
+]
+
+_PRINT_STATS_NAME_KEYS = [
+    ('number_of_parameters', 'numberOfParameters', int),
+    ('number_of_errors', 'numberOfErrors', int),
+]
+
+
 class SolveResult(object):
     """
     The information returned from a solve.
@@ -124,6 +244,13 @@ class SolveResult(object):
     All information from the solver, can then be queried as
     needed. This class never modifies data, it only stores and queries
     data.
+
+    Each section of the command data is only parsed the first time it
+    is queried. The per-marker-per-frame errors are stored as columns
+    (marker index, frame and error arrays), rather than nested
+    dictionaries. Once both the per-frame and per-marker-per-frame
+    columns are parsed, the command data is no longer kept; it is
+    re-created from the columns when needed.
     """
     def __init__(self, cmd_data):
         """
@@ -136,112 +263,158 @@ class SolveResult(object):
         if isinstance(cmd_data, list) is False:
             msg = 'cmd_data is of type %r, expected a list object.'
             raise TypeError(msg % type(cmd_data))
-        self._raw_data = list(cmd_data)
-        data = parse_command_result(cmd_data)
-
-        # Common warning message in this method.
-        msg = 'mmSolver data is incomplete, '
-        msg += 'a solver error may have occurred: '
-        msg += 'name={0} key={1} typ={2} value={3}'
-
-        # Solver statistics
-        name_keys = [
-            ('success', 'success', bool),
-            ('stop_message', 'reason_string', str),
-            ('stop_id', 'reason_num', int),
-            ('iteration_total_calls', 'iteration_num', int),
-            ('iteration_function_calls', 'iteration_function_num', int),
-            ('iteration_jacobian_calls', 'iteration_jacobian_num', int),
-            ('attempts', 'iteration_attempt_num', int),
-            ('user_interrupted', 'user_interrupted', bool),
-        ]
-        index = 0
-        self._solver_stats = {}
-        for name, key, typ in name_keys:
-            value = data.get(key)
-            v = _convert_to(name, key, typ, value, index)
-            self._solver_stats[name] = v
-
-        # Error statistics
-        name_keys = [
-            ('initial', 'error_initial', float),
-            ('maximum', 'error_maximum', float),
-            ('final', 'error_final', float),
-            ('final_average', 'error_final_average', float),
-            ('final_maximum', 'error_final_maximum', float),
-            ('final_minimum', 'error_final_minimum', float),
-            ('jt', 'error_jt', float),
-            ('dp', 'error_dp', float),
-        ]
-        index = 0
-        self._error_stats = {}
-        for name, key, typ in name_keys:
-            value = data.get(key)
-            v = _convert_to(name, key, typ, value, index)
-            self._error_stats[name] = v
-
-        # Timer statistics
-        name_keys = [
-            ('solve_seconds', 'timer_solve', float),
-            ('function_seconds', 'timer_function', float),
-            ('jacobian_seconds', 'timer_jacobian', float),
-            ('parameter_seconds', 'timer_parameter', float),
-            ('error_seconds', 'timer_error', float),
-            ('solve_ticks', 'ticks_solve', int),
-            ('function_ticks', 'ticks_function', int),
-            ('jacobian_ticks', 'ticks_jacobian', int),
-            ('parameter_ticks', 'ticks_parameter', int),
-            ('error_ticks', 'ticks_error', int),
-        ]
-        index = 0
-        self._timer_stats = {}
-        for name, key, typ in name_keys:
-            value = data.get(key)
-            v = _convert_to(name, key, typ, value, index)
-            self._timer_stats[name] = v
+        self._raw_data = tuple(cmd_data)
+        self._other_lines = None
+        self._sections = None
+        self._stats = {}
+
+        # Per-marker-per-frame error columns.
+        self._marker_names = None
+        self._marker_index = None
+        self._marker_frame = None
+        self._marker_error = None
+
+        # Per-frame error columns.
+        self._frame_values = None
+        self._frame_errors = None
+        return
+
+    def _get_section(self, key):
+        """
+        Get the values of a section, with values split into lists.
 
-        # Print statistics
-        name_keys = [
-            ('number_of_parameters', 'numberOfParameters', int),
-            ('number_of_errors', 'numberOfErrors', int),
-        ]
+        The sections stored as columns are not kept in the sections.
+        """
+        assert key not in _COLUMN_KEYS
+        if self._sections is None:
+            lines = self._raw_data
+            if lines is None:
+                lines = self._other_lines
+            self._sections = _split_sections(lines, skip_keys=_COLUMN_KEYS)
+        values = []
+        for value in self._sections.get(key, []):
+            if SPLIT_SEP_CHAR in value:
+                value = value.split(SPLIT_SEP_CHAR)
+            values.append(value)
+        return values
+
+    def _get_stats(self, stats_name, name_keys):
+        """
+        Get the statistics named, parsing them on first use.
+        """
+        stats = self._stats.get(stats_name)
+        if stats is not None:
+            return stats
+        stats = {}
         index = 0
-        self._print_stats = {}
         for name, key, typ in name_keys:
-            value = data.get(key)
+            value = self._get_section(key)
             v = _convert_to(name, key, typ, value, index)
-            self._print_stats[name] = v
+            stats[name] = v
+        self._stats[stats_name] = stats
+        return stats
 
-        # List of errors, per-marker, per-frame.
-        # Allows graphing the errors and detecting problems.
-        self._per_marker_per_frame_error = collections.defaultdict(dict)
-        key = 'error_per_marker_per_frame'
-        values = data.get(key)
+    def _release_raw_data(self):
+        """
+        Stop keeping the command data, once all the columns exist.
+        """
+        if self._raw_data is None:
+            return
+        if self._marker_names is None or self._frame_values is None:
+            return
+        self._other_lines = tuple(self.get_other_lines())
+        self._raw_data = None
+        return
+
+    def _parse_marker_errors(self):
+        """
+        Parse the per-marker-per-frame errors into columns.
+
+        Allows graphing the errors and detecting problems.
+        """
+        if self._marker_names is not None:
+            return
+        names = []
+        name_index = {}
+        mkr_index = array.array('l')
+        mkr_frame = array.array('d')
+        mkr_error = array.array('d')
         name = ''
-        if values is None or len(values) == 0:
-            LOG.debug(msg.format(name, key, 'None', values))
-        else:
-            for value in values:
+        key = 'error_per_marker_per_frame'
+        count = 0
+        for value in _iter_key_values(self._raw_data, key):
+            count += 1
+            if isinstance(value, list) and len(value) >= 3:
+                mkr = str(value[0])
+                t = _to_float(value[1])
+                v = _to_float(value[2])
+            else:
                 mkr = _convert_to(name, key, str, value, 0)
                 t = _convert_to(name, key, float, value, 1)
                 v = _convert_to(name, key, float, value, 2)
-                self._per_marker_per_frame_error[mkr][t] = v
+            index = name_index.get(mkr)
+            if index is None:
+                index = len(names)
+                name_index[mkr] = index
+                names.append(mkr)
+            mkr_index.append(index)
+            mkr_frame.append(t)
+            mkr_error.append(v)
+        if count == 0:
+            LOG.debug(_INCOMPLETE_MSG.format(name, key, 'None', []))
+        self._marker_names = names
+        self._marker_index = mkr_index
+        self._marker_frame = mkr_frame
+        self._marker_error = mkr_error
+        self._release_raw_data()
+        return
+
+    def _parse_frame_errors(self):
+        """
+        Parse the per-frame errors into columns.
 
-        # Errors per frame
-        # Allows graphing the errors and detecting problems.
-        self._per_frame_error = {}
+        Allows graphing the errors and detecting problems.
+        """
+        if self._frame_values is not None:
+            return
+        frames = array.array('d')
+        errors = array.array('d')
         name = ''
         key = 'error_per_frame'
-        values = data.get(key)
-        if values is None or len(values) == 0:
-            LOG.debug(msg.format(name, key, 'None', values))
-        else:
-            for value in values:
+        count = 0
+        for value in _iter_key_values(self._raw_data, key):
+            count += 1
+            if isinstance(value, list) and len(value) >= 2:
+                t = _to_float(value[0])
+                v = _to_float(value[1])
+            else:
                 t = _convert_to(name, key, float, value, 0)
                 v = _convert_to(name, key, float, value, 1)
-                self._per_frame_error[t] = v
+            frames.append(t)
+            errors.append(v)
+        if count == 0:
+            LOG.debug(_INCOMPLETE_MSG.format(name, key, 'None', []))
+        self._frame_values = frames
+        self._frame_errors = errors
+        self._release_raw_data()
         return
 
+    def get_other_lines(self):
+        """
+        Get the command data lines, except the lines stored as columns.
+
+        :rtype: [str, ..]
+        """
+        if self._other_lines is not None:
+            return list(self._other_lines)
+        lines = []
+        for line in self._raw_data:
+            key = line.partition(KEY_VALUE_SEP_CHAR)[0]
+            if key in _COLUMN_KEYS:
+                continue
+            lines.append(line)
+        return lines
+
     def get_data_raw(self):
         """
         Get a copy of the raw data given to this object at initialization.
@@ -249,62 +422,104 @@ class SolveResult(object):
         It is possible to re-create this object exactly by saving this
         raw data and re-initializing the object with this data.
         """
-        return list(self._raw_data)
+        if self._raw_data is not None:
+            return list(self._raw_data)
+        # Re-create the command data from the columns.
+        lines = self.get_other_lines()
+        key = 'error_per_frame'
+        for t, v in zip(self._frame_values, self._frame_errors):
+            lines.append(_format_line(key, [t, v]))
+        key = 'error_per_marker_per_frame'
+        names = self._marker_names
+        for i, t, v in zip(self._marker_index,
+                           self._marker_frame,
+                           self._marker_error):
+            lines.append(_format_line(key, [names[i], t, v]))
+        return lines
 
     def get_success(self):
         """
         Command Success or not? Did the solver fail?
         """
-        return self._solver_stats.get('success')
+        return self._get_stats('solver', _SOLVER_STATS_NAME_KEYS).get('success')
 
     def get_final_error(self):
         """
         The single error value representing the solve at it's last state.
         """
-        return self._error_stats.get('final')
+        return self._get_stats('error', _ERROR_STATS_NAME_KEYS).get('final')
 
     def get_user_interrupted(self):
         """
         Did the user purposely cancel the solve?
         """
-        return self._solver_stats.get('user_interrupted', False)
+        stats = self._get_stats('solver', _SOLVER_STATS_NAME_KEYS)
+        return stats.get('user_interrupted', False)
 
     def get_error_stats(self):
         """
         Details for the error (deviation) of the solve.
         """
-        return self._error_stats.copy()
+        return self._get_stats('error', _ERROR_STATS_NAME_KEYS).copy()
 
     def get_timer_stats(self):
         """
         Details for how long different aspects of the solve took to compute.
         """
-        return self._timer_stats.copy()
+        return self._get_stats('timer', _TIMER_STATS_NAME_KEYS).copy()
 
     def get_solver_stats(self):
         """
         Details of internal solver.
         """
-        return self._solver_stats.copy()
+        return self._get_stats('solver', _SOLVER_STATS_NAME_KEYS).copy()
 
     def get_print_stats(self):
         """
         Details of internal statistics that can be gathered and
         printed out.
         """
-        return self._print_stats.copy()
+        return self._get_stats('print', _PRINT_STATS_NAME_KEYS).copy()
 
     def get_frame_list(self):
         """
         The list of frames that this solve result contains.
         """
-        return list(sorted(self._per_frame_error.keys()))
+        self._parse_frame_errors()
+        return list(sorted(set(self._frame_values)))
+
+    def get_frame_error_columns(self):
+        """
+        The error (deviation) per-frame of the solver, as columns.
+
+        Frames may be repeated, the last error value of a frame is
+        the value used by :py:meth:`get_frame_error_list`.
+
+        :returns: Frame numbers and error values, with the same length.
+        :rtype: (array.array, array.array)
+        """
+        self._parse_frame_errors()
+        return self._frame_values, self._frame_errors
 
     def get_frame_error_list(self):
         """
         The error (deviation) per-frame of the solver.
         """
-        return self._per_frame_error.copy()
+        self._parse_frame_errors()
+        return dict(zip(self._frame_values, self._frame_errors))
+
+    def get_marker_error_columns(self):
+        """
+        Get the errors (deviation) for all markers, as columns.
+
+        :returns: The marker node names, then arrays (with the same
+                  length) of marker index (into the node names), frame
+                  number and error.
+        :rtype: ([str, ..], array.array, array.array, array.array)
+        """
+        self._parse_marker_errors()
+        return (self._marker_names, self._marker_index,
+                self._marker_frame, self._marker_error)
 
     def get_marker_error_list(self, marker_node=None):
         """
@@ -317,14 +532,232 @@ class SolveResult(object):
                   the error (deviation).
         :rtype: {"marker_node": {float: float}}
         """
-        v = None
+        self._parse_marker_errors()
+        names = self._marker_names
+        columns = zip(self._marker_index, self._marker_frame, self._marker_error)
         if marker_node is None:
-            v = self._per_marker_per_frame_error.copy()
-        elif marker_node in self._per_marker_per_frame_error:
-            v = self._per_marker_per_frame_error.get(marker_node)
+            v = collections.defaultdict(dict)
+            for i, t, e in columns:
+                v[names[i]][t] = e
+            return v
+        if marker_node not in names:
+            return None
+        index = names.index(marker_node)
+        v = {}
+        for i, t, e in columns:
+            if i == index:
+                v[t] = e
         return v
 
 
+class SolveResultSet(list):
+    """
+    A list of SolveResults, with merged values computed together.
+
+    The 'SolveResultSet' is a list, so it can be used anywhere a list
+    of SolveResults is used. The per-frame and per-marker error columns
+    of all SolveResults are concatenated once, and the merged values
+    are computed from the concatenated columns. Merged values are
+    re-computed if the list is changed.
+
+    The list is assumed to represent sequential solver executions; the
+    order of the list is important, because only the last solved error
+    value of a frame (or marker and frame) is used.
+    """
+
+    def __init__(self, solres_list=None):
+        """
+        :param solres_list: SolveResults to store.
+        :type solres_list: [SolveResult, ..] or None
+        """
+        if solres_list is None:
+            solres_list = []
+        msg = 'solres must be a SolveResult object: solres=%r'
+        for solres in solres_list:
+            if isinstance(solres, SolveResult) is False:
+                raise TypeError(msg % solres)
+        super(SolveResultSet, self).__init__(solres_list)
+        self._cache_key = None
+        self._cache = {}
+
+    def _get_cache(self):
+        # The cached SolveResults are kept, so the list is unchanged
+        # only if each item is the same object.
+        items = tuple(self)
+        same = self._cache_key is not None and len(items) == len(self._cache_key)
+        same = same and all(a is b for a, b in zip(items, self._cache_key))
+        if same is False:
+            self._cache_key = items
+            self._cache = {}
+        return self._cache
+
+    def _get_frame_columns(self):
+        cache = self._get_cache()
+        value = cache.get('frame_columns')
+        if value is not None:
+            return value
+        frames = array.array('d')
+        errors = array.array('d')
+        for solres in self:
+            frm_col, err_col = solres.get_frame_error_columns()
+            frames.extend(frm_col)
+            errors.extend(err_col)
+        value = (frames, errors)
+        cache['frame_columns'] = value
+        return value
+
+    def _get_marker_columns(self):
+        cache = self._get_cache()
+        value = cache.get('marker_columns')
+        if value is not None:
+            return value
+        names = []
+        name_index = {}
+        index = array.array('l')
+        frames = array.array('d')
+        errors = array.array('d')
+        for solres in self:
+            res_names, res_index, res_frames, res_errors = \
+                solres.get_marker_error_columns()
+            remap = []
+            for name in res_names:
+                i = name_index.get(name)
+                if i is None:
+                    i = len(names)
+                    name_index[name] = i
+                    names.append(name)
+                remap.append(i)
+            index.extend([remap[i] for i in res_index])
+            frames.extend(res_frames)
+            errors.extend(res_errors)
+        value = (names, index, frames, errors)
+        cache['marker_columns'] = value
+        return value
+
+    def get_timer_stats(self):
+        """
+        Timer statistics, accumulated over all SolveResults.
+
+        :rtype: dict
+        """
+        cache = self._get_cache()
+        value = cache.get('timer_stats')
+        if value is None:
+            value = collections.defaultdict(float)
+            for name, _, typ in _TIMER_STATS_NAME_KEYS:
+                value[name] = typ(sum(solres.get_timer_stats()[name]
+                                      for solres in self))
+            cache['timer_stats'] = value
+        return value.copy()
+
+    def get_frame_list(self):
+        """
+        All frames in all SolveResults, sorted.
+
+        :rtype: [float, ..]
+        """
+        frames, _ = self._get_frame_columns()
+        return list(sorted(set(frames)))
+
+    def get_frame_error_list(self):
+        """
+        The last error (deviation) of each frame.
+
+        :rtype: {float: float}
+        """
+        cache = self._get_cache()
+        value = cache.get('frame_error_list')
+        if value is None:
+            frames, errors = self._get_frame_columns()
+            value = dict(zip(frames, errors))
+            cache['frame_error_list'] = value
+        return collections.defaultdict(float, value)
+
+    def get_average_frame_error(self):
+        """
+        The average of the last error (deviation) of each frame.
+
+        :rtype: float
+        """
+        return get_average_frame_error_list(self.get_frame_error_list())
+
+    def get_max_frame_error(self):
+        """
+        The frame with the maximum error (deviation), and the error.
+
+        :rtype: (int or None, float)
+        """
+        return get_max_frame_error(self.get_frame_error_list())
+
+    def get_marker_node_list(self):
+        """
+        All Marker nodes in all SolveResults, sorted.
+
+        :rtype: [str, ..]
+        """
+        names, _, _, _ = self._get_marker_columns()
+        return list(sorted(names))
+
+    def get_marker_error_list(self):
+        """
+        The last error (deviation) of each Marker and frame.
+
+        :rtype: {str: {float: float}}
+        """
+        names, index, frames, errors = self._get_marker_columns()
+        value = collections.defaultdict(dict)
+        for i, t, e in zip(index, frames, errors):
+            value[names[i]][t] = e
+        return value
+
+
+def create_solve_result_from_columns(lines,
+                                     marker_columns,
+                                     frame_columns):
+    """
+    Create a SolveResult from the values returned by
+    :py:meth:`SolveResult.get_marker_error_columns`,
+    :py:meth:`SolveResult.get_frame_error_columns` and the other
+    command data lines.
+
+    :param lines: The command data lines that are not stored as columns.
+    :type lines: [str, ..]
+
+    :param marker_columns: The marker names, marker index, frame and
+                           error columns.
+    :type marker_columns: ([str, ..], array.array, array.array, array.array)
+
+    :param frame_columns: The frame and error columns.
+    :type frame_columns: (array.array, array.array)
+
+    :rtype: SolveResult
+    """
+    solres = SolveResult(list(lines))
+    solres._raw_data = None
+    solres._other_lines = tuple(lines)
+    names, mkr_index, mkr_frame, mkr_error = marker_columns
+    assert len(mkr_index) == len(mkr_frame) == len(mkr_error)
+    solres._marker_names = list(names)
+    solres._marker_index = mkr_index
+    solres._marker_frame = mkr_frame
+    solres._marker_error = mkr_error
+    frames, errors = frame_columns
+    assert len(frames) == len(errors)
+    solres._frame_values = frames
+    solres._frame_errors = errors
+    return solres
+
+
+def _get_solve_result_set(solres_list):
+    """
+    Get the SolveResultSet for a list of SolveResults.
+    """
+    if isinstance(solres_list, SolveResultSet):
+        return solres_list
+    assert isinstance(solres_list, (list, tuple))
+    return SolveResultSet(solres_list)
+
+
 def combine_timer_stats(solres_list):
     """
     Combine Timer statistics into one set.
@@ -336,22 +769,7 @@ def combine_timer_stats(solres_list):
               of the Solver.
     :rtype: dict
     """
-    assert isinstance(solres_list, (list, tuple))
-    stats_list = collections.defaultdict(float)
-    msg = 'solres must be a SolveResult object: solres=%r'
-    for solres in solres_list:
-        if isinstance(solres, SolveResult) is False:
-            raise TypeError(msg % solres)
-        stats = solres.get_timer_stats()
-        for k, v in stats.items():
-            if stats_list.get(k) is None:
-                if isinstance(v, int):
-                    stats_list[k] = 0
-                elif isinstance(v, float):
-                    stats_list[k] = 0.0
-            if isinstance(v, (int, float)):
-                stats_list[k] += v
-    return stats_list
+    return _get_solve_result_set(solres_list).get_timer_stats()
 
 
 def merge_frame_list(solres_list):
@@ -364,16 +782,7 @@ def merge_frame_list(solres_list):
     :returns: A list of frame numbers.
     :rtype: [int, ..] or [float, ..]
     """
-    assert isinstance(solres_list, (list, tuple))
-    frame_list = set()
-    msg = 'solres must be a SolveResult object: solres=%r'
-    for solres in solres_list:
-        if isinstance(solres, SolveResult) is False:
-            raise TypeError(msg % solres)
-        frame_list |= set(solres.get_frame_list())
-    frame_list = list(frame_list)
-    frame_list = list(sorted(frame_list))
-    return frame_list
+    return _get_solve_result_set(solres_list).get_frame_list()
 
 
 def merge_frame_error_list(solres_list):
@@ -390,16 +799,7 @@ def merge_frame_error_list(solres_list):
     :returns: Mapping of frame number to error values.
     :rtype: dict
     """
-    assert isinstance(solres_list, (list, tuple))
-    frame_error_list = collections.defaultdict(float)
-    msg = 'solres must be a SolveResult object: solres=%r'
-    for solres in solres_list:
-        if isinstance(solres, SolveResult) is False:
-            raise TypeError(msg % solres)
-        frm_err_list = solres.get_frame_error_list()
-        for k, v in frm_err_list.items():
-            frame_error_list[k] = v
-    return frame_error_list
+    return _get_solve_result_set(solres_list).get_frame_error_list()
 
 
 def get_average_frame_error_list(frame_error_list):
@@ -413,14 +813,11 @@ def get_average_frame_error_list(frame_error_list):
     :rtype: float
     """
     assert isinstance(frame_error_list, dict)
-    error = 0.0
-    total = 0
-    for k, v in frame_error_list.items():
-        error += float(v)
-        total += 1
-    if total > 0:
-        error = error / float(total)
-    return error
+    total = len(frame_error_list)
+    if total == 0:
+        return 0.0
+    error = math.fsum(float(v) for v in frame_error_list.values())
+    return error / float(total)
 
 
 def get_max_frame_error(frame_error_list):
@@ -461,17 +858,7 @@ def merge_marker_error_list(solres_list):
     :returns: Mapping of frame number to error values.
     :rtype: dict
     """
-    assert isinstance(solres_list, (list, tuple))
-    marker_error_list = collections.defaultdict(dict)
-    msg = 'solres must be a SolveResult object: solres=%r'
-    for solres in solres_list:
-        if isinstance(solres, SolveResult) is False:
-            raise TypeError(msg % solres)
-        mkr_err_data = solres.get_marker_error_list(marker_node=None)
-        for k1, v1 in mkr_err_data.items():
-            for k2, v2 in v1.items():
-                marker_error_list[k1][k2] = v2
-    return marker_error_list
+    return _get_solve_result_set(solres_list).get_marker_error_list()
 
 
 def merge_marker_node_list(solres_list):
@@ -484,17 +871,7 @@ def merge_marker_node_list(solres_list):
     :returns: A list of Maya nodes of Markers.
     :rtype: [str, ..]
     """
-    assert isinstance(solres_list, (list, tuple))
-    mkr_nodes = set()
-    msg = 'solres must be a SolveResult object: solres=%r'
-    for solres in solres_list:
-        if isinstance(solres, SolveResult) is False:
-            raise TypeError(msg % solres)
-        data = solres.get_marker_error_list()
-        mkr_nodes |= set(data.keys())
-    mkr_nodes = list(mkr_nodes)
-    mkr_nodes = list(sorted(mkr_nodes))
-    return mkr_nodes
+    return _get_solve_result_set(solres_list).get_marker_node_list()
 
 
 def format_timestamp(value):
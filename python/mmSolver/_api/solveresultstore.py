@@ -0,0 +1,265 @@
+# Copyright (C) 2019 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Solve result storage - compact storage of SolveResults on a Collection.
+
+The per-frame and per-marker-per-frame errors of each SolveResult are
+packed as arrays of numbers and, with the other solver statistics,
+compressed with zlib. The payload is stored in the Collection node as
+a base64 string, or, if the environment variable
+'MMSOLVER_SOLVE_RESULTS_DIR' is set, in a 'sidecar' file in that
+directory, with only the file path and hash stored on the Collection.
+Sidecar files are named by the Collection node UUID and the payload
+hash, so a file is never changed after it is written; older (or
+duplicated) scenes still refer to their own files. Old sidecar files
+are not removed.
+
+Decoded payloads are cached by hash, so the payload is only decoded
+the first time the SolveResults are requested.
+"""
+
+import os
+import sys
+import json
+import zlib
+import array
+import base64
+import struct
+import hashlib
+import collections
+
+import mmSolver.logger
+import mmSolver._api.solveresult as solveresult
+
+
+LOG = mmSolver.logger.get_logger()
+
+ENV_VAR_NAME_SOLVE_RESULTS_DIR = 'MMSOLVER_SOLVE_RESULTS_DIR'
+
+FORMAT_NAME = 'mmSolverResultsZlib'
+FORMAT_VERSION = 1
+SIDECAR_FILE_EXT = '.mmsolres'
+
+# Number of decoded payloads kept in memory.
+DECODE_CACHE_SIZE = 8
+
+__DECODE_CACHE = collections.OrderedDict()
+
+
+def _array_to_bytes(arr):
+    if hasattr(arr, 'tobytes'):
+        return arr.tobytes()
+    return arr.tostring()
+
+
+def _array_from_bytes(typecode, data, byteorder):
+    arr = array.array(typecode)
+    if hasattr(arr, 'frombytes'):
+        arr.frombytes(data)
+    else:
+        arr.fromstring(data)
+    if byteorder != sys.byteorder:
+        arr.byteswap()
+    return arr
+
+
+def _pack_solve_results(solres_list):
+    """
+    Pack SolveResults into bytes.
+
+    The bytes are a header length, a JSON header and the concatenated
+    arrays of doubles.
+    """
+    header = {
+        'byteorder': sys.byteorder,
+        'results': [],
+    }
+    values = array.array('d')
+    for solres in solres_list:
+        names, mkr_index, mkr_frame, mkr_error = \
+            solres.get_marker_error_columns()
+        frames, errors = solres.get_frame_error_columns()
+        header['results'].append({
+            'lines': solres.get_other_lines(),
+            'markers': names,
+            'marker_count': len(mkr_index),
+            'frame_count': len(frames),
+        })
+        values.extend([float(i) for i in mkr_index])
+        values.extend(mkr_frame)
+        values.extend(mkr_error)
+        values.extend(frames)
+        values.extend(errors)
+    header_data = json.dumps(header).encode('utf-8')
+    return (struct.pack('<I', len(header_data))
+            + header_data
+            + _array_to_bytes(values))
+
+
+def _unpack_solve_results(data):
+    """
+    Unpack bytes created by :py:func:`_pack_solve_results`.
+    """
+    size = struct.unpack('<I', data[:4])[0]
+    header = json.loads(data[4:4 + size].decode('utf-8'))
+    values = _array_from_bytes('d', data[4 + size:], header['byteorder'])
+
+    solres_list = []
+    start = 0
+    for result in header['results']:
+        mkr_count = result['marker_count']
+        frm_count = result['frame_count']
+        columns = []
+        for count in [mkr_count] * 3 + [frm_count] * 2:
+            columns.append(values[start:start + count])
+            start += count
+        mkr_index = array.array('l', [int(i) for i in columns[0]])
+        marker_columns = (
+            [str(n) for n in result['markers']],
+            mkr_index, columns[1], columns[2])
+        frame_columns = (columns[3], columns[4])
+        lines = [str(line) for line in result['lines']]
+        solres = solveresult.create_solve_result_from_columns(
+            lines, marker_columns, frame_columns)
+        solres_list.append(solres)
+    return solres_list
+
+
+def _add_to_decode_cache(key, solres_list):
+    global __DECODE_CACHE
+    __DECODE_CACHE[key] = list(solres_list)
+    while len(__DECODE_CACHE) > DECODE_CACHE_SIZE:
+        __DECODE_CACHE.popitem(last=False)
+    return
+
+
+def _get_from_decode_cache(key):
+    return __DECODE_CACHE.get(key)
+
+
+def get_sidecar_directory():
+    """
+    Get the directory to write solve result 'sidecar' files into.
+
+    :returns: Directory path, or None if sidecar files are not used.
+    :rtype: str or None
+    """
+    dir_path = os.environ.get(ENV_VAR_NAME_SOLVE_RESULTS_DIR)
+    if dir_path is None or len(dir_path) == 0:
+        return None
+    return dir_path
+
+
+def is_encoded_solve_results(data):
+    """
+    Is the data created by :py:func:`encode_solve_results`?
+
+    :param data: Data stored on a Collection node.
+    :type data: any
+
+    :rtype: bool
+    """
+    return (isinstance(data, dict)
+            and data.get('format') == FORMAT_NAME)
+
+
+def encode_solve_results(solres_list, name=None, sidecar_dir=None):
+    """
+    Encode SolveResults into a compact structure.
+
+    :param solres_list: The SolveResults to encode.
+    :type solres_list: [SolveResult, ..]
+
+    :param name: The start of the sidecar file name, such as the
+                 Collection node UUID. The file name ends with the
+                 payload hash.
+    :type name: str or None
+
+    :param sidecar_dir: Directory to write a sidecar file into. If None,
+                        the data is stored in the returned structure.
+    :type sidecar_dir: str or None
+
+    :returns: A JSON compatible structure.
+    :rtype: dict
+    """
+    payload = zlib.compress(_pack_solve_results(solres_list))
+    payload_hash = hashlib.sha1(payload).hexdigest()
+    data = {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'hash': payload_hash,
+        'count': len(solres_list),
+    }
+    if sidecar_dir is not None:
+        if name is None:
+            name = 'solve_results'
+        file_name = '{0}_{1}{2}'.format(name, payload_hash, SIDECAR_FILE_EXT)
+        file_path = os.path.join(sidecar_dir, file_name)
+        if not os.path.isdir(sidecar_dir):
+            os.makedirs(sidecar_dir)
+        if not os.path.isfile(file_path):
+            with open(file_path, 'wb') as f:
+                f.write(payload)
+        data['path'] = file_path
+    else:
+        data['data'] = base64.b64encode(payload).decode('ascii')
+    _add_to_decode_cache(payload_hash, solres_list)
+    return data
+
+
+def decode_solve_results(data):
+    """
+    Decode a structure created by :py:func:`encode_solve_results`.
+
+    :param data: The encoded structure.
+    :type data: dict
+
+    :returns: A new list of the SolveResults, or an empty list if the
+              data cannot be read.
+    :rtype: [SolveResult, ..]
+    """
+    assert is_encoded_solve_results(data)
+    payload_hash = data.get('hash')
+    solres_list = _get_from_decode_cache(payload_hash)
+    if solres_list is not None:
+        return list(solres_list)
+
+    version = data.get('version')
+    if version != FORMAT_VERSION:
+        LOG.warning('Solve results format version is not supported: %r',
+                    version)
+        return []
+    file_path = data.get('path')
+    if file_path is not None:
+        if not os.path.isfile(file_path):
+            LOG.warning('Solve results file does not exist: %r', file_path)
+            return []
+        with open(file_path, 'rb') as f:
+            payload = f.read()
+        if hashlib.sha1(payload).hexdigest() != payload_hash:
+            LOG.warning('Solve results file has changed: %r', file_path)
+            return []
+    else:
+        payload = base64.b64decode(data.get('data', ''))
+    try:
+        solres_list = _unpack_solve_results(zlib.decompress(payload))
+    except (zlib.error, ValueError, KeyError, struct.error):
+        LOG.warning('Solve results data could not be decoded.')
+        return []
+    _add_to_decode_cache(payload_hash, solres_list)
+    return list(solres_list)
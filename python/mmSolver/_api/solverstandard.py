@@ -21,10 +21,12 @@ The standard solver - allows solving static and animated attributes.
 
 import mmSolver.logger
 
+import mmSolver.utils.nodeaffects as affects_utils
 import mmSolver._api.constant as const
 import mmSolver._api.frame as frame
 import mmSolver._api.excep as excep
 import mmSolver._api.marker as marker
+import mmSolver._api.enableindex as enableindex
 import mmSolver._api.solverbase as solverbase
 import mmSolver._api.solverstep as solverstep
 import mmSolver._api.solvertriangulate as solvertriangulate
@@ -91,9 +93,8 @@ def _filter_mkr_list_by_frame_list(mkr_list, frame_list):
     non_root_mkr_list = []
     for mkr in mkr_list:
         assert isinstance(mkr, marker.Marker) is True
-        frame_count = 0
-        for f in root_frame_list_num:
-            frame_count += mkr.get_enable(f)
+        frame_count = enableindex.count_enabled_frames(
+            mkr, root_frame_list_num)
         if frame_count >= 2:
             root_mkr_list.append(mkr)
         else:
@@ -101,7 +102,96 @@ def _filter_mkr_list_by_frame_list(mkr_list, frame_list):
     return root_mkr_list, non_root_mkr_list
 
 
-def _split_mkr_attr_into_categories(mkr_list, attr_list):
+def _find_marker_attr_sub_mapping(mkr_list, attr_list,
+                                  sub_mkr_list, sub_attr_list,
+                                  mkr_attr_map=None):
+    """
+    Get the mapping of some of the Markers to some of the Attributes,
+    re-using an existing mapping if possible.
+
+    :param mkr_list: List of Markers in 'mkr_attr_map'.
+    :type mkr_list: [Marker, ..]
+
+    :param attr_list: List of Attributes in 'mkr_attr_map'.
+    :type attr_list: [Attribute, ..]
+
+    :param sub_mkr_list: List of Markers to get the mapping for; all
+                         Markers must be in 'mkr_list'.
+    :type sub_mkr_list: [Marker, ..]
+
+    :param sub_attr_list: List of Attributes to get the mapping for;
+                          all Attributes must be in 'attr_list'.
+    :type sub_attr_list: [Attribute, ..]
+
+    :param mkr_attr_map: The mapping of 'mkr_list' to 'attr_list', or
+                         None to compute the mapping from the Maya
+                         scene.
+    :type mkr_attr_map: [[bool, ..], ..] or None
+
+    :returns: Boolean matrix of size 'sub markers x sub attrs'.
+    :rtype: [[bool, ..], ..]
+    """
+    if mkr_attr_map is None:
+        return markerutils.find_marker_attr_mapping(
+            sub_mkr_list,
+            sub_attr_list
+        )
+    mkr_indices = dict([(id(x), i) for i, x in enumerate(mkr_list)])
+    attr_indices = dict([(id(x), j) for j, x in enumerate(attr_list)])
+    mapping = []
+    for mkr in sub_mkr_list:
+        row = mkr_attr_map[mkr_indices[id(mkr)]]
+        mapping.append([row[attr_indices[id(x)]] for x in sub_attr_list])
+    return mapping
+
+
+def _split_mkr_attr_into_components(mkr_list, attr_list, mkr_attr_map):
+    """
+    Split Markers and Attributes into independent groups, keeping the
+    Markers and Attributes that are not in any group in their own
+    group.
+
+    Markers not affected by any Attribute, and Attributes not
+    affecting any Marker, are added to a residual group, so they are
+    still given to the solver, like when the groups are not split. If
+    the residual group has no Markers or no Attributes, it cannot be
+    solved and is left out; the Markers are not affected by any
+    Attribute, so they do not change the solve.
+
+    :param mkr_list: Markers to split.
+    :type mkr_list: [Marker, ..]
+
+    :param attr_list: Attributes to split.
+    :type attr_list: [Attribute, ..]
+
+    :param mkr_attr_map: The mapping of 'mkr_list' to 'attr_list'.
+    :type mkr_attr_map: [[bool, ..], ..]
+
+    :returns: List of Marker and Attribute lists.
+    :rtype: [([Marker, ..], [Attribute, ..]), ..]
+    """
+    groups = api_compile.split_into_independent_components(
+        mkr_list,
+        attr_list,
+        mkr_attr_map=mkr_attr_map
+    )
+    used_mkr_ids = set()
+    used_attr_ids = set()
+    for group_mkr_list, group_attr_list in groups:
+        used_mkr_ids |= set([id(x) for x in group_mkr_list])
+        used_attr_ids |= set([id(x) for x in group_attr_list])
+    residual_mkr_list = [x for x in mkr_list if id(x) not in used_mkr_ids]
+    residual_attr_list = [x for x in attr_list if id(x) not in used_attr_ids]
+    if len(residual_mkr_list) == 0 and len(residual_attr_list) == 0:
+        return groups
+
+    if len(residual_mkr_list) > 0 and len(residual_attr_list) > 0:
+        groups.append((residual_mkr_list, residual_attr_list))
+    return groups
+
+
+def _split_mkr_attr_into_categories(mkr_list, attr_list,
+                                    mkr_attr_map=None):
     """
     Put Markers and Attributes into categories to be solved individually.
 
@@ -111,6 +201,10 @@ def _split_mkr_attr_into_categories(mkr_list, attr_list):
     :param attr_list: List of Attributes.
     :type attr_list: [Attribute, ..]
 
+    :param mkr_attr_map: The mapping of 'mkr_list' to 'attr_list', or
+                         None to compute the mapping.
+    :type mkr_attr_map: [[bool, ..], ..] or None
+
     :return:
         List of Markers and List of Attributes. The length of both
         Marker and Attributes will be the same and are designed to
@@ -120,10 +214,11 @@ def _split_mkr_attr_into_categories(mkr_list, attr_list):
     meta_mkr_list = []
     meta_attr_list = []
 
-    mkr_attr_map = markerutils.find_marker_attr_mapping(
-        mkr_list,
-        attr_list
-    )
+    if mkr_attr_map is None:
+        mkr_attr_map = markerutils.find_marker_attr_mapping(
+            mkr_list,
+            attr_list
+        )
     attrs_in_categories = api_compile.categorise_attributes(
         attr_list
     )
@@ -169,12 +264,128 @@ def _split_mkr_attr_into_categories(mkr_list, attr_list):
     return meta_mkr_list, meta_attr_list
 
 
+def _split_mkr_attr_into_hierarchy_groups(mkr_list, attr_list):
+    """
+    Put Markers and Attributes into hierarchy levels to be solved
+    individually, starting at the root level.
+
+    See :py:func:`mmSolver.utils.nodeaffects.sort_into_hierarchy_groups`
+    for details of how hierarchy levels are found.
+
+    :param mkr_list: List of Markers.
+    :type mkr_list: [Marker, ..]
+
+    :param attr_list: List of Attributes.
+    :type attr_list: [Attribute, ..]
+
+    :return:
+        List of Markers and List of Attributes. The length of both
+        Marker and Attributes will be the same and are designed to
+        be used together.
+    :rtype: ( [[Marker, ..], ..], [[Attribute, ..]])
+    """
+    meta_mkr_list = []
+    meta_attr_list = []
+
+    mkr_map = {}
+    raw_mkr_list = []
+    for mkr in mkr_list:
+        bnd = mkr.get_bundle()
+        cam = mkr.get_camera()
+        if bnd is None or cam is None:
+            continue
+        raw_mkr = (mkr.get_node(), cam.get_shape_node(), bnd.get_node())
+        mkr_map[raw_mkr] = mkr
+        raw_mkr_list.append(raw_mkr)
+
+    attr_map = {}
+    raw_attr_list = []
+    for attr in attr_list:
+        raw_attr = attr.get_name()
+        attr_map[raw_attr] = attr
+        raw_attr_list.append(raw_attr)
+
+    groups = affects_utils.sort_into_hierarchy_groups(
+        raw_mkr_list,
+        raw_attr_list
+    )
+    for raw_mkr_group, raw_attr_group in groups:
+        meta_mkr_list.append([mkr_map[x] for x in raw_mkr_group])
+        meta_attr_list.append([attr_map[x] for x in raw_attr_group])
+    return meta_mkr_list, meta_attr_list
+
+
+def _compile_hierarchy_blocks(mkr_list,
+                              attr_list,
+                              frame_list,
+                              block_iter_num,
+                              withtest,
+                              verbose):
+    """
+    Compile actions to solve each hierarchy level, one after the other.
+
+    Root-level Attributes are solved first, then the Attributes of
+    each child level are solved, while the Attributes of the parent
+    levels are held fixed.
+
+    :param mkr_list:
+        Markers to be solved with.
+    :type mkr_list: [Marker, ..]
+
+    :param attr_list:
+        Attributes to be solved.
+    :type attr_list: [Attribute, ..]
+
+    :param frame_list:
+        Frames to solve the hierarchy levels on.
+    :type frame_list: [Frame, ..]
+
+    :param block_iter_num:
+        How many iterations to perform for each hierarchy level.
+    :type block_iter_num: int
+
+    :param withtest:
+        Should validation tests be generated?
+    :type withtest: bool
+
+    :param verbose:
+        Print out more detail than usual.
+    :type verbose: bool
+
+    :return:
+        Yields a generator of two Actions. First Action is for solving,
+        the second Action is for validation of inputs.
+    :rtype: (Action, Action)
+    """
+    meta_mkr_list, meta_attr_list = _split_mkr_attr_into_hierarchy_groups(
+        mkr_list,
+        attr_list
+    )
+    for new_mkr_list, new_attr_list in zip(meta_mkr_list, meta_attr_list):
+        sol = solverstep.SolverStep()
+        sol.set_verbose(verbose)
+        sol.set_max_iterations(block_iter_num)
+        sol.set_frame_list(frame_list)
+        sol.set_attributes_use_animated(True)
+        sol.set_attributes_use_static(True)
+        sol.set_auto_diff_type(const.AUTO_DIFF_TYPE_FORWARD)
+
+        cache = api_compile.create_compile_solver_cache()
+        generator = api_compile.compile_solver_with_cache(
+            sol, new_mkr_list, new_attr_list, withtest, cache
+        )
+        for action, vaction in generator:
+            yield action, vaction
+    return
+
+
 def _compile_multi_root_frames(mkr_list,
                                attr_list,
                                batch_frame_list,
                                root_iter_num,
                                withtest,
-                               verbose):
+                               verbose,
+                               mkr_attr_map=None):
     """
     Compile actions for solving Root frames.
 
@@ -202,6 +413,11 @@ def _compile_multi_root_frames(mkr_list,
         Print out more detail to 'stdout'.
     :type verbose: bool
 
+    :param mkr_attr_map:
+        The mapping of 'mkr_list' to 'attr_list', or None to compute
+        the mapping.
+    :type mkr_attr_map: [[bool, ..], ..] or None
+
     :return:
         Yields two Actions at each iteration; first Action is for
         solving, second Action is to validate the inputs given.
@@ -216,14 +432,17 @@ def _compile_multi_root_frames(mkr_list,
         )
         assert len(root_mkr_list) > 0
 
-        mkr_attr_map = markerutils.find_marker_attr_mapping(
+        root_mkr_attr_map = _find_marker_attr_sub_mapping(
+            mkr_list,
+            attr_list,
             root_mkr_list,
-            attr_list
+            attr_list,
+            mkr_attr_map=mkr_attr_map
         )
         root_attr_list = []
         for i, mkr in enumerate(root_mkr_list):
             for j, attr in enumerate(attr_list):
-                x = mkr_attr_map[i][j]
+                x = root_mkr_attr_map[i][j]
                 if x is True and attr not in root_attr_list:
                     root_attr_list.append(attr)
 
@@ -397,6 +616,8 @@ def _compile_multi_frame(mkr_list,
                          root_frame_list,
                          frame_list,
                          auto_attr_blocks,
+                         hierarchy_blocks,
+                         hierarchy_refine,
                          block_iter_num,
                          only_root_frames,
                          root_iter_num,
@@ -405,7 +626,8 @@ def _compile_multi_frame(mkr_list,
                          root_frame_strategy,
                          triangulate_bundles,
                          withtest,
-                         verbose):
+                         verbose,
+                         mkr_attr_map=None):
     """
     Generate Actions to solve multiple-frames.
 
@@ -430,8 +652,19 @@ def _compile_multi_frame(mkr_list,
         solved together.
     :type auto_attr_blocks: bool
 
+    :param hierarchy_blocks:
+        Solve the root frames one hierarchy level at a time, starting
+        with the root level.
+    :type hierarchy_blocks: bool
+
+    :param hierarchy_refine:
+        After solving each hierarchy level, solve all attributes on the
+        root frames together? Only used if 'hierarchy_blocks' is True.
+    :type hierarchy_refine: bool
+
     :param block_iter_num:
-        How many iterations to perform for attribute categories.
+        How many iterations to perform for attribute categories and
+        hierarchy levels.
     :type block_iter_num: int
 
     :param only_root_frames:
@@ -469,6 +702,11 @@ def _compile_multi_frame(mkr_list,
         Print out more detail than usual.
     :type verbose: bool
 
+    :param mkr_attr_map:
+        The mapping of 'mkr_list' to 'attr_list', or None to compute
+        the mapping.
+    :type mkr_attr_map: [[bool, ..], ..] or None
+
     :return:
         Yields a generator of two Actions. First Action is for solving,
         the second Action is for validation of inputs.
@@ -507,9 +745,19 @@ def _compile_multi_frame(mkr_list,
         root_frame_list
     )
     if auto_attr_blocks is True:
+        root_mkr_attr_map = None
+        if mkr_attr_map is not None:
+            root_mkr_attr_map = _find_marker_attr_sub_mapping(
+                mkr_list,
+                attr_list,
+                root_mkr_list,
+                attr_list,
+                mkr_attr_map=mkr_attr_map
+            )
         meta_mkr_list, meta_attr_list = _split_mkr_attr_into_categories(
             root_mkr_list,
-            attr_list
+            attr_list,
+            mkr_attr_map=root_mkr_attr_map
         )
         for new_mkr_list, new_attr_list in zip(meta_mkr_list, meta_attr_list):
             sol = solverstep.SolverStep()
@@ -527,6 +775,19 @@ def _compile_multi_frame(mkr_list,
             for action, vaction in generator:
                 yield action, vaction
 
+    # Solve root frames, one hierarchy level at a time.
+    if hierarchy_blocks is True:
+        generator = _compile_hierarchy_blocks(
+            root_mkr_list,
+            attr_list,
+            root_frame_list,
+            block_iter_num,
+            withtest,
+            verbose
+        )
+        for action, vaction in generator:
+            yield action, vaction
+
     # TODO: Create a list of markers specially for root frames.
     #  Loop over all given markers, determine which markers have 2
     #  or more root frames, only use those markers for root frame
@@ -540,13 +801,11 @@ def _compile_multi_frame(mkr_list,
     #  correctly, but the Bundle is still in the solver, then it should
     #  be triangulated after the initial root frame solve is performed.
     #
-    # TODO: Run the solver multiple times for a hierarchy. First,
-    #  solve DAG level 0 nodes, then add DAG level 1, then level 2,
-    #  etc. This will allow us to incrementally add solving of
-    #  hierarchy, without getting the optimiser confused which
-    #  attributes to solve first to get a stable solve.
 
-    if root_frame_strategy == const.ROOT_FRAME_STRATEGY_GLOBAL_VALUE:
+    if hierarchy_blocks is True and hierarchy_refine is False:
+        # The hierarchy levels have already solved the root frames.
+        pass
+    elif root_frame_strategy == const.ROOT_FRAME_STRATEGY_GLOBAL_VALUE:
         # Global solve of root frames.
         sol = solverstep.SolverStep()
         sol.set_verbose(verbose)
@@ -587,7 +846,8 @@ def _compile_multi_frame(mkr_list,
             batch_frame_list,
             root_iter_num,
             withtest,
-            verbose
+            verbose,
+            mkr_attr_map=mkr_attr_map
         )
         for action, vaction in generator:
             yield action, vaction
@@ -628,8 +888,11 @@ def _compile_single_frame(mkr_list,
                           block_iter_num,
                           lineup_iter_num,
                           auto_attr_blocks,
+                          hierarchy_blocks,
+                          hierarchy_refine,
                           withtest,
-                          verbose):
+                          verbose,
+                          mkr_attr_map=None):
     """
     Compile to Actions for a solve of a single frame.
 
@@ -658,6 +921,16 @@ def _compile_single_frame(mkr_list,
         pass
     :type lineup_iter_num: int
 
+    :param hierarchy_blocks:
+        Solve one hierarchy level at a time, starting with the root
+        level.
+    :type hierarchy_blocks: bool
+
+    :param hierarchy_refine:
+        After solving each hierarchy level, solve all attributes
+        together? Only used if 'hierarchy_blocks' is True.
+    :type hierarchy_refine: bool
+
     :param withtest:
         Should validation tests be generated?
     :type withtest: bool
@@ -666,6 +939,11 @@ def _compile_single_frame(mkr_list,
         Print out more detail than usual.
     :type verbose: bool
 
+    :param mkr_attr_map:
+        The mapping of 'mkr_list' to 'attr_list', or None to compute
+        the mapping.
+    :type mkr_attr_map: [[bool, ..], ..] or None
+
     :return:
         Yields a generator of two Actions. First Action is for solving,
         the second Action is for validation of inputs.
@@ -674,7 +952,8 @@ def _compile_single_frame(mkr_list,
     if auto_attr_blocks is True:
         meta_mkr_list, meta_attr_list = _split_mkr_attr_into_categories(
             mkr_list,
-            attr_list
+            attr_list,
+            mkr_attr_map=mkr_attr_map
         )
         for new_mkr_list, new_attr_list in zip(meta_mkr_list, meta_attr_list):
             sol = solverstep.SolverStep()
@@ -692,6 +971,20 @@ def _compile_single_frame(mkr_list,
             for action, vaction in generator:
                 yield action, vaction
 
+    if hierarchy_blocks is True:
+        generator = _compile_hierarchy_blocks(
+            mkr_list,
+            attr_list,
+            [single_frame],
+            block_iter_num,
+            withtest,
+            verbose
+        )
+        for action, vaction in generator:
+            yield action, vaction
+        if hierarchy_refine is False:
+            return
+
     # Single frame solve
     sol = solverstep.SolverStep()
     sol.set_verbose(verbose)
@@ -745,6 +1038,21 @@ class SolverStandard(solverbase.SolverBase):
     If the `Solve Everything at Once` option is On, then the second solve
     step contains static and animated attributes (not just animated),
     and all frames are solved as one big crunch.
+
+    If the `Use Hierarchy Blocks` option is On, then before solving the
+    root frames, the root-level transforms are solved first, then the
+    children transforms are solved, one hierarchy level at a time,
+    while the parent transforms are held fixed. If the `Hierarchy
+    Refine` option is On, all attributes are then solved together on
+    the root frames, as usual.
+
+    If the `Split Components` option is On, the Markers and Attributes
+    are split into groups that do not share any Attribute (see
+    :py:func:`mmSolver._api.compile.split_into_independent_components`),
+    and each group is solved (and validated) separately. Markers and
+    Attributes that do not affect each other are kept together in a
+    residual group. A group may fail validation even though all groups
+    together are valid.
     """
 
     # TODO: Before solving root frames we should query the current
@@ -864,6 +1172,68 @@ class SolverStandard(solverbase.SolverBase):
 
     ############################################################################
 
+    def get_use_hierarchy_blocks(self):
+        """
+        Get Use Hierarchy Blocks value.
+
+        :rtype: bool
+        """
+        return self._data.get(
+            'use_hierarchy_blocks',
+            const.SOLVER_STD_USE_HIERARCHY_BLOCKS_DEFAULT_VALUE)
+
+    def set_use_hierarchy_blocks(self, value):
+        """
+        Set Use Hierarchy Blocks value.
+
+        :param value: Value to be set.
+        :type value: bool or int or long
+        """
+        assert isinstance(value, (bool, int, long))
+        self._data['use_hierarchy_blocks'] = bool(value)
+
+    def get_hierarchy_refine(self):
+        """
+        Get Hierarchy Refine value.
+
+        :rtype: bool
+        """
+        return self._data.get(
+            'hierarchy_refine',
+            const.SOLVER_STD_HIERARCHY_REFINE_DEFAULT_VALUE)
+
+    def set_hierarchy_refine(self, value):
+        """
+        Set Hierarchy Refine value.
+
+        :param value: Value to be set.
+        :type value: bool or int or long
+        """
+        assert isinstance(value, (bool, int, long))
+        self._data['hierarchy_refine'] = bool(value)
+
+    def get_split_components(self):
+        """
+        Get Split Components value.
+
+        :rtype: bool
+        """
+        return self._data.get(
+            'split_components',
+            const.SOLVER_STD_SPLIT_COMPONENTS_DEFAULT_VALUE)
+
+    def set_split_components(self, value):
+        """
+        Set Split Components value.
+
+        :param value: Value to be set.
+        :type value: bool or int or long
+        """
+        assert isinstance(value, (bool, int, long))
+        self._data['split_components'] = bool(value)
+
+    ############################################################################
+
     def get_root_frame_strategy(self):
         """
         Get Root Frame Strategy value.
@@ -1161,32 +1531,40 @@ class SolverStandard(solverbase.SolverBase):
         root_frame_strategy = self.get_root_frame_strategy()
         root_frame_list = self.get_root_frame_list()
         frame_list = self.get_frame_list()
+        hierarchy_blocks = self.get_use_hierarchy_blocks()
+        hierarchy_refine = self.get_hierarchy_refine()
+
+        split_components = self.get_split_components()
 
         auto_attr_blocks = self._auto_attr_blocks
         triangulate_bundles = self._triangulate_bundles
         withtest = True
         verbose = True
 
-        if use_single_frame is True:
-            generator = _compile_single_frame(
-                mkr_list,
-                attr_list,
-                single_frame,
-                block_iter_num,
-                lineup_iter_num,
-                auto_attr_blocks,
-                withtest,
-                verbose,
-            )
-            for action, vaction in generator:
-                yield action, vaction
-        else:
-            generator = _compile_multi_frame(
-                mkr_list,
-                attr_list,
+        def compile_group(group_mkr_list, group_attr_list,
+                          group_mkr_attr_map, group_withtest):
+            if use_single_frame is True:
+                return _compile_single_frame(
+                    group_mkr_list,
+                    group_attr_list,
+                    single_frame,
+                    block_iter_num,
+                    lineup_iter_num,
+                    auto_attr_blocks,
+                    hierarchy_blocks,
+                    hierarchy_refine,
+                    group_withtest,
+                    verbose,
+                    mkr_attr_map=group_mkr_attr_map,
+                )
+            return _compile_multi_frame(
+                group_mkr_list,
+                group_attr_list,
                 root_frame_list,
                 frame_list,
                 auto_attr_blocks,
+                hierarchy_blocks,
+                hierarchy_refine,
                 block_iter_num,
                 only_root_frames,
                 root_iter_num,
@@ -1194,9 +1572,43 @@ class SolverStandard(solverbase.SolverBase):
                 global_solve,
                 root_frame_strategy,
                 triangulate_bundles,
-                withtest,
+                group_withtest,
                 verbose,
+                mkr_attr_map=group_mkr_attr_map,
+            )
+
+        if split_components is not True:
+            generator = compile_group(mkr_list, attr_list, None, withtest)
+            for action, vaction in generator:
+                yield action, vaction
+            return
+
+        # Split into independent groups of Markers and Attributes,
+        # re-using the same mapping for all groups.
+        mkr_attr_map = markerutils.find_marker_attr_mapping(
+            mkr_list,
+            attr_list
+        )
+        groups = _split_mkr_attr_into_components(
+            mkr_list,
+            attr_list,
+            mkr_attr_map
+        )
+        LOG.debug('Split into independent components: num=%r', len(groups))
+
+        for group_mkr_list, group_attr_list in groups:
+            group_mkr_attr_map = _find_marker_attr_sub_mapping(
+                mkr_list,
+                attr_list,
+                group_mkr_list,
+                group_attr_list,
+                mkr_attr_map=mkr_attr_map
             )
+            generator = compile_group(
+                group_mkr_list,
+                group_attr_list,
+                group_mkr_attr_map,
+                withtest)
             for action, vaction in generator:
                 yield action, vaction
         return
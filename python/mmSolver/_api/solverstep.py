@@ -398,7 +398,9 @@ class SolverStep(solverbase.SolverBase):
         kwargs['frame'] = []
 
         # Get Markers and Cameras
-        markers, cameras = api_compile.markersAndCameras_compile_flags(mkr_list)
+        frm_num_list = [f.get_number() for f in self.get_frame_list()]
+        markers, cameras = api_compile.markersAndCameras_compile_flags(
+            mkr_list, frame_list=frm_num_list)
         if len(markers) == 0 and len(cameras) == 0:
             LOG.warning('No Markers or Cameras found!')
             return
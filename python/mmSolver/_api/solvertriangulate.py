@@ -19,10 +19,10 @@
 The triangulation solver, used to solve bundles by triangulating.
 """
 
+import array
 import collections
 
 import maya.cmds
-import maya.OpenMaya as OpenMaya
 
 import mmSolver.logger
 
@@ -33,6 +33,8 @@ import mmSolver._api.bundle as bundle
 import mmSolver._api.solverbase as solverbase
 import mmSolver._api.attribute as attribute
 import mmSolver._api.action as api_action
+import mmSolver._api.marker as marker
+import mmSolver._api.enableindex as enableindex
 
 
 LOG = mmSolver.logger.get_logger()
@@ -44,7 +46,6 @@ def _get_marker_first_last_frame_list(mkr_node, consider_frame_list):
     """
     Get the list of frames that this marker is enabled for.
     """
-    frm_list = []
     curves = maya.cmds.listConnections(mkr_node, type='animCurve') or []
     first_time = -99999
     last_time = 99999
@@ -53,14 +54,12 @@ def _get_marker_first_last_frame_list(mkr_node, consider_frame_list):
         first_time = max(int(times[0]), first_time)
         last_time = min(int(times[-1]), last_time)
 
-    for t in range(first_time, last_time + 1):
-        plug = mkr_node + '.enable'
-        value = maya.cmds.getAttr(plug, time=t)
-        if value > 0:
-            if consider_frame_list is None:
-                frm_list.append(t)
-            elif t in consider_frame_list:
-                frm_list.append(t)
+    frames = list(range(first_time, last_time + 1))
+    if consider_frame_list is not None:
+        consider_frame_list = set(consider_frame_list)
+        frames = [t for t in frames if t in consider_frame_list]
+    mkr = marker.Marker(node=mkr_node)
+    frm_list = enableindex.get_enabled_frames(mkr, frames)
     first_last_frames = []
     if len(frm_list) > 0:
         first_frame = frm_list[0]
@@ -69,6 +68,64 @@ def _get_marker_first_last_frame_list(mkr_node, consider_frame_list):
     return first_last_frames
 
 
+def _triangulate_bundles(bnd_mkr_cam_node_frm_list):
+    """
+    Triangulate many 3D bundle positions.
+
+    The camera rays of all markers and frames are queried together,
+    then each bundle is placed at the point closest to all rays of the
+    bundle's markers.
+
+    :param bnd_mkr_cam_node_frm_list: Bundle node to be triangulated,
+        with the Marker and Camera transform to be considered for
+        triangulation.
+    :type bnd_mkr_cam_node_frm_list:
+        [(str, [(str, str, (int, int)), ..]), ..]
+    """
+    LOG.debug('triangulate_bundles: %r', bnd_mkr_cam_node_frm_list)
+    cam_mkr_frm_list = []
+    bnd_ray_indices = []
+    for bnd_node, mkr_cam_node_frm_list in bnd_mkr_cam_node_frm_list:
+        indices = []
+        for mkr_node, cam_tfm, frm_list in mkr_cam_node_frm_list:
+            if len(frm_list) == 0:
+                continue
+            indices.append(len(cam_mkr_frm_list))
+            cam_mkr_frm_list.append((cam_tfm, mkr_node, list(frm_list)))
+        bnd_ray_indices.append((bnd_node, indices))
+    if len(cam_mkr_frm_list) == 0:
+        return
+
+    rays = tri_utils.get_camera_rays(cam_mkr_frm_list)
+    bnd_node_list = []
+    origins_list = []
+    directions_list = []
+    for bnd_node, indices in bnd_ray_indices:
+        if len(indices) == 0:
+            continue
+        origins = array.array('d')
+        directions = array.array('d')
+        for i in indices:
+            origins.extend(rays[i][0])
+            directions.extend(rays[i][1])
+        bnd_node_list.append(bnd_node)
+        origins_list.append(origins)
+        directions_list.append(directions)
+
+    pnt_list = tri_utils.calculate_least_squares_intersection_points(
+        origins_list, directions_list)
+    for bnd_node, pnt in zip(bnd_node_list, pnt_list):
+        if pnt is None:
+            LOG.warning('Bundle could not be triangulated: %r', bnd_node)
+            continue
+        maya.cmds.xform(
+            bnd_node,
+            translation=pnt,
+            worldSpace=True
+        )
+    return
+
+
 def _triangulate_bundle(bnd_node, mkr_cam_node_frm_list):
     """
     Triangulate a 3D bundle position.
@@ -79,41 +136,7 @@ def _triangulate_bundle(bnd_node, mkr_cam_node_frm_list):
     :param mkr_cam_node_frm_list: Marker and Camera transform to be considered for triangulation.
     :type mkr_cam_node_frm_list: [(str, stc, (int, int)), ..]
     """
-    LOG.debug('triangulate_bundle: %r %r', bnd_node, mkr_cam_node_frm_list)
-    prev_frame = maya.cmds.currentTime(query=True)
-    try:
-        for mkr_node, cam_tfm, frm_list in mkr_cam_node_frm_list:
-            if len(frm_list) == 0:
-                continue
-
-            first_frm = frm_list[0]
-            last_frm = frm_list[-1]
-            first_pnt, first_dir = tri_utils.get_point_and_direction(
-                cam_tfm,
-                mkr_node,
-                first_frm)
-            last_pnt, last_dir = tri_utils.get_point_and_direction(
-                cam_tfm,
-                mkr_node,
-                last_frm
-            )
-            a_pnt, b_pnt = tri_utils.calculate_approx_intersection_point_between_two_3d_lines(
-                first_pnt, first_dir,
-                last_pnt, last_dir
-            )
-            pnt = OpenMaya.MPoint(
-                (a_pnt.x + b_pnt.x) * 0.5,
-                (a_pnt.y + b_pnt.y) * 0.5,
-                (a_pnt.z + b_pnt.z) * 0.5
-            )
-
-            maya.cmds.xform(
-                bnd_node,
-                translation=(pnt.x, pnt.y, pnt.z),
-                worldSpace=True
-            )
-    finally:
-        maya.cmds.currentTime(prev_frame, update=False)
+    _triangulate_bundles([(bnd_node, mkr_cam_node_frm_list)])
     return
 
 
@@ -156,12 +179,13 @@ class SolverTriangulate(solverbase.SolverBase):
             if obj_type == const.OBJECT_TYPE_BUNDLE:
                 valid_node_list[attr_node] += 1
 
+        bnd_mkr_cam_node_frm_list = []
+        mkr_node_list = [x.get_node() for x in mkr_list]
         for node, count in valid_node_list.items():
             if count != 3:
                 continue
             bnd = bundle.Bundle(node=node)
             bnd_node = bnd.get_node()
-            mkr_node_list = [x.get_node() for x in mkr_list]
             bnd_mkr_list = [x for x in bnd.get_marker_list()
                             if x.get_node() in mkr_node_list]
             bnd_mkr_node_list = [x.get_node() for x in bnd_mkr_list]
@@ -169,23 +193,25 @@ class SolverTriangulate(solverbase.SolverBase):
                                  for x in bnd_mkr_list]
             bnd_mkr_frm_list = [_get_marker_first_last_frame_list(x, self.root_frame_list)
                                 for x in bnd_mkr_node_list]
-            bnd_mkr_cam_frm_list = zip(
+            bnd_mkr_cam_frm_list = list(zip(
                 bnd_mkr_node_list,
                 bnd_cam_node_list,
                 bnd_mkr_frm_list
-            )
+            ))
+            bnd_mkr_cam_node_frm_list.append((bnd_node, bnd_mkr_cam_frm_list))
 
-            # TODO: We must detect if the newly calculated position is
-            #  behind the camera, if so, we reject the new values.
-            args = [bnd_node, bnd_mkr_cam_frm_list]
+        # TODO: We must detect if the newly calculated position is
+        #  behind the camera, if so, we reject the new values.
+        if len(bnd_mkr_cam_node_frm_list) > 0:
+            args = [bnd_mkr_cam_node_frm_list]
             kwargs = {}
             action = api_action.Action(
-                _triangulate_bundle,
+                _triangulate_bundles,
                 args=args,
                 kwargs=kwargs
             )
-            LOG.debug('adding _triangulate_bundle: func=%r',
-                      _triangulate_bundle,
+            LOG.debug('adding _triangulate_bundles: func=%r args=%r kwargs=%r',
+                      _triangulate_bundles,
                       args,
                       kwargs
             )
@@ -0,0 +1,158 @@
+# Copyright (C) 2019 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Analytic validation - count the parameters and errors of a solve
+without running the 'mmSolver' command.
+
+The counting follows the rules used by the 'mmSolver' command:
+
+- An Attribute driven by an animCurve is animated, and adds one
+  parameter per frame.
+
+- An Attribute that is free to change (not locked or connected) is
+  static, and adds one parameter.
+
+- Other Attributes add no parameters.
+
+- A Marker adds two errors (X and Y) on each frame that it is enabled
+  and has a weight above zero.
+
+When the Maya scene cannot be counted (for example a node given to
+the solver does not exist) None is returned, and the 'mmSolver'
+command should be used to validate.
+"""
+
+import maya.OpenMaya as OpenMaya
+
+import mmSolver.logger
+import mmSolver.utils.node as node_utils
+import mmSolver._api.constant as const
+import mmSolver._api.enableindex as enableindex
+
+
+LOG = mmSolver.logger.get_logger()
+
+ERRORS_PER_MARKER = 2
+
+
+def _count_attribute_parameters(attr_name, num_frames):
+    """
+    Count the number of parameters an Attribute adds to a solve.
+
+    :param attr_name: The 'node.attr' name of the Attribute.
+    :type attr_name: str
+
+    :param num_frames: Number of frames solved.
+    :type num_frames: int
+
+    :returns: Number of parameters, or None if the Attribute cannot
+              be found.
+    :rtype: int or None
+    """
+    plug = node_utils.get_as_plug_apione(attr_name)
+    if plug is None:
+        return None
+    src_plugs = OpenMaya.MPlugArray()
+    plug.connectedTo(src_plugs, True, False)
+    for i in range(src_plugs.length()):
+        if src_plugs[i].node().hasFn(OpenMaya.MFn.kAnimCurve):
+            return num_frames
+    if plug.isFreeToChange() == OpenMaya.MPlug.kFreeToChange:
+        return 1
+    return 0
+
+
+def _count_marker_errors(mkr_node, frames):
+    """
+    Count the number of errors a Marker adds to a solve.
+
+    :param mkr_node: The Marker node.
+    :type mkr_node: str
+
+    :param frames: Frame numbers solved.
+    :type frames: [int, ..]
+
+    :returns: Number of errors, or None if the Marker cannot be
+              found.
+    :rtype: int or None
+    """
+    start_frame = int(min(frames))
+    end_frame = int(max(frames))
+    plugs = [
+        '{0}.{1}'.format(mkr_node, const.MARKER_ATTR_LONG_NAME_ENABLE),
+        '{0}.{1}'.format(mkr_node, const.MARKER_ATTR_LONG_NAME_WEIGHT),
+    ]
+    for plug in plugs:
+        if node_utils.get_as_plug_apione(plug) is None:
+            return None
+    enable_values, weight_values = [
+        enableindex.read_plug_values(plug, start_frame, end_frame)
+        for plug in plugs
+    ]
+    num_err = 0
+    for frame in frames:
+        index = int(frame) - start_frame
+        enable = int(round(enable_values[index])) > 0
+        weight = weight_values[index]
+        if enable is True and weight > 0.0:
+            num_err += ERRORS_PER_MARKER
+    return num_err
+
+
+def count_parameters_and_errors(kwargs):
+    """
+    Count the number of parameters and errors for the 'mmSolver'
+    command, given the command flags.
+
+    :param kwargs: Keyword arguments given to the 'mmSolver' command.
+    :type kwargs: dict
+
+    :returns: The number of parameters, errors and frames, or None if
+              the values cannot be counted without running the
+              'mmSolver' command.
+    :rtype: (int, int, int) or None
+    """
+    frames = kwargs.get('frame', [])
+    markers = kwargs.get('marker', [])
+    attrs = kwargs.get('attr', [])
+    num_frames = len(frames)
+    if num_frames == 0:
+        return None
+    if any(float(f) != int(f) for f in frames):
+        return None
+
+    # The solver fails if any of the nodes given do not exist.
+    for mkr_node, cam_shp_node, bnd_node in markers:
+        for node in [cam_shp_node, bnd_node]:
+            if node_utils.get_as_object_apione(node) is None:
+                return None
+
+    num_param = 0
+    for attr in attrs:
+        num = _count_attribute_parameters(attr[0], num_frames)
+        if num is None:
+            return None
+        num_param += num
+
+    num_err = 0
+    for mkr_node, _, _ in markers:
+        num = _count_marker_errors(mkr_node, frames)
+        if num is None:
+            return None
+        num_err += num
+    return num_param, num_err, num_frames
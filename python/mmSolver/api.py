@@ -17,176 +17,232 @@
 #
 """
 Controls the user-facing API.
+
+The objects of the API are imported when they are first used, so
+that importing this module is fast and does not import Maya modules.
+
+>>> import mmSolver.api as mmapi  # Nothing else is imported.
+>>> mkr = mmapi.Marker()  # 'mmSolver._api.marker' is imported now.
 """
 
-# All the objects for the user API.
-from mmSolver._api.camera import Camera
-from mmSolver._api.bundle import Bundle
-from mmSolver._api.marker import (
-    Marker,
-    update_deviation_on_markers
-)
-from mmSolver._api.markergroup import MarkerGroup
-from mmSolver._api.attribute import Attribute
-from mmSolver._api.collection import (
-    Collection,
-    update_deviation_on_collection
-)
-from mmSolver._api.execute import (
-    createExecuteOptions,
-    ExecuteOptions,
-    validate,
-    execute,
-)
-from mmSolver._api.frame import Frame
-from mmSolver._api.action import (
-    Action,
-    action_func_is_mmSolver,
-    func_str_to_callable,
-    action_to_components,
-)
-from mmSolver._api.solverbase import (
-    SolverBase,
-)
-from mmSolver._api.solverstep import (
-    Solver,
-    SolverStep,
-)
-from mmSolver._api.solverstandard import (
-    SolverStandard,
-)
-from mmSolver._api.solverbasic import (
-    SolverBasic,
-)
-from mmSolver._api.collectionutils import (
-    run_progress_func,
-    run_status_func,
-    is_single_frame,
-    disconnect_animcurves,
-    reconnect_animcurves,
-    clear_attr_keyframes,
-    generate_isolate_nodes,
-)
-from mmSolver._api.markerutils import (
-    calculate_marker_deviation,
-    get_markers_start_end_frames,
-    find_marker_attr_mapping,
-)
-from mmSolver._api.naming import (
-    find_valid_maya_node_name,
-    get_new_marker_name,
-    get_new_bundle_name,
-)
-convert_valid_maya_name = find_valid_maya_node_name
-get_marker_name = get_new_marker_name
-get_bundle_name = get_new_bundle_name
-from mmSolver._api.state import (
-    is_solver_running,
-    set_solver_running,
-    get_user_interrupt,
-    set_user_interrupt,
-)
-from mmSolver._api.nodeconversion import (
-    get_bundle_nodes_from_marker_nodes,
-    get_marker_nodes_from_bundle_nodes,
-    get_camera_nodes_from_marker_nodes,
-)
-from mmSolver._api.nodefilter import (
-    filter_nodes_into_categories,
-    filter_marker_nodes,
-    filter_marker_group_nodes,
-    filter_bundle_nodes,
-    filter_camera_nodes,
-    filter_collection_nodes,
-)
-from mmSolver._api.solveresult import (
-    SolveResult,
-    combine_timer_stats,
-    merge_frame_list,
-    merge_frame_error_list,
-    get_average_frame_error_list,
-    get_max_frame_error,
-    merge_marker_error_list,
-    merge_marker_node_list,
-    format_timestamp,
-)
-from mmSolver._api.excep import (
-    MMException,
-    NotValid,
-    AlreadyLinked,
-    AlreadyUnlinked,
-    NotEnoughMarkers,
-    SolverNotAvailable,
-)
-from mmSolver._api.constant import (
-    OBJECT_TYPE_UNKNOWN,
-    OBJECT_TYPE_ATTRIBUTE,
-    OBJECT_TYPE_MARKER,
-    OBJECT_TYPE_CAMERA,
-    OBJECT_TYPE_MARKER_GROUP,
-    OBJECT_TYPE_BUNDLE,
-    OBJECT_TYPE_COLLECTION,
-    OBJECT_TYPE_IMAGE_PLANE,
-    OBJECT_TYPE_LIST,
-
-    ATTR_STATE_INVALID,
-    ATTR_STATE_STATIC,
-    ATTR_STATE_ANIMATED,
-    ATTR_STATE_LOCKED,
-
-    SOLVER_TYPE_LEVMAR,
-    SOLVER_TYPE_CMINPACK_LM,
-    SOLVER_TYPE_CMINPACK_LMDIF,
-    SOLVER_TYPE_CMINPACK_LMDER,
-    SOLVER_TYPE_DEFAULT,
-
-    AUTO_DIFF_TYPE_FORWARD,
-    AUTO_DIFF_TYPE_CENTRAL,
-    AUTO_DIFF_TYPE_LIST,
-
-    ROOT_FRAME_STRATEGY_GLOBAL_VALUE,
-    ROOT_FRAME_STRATEGY_FWD_PAIR_VALUE,
-    ROOT_FRAME_STRATEGY_FWD_PAIR_AND_GLOBAL_VALUE,
-    ROOT_FRAME_STRATEGY_VALUE_LIST,
-    ROOT_FRAME_STRATEGY_DEFAULT_VALUE,
-
-    ROBUST_LOSS_TYPE_TRIVIAL_VALUE,
-    ROBUST_LOSS_TYPE_SOFT_L_ONE_VALUE,
-    ROBUST_LOSS_TYPE_CAUCHY_VALUE,
-    ROBUST_LOSS_TYPE_VALUE_LIST,
-    ROBUST_LOSS_TYPE_DEFAULT_VALUE,
-)
-from mmSolver._api.state import (
-    is_solver_running,
-    set_solver_running,
-    get_user_interrupt,
-    set_user_interrupt,
-)
-
-# Utility functions that the user is allowed to use.
-from mmSolver._api.utils import (
-    load_plugin,
-    get_object_type,
-    get_data_on_node_attr,
-    set_data_on_node_attr,
-    get_value_on_node_attr,
-    set_value_on_node_attr,
-    get_marker_group_above_node,
-)
-from mmSolver.utils.undo import (
-    undo_chunk_context,
-)
-undo_chunk = undo_chunk_context
-from mmSolver.utils.animcurve import (
-    create_anim_curve_node,
-)
-from mmSolver.utils.node import (
-    get_long_name,
-    get_as_selection_list,
-    get_as_dag_path,
-    get_as_object,
-    get_as_plug
-)
+import sys
+import types
+import importlib
+
+# All the objects for the user API, and the module that defines them.
+_LAZY_IMPORTS = [
+    ('mmSolver._api.camera', [
+        'Camera',
+    ]),
+    ('mmSolver._api.bundle', [
+        'Bundle',
+    ]),
+    ('mmSolver._api.marker', [
+        'Marker',
+        'update_deviation_on_markers',
+    ]),
+    ('mmSolver._api.markergroup', [
+        'MarkerGroup',
+    ]),
+    ('mmSolver._api.attribute', [
+        'Attribute',
+    ]),
+    ('mmSolver._api.collection', [
+        'Collection',
+        'update_deviation_on_collection',
+        'update_deviation',
+    ]),
+    ('mmSolver._api.execute', [
+        'createExecuteOptions',
+        'ExecuteOptions',
+        'validate',
+        'execute',
+    ]),
+    ('mmSolver._api.compilecache', [
+        'invalidate_collection_compile_cache',
+    ]),
+    ('mmSolver._api.frame', [
+        'Frame',
+    ]),
+    ('mmSolver._api.action', [
+        'Action',
+        'action_func_is_mmSolver',
+        'func_str_to_callable',
+        'action_to_components',
+    ]),
+    ('mmSolver._api.solverbase', [
+        'SolverBase',
+    ]),
+    ('mmSolver._api.solverstep', [
+        'Solver',
+        'SolverStep',
+    ]),
+    ('mmSolver._api.solverstandard', [
+        'SolverStandard',
+    ]),
+    ('mmSolver._api.solverbasic', [
+        'SolverBasic',
+    ]),
+    ('mmSolver._api.collectionutils', [
+        'run_progress_func',
+        'run_status_func',
+        'is_single_frame',
+        'disconnect_animcurves',
+        'reconnect_animcurves',
+        'clear_attr_keyframes',
+        'generate_isolate_nodes',
+    ]),
+    ('mmSolver._api.markerutils', [
+        'calculate_marker_deviation',
+        'get_markers_start_end_frames',
+        'find_marker_attr_mapping',
+    ]),
+    ('mmSolver._api.naming', [
+        'find_valid_maya_node_name',
+        'get_new_marker_name',
+        'get_new_bundle_name',
+    ]),
+    ('mmSolver._api.state', [
+        'is_solver_running',
+        'set_solver_running',
+        'get_user_interrupt',
+        'set_user_interrupt',
+    ]),
+    ('mmSolver._api.nodeconversion', [
+        'get_bundle_nodes_from_marker_nodes',
+        'get_marker_nodes_from_bundle_nodes',
+        'get_camera_nodes_from_marker_nodes',
+    ]),
+    ('mmSolver._api.nodefilter', [
+        'filter_nodes_into_categories',
+        'filter_marker_nodes',
+        'filter_marker_group_nodes',
+        'filter_bundle_nodes',
+        'filter_camera_nodes',
+        'filter_collection_nodes',
+    ]),
+    ('mmSolver._api.solveresult', [
+        'SolveResult',
+        'SolveResultSet',
+        'combine_timer_stats',
+        'merge_frame_list',
+        'merge_frame_error_list',
+        'get_average_frame_error_list',
+        'get_max_frame_error',
+        'merge_marker_error_list',
+        'merge_marker_node_list',
+        'format_timestamp',
+    ]),
+    ('mmSolver._api.excep', [
+        'MMException',
+        'NotValid',
+        'AlreadyLinked',
+        'AlreadyUnlinked',
+        'NotEnoughMarkers',
+        'SolverNotAvailable',
+    ]),
+    ('mmSolver._api.constant', [
+        'OBJECT_TYPE_UNKNOWN',
+        'OBJECT_TYPE_ATTRIBUTE',
+        'OBJECT_TYPE_MARKER',
+        'OBJECT_TYPE_CAMERA',
+        'OBJECT_TYPE_MARKER_GROUP',
+        'OBJECT_TYPE_BUNDLE',
+        'OBJECT_TYPE_COLLECTION',
+        'OBJECT_TYPE_IMAGE_PLANE',
+        'OBJECT_TYPE_LIST',
+        'ATTR_STATE_INVALID',
+        'ATTR_STATE_STATIC',
+        'ATTR_STATE_ANIMATED',
+        'ATTR_STATE_LOCKED',
+        'SOLVER_TYPE_LEVMAR',
+        'SOLVER_TYPE_CMINPACK_LM',
+        'SOLVER_TYPE_CMINPACK_LMDIF',
+        'SOLVER_TYPE_CMINPACK_LMDER',
+        'SOLVER_TYPE_DEFAULT',
+        'AUTO_DIFF_TYPE_FORWARD',
+        'AUTO_DIFF_TYPE_CENTRAL',
+        'AUTO_DIFF_TYPE_LIST',
+        'ROOT_FRAME_STRATEGY_GLOBAL_VALUE',
+        'ROOT_FRAME_STRATEGY_FWD_PAIR_VALUE',
+        'ROOT_FRAME_STRATEGY_FWD_PAIR_AND_GLOBAL_VALUE',
+        'ROOT_FRAME_STRATEGY_VALUE_LIST',
+        'ROOT_FRAME_STRATEGY_DEFAULT_VALUE',
+        'ROBUST_LOSS_TYPE_TRIVIAL_VALUE',
+        'ROBUST_LOSS_TYPE_SOFT_L_ONE_VALUE',
+        'ROBUST_LOSS_TYPE_CAUCHY_VALUE',
+        'ROBUST_LOSS_TYPE_VALUE_LIST',
+        'ROBUST_LOSS_TYPE_DEFAULT_VALUE',
+    ]),
+    ('mmSolver._api.utils', [
+        'load_plugin',
+        'get_object_type',
+        'get_data_on_node_attr',
+        'set_data_on_node_attr',
+        'get_value_on_node_attr',
+        'set_value_on_node_attr',
+        'get_marker_group_above_node',
+    ]),
+    ('mmSolver.utils.undo', [
+        'undo_chunk_context',
+    ]),
+    ('mmSolver.utils.animcurve', [
+        'create_anim_curve_node',
+    ]),
+    ('mmSolver.utils.node', [
+        'get_long_name',
+        'get_as_selection_list',
+        'get_as_dag_path',
+        'get_as_object',
+        'get_as_plug',
+    ]),
+]
+
+# Alternative names for objects, for backwards compatibility.
+_LAZY_ALIASES = {
+    'convert_valid_maya_name': 'find_valid_maya_node_name',
+    'get_marker_name': 'get_new_marker_name',
+    'get_bundle_name': 'get_new_bundle_name',
+    'undo_chunk': 'undo_chunk_context',
+}
+
+# Map of object name to module name.
+_LAZY_ATTRS = dict()
+for _module_name, _names in _LAZY_IMPORTS:
+    for _name in _names:
+        _LAZY_ATTRS[_name] = _module_name
+for _name, _original_name in _LAZY_ALIASES.items():
+    _LAZY_ATTRS[_name] = _LAZY_ATTRS[_original_name]
+del _module_name, _names, _name, _original_name
+
+
+def _get_lazy_attr(name):
+    """
+    Import an object of the API, and store it in this module.
+
+    :param name: The name of the object to get.
+    :type name: str
+
+    :raises AttributeError: When the name is not part of the API.
+    """
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        msg = 'module %r has no attribute %r'
+        raise AttributeError(msg % (__name__, name))
+    module = importlib.import_module(module_name)
+    value = getattr(module, _LAZY_ALIASES.get(name, name))
+    globals()[name] = value
+    return value
+
+
+def __getattr__(name):
+    # Called by Python 3.7+ when 'name' is not found in this module.
+    return _get_lazy_attr(name)
+
+
+def __dir__():
+    return sorted(set(globals().keys()) | set(_LAZY_ATTRS.keys()))
+
 
 __all__ = [
     # Classes
@@ -205,6 +261,7 @@ __all__ = [
     'SolverBasic',
     'SolverStep',
     'SolveResult',
+    'SolveResultSet',
 
     # Constants
     'OBJECT_TYPE_UNKNOWN',
@@ -252,6 +309,7 @@ __all__ = [
 
     # Collection
     'update_deviation_on_collection',
+    'update_deviation',
 
     # Collection Utils
     'run_progress_func',
@@ -272,6 +330,9 @@ __all__ = [
     'execute',
     'validate',
 
+    # Compile Cache
+    'invalidate_collection_compile_cache',
+
     # Marker Utils
     'calculate_marker_deviation',
     'get_markers_start_end_frames',
@@ -333,3 +394,23 @@ __all__ = [
     'merge_marker_node_list',
     'format_timestamp',
 ]
+
+
+if sys.version_info < (3, 7):
+    # Module '__getattr__' functions are not supported, so the module
+    # is replaced with a module sub-class that has '__getattr__'.
+    class _LazyModule(types.ModuleType):
+        def __getattr__(self, name):
+            value = _get_lazy_attr(name)
+            setattr(self, name, value)
+            return value
+
+        def __dir__(self):
+            return __dir__()
+
+    _module = _LazyModule(__name__, __doc__)
+    _module.__dict__.update(sys.modules[__name__].__dict__)
+    # Keep the original module alive; Python 2 clears the globals of
+    # deleted modules, which the functions above use.
+    _module._original_module = sys.modules[__name__]
+    sys.modules[__name__] = _module
@@ -0,0 +1,436 @@
+# Copyright (C) 2019 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Solve Collections in a Maya scene without a user interface.
+
+This module is intended to be run with 'mayapy', for example on a
+render farm::
+
+    $ mayapy -m mmSolver.batch /path/to/scene.ma \\
+        --collection collection1 \\
+        --output-scene /path/to/scene_solved.ma \\
+        --results-file /path/to/scene_solved.json
+
+If no Collection is given, all Collections in the scene are solved.
+The viewport is not used; viewport refresh, Viewport 2.0 toggling and
+object isolation are all turned off.
+
+The results file is JSON, with the success and error values for each
+Collection solved. The process exits with a non-zero exit code if any
+Collection fails to solve.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+
+import mmSolver.logger
+
+
+LOG = mmSolver.logger.get_logger()
+
+EXIT_CODE_SUCCESS = 0
+EXIT_CODE_SOLVE_FAILED = 1
+EXIT_CODE_INVALID_ARGUMENTS = 2
+EXIT_CODE_SCENE_FAILED = 3
+
+# The 'mmSolver' logger level used for each '--log-level' value;
+# 'verbose' also prints the messages of the 'mmSolver' command.
+LOG_LEVELS = {
+    'error': logging.ERROR,
+    'warning': logging.WARNING,
+    'info': logging.INFO,
+    'verbose': logging.INFO,
+    'debug': logging.DEBUG,
+}
+
+
+def create_batch_execute_options():
+    """
+    Create ExecuteOptions for solving without a user interface.
+
+    All viewport related options are turned off.
+
+    :rtype: ExecuteOptions
+    """
+    import mmSolver.api as mmapi
+    options = mmapi.createExecuteOptions(
+        verbose=False,
+        refresh=False,
+        disable_viewport_two=False,
+        force_update=False,
+        do_isolate=False,
+        pre_solve_force_eval=False,
+        display_grid=False,
+        display_node_types=None,
+    )
+    return options
+
+
+def _get_collections(names=None):
+    """
+    Get the Collections in the scene, optionally only the given names.
+
+    :param names: Collection node names to find, or None for all
+                  Collections.
+    :type names: [str, ..] or None
+
+    :returns: The Collections found and the names not found.
+    :rtype: ([Collection, ..], [str, ..])
+    """
+    import maya.cmds
+    import mmSolver.api as mmapi
+    nodes = maya.cmds.ls(type='objectSet', long=True) or []
+    col_nodes = mmapi.filter_collection_nodes(nodes)
+    if names is None or len(names) == 0:
+        return [mmapi.Collection(node=n) for n in col_nodes], []
+
+    cols = []
+    missing = []
+    for name in names:
+        found = maya.cmds.ls(name, long=True) or []
+        found = [n for n in found if n in col_nodes]
+        if len(found) == 0:
+            missing.append(name)
+            continue
+        cols.append(mmapi.Collection(node=found[0]))
+    return cols, missing
+
+
+def solve_collection(col, options, validate_mode=None, log_level=None):
+    """
+    Solve a single Collection.
+
+    The Solvers for the Collection are compiled from the state saved
+    by the Solver UI, then the Collection is executed and deviation
+    values are written onto the Markers and Collection.
+
+    :param col: The Collection to solve.
+    :type col: Collection
+
+    :param options: The execute options for the solve.
+    :type options: ExecuteOptions
+
+    :param validate_mode: How should the solve validate?
+    :type validate_mode: str or None
+
+    :param log_level: The log level for the execution.
+    :type log_level: str or None
+
+    :returns: Results of the solve, as JSON compatible data.
+    :rtype: dict
+    """
+    import mmSolver.api as mmapi
+    import mmSolver.tools.solver.lib.collection as lib_col
+
+    result = {
+        'collection': col.get_node(),
+        'success': False,
+        'message': '',
+        'duration': 0.0,
+        'solve_count': 0,
+        'average_error': None,
+        'max_error': None,
+        'max_error_frame': None,
+    }
+    s = time.time()
+    try:
+        lib_col.compile_collection(col)
+        solres_list = mmapi.execute(
+            col,
+            options=options,
+            validate_mode=validate_mode,
+            log_level=log_level)
+    except Exception as e:
+        LOG.exception('Failed to solve collection: %r', col.get_node())
+        result['message'] = str(e)
+        result['duration'] = time.time() - s
+        return result
+    result['duration'] = time.time() - s
+    solres_list = solres_list or []
+    result['solve_count'] = len(solres_list)
+    if len(solres_list) == 0:
+        result['message'] = 'Collection is not valid, nothing was solved.'
+        return result
+
+    success = all(res.get_success() for res in solres_list)
+    result['success'] = success
+    if success is not True:
+        result['message'] = 'Solver did not succeed.'
+
+    frm_err_list = mmapi.merge_frame_error_list(solres_list)
+    if len(frm_err_list) > 0:
+        avg_err = mmapi.get_average_frame_error_list(frm_err_list)
+        max_err_frm, max_err_val = mmapi.get_max_frame_error(frm_err_list)
+        result['average_error'] = avg_err
+        result['max_error'] = max_err_val
+        result['max_error_frame'] = max_err_frm
+
+    mkr_nodes = mmapi.merge_marker_node_list(solres_list)
+    mkr_list = [mmapi.Marker(node=n) for n in mkr_nodes]
+    mmapi.update_deviation(col, mkr_list, solres_list)
+    return result
+
+
+def solve_scene(scene_path,
+                collection_names=None,
+                output_scene_path=None,
+                results_file_path=None,
+                validate_mode=None,
+                log_level=None):
+    """
+    Open a Maya scene, solve Collections and save the solved scene.
+
+    :param scene_path: The Maya scene file to open.
+    :type scene_path: str
+
+    :param collection_names: Names of the Collections to solve, or None
+                             to solve all Collections in the scene.
+    :type collection_names: [str, ..] or None
+
+    :param output_scene_path: File path to save the solved scene to,
+                              or None to not save the scene.
+    :type output_scene_path: str or None
+
+    :param results_file_path: File path to write the JSON results to,
+                              or None to not write results.
+    :type results_file_path: str or None
+
+    :param validate_mode: How should the solve validate?
+    :type validate_mode: str or None
+
+    :param log_level: The log level for the execution.
+    :type log_level: str or None
+
+    :returns: Results of the solves, as JSON compatible data.
+    :rtype: dict
+    """
+    import maya.cmds
+    import mmSolver.api as mmapi
+
+    results = {
+        'scene': scene_path,
+        'output_scene': output_scene_path,
+        'success': False,
+        'message': '',
+        'collections': [],
+    }
+    try:
+        # The plug-in must be loaded before the scene is opened, so
+        # the solver nodes in the scene are created correctly.
+        mmapi.load_plugin()
+    except RuntimeError as e:
+        results['message'] = str(e)
+        _write_results_file(results_file_path, results)
+        return results
+
+    try:
+        maya.cmds.file(scene_path, open=True, force=True)
+    except RuntimeError as e:
+        LOG.error('Could not open scene: %r', scene_path)
+        results['message'] = str(e)
+        _write_results_file(results_file_path, results)
+        return results
+
+    cols, missing = _get_collections(names=collection_names)
+    if len(missing) > 0:
+        msg = 'Collections not found: %r' % missing
+        LOG.error(msg)
+        results['message'] = msg
+    if len(cols) == 0:
+        if len(results['message']) == 0:
+            results['message'] = 'No Collections to solve.'
+        _write_results_file(results_file_path, results)
+        return results
+
+    options = create_batch_execute_options()
+    col_results = []
+    for col in cols:
+        LOG.info('Solving collection: %r', col.get_node())
+        result = solve_collection(
+            col, options,
+            validate_mode=validate_mode,
+            log_level=log_level)
+        LOG.info('Solved collection: %r success=%r duration=%r',
+                 result['collection'], result['success'],
+                 result['duration'])
+        col_results.append(result)
+    results['collections'] = col_results
+    success = len(missing) == 0
+    success = success and all(r['success'] for r in col_results)
+    results['success'] = success
+
+    if output_scene_path is not None:
+        file_type = 'mayaAscii'
+        if output_scene_path.lower().endswith('.mb'):
+            file_type = 'mayaBinary'
+        try:
+            maya.cmds.file(rename=output_scene_path)
+            maya.cmds.file(save=True, type=file_type, force=True)
+        except RuntimeError as e:
+            LOG.error('Could not save scene: %r', output_scene_path)
+            results['success'] = False
+            results['message'] = str(e)
+    _write_results_file(results_file_path, results)
+    return results
+
+
+def _write_results_file(file_path, results):
+    if file_path is None:
+        return
+    dir_path = os.path.dirname(file_path)
+    if len(dir_path) > 0 and not os.path.isdir(dir_path):
+        os.makedirs(dir_path)
+    with open(file_path, 'w') as f:
+        json.dump(results, f, indent=4, sort_keys=True)
+    return
+
+
+def _initialize_maya():
+    """
+    Initialize Maya, if Maya is not already running.
+
+    :returns: True if Maya was initialized by this function, False if
+              Maya was already running.
+    :rtype: bool
+    """
+    import maya.cmds
+    if hasattr(maya.cmds, 'about'):
+        return False
+    import maya.standalone
+    try:
+        maya.standalone.initialize()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _uninitialize_maya():
+    import maya.standalone
+    try:
+        maya.standalone.uninitialize()
+    except (RuntimeError, AttributeError):
+        # Older Maya versions cannot uninitialize.
+        LOG.warning('Could not uninitialize Maya.')
+    return
+
+
+def _create_parser():
+    parser = argparse.ArgumentParser(
+        prog='mmSolver.batch',
+        description='Solve mmSolver Collections in a Maya scene.')
+    parser.add_argument(
+        'scene',
+        help='Maya scene file to open.')
+    parser.add_argument(
+        '-c', '--collection',
+        action='append',
+        default=None,
+        help=('Collection node name to solve, may be given many '
+              'times. If not given, all Collections are solved.'))
+    parser.add_argument(
+        '-o', '--output-scene',
+        default=None,
+        help='Maya scene file path to save the solved scene to.')
+    parser.add_argument(
+        '-r', '--results-file',
+        default=None,
+        help='JSON file path to write solve results to.')
+    parser.add_argument(
+        '--validate-mode',
+        default=None,
+        choices=['none', 'pre_validate', 'at_runtime'],
+        help='How should the solve be validated?')
+    parser.add_argument(
+        '--log-level',
+        default='info',
+        choices=sorted(LOG_LEVELS.keys()),
+        help=('How much information should be printed? Sets the '
+              'mmSolver logger level; "verbose" also prints the '
+              'messages of the solver.'))
+    return parser
+
+
+def _set_log_level(log_level):
+    """
+    Set the level of the 'mmSolver' logger (and all module loggers).
+
+    If no logging handler exists, messages are printed to standard
+    error.
+
+    :param log_level: A '--log-level' value, see LOG_LEVELS.
+    :type log_level: str
+    """
+    log = logging.getLogger('mmSolver')
+    log.setLevel(LOG_LEVELS[log_level])
+    if len(logging.getLogger().handlers) == 0 and len(log.handlers) == 0:
+        logging.basicConfig()
+    return
+
+
+def main(argv=None):
+    """
+    Run a batch solve from the command line.
+
+    :param argv: The command line arguments, without the program name.
+    :type argv: [str, ..] or None
+
+    :returns: The process exit code.
+    :rtype: int
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    parser = _create_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        # The parser exits with code 0 for '--help', and code 2 for
+        # invalid arguments.
+        if e.code is None:
+            return EXIT_CODE_SUCCESS
+        return e.code
+    _set_log_level(args.log_level)
+
+    if not os.path.isfile(args.scene):
+        LOG.error('Scene file does not exist: %r', args.scene)
+        return EXIT_CODE_INVALID_ARGUMENTS
+
+    initialized = _initialize_maya()
+    try:
+        results = solve_scene(
+            args.scene,
+            collection_names=args.collection,
+            output_scene_path=args.output_scene,
+            results_file_path=args.results_file,
+            validate_mode=args.validate_mode,
+            log_level=args.log_level)
+    finally:
+        if initialized is True:
+            _uninitialize_maya()
+    if len(results['collections']) == 0:
+        return EXIT_CODE_SCENE_FAILED
+    if results['success'] is not True:
+        return EXIT_CODE_SOLVE_FAILED
+    return EXIT_CODE_SUCCESS
+
+
+if __name__ == '__main__':
+    sys.exit(main())
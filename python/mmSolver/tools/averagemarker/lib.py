@@ -21,6 +21,8 @@ Library functions to perform average marker tool functions.
 
 import maya.cmds
 
+import mmSolver.utils.animcurve as anim_utils
+
 
 def __set_average_marker_position(selected_markers,
                                   start_frame,
@@ -44,10 +46,14 @@ def __set_average_marker_position(selected_markers,
 
     :return: None
     """
-    for frame in range(int(start_frame), int(end_frame) + 1):
-        count = len(selected_markers)
+    count = len(selected_markers)
+    if count == 0:
+        return
+    times = list(range(int(start_frame), int(end_frame) + 1))
+    values_x = []
+    values_y = []
+    for frame in times:
         sums = [0, 0]
-
         for item in selected_markers:
             src_plug_x = '%s.translateX' % item
             src_plug_y = '%s.translateY' % item
@@ -56,10 +62,14 @@ def __set_average_marker_position(selected_markers,
 
             sums[0] += pos_x
             sums[1] += pos_y
-            center = [sums[0] / count, sums[1] / count]
+        values_x.append(sums[0] / count)
+        values_y.append(sums[1] / count)
 
-            dst_plug_x = '%s.translateX' % new_mkr_node
-            dst_plug_y = '%s.translateY' % new_mkr_node
-            maya.cmds.setKeyframe(dst_plug_x, value=center[0], time=frame)
-            maya.cmds.setKeyframe(dst_plug_y, value=center[1], time=frame)
+    dst_plug_x = '%s.translateX' % new_mkr_node
+    dst_plug_y = '%s.translateY' % new_mkr_node
+    curve_data = [
+        (dst_plug_x, times, values_x),
+        (dst_plug_y, times, values_y),
+    ]
+    anim_utils.set_anim_curves_keys(curve_data)
     return
@@ -118,18 +118,13 @@ def __create_node(mkr_data, cam, mkr_grp, with_bundles):
     return mkr, bnd
 
 
-def __set_attr_keyframes(node, attr_name, keyframes,
+def __get_attr_keyframes(keyframes,
                          before_value=None,
                          after_value=None,
                          reduce_keys=None):
     """
-    Set keyframes on a node.attribute, from a KeyframeData instance.
-
-    :param node: Node to set data on.
-    :type node: str
-
-    :param attr_name: Attribute (on 'node') to set keyframes.
-    :type attr_name: str
+    Get the keyframe times and values to set, from a KeyframeData
+    instance.
 
     :param keyframes: The keyframe information.
     :type keyframes: KeyframeData
@@ -146,8 +141,8 @@ def __set_attr_keyframes(node, attr_name, keyframes,
                         removed.
     :type reduce_keys: bool
 
-    :returns: Maya API (version 1) MFnAnimCurve object.
-    :rtype: maya.OpenMaya.MFnAnimCurve
+    :returns: The times and values of the keyframes.
+    :rtype: ([int, ..], [float, ..])
     """
     if isinstance(keyframes, interface.KeyframeData) is False:
         msg = 'keyframes must be type %r'
@@ -193,15 +188,41 @@ def __set_attr_keyframes(node, attr_name, keyframes,
             prev_t = t
             prev_v = v
 
-    node_attr = node + '.' + attr_name
-    anim_fn = anim_utils.create_anim_curve_node_apione(times, values, node_attr)
+    return times, values
 
-    if reduce_keys is True:
+
+def __set_attrs_keyframes(node, attr_keyframes):
+    """
+    Set keyframes on many attributes of a node at once.
+
+    :param node: Node to set data on.
+    :type node: str
+
+    :param attr_keyframes: The attribute name, keyframe information and
+                           options (see :py:func:`__get_attr_keyframes`)
+                           for each attribute.
+    :type attr_keyframes: [(str, KeyframeData, dict), ..]
+
+    :returns: Maya API (version 1) MFnAnimCurve object for each
+              attribute.
+    :rtype: [maya.OpenMaya.MFnAnimCurve, ..]
+    """
+    curve_data = []
+    reduce_attrs = []
+    for attr_name, keyframes, kwargs in attr_keyframes:
+        times, values = __get_attr_keyframes(keyframes, **kwargs)
+        node_attr = node + '.' + attr_name
+        curve_data.append((node_attr, times, values, None))
+        if kwargs.get('reduce_keys') is True:
+            reduce_attrs.append(node_attr)
+    anim_fn_list = anim_utils.create_anim_curve_nodes_apione(curve_data)
+
+    for node_attr in reduce_attrs:
         locked = maya.cmds.getAttr(node_attr, lock=True)
         maya.cmds.setAttr(node_attr, lock=False)
         maya.cmds.delete(node_attr, staticChannels=True)
         maya.cmds.setAttr(node_attr, lock=locked)
-    return anim_fn
+    return anim_fn_list
 
 
 def __set_node_data(mkr, bnd, mkr_data,
@@ -275,13 +296,16 @@ def __set_node_data(mkr, bnd, mkr_data,
     maya.cmds.setAttr(mkr_node + '.weight', lock=False)
 
     # Set keyframes.
-    __set_attr_keyframes(mkr_node, 'translateX', mkr_x)
-    __set_attr_keyframes(mkr_node, 'translateY', mkr_y)
-    __set_attr_keyframes(mkr_node, 'enable', mkr_enable,
-                         before_value=False,
-                         after_value=False,
-                         reduce_keys=True)
-    __set_attr_keyframes(mkr_node, 'weight', mkr_weight, reduce_keys=True)
+    __set_attrs_keyframes(mkr_node, [
+        ('translateX', mkr_x, {}),
+        ('translateY', mkr_y, {}),
+        ('enable', mkr_enable, {
+            'before_value': False,
+            'after_value': False,
+            'reduce_keys': True,
+        }),
+        ('weight', mkr_weight, {'reduce_keys': True}),
+    ])
 
     # Lock
     maya.cmds.setAttr(mkr_node + '.translateX', lock=True)
@@ -99,7 +99,7 @@ def main():
         meshes = [n for n in meshes if _visible(n, cache)]
 
     max_dist = 9999999999.0
-    bnd_nodes = []
+    rays = []
     for node in selected_markers:
         mkr = mmapi.Marker(node=node)
         bnd = mkr.get_bundle()
@@ -116,14 +116,18 @@ def main():
             translation=True,
             worldSpace=True
         )
+        rays.append((node, bnd, origin_point, direction))
 
-        hit_point = raytrace_utils.closest_intersect(
-            origin_point,
-            direction,
-            meshes,
-            test_both_directions=False,
-            max_dist=max_dist,
-        )
+    hit_points = raytrace_utils.closest_intersect_many(
+        [origin_point for _, _, origin_point, _ in rays],
+        [direction for _, _, _, direction in rays],
+        meshes,
+        test_both_directions=False,
+        max_dist=max_dist,
+    )
+
+    bnd_nodes = []
+    for (node, bnd, _, _), hit_point in zip(rays, hit_points):
         if hit_point is None:
             LOG.warning('%s didn\'t hit the mesh.' % node)
             continue
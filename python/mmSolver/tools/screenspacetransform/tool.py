@@ -71,6 +71,7 @@ def main():
     times = range(start_frame, end_frame+1)
 
     created_loc_tfms = []
+    curve_data = []
     for node in nodes:
         grp_node, depth_tfm, loc_tfm, loc_shp = lib.create_screen_space_locator(cam)
         created_loc_tfms.append(loc_tfm)
@@ -85,26 +86,13 @@ def main():
         stop = len(values)
         step = 3
 
-        plug = loc_tfm + '.translateX'
-        values_x = values[0:stop:step]
-        animfn_x = anim_utils.create_anim_curve_node_apione(
-            times, values_x,
-            node_attr=plug
-        )
-
-        plug = loc_tfm + '.translateY'
-        values_y = values[1:stop:step]
-        animfn_y = anim_utils.create_anim_curve_node_apione(
-            times, values_y,
-            node_attr=plug
-        )
-
-        plug = depth_tfm + '.scaleX'
-        values_z = values[2:stop:step]
-        animfn_z = anim_utils.create_anim_curve_node_apione(
-            times, values_z,
-            node_attr=plug
-        )
+        curve_data += [
+            (loc_tfm + '.translateX', times, values[0:stop:step], None),
+            (loc_tfm + '.translateY', times, values[1:stop:step], None),
+            (depth_tfm + '.scaleX', times, values[2:stop:step], None),
+        ]
+    if len(curve_data) > 0:
+        anim_utils.create_anim_curve_nodes_apione(curve_data)
 
     if len(created_loc_tfms) > 0:
         maya.cmds.select(created_loc_tfms, replace=True)
@@ -648,19 +648,14 @@ def execute_collection(col,
         status_fn=info_fn
     )
 
-    # Calculate marker deviation, and set it on the marker.
+    # Calculate marker deviation, and set it on the markers and
+    # collection.
     s = time.time()
     mkr_nodes = mmapi.merge_marker_node_list(solres_list)
     mkr_list = [mmapi.Marker(node=n) for n in mkr_nodes]
-    mmapi.update_deviation_on_markers(mkr_list, solres_list)
+    mmapi.update_deviation(col, mkr_list, solres_list)
     e = time.time()
-    LOG.debug('Update Deviation on Markers; time=%r', e - s)
-
-    # Set keyframe data on the collection for the solver
-    s = time.time()
-    mmapi.update_deviation_on_collection(col, solres_list)
-    e = time.time()
-    LOG.debug('Update Deviation on collection; time=%r', e - s)
+    LOG.debug('Update Deviation on Markers and collection; time=%r', e - s)
     return
 
 
@@ -36,8 +36,8 @@ def ensure_attr_exists(node, attr_name,
     """
     Ensure an attribute exists on the given node, or we create it.
     """
-    attrs = maya.cmds.listAttr(node)
-    if attr_name in attrs:
+    exists = maya.cmds.attributeQuery(attr_name, node=node, exists=True)
+    if exists is True:
         return
     node_attr = node + '.' + attr_name
     numeric_attr_types = [
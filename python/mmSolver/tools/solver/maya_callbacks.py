@@ -380,6 +380,7 @@ def attribute_changed_func(callback_msg, plugA, plugB, clientData):
             or callback_msg & OpenMaya.MNodeMessage.kAttributeUnkeyable
             or callback_msg & OpenMaya.MNodeMessage.kAttributeRemoved
             or callback_msg & OpenMaya.MNodeMessage.kAttributeRenamed):
+        mmapi.invalidate_collection_compile_cache()
         update_func()
     return
 
@@ -413,6 +414,7 @@ def attribute_connection_changed_func(callback_msg, plugA, plugB, clientData):
     if (callback_msg & OpenMaya.MNodeMessage.kConnectionMade
         or callback_msg & OpenMaya.MNodeMessage.kConnectionBroken
         or callback_msg & OpenMaya.MNodeMessage.kAttributeRemoved):
+        mmapi.invalidate_collection_compile_cache()
         update_func()
     return
 
@@ -436,6 +438,7 @@ def node_name_changed_func(node, prevName, clientData):
     """
     node_uuid = clientData[0]
     update_func = clientData[1]
+    mmapi.invalidate_collection_compile_cache()
     update_func()
     return
 
@@ -453,6 +456,7 @@ def node_deleted_func(clientData):
     """
     node_uuid = clientData[0]
     update_func = clientData[1]
+    mmapi.invalidate_collection_compile_cache()
     update_func()
     return
 
@@ -461,6 +465,7 @@ def membership_change_func(node_obj, clientData):
     node_uuid = clientData[0]
     LOG.warning('membership_changed: %r', node_uuid)
     update_func = clientData[1]
+    mmapi.invalidate_collection_compile_cache()
     update_func()
     return
 
@@ -19,8 +19,9 @@
 Position Bundle under the Marker.
 """
 
+import array
+
 import maya.cmds
-import maya.OpenMaya as OpenMaya
 
 import mmSolver.logger
 import mmSolver.utils.lineintersect as tri_utils
@@ -50,78 +51,101 @@ def get_marker_frame_list(mkr_node):
     return frm_list
 
 
-def triangulate_bundle(bnd, relock=None):
+def triangulate_bundles(bnd_list, relock=None):
     """
-    Triangulate a 3D bundle position.
+    Triangulate many 3D bundle positions.
 
-    :param bnd: Bundle to be triangulated.
-    :type bnd: Bundle
+    The camera rays of all markers are queried together, then each
+    bundle is placed at the point closest to the rays of the first and
+    last enabled frame of all of the bundle's markers.
+
+    :param bnd_list: Bundles to be triangulated.
+    :type bnd_list: [Bundle, ..]
 
     :param relock: If True any bundle translate attributes will be
                    unlocked, changed then relocked.
     :type relock: bool
+
+    :returns: The Bundle nodes that were triangulated.
+    :rtype: [str, ..]
     """
     if relock is None:
         relock = False
     assert isinstance(relock, bool) is True
 
-    prev_frame = maya.cmds.currentTime(query=True)
-    try:
-        mkr_list = bnd.get_marker_list()
-        for mkr in mkr_list:
+    cam_mkr_frm_list = []
+    bnd_ray_indices = []
+    for bnd in bnd_list:
+        indices = []
+        for mkr in bnd.get_marker_list():
             mkr_node = mkr.get_node()
             frm_list = get_marker_frame_list(mkr_node)
             if len(frm_list) == 0:
                 continue
-
-            bnd_node = bnd.get_node()
             cam = mkr.get_camera()
             cam_tfm = cam.get_transform_node()
-
-            first_frm = frm_list[0]
-            last_frm = frm_list[-1]
-            first_pnt, first_dir = tri_utils.get_point_and_direction(
-                cam_tfm,
-                mkr_node,
-                first_frm
-            )
-            last_pnt, last_dir = tri_utils.get_point_and_direction(
-                cam_tfm,
-                mkr_node,
-                last_frm
-            )
-
-            a_pnt, b_pnt = tri_utils.calculate_approx_intersection_point_between_two_3d_lines(
-                first_pnt, first_dir,
-                last_pnt, last_dir
-            )
-            pnt = OpenMaya.MPoint(
-                (a_pnt.x + b_pnt.x) * 0.5,
-                (a_pnt.y + b_pnt.y) * 0.5,
-                (a_pnt.z + b_pnt.z) * 0.5
-            )
-
-            plugs = [
-                '%s.translateX' % bnd_node,
-                '%s.translateY' % bnd_node,
-                '%s.translateZ' % bnd_node
-            ]
-            lock_state = {}
+            frames = [frm_list[0], frm_list[-1]]
+            indices.append(len(cam_mkr_frm_list))
+            cam_mkr_frm_list.append((cam_tfm, mkr_node, frames))
+        if len(indices) > 0:
+            bnd_ray_indices.append((bnd.get_node(), indices))
+    if len(bnd_ray_indices) == 0:
+        return []
+
+    rays = tri_utils.get_camera_rays(cam_mkr_frm_list)
+    origins_list = []
+    directions_list = []
+    for _, indices in bnd_ray_indices:
+        origins = array.array('d')
+        directions = array.array('d')
+        for i in indices:
+            origins.extend(rays[i][0])
+            directions.extend(rays[i][1])
+        origins_list.append(origins)
+        directions_list.append(directions)
+    pnt_list = tri_utils.calculate_least_squares_intersection_points(
+        origins_list, directions_list)
+
+    adjusted_bnd_nodes = []
+    for (bnd_node, _), pnt in zip(bnd_ray_indices, pnt_list):
+        if pnt is None:
+            LOG.warning('Bundle could not be triangulated: %r', bnd_node)
+            continue
+        plugs = [
+            '%s.translateX' % bnd_node,
+            '%s.translateY' % bnd_node,
+            '%s.translateZ' % bnd_node
+        ]
+        lock_state = {}
+        for plug in plugs:
+            value = maya.cmds.getAttr(plug, lock=True)
+            lock_state[plug] = value
+            maya.cmds.setAttr(plug, lock=False)
+
+        maya.cmds.xform(
+            bnd_node,
+            translation=pnt,
+            worldSpace=True
+        )
+
+        if relock is True:
             for plug in plugs:
-                value = maya.cmds.getAttr(plug, lock=True)
-                lock_state[plug] = value
-                maya.cmds.setAttr(plug, lock=False)
-
-            maya.cmds.xform(
-                bnd_node,
-                translation=(pnt.x, pnt.y, pnt.z),
-                worldSpace=True
-            )
-
-            if relock is True:
-                for plug in plugs:
-                    value = lock_state.get(plug)
-                    maya.cmds.setAttr(plug, lock=value)
-    finally:
-        maya.cmds.currentTime(prev_frame, update=False)
+                value = lock_state.get(plug)
+                maya.cmds.setAttr(plug, lock=value)
+        adjusted_bnd_nodes.append(bnd_node)
+    return adjusted_bnd_nodes
+
+
+def triangulate_bundle(bnd, relock=None):
+    """
+    Triangulate a 3D bundle position.
+
+    :param bnd: Bundle to be triangulated.
+    :type bnd: Bundle
+
+    :param relock: If True any bundle translate attributes will be
+                   unlocked, changed then relocked.
+    :type relock: bool
+    """
+    triangulate_bundles([bnd], relock=relock)
     return
@@ -32,6 +32,32 @@ def _bit_length(x):
 	s = s.lstrip('-0b') # remove leading zeros and minus sign
 	return len(s)	    # len('100101') --> 6
 
+
+# Plans (twiddle factors, permutations and chirps) are cached by length,
+# so repeated transforms of the same length do not redo set-up work.
+_RADIX2_PLAN_CACHE = {}
+_BLUESTEIN_PLAN_CACHE = {}
+_REAL_PLAN_CACHE = {}
+
+
+# 
+# Removes all cached transform plans.
+# 
+def clear_plan_cache():
+	_RADIX2_PLAN_CACHE.clear()
+	_BLUESTEIN_PLAN_CACHE.clear()
+	_REAL_PLAN_CACHE.clear()
+
+
+# 
+# Returns the smallest power of 2 that is greater than or equal to 'n'.
+# 
+def next_power_of_two(n):
+	if n <= 1:
+		return 1
+	return 2**(_bit_length(n - 1))
+
+
 # 
 # Computes the discrete Fourier transform (DFT) or inverse transform of the given complex vector, returning the result as a new vector.
 # The vector can have any length. This is a wrapper function. The inverse transform does not perform scaling, so it is not a true inverse.
@@ -49,10 +75,14 @@ def transform(vector, inverse):
 
 
 # 
-# Computes the discrete Fourier transform (DFT) of the given complex vector, returning the result as a new vector.
-# The vector's length must be a power of 2. Uses the Cooley-Tukey decimation-in-time radix-2 algorithm.
+# Returns the cached bit-reversed permutation and trigonometric table for a radix-2 transform of length n.
 # 
-def transform_radix2(vector, inverse):
+def _get_radix2_plan(n, inverse):
+	key = (n, inverse)
+	plan = _RADIX2_PLAN_CACHE.get(key)
+	if plan is not None:
+		return plan
+	
 	# Returns the integer whose value is the reverse of the lowest 'bits' bits of the integer 'x'.
 	def reverse(x, bits):
 		y = 0
@@ -61,15 +91,27 @@ def transform_radix2(vector, inverse):
 			x >>= 1
 		return y
 	
-	# Initialization
-	n = len(vector)
 	levels = _bit_length(n) - 1
 	if 2**levels != n:
 		raise ValueError("Length is not a power of 2")
 	# Now, levels = log2(n)
 	coef = (2j if inverse else -2j) * cmath.pi / n
 	exptable = [cmath.exp(i * coef) for i in range(n // 2)]
-	vector = [vector[reverse(i, levels)] for i in range(n)]  # Copy with bit-reversed permutation
+	permutation = [reverse(i, levels) for i in range(n)]
+	plan = (permutation, exptable)
+	_RADIX2_PLAN_CACHE[key] = plan
+	return plan
+
+
+# 
+# Computes the discrete Fourier transform (DFT) of the given complex vector, returning the result as a new vector.
+# The vector's length must be a power of 2. Uses the Cooley-Tukey decimation-in-time radix-2 algorithm.
+# 
+def transform_radix2(vector, inverse):
+	# Initialization
+	n = len(vector)
+	permutation, exptable = _get_radix2_plan(n, inverse)
+	vector = [vector[i] for i in permutation]  # Copy with bit-reversed permutation
 	
 	# Radix-2 decimation-in-time FFT
 	size = 2
@@ -87,25 +129,114 @@ def transform_radix2(vector, inverse):
 	return vector
 
 
+# 
+# Returns the cached convolution length, chirp table and transformed chirp for a Bluestein transform of length n.
+# 
+def _get_bluestein_plan(n, inverse):
+	key = (n, inverse)
+	plan = _BLUESTEIN_PLAN_CACHE.get(key)
+	if plan is not None:
+		return plan
+	
+	# Find a power-of-2 convolution length m such that m >= n * 2 + 1
+	m = 2**(_bit_length(n * 2))
+	coef = (1j if inverse else -1j) * cmath.pi / n
+	exptable = [cmath.exp((i * i % (n * 2)) * coef) for i in range(n)]  # Trigonometric table
+	b = exptable[ : n] + [0] * (m - (n * 2 - 1)) + exptable[ : 0 : -1]
+	b = [x.conjugate() for x in b]
+	plan = (m, exptable, transform_radix2(b, False))
+	_BLUESTEIN_PLAN_CACHE[key] = plan
+	return plan
+
+
 # 
 # Computes the discrete Fourier transform (DFT) of the given complex vector, returning the result as a new vector.
 # The vector can have any length. This requires the convolution function, which in turn requires the radix-2 FFT function.
 # Uses Bluestein's chirp z-transform algorithm.
 # 
 def transform_bluestein(vector, inverse):
-	# Find a power-of-2 convolution length m such that m >= n * 2 + 1
 	n = len(vector)
 	if n == 0:
 		return []
-	m = 2**(_bit_length(n * 2))
-	
-	coef = (1j if inverse else -1j) * cmath.pi / n
-	exptable = [cmath.exp((i * i % (n * 2)) * coef) for i in range(n)]  # Trigonometric table
+	m, exptable, b = _get_bluestein_plan(n, inverse)
 	a = [(x * y) for (x, y) in zip(vector, exptable)] + [0] * (m - n)  # Temporary vectors and preprocessing
-	b = exptable[ : n] + [0] * (m - (n * 2 - 1)) + exptable[ : 0 : -1]
-	b = [x.conjugate() for x in b]
-	c = convolve(a, b, False)[ : n]  # Convolution
-	return [(x * y) for (x, y) in zip(c, exptable)]  # Postprocessing
+	
+	# Convolution, re-using the transformed chirp
+	a = transform_radix2(a, False)
+	for i in range(m):
+		a[i] *= b[i]
+	c = transform_radix2(a, True)[ : n]
+	return [(x * y / m) for (x, y) in zip(c, exptable)]  # Postprocessing
+
+
+# 
+# Returns the cached twiddle factors used to split a complex transform of length n // 2 into a real transform of length n.
+# 
+def _get_real_plan(n):
+	plan = _REAL_PLAN_CACHE.get(n)
+	if plan is not None:
+		return plan
+	coef = -2j * cmath.pi / n
+	plan = [cmath.exp(k * coef) for k in range(n // 2 + 1)]
+	_REAL_PLAN_CACHE[n] = plan
+	return plan
+
+
+# 
+# Computes the discrete Fourier transform (DFT) of the given real vector, returning the non-negative frequencies as a new vector of length n // 2 + 1.
+# The other frequencies are the complex conjugates of these. Even lengths are computed with a complex transform of half the length.
+# 
+def transform_real(vector):
+	n = len(vector)
+	if n == 0:
+		return []
+	if n % 2 == 1 or n == 2:
+		return transform(vector, False)[ : n // 2 + 1]
+	
+	# Pack the even and odd values into one complex vector of half the length
+	half = n // 2
+	z = [complex(vector[2 * i], vector[2 * i + 1]) for i in range(half)]
+	z = transform(z, False)
+	z.append(z[0])
+	twiddle = _get_real_plan(n)
+	result = [0j] * (half + 1)
+	for k in range(half + 1):
+		a = z[k]
+		b = z[half - k].conjugate()
+		even = (a + b) * 0.5
+		odd = (a - b) * -0.5j
+		result[k] = even + twiddle[k] * odd
+	return result
+
+
+# 
+# Computes the inverse of transform_real(), returning a real vector of length n.
+# Like transform(), the inverse does not perform scaling, so the result is n times the original vector.
+# 
+def inverse_transform_real(spectrum, n):
+	if n == 0:
+		return []
+	if n % 2 == 1 or n == 2:
+		full = list(spectrum[ : n // 2 + 1])
+		full += [x.conjugate() for x in spectrum[(n + 1) // 2 - 1 : 0 : -1]]
+		return [x.real for x in transform(full, True)]
+	
+	# Recombine into a complex vector of half the length
+	half = n // 2
+	twiddle = _get_real_plan(n)
+	z = [0j] * half
+	for k in range(half):
+		a = spectrum[k]
+		b = spectrum[half - k].conjugate()
+		even = a + b
+		odd = (a - b) * twiddle[k].conjugate()
+		z[k] = even + 1j * odd
+	z = transform(z, True)
+	result = [0.0] * n
+	for i in range(half):
+		result[2 * i] = z[i].real
+		result[2 * i + 1] = z[i].imag
+	return result
 
 
 # 
@@ -127,3 +258,30 @@ def convolve(x, y, realoutput=True):
 		return [(val.real / n) for val in x]
 	else:
 		return [(val / n) for val in x]
+
+
+# 
+# Computes the linear ('full') convolution of each of the given real signals with one real window, returning a list of new vectors of length len(signal) + len(window) - 1.
+# The signals must all have the same length. The signals are zero padded to a power of 2 length and the window is transformed only once.
+# 
+def convolve_many(signals, window):
+	if len(signals) == 0:
+		return []
+	m = len(signals[0])
+	if any(len(signal) != m for signal in signals):
+		raise ValueError("Signals must have the same length")
+	size = m + len(window) - 1
+	if m == 0 or len(window) == 0:
+		return [[] for signal in signals]
+	n = next_power_of_two(size)
+	
+	w = transform_real(list(window) + [0.0] * (n - len(window)))
+	scale = 1.0 / n
+	result = []
+	for signal in signals:
+		x = transform_real(list(signal) + [0.0] * (n - m))
+		for i in range(len(x)):
+			x[i] *= w[i]
+		x = inverse_transform_real(x, n)
+		result.append([(val * scale) for val in x[ : size]])
+	return result
@@ -31,8 +31,6 @@ import maya.cmds
 import maya.OpenMaya as OpenMaya1
 import maya.OpenMayaAnim as OpenMayaAnim1
 
-import mmSolver.utils.node as node_utils
-
 
 def create_anim_curve_node_apione(times, values,
                                   node_attr=None,
@@ -43,6 +41,9 @@ def create_anim_curve_node_apione(times, values,
     """
     Create an animCurve using Maya API (one).
 
+    To create many animCurves, use
+    :py:func:`create_anim_curve_nodes_apione`.
+
     :param times: Time values for the animCurve
     :type times: list
 
@@ -79,43 +80,326 @@ def create_anim_curve_node_apione(times, values,
     if len(times) != len(values):
         raise ValueError('Number of times and values does not match.')
 
-    # create anim curve
-    animfn = OpenMayaAnim1.MFnAnimCurve()
-    if node_attr is None:
-        animCurve = animfn.create(anim_type)
-    else:
-        # Get the plug to be animated.
-        dst_plug = node_utils.get_as_plug(node_attr)
-
-        objs = OpenMaya1.MObjectArray()
-        find = OpenMayaAnim1.MAnimUtil.findAnimation(dst_plug, objs)
-        if find is True and objs.length() > 0:
-            animfn = OpenMayaAnim1.MFnAnimCurve(objs[0])
-        else:
-            animfn = OpenMayaAnim1.MFnAnimCurve()
-            animfn.create(dst_plug)
-
-    # Copy the times into an MTimeArray and the values into an MDoubleArray.
-    time_array = OpenMaya1.MTimeArray()
-    value_array = OpenMaya1.MDoubleArray()
-    for time, value in zip(times, values):
-        time_array.append(OpenMaya1.MTime(time, OpenMaya1.MTime.uiUnit()))
-        value_array.append(value)
-
-    # force a default undo cache
-    if not undo_cache:
-        undo_cache = OpenMayaAnim1.MAnimCurveChange()
-
-    # Add the keys to the animCurve.
-    animfn.addKeys(
-        time_array,
-        value_array,
-        tangent_in_type,
-        tangent_out_type,
-        False,  # overwrite any keys that get in our way
-        undo_cache
-    )
-    return animfn
+    # The type of curves connected to a plug is chosen by the plug.
+    if node_attr is not None:
+        anim_type = None
+    animfn_list = create_anim_curve_nodes_apione(
+        [(node_attr, times, values, anim_type)],
+        tangent_in_type=tangent_in_type,
+        tangent_out_type=tangent_out_type,
+        undo_cache=undo_cache)
+    return animfn_list[0]
+
+
+def _get_plugs_apione(node_attrs):
+    """
+    Get MPlug objects for many 'node.attr' paths, with a single
+    selection list.
+
+    :param node_attrs: Node attribute strings in format 'node.attr'.
+    :type node_attrs: [str or None, ..]
+
+    :returns: MPlug object for each path, or None if the path is None
+              or is not a valid plug.
+    :rtype: [maya.OpenMaya.MPlug or None, ..]
+    """
+    sel_list = OpenMaya1.MSelectionList()
+    indices = []
+    for node_attr in node_attrs:
+        index = None
+        if node_attr is not None:
+            try:
+                sel_list.add(node_attr)
+                index = sel_list.length() - 1
+            except RuntimeError:
+                pass
+        indices.append(index)
+
+    plugs = []
+    for index in indices:
+        plug = None
+        if index is not None:
+            try:
+                plug = OpenMaya1.MPlug()
+                sel_list.getPlug(index, plug)
+            except RuntimeError:
+                plug = None
+        plugs.append(plug)
+    return plugs
+
+
+def create_anim_curve_nodes_apione(curve_data,
+                                   tangent_in_type=OpenMayaAnim1.MFnAnimCurve.kTangentGlobal,
+                                   tangent_out_type=OpenMayaAnim1.MFnAnimCurve.kTangentGlobal,
+                                   undo_cache=None,
+                                   dg_modifier=None,
+                                   undo_new_curves=True):
+    """
+    Create (or re-use) many animCurves and set keys, using Maya API
+    (one).
+
+    All plugs are found with one selection list and all new animCurves
+    are created with one MDGModifier. The keys of each animCurve are
+    added with a single call.
+
+    Existing animCurves connected to a plug are re-used. If an existing
+    animCurve already has keys at exactly the times given, only the
+    key values are changed, otherwise the keys are added (replacing
+    existing keys in the time range). Locked plugs are unlocked while
+    the keys are set, then locked again.
+
+    .. note:: The changes are not recorded in Maya's undo queue. To undo
+        the changes, the caller must keep the 'dg_modifier' and
+        'undo_cache' and undo them (for example, in an MPxCommand).
+        Use :py:func:`set_anim_curves_keys` for undoable keyframes.
+
+    :param curve_data: The 'plug' to set keys on (or None to create an
+                       unconnected animCurve), the times and values of
+                       the keys, and the type of animCurve to create
+                       (or None to use the default type for the plug).
+    :type curve_data: [(str or None, [float, ..], [float, ..],
+                        maya.OpenMayaAnim.MFnAnimCurve.kAnimCurve* or None), ..]
+
+    :param tangent_in_type: The "in" tangent type for keyframes.
+    :type tangent_in_type: maya.OpenMayaAnim.MFnAnimCurve.kTangent*
+
+    :param tangent_out_type: The "out" tangent type for keyframes.
+    :type tangent_out_type: maya.OpenMayaAnim.MFnAnimCurve.kTangent*
+
+    :param undo_cache: The Maya AnimCurve Undo Cache data structure to
+                       record key changes in, or None if no undo is
+                       required.
+    :type undo_cache: maya.OpenMayaAnim.MAnimCurveChange or None
+
+    :param dg_modifier: The modifier used to create new animCurves, or
+                        None to use a new modifier.
+    :type dg_modifier: maya.OpenMaya.MDGModifier
+
+    :param undo_new_curves: Record the keys added to newly created
+                            animCurves in the 'undo_cache'? Newly
+                            created animCurves are removed by undoing
+                            the 'dg_modifier', so recording the keys
+                            is not needed. Only used when 'undo_cache'
+                            is given.
+    :type undo_new_curves: bool
+
+    :return: MFnAnimCurve objects for each entry given, in the same order.
+    :rtype: [maya.OpenMayaAnim.MFnAnimCurve, ..]
+    """
+    if dg_modifier is None:
+        dg_modifier = OpenMaya1.MDGModifier()
+    unit = OpenMaya1.MTime.uiUnit()
+
+    for node_attr, times, values, anim_type in curve_data:
+        if len(times) == 0:
+            raise ValueError('times must have 1 or more values.')
+        if len(times) != len(values):
+            raise ValueError('Number of times and values does not match.')
+    node_attrs = [d[0] for d in curve_data]
+    plugs = _get_plugs_apione(node_attrs)
+
+    locked_plugs = []
+    animfn_list = []
+    new_list = []
+    try:
+        for (node_attr, _, _, anim_type), dst_plug in zip(curve_data, plugs):
+            if node_attr is None:
+                animfn = OpenMayaAnim1.MFnAnimCurve()
+                if anim_type is None:
+                    anim_type = OpenMayaAnim1.MFnAnimCurve.kAnimCurveTL
+                animfn.create(anim_type, dg_modifier)
+                animfn_list.append(animfn)
+                new_list.append(True)
+                continue
+            if dst_plug is None:
+                raise ValueError('Plug does not exist: %r' % node_attr)
+            if dst_plug.isLocked() is True:
+                dst_plug.setLocked(False)
+                locked_plugs.append(dst_plug)
+
+            objs = OpenMaya1.MObjectArray()
+            find = OpenMayaAnim1.MAnimUtil.findAnimation(dst_plug, objs)
+            if find is True and objs.length() > 0:
+                animfn = OpenMayaAnim1.MFnAnimCurve(objs[0])
+                new_list.append(False)
+            else:
+                animfn = OpenMayaAnim1.MFnAnimCurve()
+                if anim_type is None:
+                    animfn.create(dst_plug, dg_modifier)
+                else:
+                    animfn.create(dst_plug, anim_type, dg_modifier)
+                new_list.append(True)
+            animfn_list.append(animfn)
+        dg_modifier.doIt()
+
+        loop_iter = zip(animfn_list, new_list, curve_data)
+        for animfn, is_new, (_, times, values, _) in loop_iter:
+            change = undo_cache
+            if is_new is True and undo_new_curves is False:
+                change = None
+            if is_new is False:
+                num_keys = animfn.numKeys()
+                key_times = [animfn.time(i).asUnits(unit)
+                             for i in range(num_keys)]
+                if key_times == [float(t) for t in times]:
+                    for i, value in enumerate(values):
+                        animfn.setValue(i, value, change)
+                    continue
+
+            time_array = OpenMaya1.MTimeArray()
+            value_array = OpenMaya1.MDoubleArray()
+            for time, value in zip(times, values):
+                time_array.append(OpenMaya1.MTime(time, unit))
+                value_array.append(value)
+            animfn.addKeys(
+                time_array,
+                value_array,
+                tangent_in_type,
+                tangent_out_type,
+                False,  # overwrite any keys that get in our way
+                change
+            )
+    finally:
+        for plug in locked_plugs:
+            plug.setLocked(True)
+    return animfn_list
+
+
+def set_anim_curves_keys_apione(curve_data,
+                                tangent_in_type=OpenMayaAnim1.MFnAnimCurve.kTangentGlobal,
+                                tangent_out_type=OpenMayaAnim1.MFnAnimCurve.kTangentGlobal,
+                                anim_type=OpenMayaAnim1.MFnAnimCurve.kAnimCurveTL,
+                                undo_cache=None,
+                                dg_modifier=None):
+    """
+    Set keyframes on many plugs at once, using Maya API (one).
+
+    All the animCurves have the same type. See
+    :py:func:`create_anim_curve_nodes_apione` for details.
+
+    :param curve_data: The 'plug' to set keys on, with the times and
+                       values of the keys.
+    :type curve_data: [(str, [float, ..], [float, ..]), ..]
+
+    :param tangent_in_type: The "in" tangent type for keyframes.
+    :type tangent_in_type: maya.OpenMayaAnim.MFnAnimCurve.kTangent*
+
+    :param tangent_out_type: The "out" tangent type for keyframes.
+    :type tangent_out_type: maya.OpenMayaAnim.MFnAnimCurve.kTangent*
+
+    :param anim_type: The type of animation curve node to create.
+    :type anim_type: maya.OpenMayaAnim.MFnAnimCurve.kAnimCurve*
+
+    :param undo_cache: The Maya AnimCurve Undo Cache data structure or
+                       None if no undo is required.
+    :type undo_cache: maya.OpenMayaAnim.MAnimCurveChange
+
+    :param dg_modifier: The modifier used to create new animCurves, or
+                        None to use a new modifier.
+    :type dg_modifier: maya.OpenMaya.MDGModifier
+
+    :return: MFnAnimCurve objects for each plug given, in the same order.
+    :rtype: [maya.OpenMayaAnim.MFnAnimCurve, ..]
+    """
+    for node_attr, times, values in curve_data:
+        if node_attr is None:
+            raise ValueError('Plug must be given.')
+    curve_data = [(node_attr, times, values, anim_type)
+                  for node_attr, times, values in curve_data]
+    return create_anim_curve_nodes_apione(
+        curve_data,
+        tangent_in_type=tangent_in_type,
+        tangent_out_type=tangent_out_type,
+        undo_cache=undo_cache,
+        dg_modifier=dg_modifier)
+
+
+def _get_anim_curve_node(node_attr):
+    """
+    Get the animCurve node directly connected to a plug, or None.
+    """
+    anim_curves = maya.cmds.listConnections(
+        node_attr,
+        source=True,
+        destination=False,
+        type='animCurve') or []
+    if len(anim_curves) == 0:
+        return None
+    return anim_curves[0]
+
+
+def set_anim_curves_keys(curve_data):
+    """
+    Set keyframes on many plugs, using undoable Maya commands.
+
+    Unlike the Maya API (one) functions, the keys set by this function
+    are recorded in Maya's undo queue.
+
+    The number of commands run for each plug does not depend on the
+    number of keys; missing keys are created with one
+    'maya.cmds.setKeyframe' call, then all the key values of the
+    animCurve are set with one 'maya.cmds.setAttr' call on the
+    animCurve 'keyTimeValue' attribute. Existing key tangents are not
+    changed.
+
+    :param curve_data: The 'plug' to set keys on, with the times and
+                       values of the keys. Values are in UI units, the
+                       same as 'maya.cmds.setKeyframe'.
+    :type curve_data: [(str, [float, ..], [float, ..]), ..]
+
+    :rtype: None
+    """
+    for node_attr, times, values in curve_data:
+        if len(times) != len(values):
+            raise ValueError('Number of times and values does not match.')
+        if len(times) == 0:
+            continue
+        node, attr = node_attr.split('.', 1)
+
+        # Create the missing keys, and the animCurve if needed.
+        key_times = []
+        anim_curve = _get_anim_curve_node(node_attr)
+        if anim_curve is not None:
+            key_times = maya.cmds.keyframe(
+                anim_curve, query=True, timeChange=True) or []
+        new_times = set([float(t) for t in times]) - set(key_times)
+        if len(new_times) > 0:
+            maya.cmds.setKeyframe(
+                node,
+                attribute=attr,
+                time=[(t, t) for t in sorted(new_times)])
+            anim_curve = _get_anim_curve_node(node_attr)
+
+        if anim_curve is None:
+            # The plug is not driven directly by an animCurve.
+            for t, v in zip(times, values):
+                maya.cmds.setKeyframe(node, attribute=attr, time=t, value=v)
+            continue
+
+        # Set all the key values at once.
+        key_times = maya.cmds.keyframe(
+            anim_curve, query=True, timeChange=True) or []
+        key_values = maya.cmds.keyframe(
+            anim_curve, query=True, valueChange=True) or []
+        key_index = dict((t, i) for i, t in enumerate(key_times))
+        missing_keys = []
+        for t, v in zip(times, values):
+            index = key_index.get(float(t))
+            if index is None:
+                missing_keys.append((t, v))
+                continue
+            key_values[index] = v
+        time_values = []
+        for t, v in zip(key_times, key_values):
+            time_values += [t, v]
+        plug_range = '{0}.keyTimeValue[0:{1}]'.format(
+            anim_curve, len(key_times) - 1)
+        maya.cmds.setAttr(plug_range, *time_values)
+
+        # Keys that could not be matched to a key time.
+        for t, v in missing_keys:
+            maya.cmds.setKeyframe(node, attribute=attr, time=t, value=v)
+    return
 
 
 def create_anim_curve_node(*args, **kwargs):
@@ -171,3 +455,33 @@ def euler_filter_value(prev_value, value):
     elif value_diff < -180.0:
         value = euler_filter_value(prev_value, value + 360.0)
     return value
+
+
+def euler_filter_values(values, prev_value=None):
+    """
+    Perform a 'Euler Filter' along a sequence of rotation values.
+
+    Each value is filtered against the previous (filtered) value, as
+    :py:func:`euler_filter_value` does, but without recursion.
+
+    :param values: The rotation values of a single axis, in time
+                   order.
+    :type values: [float, ..]
+
+    :param prev_value: The rotation value before the first value, or
+                       None to leave the first value unchanged.
+    :type prev_value: float or None
+
+    :returns: New filtered rotation values.
+    :rtype: [float, ..]
+    """
+    new_values = [0.0] * len(values)
+    for i, value in enumerate(values):
+        if prev_value is not None:
+            while value - prev_value > 180.0:
+                value -= 360.0
+            while value - prev_value < -180.0:
+                value += 360.0
+        new_values[i] = value
+        prev_value = value
+    return new_values
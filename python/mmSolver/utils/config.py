@@ -36,6 +36,12 @@ By default the following paths are searched (in order, top-down):
 This allows both a default fallback, and a user specified path.
 Additionally, studios may modify the '.mod' file to provide an
 intermediate studio or project location.
+
+Configuration files read by the Config class are cached for the
+whole process, by resolved file path. Before a cached file is used,
+the file modification time and size are compared, and the file is
+only read again if it has changed. Data returned from the cache is
+shared, and must not be modified.
 """
 
 import collections
@@ -48,6 +54,12 @@ import mmSolver.utils.constant as const
 
 LOG = mmSolver.logger.get_logger()
 
+# Cached config file data; {resolved path: (mtime, size, data)}.
+__CACHE = dict()
+
+# Keys split into a hierarchy of names; {key: (str, ..)}.
+__KEY_CACHE = dict()
+
 
 def get_dirs(envvar):
     """
@@ -74,13 +86,48 @@ def _split_key(key):
     """
     Split a key into separate name hierarchy, with a '/' character.
 
-    :rtype: [str, ..]
+    Each key is split once, and then looked up from a cache.
+
+    :rtype: (str, ..)
     """
-    args = key.split('/')
-    args = [k for k in args if len(k) > 0]
+    args = __KEY_CACHE.get(key)
+    if args is None:
+        args = tuple(k for k in key.split('/') if len(k) > 0)
+        __KEY_CACHE[key] = args
     return args
 
 
+def _get_file_stamp(file_path):
+    """
+    Get the values used to detect if a file has changed.
+
+    :returns: The file modification time and size, or None if the file
+              cannot be queried.
+    :rtype: (float, int) or None
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_mtime, stat.st_size
+
+
+def clear_cache(file_path=None):
+    """
+    Remove config file data from the cache.
+
+    :param file_path: The file path to remove, or None to remove all
+                      files.
+    :type file_path: str or None
+    """
+    global __CACHE
+    if file_path is None:
+        __CACHE = dict()
+    else:
+        __CACHE.pop(os.path.realpath(file_path), None)
+    return
+
+
 def find_path(file_name, search_paths):
     """
     Search though a list of defined paths for the config file name given.
@@ -127,6 +174,33 @@ def read_data(file_path):
     return data
 
 
+def read_data_cached(file_path):
+    """
+    Read configuration file data, using a cache when the file has not
+    changed.
+
+    .. note:: The data returned is shared with all callers and must not
+        be modified. Use :py:func:`set_value` to create a modified copy.
+
+    :param file_path: The absolute file path to a config file.
+    :type file_path: str
+
+    :return: Dictionary, list or None, depending what the given file
+             contains.
+    :rtype: dict, list or None
+    """
+    path = os.path.realpath(file_path)
+    stamp = _get_file_stamp(path)
+    if stamp is not None:
+        value = __CACHE.get(path)
+        if value is not None and value[0] == stamp:
+            return value[1]
+    data = read_data(path)
+    if stamp is not None:
+        __CACHE[path] = (stamp, data)
+    return data
+
+
 def write_data(data, file_path, human_readable=True):
     """
     Write the given configuration data to a file.
@@ -154,6 +228,9 @@ def write_data(data, file_path, human_readable=True):
     text = json.dumps(data, **kwargs)
     with open(file_path, 'wb') as f:
         f.write(text)
+    # The file time may not change if written more than once per
+    # second, so the cache must not be trusted.
+    clear_cache(file_path)
     return
 
 
@@ -211,19 +288,39 @@ def get_value(data, key, default_value=None):
     :return:
     :rtype
     """
-    if exists(data, key) is False:
-        return default_value
-
-    key_list = _split_key(key)
     d = data
-    for i, k in enumerate(key_list):
+    for k in _split_key(key):
         if k not in d:
-            break
-        else:
-            d = d[k]
+            return default_value
+        d = d[k]
     return d
 
 
+def get_values(data, keys, default_value=None):
+    """
+    Get many values from the config data.
+
+    >>> data = read_data('/path/to/config.json')
+    >>> x, y = get_values(data, ['key', 'key/subkey'])
+
+    :param data: The configuration data, as a Python dict (plain-old-data).
+    :type data: dict
+
+    :param keys: Keys to get, each a hierarchy of keys separated by
+                 forward slash.
+    :type keys: [str, ..]
+
+    :param default_value: The value returned for each key that
+                          doesn't exist.
+    :type default_value: any type
+
+    :return: A value for each key.
+    :rtype: [any, ..]
+    """
+    return [get_value(data, key, default_value=default_value)
+            for key in keys]
+
+
 def _recursive_update(d, u):
     """
     Merge one dictionary with another, while keeping the nested state.
@@ -242,7 +339,9 @@ def _recursive_update(d, u):
     """
     for k, v in u.iteritems():
         if isinstance(v, collections.Mapping):
-            d[k] = _recursive_update(d.get(k, {}), v)
+            # Copy nested dictionaries, so the input data (which may be
+            # shared from the cache) is not modified.
+            d[k] = _recursive_update(dict(d.get(k, {})), v)
         else:
             d[k] = v
     return d
@@ -308,7 +407,7 @@ class Config(object):
             self.write()
 
     def read(self):
-        data = read_data(self.file_path)
+        data = read_data_cached(self.file_path)
         self._values = data
         self._changed = False
         return
@@ -330,6 +429,14 @@ class Config(object):
         value = get_value(data, key, default_value=default_value)
         return value
 
+    def get_values(self, keys, default_value=None):
+        if self._auto_read is True and len(self._values) == 0:
+            self.read()
+        data = self._values
+        if data is None or len(data) == 0:
+            return [default_value] * len(keys)
+        return get_values(data, keys, default_value=default_value)
+
     def set_value(self, key, value):
         data = {}
         if isinstance(self._values, dict):
@@ -33,16 +33,47 @@ The levels are (in ascending order):
 - Maya Session
 - Maya Preferences
 
+Node option structures are JSON encoded strings, stored on a node
+attribute. The strings, and the decoded structures, are cached by node
+UUID and attribute name, and Maya callbacks remove the cached values
+when any attribute of the node changes (including by undo and redo),
+or when a new scene is created or opened. Node names are mapped to
+node UUIDs with a cache of MObjectHandles, which is cleared when any
+node is renamed or the DAG hierarchy changes.
+
+Writes of node option structures can be coalesced with
+:py:func:`coalesce_node_option_writes`, so that many writes to the same
+node attribute result in only one 'setAttr' call.
+
 """
 
+import collections
+import contextlib
+import copy
 import json
 
 import maya.cmds
+import maya.OpenMaya as OpenMaya
 import mmSolver.logger
 import mmSolver.utils.constant as const
+import mmSolver.utils.node as node_utils
 
 LOG = mmSolver.logger.get_logger()
 
+# Cached attribute values; {node_uuid: {attr_name: {'handle':
+# MObjectHandle, 'string': str, 'structure': decoded data}}}. The
+# 'structure' is only added when the string is first decoded.
+__CACHE = dict()
+__NODE_CALLBACK_IDS = dict()
+__SCENE_CALLBACK_IDS = []
+
+# Node names looked up; {node_name: (MObjectHandle, node_uuid)}.
+__NODE_HANDLES = dict()
+
+# Writes waiting to be set on nodes, while writes are coalesced;
+# {(node_uuid, attr_name): (node_name, str, add_attr)}.
+__PENDING_WRITES = None
+
 
 def __add_node_option_attr(node_name, attr_name, value):
     """
@@ -158,10 +189,256 @@ def set_node_option(node_name, attr_name, value,
     return
 
 
+def clear_node_option_cache(*args):
+    """
+    Remove all cached node option values, and the node callbacks.
+
+    This function may be used directly as a Maya callback function;
+    all arguments are ignored.
+    """
+    global __CACHE
+    global __NODE_CALLBACK_IDS
+    for callback_id in __NODE_CALLBACK_IDS.values():
+        try:
+            OpenMaya.MMessage.removeCallback(callback_id)
+        except RuntimeError:
+            # The node has been deleted.
+            pass
+    __NODE_CALLBACK_IDS = dict()
+    __CACHE = dict()
+    _clear_node_handles()
+    return
+
+
+def _clear_node_handles(*args):
+    """
+    Remove all node names looked up.
+
+    This function may be used directly as a Maya callback function;
+    all arguments are ignored.
+    """
+    global __NODE_HANDLES
+    __NODE_HANDLES = dict()
+    return
+
+
+def _node_attribute_changed(msg, plug, other_plug, node_uuid):
+    """
+    Remove cached values of a node, when an attribute changes.
+    """
+    __CACHE.pop(node_uuid, None)
+    return
+
+
+def _add_scene_callbacks():
+    """
+    Add the Maya callbacks used to clear the node option cache.
+
+    :returns: True if the callbacks exist, False otherwise.
+    :rtype: bool
+    """
+    global __SCENE_CALLBACK_IDS
+    if len(__SCENE_CALLBACK_IDS) > 0:
+        return True
+    clear_node_option_cache()
+    callback_ids = []
+    try:
+        msgs = [
+            OpenMaya.MSceneMessage.kBeforeNew,
+            OpenMaya.MSceneMessage.kBeforeOpen,
+        ]
+        for msg in msgs:
+            callback_ids.append(
+                OpenMaya.MSceneMessage.addCallback(
+                    msg, clear_node_option_cache))
+        # Node names may refer to different nodes after nodes are
+        # renamed or re-parented.
+        callback_ids.append(
+            OpenMaya.MNodeMessage.addNameChangedCallback(
+                OpenMaya.MObject(), _clear_node_handles))
+        callback_ids.append(
+            OpenMaya.MDagMessage.addAllDagChangesCallback(
+                _clear_node_handles))
+    except RuntimeError:
+        LOG.warning('Could not add node option cache callbacks.')
+        for callback_id in callback_ids:
+            OpenMaya.MMessage.removeCallback(callback_id)
+        return False
+    __SCENE_CALLBACK_IDS = callback_ids
+    return True
+
+
+def _add_node_callback(node_uuid, handle):
+    """
+    Add a Maya callback to clear the cached values of a node, when
+    any attribute on the node is changed.
+
+    :returns: True if the callback exists, False otherwise.
+    :rtype: bool
+    """
+    key = (node_uuid, handle.hashCode())
+    if key in __NODE_CALLBACK_IDS:
+        return True
+    if _add_scene_callbacks() is False:
+        return False
+    try:
+        callback_id = OpenMaya.MNodeMessage.addAttributeChangedCallback(
+            handle.object(), _node_attribute_changed, node_uuid)
+    except RuntimeError:
+        LOG.warning('Could not add node option callback: %r', node_uuid)
+        return False
+    __NODE_CALLBACK_IDS[key] = callback_id
+    return True
+
+
+def _get_node_uuid_and_handle(node_name):
+    """
+    Get the UUID and object handle of a node.
+
+    Node names already looked up are not looked up again, while the
+    node exists.
+
+    :returns: UUID and object handle, or (None, None) if the node does
+              not exist.
+    :rtype: (str, OpenMaya.MObjectHandle) or (None, None)
+    """
+    value = __NODE_HANDLES.get(node_name)
+    if value is not None and value[0].isValid():
+        return value[1], value[0]
+    obj = node_utils.get_as_object_apione(node_name)
+    if obj is None:
+        return None, None
+    node_uuid = OpenMaya.MFnDependencyNode(obj).uuid().asString()
+    handle = OpenMaya.MObjectHandle(obj)
+    if _add_scene_callbacks() is True:
+        __NODE_HANDLES[node_name] = (handle, node_uuid)
+    return node_uuid, handle
+
+
+def _get_cache_entry(node_name, attr_name):
+    """
+    Get the cached value of a node attribute, reading the attribute
+    if the value is not cached.
+
+    :returns: The cache entry, with the 'string' stored on the node
+              attribute, and the decoded 'structure' if it has been
+              decoded before. None is returned if the node does not
+              exist.
+    :rtype: dict or None
+    """
+    node_uuid, handle = _get_node_uuid_and_handle(node_name)
+    if node_uuid is None:
+        return None
+    entry = __CACHE.get(node_uuid, dict()).get(attr_name)
+    if (entry is not None
+            and entry['handle'].isValid()
+            and entry['handle'].object() == handle.object()):
+        return entry
+    attr_data = get_node_option(node_name, attr_name)
+    entry = {'handle': handle, 'string': attr_data}
+    if _add_node_callback(node_uuid, handle) is True:
+        __CACHE.setdefault(node_uuid, dict())[attr_name] = entry
+    return entry
+
+
+def _get_pending_write(node_name, attr_name):
+    """
+    Get the string waiting to be written to a node attribute, while
+    writes are coalesced.
+
+    :rtype: str or None
+    """
+    if __PENDING_WRITES is None:
+        return None
+    node_uuid, _ = _get_node_uuid_and_handle(node_name)
+    value = __PENDING_WRITES.get((node_uuid, attr_name))
+    if value is None:
+        return None
+    return value[1]
+
+
+def _get_node_option_string(node_name, attr_name):
+    """
+    Get the string stored on a node attribute, from the cache if
+    possible.
+
+    :rtype: str or None
+    """
+    attr_data = _get_pending_write(node_name, attr_name)
+    if attr_data is not None:
+        return attr_data
+    entry = _get_cache_entry(node_name, attr_name)
+    if entry is None:
+        return get_node_option(node_name, attr_name)
+    return entry['string']
+
+
+def _set_node_option_string(node_name, attr_name, attr_data, add_attr):
+    """
+    Set a string onto a node attribute, if the value has changed.
+
+    :rtype: None
+    """
+    old_attr_data = _get_node_option_string(node_name, attr_name)
+    if old_attr_data == attr_data:
+        # No change is needed.
+        return
+    set_node_option(node_name, attr_name, attr_data,
+                    add_attr=add_attr)
+
+    # The attribute changed callback has removed the cached value,
+    # the new value is known, so we add it back.
+    node_uuid, handle = _get_node_uuid_and_handle(node_name)
+    if node_uuid is None:
+        return
+    if (node_uuid, handle.hashCode()) in __NODE_CALLBACK_IDS:
+        entry = {'handle': handle, 'string': attr_data}
+        __CACHE.setdefault(node_uuid, dict())[attr_name] = entry
+    return
+
+
+@contextlib.contextmanager
+def coalesce_node_option_writes():
+    """
+    Coalesce node option structure writes, using a context manager.
+
+    Inside the 'with' block, :py:func:`set_node_option_structure`
+    remembers the value to write, and
+    :py:func:`get_node_option_structure` returns the remembered
+    value. When the (outer-most) 'with' block ends, only the last
+    value for each node attribute is set on the node.
+
+    Example usage:
+    >>> with coalesce_node_option_writes():
+    ...     set_node_option_structure(node, 'myAttr', [])
+    ...     set_node_option_structure(node, 'myAttr', [1, 2])
+    """
+    global __PENDING_WRITES
+    if __PENDING_WRITES is not None:
+        # Already coalescing writes, the outer context will write.
+        yield
+        return
+    __PENDING_WRITES = collections.OrderedDict()
+    try:
+        yield
+    finally:
+        pending_writes = __PENDING_WRITES
+        __PENDING_WRITES = None
+        for key, value in pending_writes.items():
+            attr_name = key[1]
+            node_name, attr_data, add_attr = value
+            _set_node_option_string(
+                node_name, attr_name, attr_data, add_attr)
+    return
+
+
 def get_node_option_structure(node_name, attr_name):
     """
     Get data structure from a node attribute.
 
+    The decoded data structure is cached, and a copy is returned, so
+    the returned data may be modified by the caller.
+
     :param node_name: Node to get data from.
     :type node_name: str
 
@@ -173,10 +450,20 @@ def get_node_option_structure(node_name, attr_name):
     :rtype: dict or list or None
     """
     ret = None
-    attr_data = get_node_option(node_name, attr_name)
-    if attr_data is None:
+    attr_data = _get_pending_write(node_name, attr_name)
+    if attr_data is not None:
+        return json.loads(attr_data)
+    entry = _get_cache_entry(node_name, attr_name)
+    if entry is None:
+        attr_data = get_node_option(node_name, attr_name)
+        if attr_data is not None:
+            ret = json.loads(attr_data)
         return ret
-    ret = json.loads(attr_data)
+    if entry['string'] is None:
+        return ret
+    if 'structure' not in entry:
+        entry['structure'] = json.loads(entry['string'])
+    ret = copy.deepcopy(entry['structure'])
     return ret
 
 
@@ -184,6 +471,10 @@ def set_node_option_structure(node_name, attr_name, data_struct, add_attr=None):
     """
     Set arbitrary Plain-Old-Data onto a node.attr path.
 
+    The node attribute is only set if the data has changed. Inside a
+    :py:func:`coalesce_node_option_writes` block, the node attribute is
+    set when the block ends.
+
     .. note: If you use use add_attr, be aware that the first value
         type will determine the attribute automatically created.
         Once created the attribute type cannot be changed.
@@ -207,13 +498,14 @@ def set_node_option_structure(node_name, attr_name, data_struct, add_attr=None):
     assert isinstance(data_struct, (list, dict))
 
     new_attr_data = json.dumps(data_struct)
-    old_attr_data = get_node_option(node_name, attr_name)
-    if old_attr_data == new_attr_data:
-        # No change is needed.
-        return
-
-    set_node_option(node_name, attr_name, new_attr_data,
-                    add_attr=add_attr)
+    if __PENDING_WRITES is not None:
+        node_uuid, _ = _get_node_uuid_and_handle(node_name)
+        if node_uuid is not None:
+            key = (node_uuid, attr_name)
+            __PENDING_WRITES[key] = (node_name, new_attr_data, add_attr)
+            return
+
+    _set_node_option_string(node_name, attr_name, new_attr_data, add_attr)
     return
 
 
@@ -47,15 +47,33 @@ Utility functions for 3D line intersection (for triangulating 3D points).
     )
     # Use 'pnt' as the 'intersection' point of the two lines.
 
+    # Triangulate many bundles at once, with all rays of each bundle.
+    cam_mkr_frm_list = [
+        (cam_tfm, mkr_node, [1001, 1051, 1101]),
+        (cam_tfm, other_mkr_node, [1001, 1101]),
+    ]
+    rays = tri_utils.get_camera_rays(cam_mkr_frm_list)
+    origins_list = [rays[0][0], rays[1][0]]
+    directions_list = [rays[0][1], rays[1][1]]
+    pnts = tri_utils.calculate_least_squares_intersection_points(
+        origins_list, directions_list)
+
 """
 
+import array
+
 import maya.cmds
 import maya.OpenMaya as OpenMaya
 
 import mmSolver.logger
+import mmSolver.utils.constant as const
+import mmSolver.utils.transform as tfm_utils
 
 LOG = mmSolver.logger.get_logger()
 
+# Matrices with a determinant smaller than this are not solved.
+LEAST_SQUARES_DETERMINANT_TOLERANCE = 1e-12
+
 
 def get_point_and_direction(camera_node, point_node, frame):
     """
@@ -165,3 +183,278 @@ def calculate_approx_intersection_point_between_two_3d_lines(a_pnt, a_dir,
                          p3.y + mub * p43.y,
                          p3.z + mub * p43.z)
     return pa, pb
+
+
+def get_camera_rays(cam_mkr_frm_list, eval_mode=None):
+    """
+    Get the rays from a camera toward a point, for many cameras,
+    points and frames.
+
+    The world matrices of all camera and point nodes are evaluated
+    together, visiting each frame only once.
+
+    :param cam_mkr_frm_list: List of camera transform node, point
+                             transform node and frames to query.
+    :type cam_mkr_frm_list: [(str, str, [int, ..]), ..]
+
+    :param eval_mode: What type of evaluation method to use?
+    :type eval_mode: mmSolver.utils.constant.EVAL_MODE_*
+
+    :return: For each entry of cam_mkr_frm_list, the camera positions
+             and the normalised directions toward the point, as flat
+             arrays with 3 numbers (X, Y, Z) per frame. Frames where
+             the camera and point are at the same position are
+             skipped.
+    :rtype: [(array.array, array.array), ..]
+    """
+    if eval_mode is None:
+        eval_mode = const.EVAL_MODE_DEFAULT
+    attr_name = 'worldMatrix[0]'
+    tfm_cache = tfm_utils.TransformMatrixCache()
+    tfm_nodes = dict()
+    for cam_node, point_node, frames in cam_mkr_frm_list:
+        for node in (cam_node, point_node):
+            tfm_node = tfm_nodes.get(node)
+            if tfm_node is None:
+                tfm_node = tfm_utils.TransformNode(node=node)
+                tfm_nodes[node] = tfm_node
+            tfm_cache.add_node_attr(tfm_node, attr_name, frames)
+    tfm_cache.process(eval_mode=eval_mode)
+
+    rays = []
+    for cam_node, point_node, frames in cam_mkr_frm_list:
+        cam_matrices = tfm_cache.get_node_attr_array(
+            tfm_nodes[cam_node], attr_name, frames)
+        point_matrices = tfm_cache.get_node_attr_array(
+            tfm_nodes[point_node], attr_name, frames)
+        origins = array.array('d')
+        directions = array.array('d')
+        for i in range(len(frames)):
+            # The translation is stored in the last row of the matrix.
+            start = (i * 16) + 12
+            cx, cy, cz = cam_matrices[start:start + 3]
+            px, py, pz = point_matrices[start:start + 3]
+            dx, dy, dz = px - cx, py - cy, pz - cz
+            length = (dx * dx + dy * dy + dz * dz) ** 0.5
+            if length == 0.0:
+                continue
+            origins.extend((cx, cy, cz))
+            directions.extend((dx / length, dy / length, dz / length))
+        rays.append((origins, directions))
+    return rays
+
+
+def _solve_least_squares_intersection(origins, directions, weights,
+                                      enabled):
+    """
+    Find the point closest to all enabled rays, in a least squares
+    sense.
+
+    The sum of (I - d * d^T) * w over all rays is a 3x3 symmetric
+    matrix, solved with Cramer's rule.
+
+    :returns: The point, or None if the rays do not define a point
+              (for example, all rays are parallel).
+    :rtype: (float, float, float) or None
+    """
+    a00 = a01 = a02 = a11 = a12 = a22 = 0.0
+    b0 = b1 = b2 = 0.0
+    for i, ok in enumerate(enabled):
+        if ok is False:
+            continue
+        j = i * 3
+        ox, oy, oz = origins[j], origins[j + 1], origins[j + 2]
+        dx, dy, dz = directions[j], directions[j + 1], directions[j + 2]
+        length_sq = dx * dx + dy * dy + dz * dz
+        if length_sq == 0.0:
+            continue
+        w = 1.0 if weights is None else weights[i]
+        inv = 1.0 / length_sq
+        m00 = w * (1.0 - dx * dx * inv)
+        m01 = w * (-dx * dy * inv)
+        m02 = w * (-dx * dz * inv)
+        m11 = w * (1.0 - dy * dy * inv)
+        m12 = w * (-dy * dz * inv)
+        m22 = w * (1.0 - dz * dz * inv)
+        a00 += m00
+        a01 += m01
+        a02 += m02
+        a11 += m11
+        a12 += m12
+        a22 += m22
+        b0 += m00 * ox + m01 * oy + m02 * oz
+        b1 += m01 * ox + m11 * oy + m12 * oz
+        b2 += m02 * ox + m12 * oy + m22 * oz
+
+    c00 = a11 * a22 - a12 * a12
+    c01 = a02 * a12 - a01 * a22
+    c02 = a01 * a12 - a02 * a11
+    det = a00 * c00 + a01 * c01 + a02 * c02
+    scale = max(abs(a00), abs(a11), abs(a22), 1.0)
+    if abs(det) <= LEAST_SQUARES_DETERMINANT_TOLERANCE * (scale ** 3):
+        return None
+    c11 = a00 * a22 - a02 * a02
+    c12 = a01 * a02 - a00 * a12
+    c22 = a00 * a11 - a01 * a01
+    x = (c00 * b0 + c01 * b1 + c02 * b2) / det
+    y = (c01 * b0 + c11 * b1 + c12 * b2) / det
+    z = (c02 * b0 + c12 * b1 + c22 * b2) / det
+    return x, y, z
+
+
+def calculate_distances_from_rays(point, origins, directions):
+    """
+    Calculate the perpendicular distance from a point to each ray.
+
+    :param point: The point to measure from.
+    :type point: (float, float, float)
+
+    :param origins: Ray origins, 3 numbers (X, Y, Z) per ray.
+    :type origins: [float, ..]
+
+    :param directions: Ray directions, 3 numbers (X, Y, Z) per ray.
+    :type directions: [float, ..]
+
+    :return: Distance from the point to each ray.
+    :rtype: [float, ..]
+    """
+    px, py, pz = point
+    distances = []
+    for j in range(0, len(origins), 3):
+        vx = px - origins[j]
+        vy = py - origins[j + 1]
+        vz = pz - origins[j + 2]
+        dx, dy, dz = directions[j], directions[j + 1], directions[j + 2]
+        length_sq = dx * dx + dy * dy + dz * dz
+        dist_sq = vx * vx + vy * vy + vz * vz
+        if length_sq > 0.0:
+            dot = vx * dx + vy * dy + vz * dz
+            dist_sq -= (dot * dot) / length_sq
+        distances.append(max(dist_sq, 0.0) ** 0.5)
+    return distances
+
+
+def calculate_least_squares_intersection_point(origins, directions,
+                                               weights=None,
+                                               outlier_distance=None,
+                                               max_iterations=None):
+    """
+    Calculate the point closest to many 3D lines (rays).
+
+    The ray furthest from the point is rejected, if it is further than
+    'outlier_distance', and the point is calculated again. Rays are
+    rejected one at a time until all rays are within
+    'outlier_distance', 'max_iterations' rays are rejected, or only 2
+    rays remain.
+
+    :param origins: Ray origins, 3 numbers (X, Y, Z) per ray.
+    :type origins: [float, ..]
+
+    :param directions: Ray directions, 3 numbers (X, Y, Z) per ray.
+                       The directions do not need to be normalised.
+    :type directions: [float, ..]
+
+    :param weights: Weight of each ray, or None for equal weights.
+    :type weights: [float, ..] or None
+
+    :param outlier_distance: Distance from the point to reject a ray,
+                             or None to use all rays.
+    :type outlier_distance: float or None
+
+    :param max_iterations: The maximum number of outlier rays to
+                           reject.
+    :type max_iterations: int or None
+
+    :return: The point, or None if the rays do not define a point.
+    :rtype: (float, float, float) or None
+    """
+    if max_iterations is None:
+        max_iterations = 10
+    if len(origins) != len(directions) or (len(origins) % 3) != 0:
+        msg = 'origins and directions must have 3 numbers per ray.'
+        raise ValueError(msg)
+    count = len(origins) // 3
+    if weights is not None and len(weights) != count:
+        msg = 'weights must have 1 number per ray; count=%r weights=%r'
+        raise ValueError(msg % (count, len(weights)))
+
+    enabled = [True] * count
+    pnt = _solve_least_squares_intersection(
+        origins, directions, weights, enabled)
+    if pnt is None or outlier_distance is None:
+        return pnt
+
+    for _ in range(max_iterations):
+        if sum(enabled) <= 2:
+            break
+        distances = calculate_distances_from_rays(pnt, origins, directions)
+        worst_index = None
+        worst_distance = outlier_distance
+        for i, (ok, distance) in enumerate(zip(enabled, distances)):
+            if ok is True and distance > worst_distance:
+                worst_index = i
+                worst_distance = distance
+        if worst_index is None:
+            break
+        new_enabled = list(enabled)
+        new_enabled[worst_index] = False
+        new_pnt = _solve_least_squares_intersection(
+            origins, directions, weights, new_enabled)
+        if new_pnt is None:
+            break
+        enabled = new_enabled
+        pnt = new_pnt
+    return pnt
+
+
+def calculate_least_squares_intersection_points(origins_list,
+                                                directions_list,
+                                                weights_list=None,
+                                                outlier_distance=None,
+                                                max_iterations=None):
+    """
+    Calculate the point closest to many 3D lines (rays), for many
+    points at once.
+
+    See :py:func:`calculate_least_squares_intersection_point`.
+
+    :param origins_list: Ray origins for each point, 3 numbers
+                         (X, Y, Z) per ray.
+    :type origins_list: [[float, ..], ..]
+
+    :param directions_list: Ray directions for each point, 3 numbers
+                            (X, Y, Z) per ray.
+    :type directions_list: [[float, ..], ..]
+
+    :param weights_list: Ray weights for each point, or None for
+                         equal weights.
+    :type weights_list: [[float, ..] or None, ..] or None
+
+    :param outlier_distance: Distance from the point to reject a ray,
+                             or None to use all rays.
+    :type outlier_distance: float or None
+
+    :param max_iterations: The maximum number of outlier rays to
+                           reject, for each point.
+    :type max_iterations: int or None
+
+    :return: A point for each list of rays; None if the rays do not
+             define a point.
+    :rtype: [(float, float, float) or None, ..]
+    """
+    if len(origins_list) != len(directions_list):
+        msg = 'origins_list and directions_list must be the same length.'
+        raise ValueError(msg)
+    if weights_list is None:
+        weights_list = [None] * len(origins_list)
+    pnts = []
+    for origins, directions, weights in zip(origins_list,
+                                            directions_list,
+                                            weights_list):
+        pnt = calculate_least_squares_intersection_point(
+            origins, directions,
+            weights=weights,
+            outlier_distance=outlier_distance,
+            max_iterations=max_iterations)
+        pnts.append(pnt)
+    return pnts
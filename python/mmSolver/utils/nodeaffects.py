@@ -30,14 +30,23 @@ and attributes.
 - Cameras; transform attributes and focal length will affect all
   markers
 
-.. todo:: Calculating node affect relationships is too slow. We need
-    to find a way of caching the calculation, so that batches of
-    functions that do not change connections can re-use exist
-    computations, leading to greater speed ups, at the cost of memory.
+Calculating node affect relationships is slow, so the results are
+stored in a dependency index (a cache in memory). The index is
+cleared when a change that could change the node affect
+relationships happens in the Maya scene; DAG hierarchy changes,
+connections made or broken, nodes renamed or deleted, and attributes
+locked, unlocked, added, removed or renamed on the nodes used by the
+index. Changes that are not detected require the index to be cleared
+with :py:func:`clear_dependency_index`.
+
+The Maya callbacks used by the index are removed before a new scene
+is created or opened, and are added again the next time the index
+is used.
 
 """
 
 import maya.cmds
+import maya.OpenMaya as OpenMaya
 
 import mmSolver.logger
 
@@ -67,6 +76,262 @@ CAMERA_ATTRS = [
 
 
 __CACHE = dict()
+__CACHE_ID = 0
+__CALLBACK_IDS = []
+__SCENE_CALLBACK_IDS = []
+
+# Attribute changed callbacks on the nodes used by the index;
+# {MObjectHandle hash code: callback id}.
+__NODE_CALLBACK_IDS = dict()
+
+
+def _clear_query_cache():
+    global __CACHE
+    global __CACHE_ID
+    __CACHE = dict()
+    __CACHE_ID += 1
+    return
+
+
+def _get_from_query_cache(key):
+    global __CACHE
+    return __CACHE.get(key)
+
+
+def _add_to_query_cache(key, value):
+    global __CACHE
+    global __CALLBACK_IDS
+    # Without callbacks, we cannot know when the cache is invalid.
+    if len(__CALLBACK_IDS) == 0:
+        return
+    __CACHE[key] = value
+    return
+
+
+def _dependency_index_changed_func(*args):
+    """
+    Callback triggered when the Maya scene changes in a way that may
+    change node affect relationships.
+
+    The arguments given to the callback differ for each callback
+    type, and are not used.
+    """
+    clear_dependency_index()
+    return
+
+
+def _node_attribute_changed_func(msg, plug, other_plug, client_data):
+    """
+    Callback triggered when an attribute of a node used by the
+    dependency index changes.
+
+    Locking and unlocking an attribute changes whether the attribute
+    can be solved, and adding, removing or renaming an attribute
+    changes the attributes of the node.
+    """
+    mask = (OpenMaya.MNodeMessage.kAttributeLocked
+            | OpenMaya.MNodeMessage.kAttributeUnlocked
+            | OpenMaya.MNodeMessage.kAttributeAdded
+            | OpenMaya.MNodeMessage.kAttributeRemoved
+            | OpenMaya.MNodeMessage.kAttributeRenamed)
+    if msg & mask:
+        clear_dependency_index()
+    return
+
+
+def _add_node_callback(node):
+    """
+    Add a Maya callback to clear the dependency index when an
+    attribute of the node is locked, unlocked, added, removed or
+    renamed.
+
+    :param node: Maya node name.
+    :type node: str
+    """
+    global __NODE_CALLBACK_IDS
+    global __CALLBACK_IDS
+    # Without callbacks, the index is not used.
+    if len(__CALLBACK_IDS) == 0:
+        return
+    sel_list = OpenMaya.MSelectionList()
+    try:
+        sel_list.add(node)
+    except RuntimeError:
+        return
+    node_obj = OpenMaya.MObject()
+    sel_list.getDependNode(0, node_obj)
+    key = OpenMaya.MObjectHandle(node_obj).hashCode()
+    if key in __NODE_CALLBACK_IDS:
+        return
+    callback_id = OpenMaya.MNodeMessage.addAttributeChangedCallback(
+        node_obj, _node_attribute_changed_func)
+    __NODE_CALLBACK_IDS[key] = callback_id
+    return
+
+
+def _remove_node_callbacks():
+    global __NODE_CALLBACK_IDS
+    for callback_id in __NODE_CALLBACK_IDS.values():
+        try:
+            OpenMaya.MMessage.removeCallback(callback_id)
+        except RuntimeError:
+            # The node has been deleted.
+            pass
+    __NODE_CALLBACK_IDS = dict()
+    return
+
+
+def _scene_changed_func(*args):
+    """
+    Callback triggered before a new scene is created or opened.
+
+    The dependency index callbacks are removed, so they are not run
+    for each node and connection made while the scene is loaded.
+    """
+    remove_dependency_index_callbacks()
+    return
+
+
+def _add_scene_callbacks():
+    """
+    Add the Maya callbacks used to remove the dependency index
+    callbacks.
+
+    :returns: True if the callbacks exist, False otherwise.
+    :rtype: bool
+    """
+    global __SCENE_CALLBACK_IDS
+    if len(__SCENE_CALLBACK_IDS) > 0:
+        return True
+    func = _scene_changed_func
+    callback_ids = []
+    try:
+        msgs = [
+            OpenMaya.MSceneMessage.kBeforeNew,
+            OpenMaya.MSceneMessage.kBeforeOpen,
+            OpenMaya.MSceneMessage.kMayaExiting,
+        ]
+        for msg in msgs:
+            callback_ids.append(
+                OpenMaya.MSceneMessage.addCallback(msg, func))
+    except RuntimeError:
+        LOG.warning('Could not add dependency index scene callbacks.')
+        for callback_id in callback_ids:
+            OpenMaya.MMessage.removeCallback(callback_id)
+        return False
+    __SCENE_CALLBACK_IDS = callback_ids
+    return True
+
+
+def add_dependency_index_callbacks():
+    """
+    Add the Maya callbacks used to invalidate the dependency index.
+
+    The dependency index is only used when the callbacks exist. If
+    the callbacks have already been added, nothing happens.
+
+    :returns: True if the callbacks exist, False otherwise.
+    :rtype: bool
+    """
+    global __CALLBACK_IDS
+    if len(__CALLBACK_IDS) > 0:
+        return True
+    if _add_scene_callbacks() is False:
+        return False
+    _clear_query_cache()
+    func = _dependency_index_changed_func
+    callback_ids = []
+    try:
+        callback_ids.append(
+            OpenMaya.MDGMessage.addConnectionCallback(func))
+        callback_ids.append(
+            OpenMaya.MDagMessage.addAllDagChangesCallback(func))
+        callback_ids.append(
+            OpenMaya.MDGMessage.addNodeRemovedCallback(func, 'dependNode'))
+        callback_ids.append(
+            OpenMaya.MNodeMessage.addNameChangedCallback(
+                OpenMaya.MObject(), func))
+        msgs = [
+            OpenMaya.MSceneMessage.kBeforeImport,
+            OpenMaya.MSceneMessage.kBeforeCreateReference,
+            OpenMaya.MSceneMessage.kBeforeRemoveReference,
+        ]
+        for msg in msgs:
+            callback_ids.append(
+                OpenMaya.MSceneMessage.addCallback(msg, func))
+    except RuntimeError:
+        LOG.warning('Could not add dependency index callbacks.')
+        for callback_id in callback_ids:
+            OpenMaya.MMessage.removeCallback(callback_id)
+        return False
+    __CALLBACK_IDS = callback_ids
+    return True
+
+
+def remove_dependency_index_callbacks():
+    """
+    Remove the Maya callbacks used to invalidate the dependency index.
+
+    After the callbacks are removed the dependency index is cleared
+    and no longer used, until the callbacks are added again.
+    """
+    global __CALLBACK_IDS
+    for callback_id in __CALLBACK_IDS:
+        OpenMaya.MMessage.removeCallback(callback_id)
+    __CALLBACK_IDS = []
+    _remove_node_callbacks()
+    _clear_query_cache()
+    return
+
+
+def clear_dependency_index():
+    """
+    Remove all values stored in the dependency index.
+
+    This function is called by the dependency index callbacks, and
+    may be used after making a scene change that is not detected by
+    the callbacks.
+    """
+    _clear_query_cache()
+    return
+
+
+def get_dependency_index_id():
+    """
+    Get a number identifying the current state of the dependency index.
+
+    The number changes each time the dependency index is cleared, so
+    other caches may use the number to know when the node affect
+    relationships in the Maya scene may have changed.
+
+    :returns: The dependency index identifier, or None if the
+              dependency index callbacks have not been added.
+    :rtype: int or None
+    """
+    global __CACHE_ID
+    global __CALLBACK_IDS
+    if len(__CALLBACK_IDS) == 0:
+        return None
+    return __CACHE_ID
+
+
+def _get_long_name(node):
+    """
+    Get the full path name of a node.
+
+    :param node: Maya node name.
+    :type node: str
+
+    :returns: Long name for the given node.
+    :rtype: str
+    """
+    key = ('long_name', node)
+    value = _get_from_query_cache(key)
+    if value is not None:
+        return value
+    value = maya.cmds.ls(node, long=True)[0]
+    _add_to_query_cache(key, value)
+    return value
 
 
 def _get_full_path_plug(plug):
@@ -79,29 +344,134 @@ def _get_full_path_plug(plug):
     :returns: Long name for the given plug.
     :rtype: str
     """
+    key = ('full_path_plug', plug)
+    full_path = _get_from_query_cache(key)
+    if full_path is not None:
+        return full_path
     node = plug.partition('.')[0]
-    attr = plug.partition('.')[-1]
     attr = maya.cmds.attributeName(plug, long=True)
-    node = maya.cmds.ls(node, long=True)[0]
+    node = _get_long_name(node)
     full_path = node + '.' + attr
+    _add_to_query_cache(key, full_path)
     return full_path
 
 
-def _clear_query_cache():
-    global __CACHE
-    __CACHE = dict()
-    return
+def _get_parent_nodes(node):
+    """
+    Get all the parents above the given node.
 
+    :param node: Full path to a Maya DAG node.
+    :type node: str
 
-def _get_from_query_cache(key):
-    global __CACHE
-    return __CACHE.get(key)
+    :returns: The parent nodes of node, in order from node upwards.
+    :rtype: [str, ..]
+    """
+    key = ('parent_nodes', node)
+    parent_nodes = _get_from_query_cache(key)
+    if parent_nodes is not None:
+        return list(parent_nodes)
+    parent_nodes = []
+    parents = maya.cmds.listRelatives(
+        node,
+        parent=True,
+        fullPath=True) or []
+    parent_nodes += parents
+    while len(parents) > 0:
+        parents = maya.cmds.listRelatives(
+            parents,
+            parent=True,
+            fullPath=True) or []
+        parent_nodes += parents
+    _add_to_query_cache(key, tuple(parent_nodes))
+    return parent_nodes
 
 
-def _add_to_query_cache(key, value):
-    global __CACHE
-    __CACHE[key] = value
-    return
+def _find_plugs_affecting_node(node):
+    """
+    Find plugs that affect the world-space of a single node.
+
+    Only the attributes of the node itself (and any attributes
+    connected to them, recursively) are considered, not the parent
+    nodes.
+
+    :param node: Full path to a Maya node.
+    :type node: str
+
+    :returns: Set of Maya attributes in 'node.attr' string format.
+    :rtype: set of str
+    """
+    key = ('node_plugs', node)
+    plugs = _get_from_query_cache(key)
+    if plugs is not None:
+        return set(plugs)
+
+    plugs = set()
+    _add_node_callback(node)
+    node_type = maya.cmds.nodeType(node)
+    attrs = maya.cmds.listAttr(node, leaf=True) or []
+    for attr in attrs:
+        # Logic to decide if this attribute will affect the node.
+        ws = maya.cmds.attributeQuery(
+            attr,
+            node=node,
+            affectsWorldspace=True)
+        if node_type == 'camera':
+            # If the attribute affects the camera projection matrix, then
+            # it's important to us.
+            if attr not in CAMERA_ATTRS:
+                continue
+        else:
+            # All other nodes, skip if world space is not affected
+            if ws is False:
+                continue
+
+        node_attr = node + '.' + attr
+        settable = maya.cmds.getAttr(node_attr, settable=True)
+        if settable is True:
+            typ = maya.cmds.getAttr(node_attr, type=True)
+            if typ in VALID_ATTR_TYPES:
+                plugs.add(node_attr)
+            continue
+
+        # Get plugs connected to this attribute, recursively
+        conn_attrs = maya.cmds.listConnections(
+            node_attr,
+            source=True,
+            destination=False,
+            plugs=True) or []
+        while len(conn_attrs) > 0:
+            node_attr = conn_attrs.pop()
+            node_attr = _get_full_path_plug(node_attr)
+            _add_node_callback(node_attr.partition('.')[0])
+            settable = maya.cmds.getAttr(node_attr, settable=True)
+            if settable is True:
+                typ = maya.cmds.getAttr(node_attr, type=True)
+                if typ in VALID_ATTR_TYPES:
+                    plugs.add(node_attr)
+                continue
+
+            # Get the plugs that affect this plug.
+            tmp_list = maya.cmds.listConnections(
+                node_attr,
+                source=True,
+                destination=False,
+                plugs=True) or []
+
+            # Filter by valid plug types.
+            for tmp in tmp_list:
+                node_ = tmp.partition('.')[0]
+                attr_ = tmp.partition('.')[-1]
+
+                affects_this_plug = maya.cmds.affects(attr_, node_)
+                for attr__ in affects_this_plug:
+                    node_attr = node_ + '.' + attr__
+                    node_attr = _get_full_path_plug(node_attr)
+                    conn_attrs += [node_attr]
+            # Only unique attributes.
+            conn_attrs = list(set(conn_attrs))
+
+    _add_to_query_cache(key, frozenset(plugs))
+    return plugs
 
 
 def find_plugs_affecting_transform(bnd_node, cam_tfm):
@@ -115,41 +485,26 @@ def find_plugs_affecting_transform(bnd_node, cam_tfm):
     :type cam_tfm: str or None
 
     :returns: Set of Maya attributes in 'node.attr' string format.
-    :rtype: [str, ..]
+    :rtype: set of str
     """
-    # # Read from cache
-    # #
-    # # TODO: Cache invalidation is very important here. We cannot use the
-    # #  cache if a new object has been added to the Maya scene or for a
-    # #  different run of the solver. Each new solve must trigger a fresh
-    # #  cache. We could do this by adding a new argument 'solve id'
-    # #  and hashing it into the dictionary, which is generated new at
-    # #  the start of each new solver.
-    # plugs = _get_from_query_cache(args)
-    # if plugs is not None:
-    #     return plugs
-    # bnd_node, cam_tfm = args
-
-    bnd_node = maya.cmds.ls(bnd_node, long=True)[0]
+    # The dependency index is kept for the whole Maya session, and is
+    # invalidated by callbacks.
+    add_dependency_index_callbacks()
+
+    key = ('transform_plugs', bnd_node, cam_tfm)
+    plugs = _get_from_query_cache(key)
+    if plugs is not None:
+        return set(plugs)
+
+    bnd_node = _get_long_name(bnd_node)
 
     # Get all the parents above this bundle
-    parent_nodes = []
-    parents = maya.cmds.listRelatives(
-        bnd_node,
-        parent=True,
-        fullPath=True) or []
-    parent_nodes += parents
-    while len(parents) > 0:
-        parents = maya.cmds.listRelatives(
-            parents,
-            parent=True,
-            fullPath=True) or []
-        parent_nodes += parents
+    parent_nodes = _get_parent_nodes(bnd_node)
 
     # Get camera related to the given bundle.
     nodes = [bnd_node] + parent_nodes
     if cam_tfm is not None:
-        cam_tfm_node = maya.cmds.ls(cam_tfm, long=True)[0]
+        cam_tfm_node = _get_long_name(cam_tfm)
         cam_shp_node = maya.cmds.listRelatives(
             cam_tfm,
             shapes=True,
@@ -161,73 +516,10 @@ def find_plugs_affecting_transform(bnd_node, cam_tfm):
 
     plugs = set()
     for node in nodes:
-        node_type = maya.cmds.nodeType(node)
-        attrs = maya.cmds.listAttr(node, leaf=True) or []
-        for attr in attrs:
-            # Logic to decide if this attribute will affect the node.
-            ws = maya.cmds.attributeQuery(
-                attr,
-                node=node,
-                affectsWorldspace=True)
-            if node_type == 'camera':
-                # If the attribute affects the camera projection matrix, then
-                # it's important to us.
-                if attr not in CAMERA_ATTRS:
-                    continue
-            else:
-                # All other nodes, skip if world space is not affected
-                if ws is False:
-                    continue
-
-            node_attr = node + '.' + attr
-            settable = maya.cmds.getAttr(node_attr, settable=True)
-            if settable is True:
-                typ = maya.cmds.getAttr(node_attr, type=True)
-                if typ in VALID_ATTR_TYPES:
-                    plugs.add(node_attr)
-                continue
-
-            # Get plugs connected to this attribute, recursively
-            conn_attrs = maya.cmds.listConnections(
-                node_attr,
-                source=True,
-                destination=False,
-                plugs=True) or []
-            while len(conn_attrs) > 0:
-                node_attr = conn_attrs.pop()
-                node_attr = _get_full_path_plug(node_attr)
-                settable = maya.cmds.getAttr(node_attr, settable=True)
-                if settable is True:
-                    typ = maya.cmds.getAttr(node_attr, type=True)
-                    if typ in VALID_ATTR_TYPES:
-                        plugs.add(node_attr)
-                    continue
-
-                # Get the plugs that affect this plug.
-                tmp_list = maya.cmds.listConnections(
-                    node_attr,
-                    source=True,
-                    destination=False,
-                    plugs=True) or []
-
-                # Filter by valid plug types.
-                for tmp in tmp_list:
-                    node_ = tmp.partition('.')[0]
-                    attr_ = tmp.partition('.')[-1]
-
-                    affects_this_plug = maya.cmds.affects(attr_, node_)
-                    for attr__ in affects_this_plug:
-                        node_attr = node_ + '.' + attr__
-                        node_attr = _get_full_path_plug(node_attr)
-                        conn_attrs += [node_attr]
-                # Only unique attributes.
-                conn_attrs = list(set(conn_attrs))
-
-    # Only unique plugs.
-    plugs = set(plugs)
+        plugs |= _find_plugs_affecting_node(node)
 
     # Set into cache.
-    # _add_to_query_cache(args, plugs)
+    _add_to_query_cache(key, frozenset(plugs))
     return plugs
 
 
@@ -268,6 +560,87 @@ def find_marker_attr_mapping_raw(mkr_list, attr_list):
     return mapping
 
 
+def _get_hierarchy_owner_node(node):
+    """
+    Get the transform node that represents 'node' in the DAG hierarchy.
+
+    Shape nodes are represented by their parent transform, so that
+    (for example) a camera's focal length is considered at the same
+    hierarchy level as the camera transform. DG nodes are not part of
+    the DAG hierarchy and None is returned.
+
+    :param node: Maya node name.
+    :type node: str
+
+    :returns: Full path to the transform node, or None.
+    :rtype: str or None
+    """
+    dag_nodes = maya.cmds.ls(node, dag=True, long=True) or []
+    if len(dag_nodes) == 0:
+        return None
+    node = dag_nodes[0]
+    if maya.cmds.objectType(node, isAType='shape') is True:
+        parents = maya.cmds.listRelatives(
+            node,
+            parent=True,
+            fullPath=True) or []
+        if len(parents) > 0:
+            node = parents[0]
+    return node
+
+
+def _compute_hierarchy_levels(owner_nodes, owner_attrs):
+    """
+    Compute the hierarchy level of each owner node.
+
+    An owner node is 'below' another owner node when any attribute
+    of the other owner node affects the world-matrix of the owner
+    node. This covers both DAG parenting and DG connections, such as
+    constraints.
+
+    :param owner_nodes: Owner (transform) nodes to compute levels for.
+    :type owner_nodes: [str, ..]
+
+    :param owner_attrs: Mapping of owner node to the full path
+                        'node.attr' plugs owned by the node.
+    :type owner_attrs: {str: set of str}
+
+    :returns: Mapping of owner node to hierarchy level; 0 is the
+              root level.
+    :rtype: {str: int}
+    """
+    parents_map = {}
+    for owner in owner_nodes:
+        plugs = find_plugs_affecting_transform(owner, None)
+        parents = []
+        for other in owner_nodes:
+            if other == owner:
+                continue
+            if len(owner_attrs[other].intersection(plugs)) > 0:
+                parents.append(other)
+        parents_map[owner] = parents
+
+    levels = {}
+
+    def compute_level(owner, visiting):
+        if owner in levels:
+            return levels[owner]
+        if owner in visiting:
+            # Cyclic dependency, the owner is considered to be a root.
+            return 0
+        visiting.add(owner)
+        level = 0
+        for parent in parents_map[owner]:
+            level = max(level, compute_level(parent, visiting) + 1)
+        visiting.remove(owner)
+        levels[owner] = level
+        return level
+
+    for owner in owner_nodes:
+        compute_level(owner, set())
+    return levels
+
+
 def sort_into_hierarchy_groups(mkr_list, attr_list):
     """
     Create blocks of Markers and Attributes, sorted by hierarchy.
@@ -276,8 +649,96 @@ def sort_into_hierarchy_groups(mkr_list, attr_list):
     first, before solving children. This will ensure we minimise the
     base before attempting to solve the children.
 
-    TODO: Write this.
+    Each Attribute is given a hierarchy level, based on how many
+    (other) solved transforms affect the Attribute's node. Root-level
+    Attributes (and Attributes on DG nodes) are level 0, the
+    Attributes of a child transform of a level 0 transform are
+    level 1, and so on. Constraints are considered the same as
+    parenting.
 
-    :return:
+    For each hierarchy level, the Markers used are the Markers
+    affected by an Attribute in the level, but not affected by any
+    Attribute in a deeper level. If no such Markers exist, all
+    Markers affected by the level's Attributes are used.
+
+    :param mkr_list: Tuple of marker node, camera shape node and
+                     bundle node in a list; each list of nodes
+                     represent a single Marker relationship and will
+                     be considered in grouping.
+    :type mkr_list: [(str, str, str), ..]
+
+    :param attr_list: Maya attributes to consider in grouping, in the
+                      familiar 'node.attr' string representation.
+    :type attr_list: [str, ..]
+
+    :returns: List of Marker and Attribute lists, one pair of lists
+              per hierarchy level, ordered from the root level
+              downwards. The values in the lists are the same values
+              given in mkr_list and attr_list. Levels without any
+              Markers are skipped.
+    :rtype: [([(str, str, str), ..], [str, ..]), ..]
     """
-    pass
+    if len(mkr_list) == 0 or len(attr_list) == 0:
+        return []
+
+    # Find the owner node of each attribute.
+    full_attr_list = [_get_full_path_plug(x) for x in attr_list]
+    attr_owners = []
+    owner_nodes = []
+    owner_attrs = {}
+    for attr_name in full_attr_list:
+        node = attr_name.partition('.')[0]
+        owner = _get_hierarchy_owner_node(node)
+        attr_owners.append(owner)
+        if owner is None:
+            continue
+        if owner not in owner_attrs:
+            owner_nodes.append(owner)
+            owner_attrs[owner] = set()
+        owner_attrs[owner].add(attr_name)
+
+    levels = _compute_hierarchy_levels(owner_nodes, owner_attrs)
+    attr_levels = []
+    for owner in attr_owners:
+        level = 0
+        if owner is not None:
+            level = levels[owner]
+        attr_levels.append(level)
+
+    # The levels of attributes affecting each marker.
+    mkr_attr_levels = []
+    for mkr in mkr_list:
+        mkr_node = mkr[0]
+        cam_tfm = _get_hierarchy_owner_node(mkr[1])
+        bnd_node = mkr[2]
+        mkr_plugs = find_plugs_affecting_transform(mkr_node, cam_tfm)
+        bnd_plugs = find_plugs_affecting_transform(bnd_node, None)
+        plugs = mkr_plugs.union(bnd_plugs)
+        mkr_levels = set()
+        for attr_name, level in zip(full_attr_list, attr_levels):
+            if attr_name in plugs:
+                mkr_levels.add(level)
+        mkr_attr_levels.append(mkr_levels)
+
+    groups = []
+    for level in sorted(set(attr_levels)):
+        level_attr_list = [
+            attr for attr, attr_level in zip(attr_list, attr_levels)
+            if attr_level == level]
+        affected_mkr_list = []
+        level_mkr_list = []
+        for mkr, mkr_levels in zip(mkr_list, mkr_attr_levels):
+            if level not in mkr_levels:
+                continue
+            affected_mkr_list.append(mkr)
+            if max(mkr_levels) == level:
+                level_mkr_list.append(mkr)
+        if len(level_mkr_list) == 0:
+            level_mkr_list = affected_mkr_list
+        if len(level_mkr_list) == 0:
+            LOG.warning(
+                'No markers found affecting hierarchy level; level=%r',
+                level)
+            continue
+        groups.append((level_mkr_list, level_attr_list))
+    return groups
@@ -17,6 +17,11 @@
 #
 """
 Raytracing functions.
+
+The Maya mesh function sets and intersection acceleration structures
+(uniform grids) used for ray casting are cached per mesh, and re-used
+until the mesh (or a parent transform) is changed. Many rays may be
+cast at once with :py:func:`closest_intersect_many`.
 """
 
 import maya.OpenMaya as OpenMaya
@@ -25,6 +30,147 @@ import mmSolver.utils.constant as const
 
 LOG = mmSolver.logger.get_logger()
 
+__CACHE = dict()
+__CALLBACK_IDS = []
+
+
+class _MeshIntersector(object):
+    """
+    A mesh function set and intersection acceleration parameters,
+    re-built when the mesh is changed.
+    """
+
+    def __init__(self, dag):
+        self.dag = OpenMaya.MDagPath(dag)
+        self.handle = OpenMaya.MObjectHandle(dag.node())
+        self.mesh_fn = None
+        self.accel_params = None
+        self.dirty = True
+        self.callback_id = None
+
+    def is_valid(self):
+        return self.handle.isValid() and self.dag.isValid()
+
+    def free(self):
+        if self.callback_id is not None:
+            OpenMaya.MMessage.removeCallback(self.callback_id)
+            self.callback_id = None
+        if self.mesh_fn is not None and self.handle.isValid():
+            self.mesh_fn.freeCachedIntersectionAccelerator()
+        self.mesh_fn = None
+        self.accel_params = None
+        self.dirty = True
+
+    def get(self):
+        if self.dirty is True:
+            if self.mesh_fn is not None:
+                self.mesh_fn.freeCachedIntersectionAccelerator()
+            self.mesh_fn = OpenMaya.MFnMesh(self.dag)
+            self.accel_params = self.mesh_fn.autoUniformGridParams()
+            self.dirty = False
+        return self.mesh_fn, self.accel_params
+
+
+def _mesh_dirty_callback(*args):
+    """
+    Mark the cached intersection data of a mesh as out of date.
+
+    The last argument is the cache key of the mesh.
+    """
+    intersector = __CACHE.get(args[-1])
+    if intersector is not None:
+        intersector.dirty = True
+    return
+
+
+def clear_raytrace_cache(*args):
+    """
+    Remove all cached mesh intersection data.
+
+    This function may be used directly as a Maya callback function;
+    all arguments are ignored.
+    """
+    global __CACHE
+    for intersector in __CACHE.values():
+        intersector.free()
+    __CACHE = dict()
+    return
+
+
+def _add_scene_callbacks():
+    """
+    Add Maya callbacks to clear the cache when the scene changes.
+
+    :returns: True if the callbacks exist, False otherwise.
+    :rtype: bool
+    """
+    global __CALLBACK_IDS
+    if len(__CALLBACK_IDS) > 0:
+        return True
+    func = clear_raytrace_cache
+    callback_ids = []
+    try:
+        msgs = [
+            OpenMaya.MSceneMessage.kBeforeNew,
+            OpenMaya.MSceneMessage.kBeforeOpen,
+        ]
+        for msg in msgs:
+            callback_ids.append(
+                OpenMaya.MSceneMessage.addCallback(msg, func))
+    except RuntimeError:
+        LOG.warning('Could not add raytrace cache callbacks.')
+        for callback_id in callback_ids:
+            OpenMaya.MMessage.removeCallback(callback_id)
+        return False
+    __CALLBACK_IDS = callback_ids
+    return True
+
+
+def _get_mesh_intersectors(mesh_nodes):
+    """
+    Get the (cached) mesh function set and acceleration parameters
+    for each mesh node.
+
+    :param mesh_nodes: Mesh nodes.
+    :type mesh_nodes: [str, ..]
+
+    :returns: Mesh function set and acceleration parameters of each
+              mesh. If the cache cannot be used, the acceleration
+              parameters are None.
+    :rtype: [(maya.OpenMaya.MFnMesh,
+              maya.OpenMaya.MMeshIsectAccelParams or None), ..]
+    """
+    use_cache = _add_scene_callbacks()
+    sel = OpenMaya.MSelectionList()
+    for mesh in mesh_nodes:
+        sel.add(mesh)
+
+    result = []
+    for i in range(sel.length()):
+        dag = OpenMaya.MDagPath()
+        sel.getDagPath(i, dag)
+        if use_cache is False:
+            result.append((OpenMaya.MFnMesh(dag), None))
+            continue
+
+        key = dag.fullPathName()
+        intersector = __CACHE.get(key)
+        if intersector is not None and intersector.is_valid() is False:
+            intersector.free()
+            intersector = None
+        if intersector is None:
+            intersector = _MeshIntersector(dag)
+            try:
+                intersector.callback_id = \
+                    OpenMaya.MNodeMessage.addNodeDirtyCallback(
+                        dag.node(), _mesh_dirty_callback, key)
+            except RuntimeError:
+                result.append((OpenMaya.MFnMesh(dag), None))
+                continue
+            __CACHE[key] = intersector
+        result.append(intersector.get())
+    return result
+
 
 def closest_intersect(source,
                       direction,
@@ -64,53 +210,101 @@ def closest_intersect(source,
     assert isinstance(mesh_nodes, (list, tuple))
     assert len(source) >= 3
     assert len(direction) >= 3
+    if len(mesh_nodes) == 0:
+        LOG.warning('No mesh objects found in the scene')
+        return
+    hit_points = closest_intersect_many(
+        [source], [direction], mesh_nodes,
+        test_both_directions=test_both_directions,
+        max_dist=max_dist,
+        tolerance=tolerance)
+    return hit_points[0]
+
+
+def closest_intersect_many(sources,
+                           directions,
+                           mesh_nodes,
+                           test_both_directions=False,
+                           max_dist=None,
+                           tolerance=None):
+    """
+    Get the closest intersection point on meshes for many rays.
+
+    Each ray has the same result as :py:func:`closest_intersect`, but
+    the meshes are looked up once for all rays, and the intersection
+    acceleration structure of each mesh is re-used.
+
+    :param sources: Origin point of each ray.
+    :type sources: [[float, float, float], ..]
+
+    :param directions: The direction each ray will travel.
+    :type directions: [[float, float, float], ..]
+
+    :param mesh_nodes: Mesh nodes
+    :type mesh_nodes: [str, ..]
+
+    :param test_both_directions: testing ray direction both sides;
+                                 default is False.
+    :type test_both_directions: bool
+
+    :param max_dist: The maximum distance the rays will travel before
+                     stopping; default is RAYTRACE_MAX_DIST.
+    :type max_dist: float
+
+    :param tolerance: The minimum ray trace tolerance; default is
+                      RAYTRACE_EPSILON.
+    :type tolerance: float
+
+    :return: The closest world space intersection of each ray, over
+             all mesh nodes given, or None if no point was found.
+    :rtype: [maya.OpenMaya.MFloatPoint or None, ..]
+    """
+    assert isinstance(mesh_nodes, (list, tuple))
+    assert len(sources) == len(directions)
     if max_dist is None:
         max_dist = const.RAYTRACE_MAX_DIST
     if tolerance is None:
         tolerance = const.RAYTRACE_EPSILON
     if len(mesh_nodes) == 0:
         LOG.warning('No mesh objects found in the scene')
-        return
+        return [None] * len(sources)
 
-    source_pt = OpenMaya.MFloatPoint(source[0], source[1], source[2])
-    direction_vec = OpenMaya.MFloatVector(*direction)
+    intersectors = _get_mesh_intersectors(mesh_nodes)
+    closest_points = []
+    for source, direction in zip(sources, directions):
+        assert len(source) >= 3
+        assert len(direction) >= 3
+        source_pt = OpenMaya.MFloatPoint(source[0], source[1], source[2])
+        direction_vec = OpenMaya.MFloatVector(
+            direction[0], direction[1], direction[2])
 
-    hit_points = []
-    for mesh in mesh_nodes:
-        sel = OpenMaya.MSelectionList()
-        dag = OpenMaya.MDagPath()
-        sel.add(mesh)
-        sel.getDagPath(0, dag)
-        mesh_fn = OpenMaya.MFnMesh(dag)
-        hit_pt = OpenMaya.MFloatPoint()
-        hit = mesh_fn.closestIntersection(
-            source_pt,
-            direction_vec,
-            None,
-            None,
-            False,
-            OpenMaya.MSpace.kWorld,
-            max_dist,
-            test_both_directions,
-            None,
-            hit_pt,
-            None,
-            None,
-            None,
-            None,
-            None,
-            tolerance)
-        if hit is True:
-            hit_points.append(hit_pt)
-
-    # Get the closest hit point.
-    closest_point = None
-    min_dist = max_dist
-    for point in hit_points:
-        dist = source_pt.distanceTo(point)
-        if dist < min_dist:
-            min_dist = dist
-            closest_point = point
-    assert closest_point is None or isinstance(closest_point,
-                                               OpenMaya.MFloatPoint)
-    return closest_point
+        # Get the closest hit point.
+        closest_point = None
+        min_dist = max_dist
+        for mesh_fn, accel_params in intersectors:
+            hit_pt = OpenMaya.MFloatPoint()
+            hit = mesh_fn.closestIntersection(
+                source_pt,
+                direction_vec,
+                None,
+                None,
+                False,
+                OpenMaya.MSpace.kWorld,
+                max_dist,
+                test_both_directions,
+                accel_params,
+                hit_pt,
+                None,
+                None,
+                None,
+                None,
+                None,
+                tolerance)
+            if hit is not True:
+                continue
+            dist = source_pt.distanceTo(hit_pt)
+            if dist < min_dist:
+                min_dist = dist
+                closest_point = hit_pt
+        closest_points.append(closest_point)
+    return closest_points
@@ -60,6 +60,18 @@ if sys.version_info[0] == 2:
     range = xrange
 
 
+# Gaussian weights smaller than this (relative to the largest weight)
+# are ignored.
+GAUSSIAN_KERNEL_TOLERANCE = 1e-12
+
+_GAUSSIAN_KERNEL_CACHE = {}
+_WINDOW_CACHE = {}
+
+# Windows up to this size are convolved directly, rather than with an
+# FFT.
+DIRECT_CONVOLVE_MAX_WINDOW = 64
+
+
 def smooth(smooth_type, value_array, width):
     """
     Run a Smoothing function, of any type, just pass a 'smooth type' in.
@@ -93,13 +105,117 @@ def smooth(smooth_type, value_array, width):
     return new_array
 
 
+def _average_smooth_raw(value_array, sigma_val):
+    """
+    Average smooth, using a running sum, in O(N) time.
+
+    Uses standard python functions only.
+    """
+    value_num = len(value_array)
+    prefix_sum = [0.0] * (value_num + 1)
+    total = 0.0
+    for i in range(value_num):
+        total += value_array[i]
+        prefix_sum[i + 1] = total
+
+    new_array = [0.0] * value_num
+    for i in range(value_num):
+        start = int(i-sigma_val)
+        end = int(i+sigma_val)+1
+        if start < 0:
+            start = 0
+        if end >= value_num:
+            end = value_num
+        new_array[i] = (prefix_sum[end] - prefix_sum[start]) / (end-start)
+    return new_array
+
+
+def _average_smooth_numpy(value_arrays, sigma_val):
+    """
+    Average smooth many equal-length arrays, using a running sum.
+
+    Uses the numpy module.
+    """
+    assert np is not None
+    values = np.asarray(value_arrays, dtype=np.float64)
+    value_num = values.shape[1]
+    prefix_sum = np.zeros((values.shape[0], value_num + 1))
+    np.cumsum(values, axis=1, out=prefix_sum[:, 1:])
+
+    index = np.arange(value_num)
+    start = np.clip((index - sigma_val).astype(np.int64), 0, value_num)
+    end = np.clip((index + sigma_val).astype(np.int64) + 1, 0, value_num)
+    return (prefix_sum[:, end] - prefix_sum[:, start]) / (end - start)
+
+
+def smooth_many(smooth_type, value_arrays, width):
+    """
+    Run a Smoothing function on many arrays of values.
+
+    Set-up work (such as Gaussian kernels, normalisation weights and
+    transformed Fourier windows) is shared between all the arrays.
+    When numpy is available, arrays of equal length are smoothed
+    together.
+
+    :param smooth_type: Type of smoothing operation.
+    :type smooth_type: SMOOTH_TYPE_*
+
+    :param value_arrays: Input data to smooth.
+    :type value_arrays: [[float, ..], ..]
+
+    :param width: The width to smooth over. Values above 1.0 will
+                  perform smoothing. 1.0 or below has no effect.
+    :type width: float
+
+    :returns: Smoothed copies of the arrays in 'value_arrays'.
+    :rtype: [[float, ..], ..]
+    """
+    if smooth_type not in const.SMOOTH_TYPES:
+        msg = (
+            'smoothType argument is invalid, '
+            'must be SMOOTH_TYPE_* attribute'
+        )
+        raise ValueError(msg)
+    new_arrays = [None] * len(value_arrays)
+
+    # Group arrays by length.
+    groups = {}
+    for i, value_array in enumerate(value_arrays):
+        groups.setdefault(len(value_array), []).append(i)
+
+    for value_num, indices in groups.items():
+        arrays = [value_arrays[i] for i in indices]
+        if smooth_type == const.SMOOTH_TYPE_AVERAGE:
+            sigma_val = width - 1.0
+            if sigma_val <= 0.0 or value_num == 0:
+                results = arrays
+            elif np is not None:
+                results = _average_smooth_numpy(arrays, sigma_val).tolist()
+            else:
+                results = [_average_smooth_raw(a, sigma_val) for a in arrays]
+        elif smooth_type == const.SMOOTH_TYPE_GAUSSIAN:
+            sigma_val = (width - 1.0) * 0.5
+            if sigma_val <= 0.0 or value_num == 0:
+                results = arrays
+            elif np is not None:
+                results = _gaussian_smooth_numpy(arrays, sigma_val).tolist()
+            else:
+                results = _gaussian_smooth_raw(arrays, sigma_val)
+        elif np is not None:
+            results = [fourier_smooth(a, width) for a in arrays]
+        else:
+            results = _fourier_smooth_raw_many(arrays, width)
+        for i, result in zip(indices, results):
+            new_arrays[i] = result
+    return new_arrays
+
+
 def average_smooth(value_array, width):
     """
     Average Smooth Function
 
-    .. note::
-
-        Uses standard python functions only.
+    Each value is the average of the values within 'width - 1' of the
+    value. Uses numpy, if available.
 
     :param value_array: Input data to smooth.
     :type value_array: [float, ..]
@@ -115,29 +231,10 @@ def average_smooth(value_array, width):
     if sigma_val <= 0.0:
         return value_array
 
-    # Smooth Function
-    value_num = len(value_array)
-    sum_avg = 0.0
-    new_array = [0.0] * value_num
-    weights = [1.0] * value_num
-    for i in range(value_num):
-
-        # Get Average
-        start = int(i-sigma_val)
-        end = int(i+sigma_val)+1
-        if start < 0:
-            start = 0
-        if end >= value_num:
-            end = value_num
-        for j in range(start, end):
-            sum_avg = sum_avg + value_array[j]
-        sum_avg = sum_avg/(end-start)
-
-        for k in range(value_num):
-            new_array[i] = ((sum_avg * weights[i]) +
-                            (value_array[i] * (1.0 - weights[i])))
-        sum_avg = 0
-
+    if np is not None and len(value_array) > 0:
+        new_array = _average_smooth_numpy([value_array], sigma_val)[0].tolist()
+    else:
+        new_array = _average_smooth_raw(value_array, sigma_val)
     assert len(value_array) == len(new_array)
     return new_array
 
@@ -160,13 +257,92 @@ def _gaussian(sig, x, mu):
     return math.exp(-(math.pow((x - mu), 2) / (2 * (math.pow(sig, 2)))))
 
 
+def _get_gaussian_kernel(sigma_val):
+    """
+    Get the weights of a (half) Gaussian kernel, from the centre
+    outwards.
+
+    Weights smaller than GAUSSIAN_KERNEL_TOLERANCE (relative to the
+    centre weight) are not included. Kernels are cached by sigma.
+
+    :param sigma_val: Sigma value (the width)
+    :type sigma_val: float
+
+    :rtype: (float, ..)
+    """
+    kernel = _GAUSSIAN_KERNEL_CACHE.get(sigma_val)
+    if kernel is not None:
+        return kernel
+    radius = int(math.ceil(
+        sigma_val * math.sqrt(-2.0 * math.log(GAUSSIAN_KERNEL_TOLERANCE))))
+    kernel = tuple(_gaussian(sigma_val, i, 0) for i in range(radius + 1))
+    _GAUSSIAN_KERNEL_CACHE[sigma_val] = kernel
+    return kernel
+
+
+def _gaussian_smooth_raw(value_arrays, sigma_val):
+    """
+    Gaussian smooth many equal-length arrays.
+
+    Uses standard python functions only.
+    """
+    value_num = len(value_arrays[0])
+    kernel = _get_gaussian_kernel(sigma_val)
+    radius = min(len(kernel) - 1, value_num - 1)
+
+    # The normalisation of the weights only depends on the position,
+    # and is shared by all arrays.
+    ranges = [None] * value_num
+    for i in range(value_num):
+        start = max(0, i - radius)
+        end = min(value_num, i + radius + 1)
+        weights = [kernel[abs(j - i)] for j in range(start, end)]
+        weight_sum = math.fsum(weights)
+        weights = [w / weight_sum for w in weights]
+        ranges[i] = (start, end, weights)
+
+    new_arrays = []
+    for value_array in value_arrays:
+        new_array = [0.0] * value_num
+        for i, (start, end, weights) in enumerate(ranges):
+            total = 0.0
+            for value, weight in zip(value_array[start:end], weights):
+                total += value * weight
+            new_array[i] = total
+        new_arrays.append(new_array)
+    return new_arrays
+
+
+def _gaussian_smooth_numpy(value_arrays, sigma_val):
+    """
+    Gaussian smooth many equal-length arrays.
+
+    Uses the numpy module.
+    """
+    assert np is not None
+    values = np.asarray(value_arrays, dtype=np.float64)
+    value_num = values.shape[1]
+    kernel = _get_gaussian_kernel(sigma_val)
+    radius = min(len(kernel) - 1, value_num - 1)
+    half = np.array(kernel[:radius + 1])
+    full = np.r_[half[:0:-1], half]
+    # The kernel may be longer than the values, so 'full' convolution
+    # is trimmed, rather than using the 'same' mode.
+    end = radius + value_num
+    norm = np.convolve(np.ones(value_num), full, mode='full')[radius:end]
+    new_values = np.empty_like(values)
+    for i in range(values.shape[0]):
+        x = np.convolve(values[i], full, mode='full')[radius:end]
+        new_values[i] = x / norm
+    return new_values
+
+
 def gaussian_smooth(value_array, width):
     """
     Gaussian Smooth Function.
 
-    .. note::
-
-        Uses standard python functions only.
+    Uses a cached Gaussian kernel, truncated where the weights no longer
+    affect the result, and numpy if available.
 
     :param value_array: Input data to smooth.
     :type value_array: [float, ..]
@@ -181,23 +357,13 @@ def gaussian_smooth(value_array, width):
     sigma_val = (width-1.0)*0.5
     if sigma_val <= 0.0:
         return value_array
+    if len(value_array) == 0:
+        return []
 
-    value_num = len(value_array)
-
-    # Smooth Function
-    sum_gaussian = 0.0
-    tmp_gaussian = [None] * value_num
-    new_array = [0.0] * value_num
-    for i in range(value_num):
-
-        for j in range(value_num):
-            tmp_gaussian[j] = _gaussian(sigma_val, i, j)
-            sum_gaussian = sum_gaussian + tmp_gaussian[j]
-        for k in range(value_num):
-            new_array[i] = new_array[i] + (value_array[k] * (tmp_gaussian[k] / sum_gaussian))
-
-        sum_gaussian = 0
-
+    if np is not None:
+        new_array = _gaussian_smooth_numpy([value_array], sigma_val)[0].tolist()
+    else:
+        new_array = _gaussian_smooth_raw([value_array], sigma_val)[0]
     assert len(value_array) == len(new_array)
     return new_array
 
@@ -229,7 +395,7 @@ def _generate_window_raw(n, filtr=None):
             window[i] = _gaussian(mean, i, std)
 
     elif filtr == 'triangle':
-        half_n = (n - 1) / 2
+        half_n = (n - 1) // 2
         # Middle index number
         window[half_n] = n
 
@@ -259,9 +425,27 @@ def _generate_window_raw(n, filtr=None):
     return window
 
 
-def _fft_convolve_raw(signal, window):
+def _get_window_raw(n, filtr=None):
+    """
+    Get a "window" array used for convolving, from a cache.
+
+    See :py:func:`_generate_window_raw`.
+
+    :rtype: (float, ..)
+    """
+    key = (n, filtr)
+    window = _WINDOW_CACHE.get(key)
+    if window is None:
+        window = tuple(_generate_window_raw(n, filtr=filtr))
+        _WINDOW_CACHE[key] = window
+    return window
+
+
+def _direct_convolve_raw(signal, window):
     """
-    Perform convolution.
+    Perform convolution directly, in 'valid' mode.
+
+    This is faster than an FFT convolution for small windows.
 
     Uses standard python functions only.
 
@@ -275,26 +459,50 @@ def _fft_convolve_raw(signal, window):
     """
     m = len(signal)
     n = len(window)
-    length = max(m, n) - min(m, n) + 1  # 'valid' mode
+    reverse_window = list(reversed(window))
+    r = [0.0] * (m - n + 1)
+    for i in range(m - n + 1):
+        total = 0.0
+        for value, weight in zip(signal[i:i + n], reverse_window):
+            total += value * weight
+        r[i] = total
+    return r
 
-    # zero pad the window
-    tmp = [0.0] * len(signal)
-    tmp[:len(window)] = window
-    window = tmp
 
-    r = fft.convolve(signal, window)  # , realoutput=True
-    r = r[(min(m, n)-1):]
-    return r
+def _fft_convolve_raw(signals, window):
+    """
+    Perform convolution of many equal-length signals, in 'valid' mode.
 
+    The window is transformed once and shared by all signals.
 
-def _fourier_smooth_raw(data, width, filtr=None):
+    Uses standard python functions only.
+
+    :param signals: The input signals to be convolved.
+    :type signals: [[float, ..], ..]
+
+    :param window: The window to be multiplied over each value in
+                   each signal.
+    :type window: [float, ..]
+
+    :returns: Modified copies of 'signals'.
     """
-    Fourier smoothing.
+    n = len(window)
+    if n <= DIRECT_CONVOLVE_MAX_WINDOW:
+        return [_direct_convolve_raw(s, window) for s in signals]
+    result = []
+    for r, signal in zip(fft.convolve_many(signals, window), signals):
+        result.append(r[n - 1:len(signal)])
+    return result
+
+
+def _fourier_smooth_raw_many(value_arrays, width, filtr=None):
+    """
+    Fourier smoothing of many equal-length arrays.
 
     Uses standard python functions only.
 
-    :param data: Input data to smooth.
-    :type data: [float, ..]
+    :param value_arrays: Input data to smooth.
+    :type value_arrays: [[float, ..], ..]
 
     :param width: The width to smooth over. Values above 1.0 will perform
                   smoothing. 1.0 or below has no effect.
@@ -304,11 +512,11 @@ def _fourier_smooth_raw(data, width, filtr=None):
                   'triangle' or 'box'. Default filter is 'gaussian'.
     :type filtr: str
 
-    :returns: Smoothed copy of 'data'.
+    :returns: Smoothed copies of 'value_arrays'.
     """
     sigma_val = (width-1.0)*0.5
     if sigma_val <= 0.0:
-        return data
+        return value_arrays
 
     # Value must always be odd number.
     # 1 = 0
@@ -316,27 +524,44 @@ def _fourier_smooth_raw(data, width, filtr=None):
     # 3 = 5
     n = ((int(width) - 1) * 2) + 1  # number of 'frames' to smooth by.
 
-    # Convert to frequency space.
-    x = fft.transform(data, inverse=False)
-    assert len(x) == len(data)
-
     # Generate Smoothing Window
-    window = _generate_window_raw(n, filtr=filtr)
+    window = _get_window_raw(n, filtr=filtr)
 
     # Custom Convolve ('valid')
-    s = data[n-1:0:-1]
-    s += data
-    s += data[-2:-n-1:-1]
-    x = _fft_convolve_raw(s, window)
-    if n % 2 == 1:
-        # n is odd
-        x = x[n/2:-(n/2)]
-    else:
-        # n is even
-        x = x[(n/2)-1:-(n/2)]
+    signals = []
+    for data in value_arrays:
+        data = list(data)
+        s = data[n-1:0:-1]
+        s += data
+        s += data[-2:-n-1:-1]
+        signals.append(s)
+    new_arrays = []
+    for data, x in zip(value_arrays, _fft_convolve_raw(signals, window)):
+        if n % 2 == 1:
+            # n is odd
+            x = x[n//2:-(n//2)]
+        else:
+            # n is even
+            x = x[(n//2)-1:-(n//2)]
+        assert len(x) == len(data)
+        new_arrays.append(x)
+    return new_arrays
 
-    assert len(x) == len(data)
-    return x
+
+def _fourier_smooth_raw(data, width, filtr=None):
+    """
+    Fourier smoothing.
+
+    Uses standard python functions only.
+
+    See :py:func:`_fourier_smooth_raw_many` for details.
+
+    :returns: Smoothed copy of 'data'.
+    """
+    sigma_val = (width-1.0)*0.5
+    if sigma_val <= 0.0:
+        return data
+    return _fourier_smooth_raw_many([data], width, filtr=filtr)[0]
 
 
 def _generate_window_numpy(n, filtr=None):
@@ -367,7 +592,7 @@ def _generate_window_numpy(n, filtr=None):
             window[i] = _gaussian(mean, i, std)
 
     elif filtr == 'triangle':
-        half_n = (n - 1) / 2
+        half_n = (n - 1) // 2
         # Middle index number
         window[half_n] = n
 
@@ -420,10 +645,7 @@ def _fourier_smooth_numpy(data, width, filtr=None):
     # 3 = 5
     n = ((int(width) - 1) * 2) + 1  # number of 'frames' to smooth by.
 
-    # Convert to frequency space.
     data = np.array(data)
-    x = np.fft.fft(data)
-    assert len(x) == len(data)
 
     # Generate Smoothing Window
     window = _generate_window_numpy(n, filtr=filtr)
@@ -433,10 +655,10 @@ def _fourier_smooth_numpy(data, width, filtr=None):
     x = np.convolve(s, window, mode='valid')
     if n % 2 == 1:
         # n is odd
-        x = x[n/2:-(n/2)]
+        x = x[n//2:-(n//2)]
     else:
         # n is even
-        x = x[(n/2)-1:-(n/2)]
+        x = x[(n//2)-1:-(n//2)]
 
     assert len(x) == len(data)
     return x
@@ -31,14 +31,17 @@ Features:
 """
 
 import math
+import array
 
 import maya.cmds
 import maya.debug
+import maya.OpenMayaAnim as OpenMayaAnim1
 import maya.api.OpenMaya as OpenMaya2
 
 import mmSolver.logger
 import mmSolver.utils.node as node_utils
 import mmSolver.utils.animcurve as animcurve_utils
+import mmSolver.utils.undo as undo_utils
 import mmSolver.utils.constant as const
 
 
@@ -50,6 +53,16 @@ ROTATE_ORDER_STR_TO_APITWO_CONSTANT = {
     'zxy': OpenMaya2.MTransformationMatrix.kZXY,
     'zyx': OpenMaya2.MTransformationMatrix.kZYX
 }
+TRANSFORM_ATTRS = [
+    'translateX', 'translateY', 'translateZ',
+    'rotateX', 'rotateY', 'rotateZ',
+    'scaleX', 'scaleY', 'scaleZ'
+]
+
+# The largest difference between key values of an animCurve that is
+# considered static (in internal units; centimeters and radians).
+STATIC_CURVE_TOLERANCE = 0.000001
+
 LOG = mmSolver.logger.get_logger()
 
 
@@ -323,10 +336,73 @@ class TransformNode(object):
         return parent_tfm_nodes
 
 
+def _get_attr_value_size(attr_name):
+    """
+    Get the number of floating point numbers used to store a value of
+    the attribute name in a TransformMatrixCache.
+
+    :returns: 16 for matrix attributes, 1 for rotate pivot attributes,
+              or None if the attribute is not supported.
+    :rtype: int or None
+    """
+    name = attr_name.lower()
+    if 'matrix' in name:
+        return 16
+    elif 'rotatepivot' in name:
+        return 1
+    return None
+
+
+class _TimeValueArray(object):
+    """
+    Values of a single node attribute across time, stored compactly.
+
+    Values are stored in one contiguous array of doubles, with 'size'
+    numbers per time, and a map from time to row in the array.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.index = dict()
+        self.values = array.array('d')
+        self.evaluated = array.array('B')
+
+    def add_times(self, times):
+        for t in times:
+            if t in self.index:
+                continue
+            self.index[t] = len(self.evaluated)
+            self.evaluated.append(0)
+        self.values.extend([0.0] * (len(self.evaluated) * self.size
+                                    - len(self.values)))
+        return
+
+    def set_value(self, row, value):
+        start = row * self.size
+        if self.size == 1:
+            self.values[start] = value
+        else:
+            self.values[start:start + self.size] = array.array('d', value)
+        self.evaluated[row] = 1
+        return
+
+    def get_value(self, t):
+        row = self.index.get(t)
+        if row is None or self.evaluated[row] == 0:
+            return None
+        start = row * self.size
+        if self.size == 1:
+            return self.values[start]
+        return self.values[start:start + self.size]
+
+
 class TransformMatrixCache(object):
     """
     Hold a list of matrix node/values to be queried and stored in the object.
 
+    The values of each node attribute are stored in a contiguous array
+    of doubles (16 per matrix), indexed by time.
+
     >>> tfm_node = TransformNode(node='myNode')
     >>> times = list(range(1001, 1101))
     >>> tfm_matrix_cache = TransformMatrixCache()
@@ -397,9 +473,9 @@ class TransformMatrixCache(object):
         if uuid not in self._data:
             self._data[uuid] = dict()
         if attr_name not in self._data[uuid]:
-            self._data[uuid][attr_name] = dict()
-        for t in times:
-            self._data[uuid][attr_name][t] = None
+            size = _get_attr_value_size(attr_name)
+            self._data[uuid][attr_name] = _TimeValueArray(size or 0)
+        self._data[uuid][attr_name].add_times(times)
         return
 
     def get_nodes(self):
@@ -416,72 +492,64 @@ class TransformMatrixCache(object):
                 tfm_nodes.append(node)
         return tfm_nodes
 
-    def __get_times_and_nodes(self):
-        """Get times and nodes."""
-        times = []
-        map_uuid_to_node = dict()
+    def __get_schedule(self):
+        """
+        Get the node attributes to be evaluated at each time.
+
+        Each time is listed once, with all node attributes that need a
+        value at that time, so the times can be swept only once for
+        all nodes.
+
+        :returns: List of times, and the node attributes to evaluate at
+                  each time; (values, row, plug, plug_name, is_matrix).
+        :rtype: [(float, [(_TimeValueArray, int, MPlug, str, bool), ..]), ..]
+        """
+        schedule = dict()
         for uuid in self._data.keys():
             node = maya.cmds.ls(uuid, long=True)[0]
-            map_uuid_to_node[uuid] = dict()
-            for attr_name in self._data[uuid].keys():
+            for attr_name, values in self._data[uuid].items():
+                if values.size == 0:
+                    msg = 'Attribute name is not supported; attr_name=%r'
+                    raise ValueError(msg % attr_name)
                 plug_name = node + '.' + attr_name
                 plug = node_utils.get_as_plug_apitwo(plug_name)
                 assert plug is not None
-                map_uuid_to_node[uuid][attr_name] = plug
-                data = self._data.get(uuid, dict())
-                data = data.get(attr_name, dict())
-                times += data
-        times = list(set(times))
-        times = list(sorted(times))
-        return times, map_uuid_to_node
-
-    def __get_process_list(self, map_uuid_to_node):
-        data = []
-        for uuid in self._data.keys():
-            d = self._data.get(uuid, dict())
-            for attr_name in d.keys():
-                d2 = map_uuid_to_node.get(uuid, dict())
-                plug = d2.get(attr_name, dict())
-                plug_name = plug.name()
-                data.append((uuid, attr_name, plug, plug_name))
-        return data
-
-    def __process_with_getattr(self, map_uuid_to_node, time):
+                is_matrix = values.size == 16
+                for t, row in values.index.items():
+                    item = (values, row, plug, plug_name, is_matrix)
+                    schedule.setdefault(t, []).append(item)
+        return list(sorted(schedule.items()))
+
+    @staticmethod
+    def __process_with_getattr(time, items):
         """Process the TransformMatrixCache, with getAttr functions."""
         maya.cmds.currentTime(time, update=True)
-        process_list = self.__get_process_list(map_uuid_to_node)
-        for uuid, attr_name, plug, plug_name in process_list:
-            if 'matrix' in attr_name.lower():
-                matrix = maya.cmds.getAttr(plug_name)
-                matrix = OpenMaya2.MMatrix(matrix)
-                self._data[uuid][attr_name][time] = matrix
-            elif 'rotatepivot' in attr_name.lower():
-                value = maya.cmds.getAttr(plug_name)
-                self._data[uuid][attr_name][time] = value
-            else:
-                msg = 'Attribute name is not supported; attr_name=%r'
-                raise ValueError(msg % attr_name)
+        for values, row, plug, plug_name, is_matrix in items:
+            values.set_value(row, maya.cmds.getAttr(plug_name))
         return
 
-    def __process_with_api(self, map_uuid_to_node, time, ctx):
+    @staticmethod
+    def __process_with_api(time, items):
         """Process the TransformMatrixCache, with API functions. """
-        process_list = self.__get_process_list(map_uuid_to_node)
-        for uuid, attr_name, plug, plug_name in process_list:
-            if 'matrix' in attr_name.lower():
-                matrix = get_matrix_from_plug_apitwo(plug, ctx)
-                self._data[uuid][attr_name][time] = matrix
-            elif 'rotatepivot' in attr_name.lower():
-                value = get_double_from_plug_apitwo(plug, ctx)
-                self._data[uuid][attr_name][time] = value
+        ctx = create_dg_context_apitwo(time)
+        for values, row, plug, plug_name, is_matrix in items:
+            if is_matrix is True:
+                mobject = plug.asMObject(ctx)
+                value = OpenMaya2.MFnMatrixData(mobject).matrix()
             else:
-                msg = 'Attribute name is not supported; attr_name=%r'
-                raise ValueError(msg % attr_name)
+                value = plug.asDouble(ctx)
+            values.set_value(row, value)
         return
 
     def process(self, eval_mode=None):
         """
         Evaluate all the node attributes at times.
 
+        Each time is visited once, evaluating all nodes needing a
+        value at that time. With EVAL_MODE_API_DG_CONTEXT the values
+        are queried with a DG Context and the current time is not
+        changed.
+
         :param eval_mode: What type of evaluation method to use?
         :type eval_mode: mmSolver.utils.constant.EVAL_MODE_*
 
@@ -491,23 +559,22 @@ class TransformMatrixCache(object):
             eval_mode = const.EVAL_MODE_DEFAULT
         assert eval_mode in const.EVAL_MODE_LIST
 
-        current_frame = maya.cmds.currentTime(query=True)
-        times, map_uuid_to_node = self.__get_times_and_nodes()
+        schedule = self.__get_schedule()
 
         # Query the matrices, looping over time sequentially.
         if eval_mode == const.EVAL_MODE_TIME_SWITCH_GET_ATTR:
-            for t in times:
-                self.__process_with_getattr(map_uuid_to_node, t)
+            current_frame = maya.cmds.currentTime(query=True)
+            try:
+                for t, items in schedule:
+                    self.__process_with_getattr(t, items)
+            finally:
+                maya.cmds.currentTime(current_frame, update=True)
         elif eval_mode == const.EVAL_MODE_API_DG_CONTEXT:
-            for t in times:
-                ctx = create_dg_context_apitwo(t)
-                self.__process_with_api(map_uuid_to_node, t, ctx)
+            for t, items in schedule:
+                self.__process_with_api(t, items)
         else:
-            msg = 'eval_mode does not have a valid value'
+            msg = 'eval_mode does not have a valid value: %r'
             raise ValueError(msg % eval_mode)
-
-        if eval_mode == const.EVAL_MODE_TIME_SWITCH_GET_ATTR:
-            maya.cmds.currentTime(current_frame, update=True)
         return
 
     def get_attrs_for_node(self, tfm_node):
@@ -552,16 +619,57 @@ class TransformMatrixCache(object):
         if isinstance(tfm_node, TransformNode):
             node_uuid = tfm_node.get_node_uuid()
         node_values = self._data.get(node_uuid, dict())
-        attr_values = node_values.get(attr_name, dict())
-        attr_values = attr_values.copy()
+        attr_values = node_values.get(attr_name)
+        if attr_values is None:
+            return [None] * len(times)
         values = []
         for t in times:
-            v = attr_values.get(t, None)
+            v = attr_values.get_value(t)
+            if v is not None and attr_values.size == 16:
+                v = OpenMaya2.MMatrix(v)
             values.append(v)
         return values
 
     get_node_attr_matrix = get_node_attr
 
+    def get_node_attr_array(self, tfm_node, attr_name, times):
+        """
+        Get the node attribute data, at given times, as a flat array.
+
+        Matrix attributes have 16 numbers per time, other attributes
+        have 1 number per time.
+
+        :param tfm_node: The transform node to query.
+        :type tfm_node: TransformNode or str
+
+        :param attr_name: Name of the attribute (previously added to
+                          the cache).
+        :type attr_name: str
+
+        :param times: The list of times to query from the cache.
+        :type times: [int, ..]
+
+        :returns: Array of values for the times requested, or None if
+                  a value at any of the times is not cached.
+        :rtype: array.array or None
+        """
+        node_uuid = tfm_node
+        if isinstance(tfm_node, TransformNode):
+            node_uuid = tfm_node.get_node_uuid()
+        node_values = self._data.get(node_uuid, dict())
+        attr_values = node_values.get(attr_name)
+        if attr_values is None:
+            return None
+        size = attr_values.size
+        result = array.array('d')
+        for t in times:
+            row = attr_values.index.get(t)
+            if row is None or attr_values.evaluated[row] == 0:
+                return None
+            start = row * size
+            result.extend(attr_values.values[start:start + size])
+        return result
+
 
 def get_transform_matrix_list(tfm_matrix_cache,
                               times,
@@ -675,27 +783,10 @@ def get_transform_matrix_list(tfm_matrix_cache,
             world_mat_list.append(world_mat)
     assert len(world_mat_list) == len(times)
 
-    # Get destination node plug.
-    src_node = src_tfm_node.get_node()
-    src_name = src_node + '.parentInverseMatrix[0]'
-    parent_inv_matrix_plug = node_utils.get_as_plug_apitwo(src_name)
-
     # Get transform
     matrix_list = []
     for t, world_mat in zip(times, world_mat_list):
         assert world_mat is not None
-        par_inv_mat = None
-        if True:
-            maya.cmds.currentTime(t, update=True)
-            plug_name = parent_inv_matrix_plug.name()
-            par_inv_mat = maya.cmds.getAttr(plug_name)
-            par_inv_mat = OpenMaya2.MMatrix(par_inv_mat)
-        else:
-            ctx = create_dg_context_apitwo(t)
-            par_inv_mat = get_matrix_from_plug_apitwo(
-                parent_inv_matrix_plug,
-                ctx
-            )
         local_mat = OpenMaya2.MTransformationMatrix(world_mat)
         local_mat.reorderRotation(rotate_order)
         matrix_list.append(local_mat)
@@ -763,6 +854,12 @@ def set_transform_values(tfm_matrix_cache,
     possible to have src_tfm_node and dst_tfm_node reference the same
     Maya node, or even the same object.
 
+    All the channel values are computed first. If Maya's undo queue is
+    turned off, the keys of each channel are set on the animCurve with
+    a single Maya API call, and existing keys of the channel inside the
+    range of 'times' are replaced. Otherwise the keys are set with
+    'maya.cmds.setKeyframe', so the keys can be undone.
+
     .. note::
        The function assumes the given destination node has no locked
        attributes.
@@ -801,14 +898,8 @@ def set_transform_values(tfm_matrix_cache,
     if eval_mode is None:
         eval_mode = const.EVAL_MODE_DEFAULT
     assert eval_mode in const.EVAL_MODE_LIST
-
-    current_frame = maya.cmds.currentTime(query=True)
-    space = OpenMaya2.MSpace.kWorld
-    attrs = [
-        'translateX', 'translateY', 'translateZ',
-        'rotateX', 'rotateY', 'rotateZ',
-        'scaleX', 'scaleY', 'scaleZ'
-    ]
+    if len(times) == 0:
+        return
 
     dst_node = dst_tfm_node.get_node()
     if rotate_order is None:
@@ -824,11 +915,6 @@ def set_transform_values(tfm_matrix_cache,
     assert rotate_order in const.ROTATE_ORDER_STR_LIST
     rotate_order_api = ROTATE_ORDER_STR_TO_APITWO_CONSTANT[rotate_order]
 
-    # Get destination node plug.
-    dst_node = dst_tfm_node.get_node()
-    dst_name = dst_node + '.parentInverseMatrix[0]'
-    parent_inv_matrix_plug = node_utils.get_as_plug_apitwo(dst_name)
-
     # Query the matrix of nodes.
     world_mat_list = get_transform_matrix_list(
         tfm_matrix_cache,
@@ -837,63 +923,126 @@ def set_transform_values(tfm_matrix_cache,
         rotate_order=rotate_order)
     assert len(world_mat_list) == len(times)
 
-    # Set transform
-    dst_node = dst_tfm_node.get_node()
-    prv_rot = None
-    for t, world_mat in zip(times, world_mat_list):
-        assert t is not None
+    # Query the destination parent inverse matrix, at all times.
+    dst_node_uuid = dst_tfm_node.get_node_uuid()
+    parent_inv_cache = TransformMatrixCache()
+    parent_inv_cache.add_node_attr(
+        dst_node_uuid, 'parentInverseMatrix[0]', times)
+    parent_inv_cache.process(eval_mode=eval_mode)
+    parent_inv_mat_list = parent_inv_cache.get_node_attr(
+        dst_node_uuid, 'parentInverseMatrix[0]', times)
+
+    # Compute all channel values.
+    channel_values = [[0.0] * len(times) for _ in TRANSFORM_ATTRS]
+    for i, (world_mat, parent_inv_mat) in enumerate(
+            zip(world_mat_list, parent_inv_mat_list)):
         assert world_mat is not None
-
-        parent_inv_mat = None
-        if eval_mode == const.EVAL_MODE_API_DG_CONTEXT:
-            ctx = create_dg_context_apitwo(t)
-            parent_inv_mat = get_matrix_from_plug_apitwo(
-                parent_inv_matrix_plug,
-                ctx
-            )
-        elif eval_mode == const.EVAL_MODE_TIME_SWITCH_GET_ATTR:
-            maya.cmds.currentTime(t, update=True)
-            plug_name = parent_inv_matrix_plug.name()
-            parent_inv_mat = maya.cmds.getAttr(plug_name)
-            parent_inv_mat = OpenMaya2.MMatrix(parent_inv_mat)
-        else:
-            msg = 'eval_mode does not have a valid value'
-            raise ValueError(msg % eval_mode)
-
+        assert parent_inv_mat is not None
         local_mat = world_mat.asMatrix() * parent_inv_mat
         local_mat = OpenMaya2.MTransformationMatrix(local_mat)
         local_mat.reorderRotation(rotate_order_api)
+        values = decompose_matrix(local_mat, None)
+        for j, v in enumerate(values):
+            channel_values[j][i] = v
+    for j in range(3, 6):
+        channel_values[j] = animcurve_utils.euler_filter_values(
+            channel_values[j])
+
+    with undo_utils.undo_chunk_context():
+        _set_transform_channel_keys(
+            dst_node, times, channel_values,
+            delete_static_anim_curves=delete_static_anim_curves)
+    return
 
-        # Decompose matrix into components
-        trans = local_mat.translation(space)
-        scl = local_mat.scale(space)
-        rot = local_mat.rotation(asQuaternion=False)
 
-        # Convert and clean rotation values
-        trans = (trans[0], trans[1], trans[2])
-        scl = (scl[0], scl[1], scl[2])
-        rot = (
-            math.degrees(rot[0]),
-            math.degrees(rot[1]),
-            math.degrees(rot[2])
-        )
-        if prv_rot is not None:
-            rot = (
-                animcurve_utils.euler_filter_value(prv_rot[0], rot[0]),
-                animcurve_utils.euler_filter_value(prv_rot[1], rot[1]),
-                animcurve_utils.euler_filter_value(prv_rot[2], rot[2])
-            )
-        prv_rot = rot
-
-        # Set Keyframes
-        values = trans + rot + scl
-        assert len(attrs) == len(values)
-        for attr, v in zip(attrs, values):
-            maya.cmds.setKeyframe(dst_node, attribute=attr, time=t, value=v)
-
-    if delete_static_anim_curves is True:
-        maya.cmds.delete(dst_node, staticChannels=True)
-
-    if eval_mode == const.EVAL_MODE_TIME_SWITCH_GET_ATTR:
-        maya.cmds.currentTime(current_frame, update=True)
+def _set_transform_channel_keys(node, times, channel_values,
+                                delete_static_anim_curves=False):
+    """
+    Set keyframes on the translate, rotate and scale channels of a
+    node, creating or re-using one animCurve per channel.
+
+    :param node: The transform node to set keys on.
+    :type node: str
+
+    :param times: The times to set keys at.
+    :type times: [int or float, ..]
+
+    :param channel_values: The values for each attribute in
+                           TRANSFORM_ATTRS (translate values in
+                           centimeters, rotate values in degrees).
+    :type channel_values: [[float, ..], ..]
+
+    :param delete_static_anim_curves: Delete the animCurves where all
+                                      keys have the same value, and
+                                      set the attribute value instead.
+    :type delete_static_anim_curves: bool
+
+    :rtype: None
+    """
+    to_ui_linear = OpenMaya2.MDistance(
+        1.0, OpenMaya2.MDistance.kCentimeters).asUnits(
+            OpenMaya2.MDistance.uiUnit())
+    to_ui_angle = OpenMaya2.MAngle(
+        1.0, OpenMaya2.MAngle.kDegrees).asUnits(
+            OpenMaya2.MAngle.uiUnit())
+
+    undo_state = maya.cmds.undoInfo(query=True, state=True)
+    if undo_state is True:
+        # Maya API (one) changes are not recorded in Maya's undo
+        # queue, so use undoable commands (a few commands per
+        # animCurve), in UI units.
+        curve_data = []
+        for j, attr in enumerate(TRANSFORM_ATTRS):
+            scale = 1.0
+            if j < 3:
+                scale = to_ui_linear
+            elif j < 6:
+                scale = to_ui_angle
+            values = [v * scale for v in channel_values[j]]
+            curve_data.append((node + '.' + attr, times, values))
+        animcurve_utils.set_anim_curves_keys(curve_data)
+        if delete_static_anim_curves is True:
+            maya.cmds.delete(node, staticChannels=True)
+        return
+
+    # Keys are set in internal units; centimeters and radians.
+    anim_types = [
+        OpenMayaAnim1.MFnAnimCurve.kAnimCurveTL,
+        OpenMayaAnim1.MFnAnimCurve.kAnimCurveTA,
+        OpenMayaAnim1.MFnAnimCurve.kAnimCurveTU,
+    ]
+    animfn_list = []
+    for k, anim_type in enumerate(anim_types):
+        curve_data = []
+        for j in range(k * 3, (k + 1) * 3):
+            values = channel_values[j]
+            if anim_type == OpenMayaAnim1.MFnAnimCurve.kAnimCurveTA:
+                values = [math.radians(v) for v in values]
+            node_attr = node + '.' + TRANSFORM_ATTRS[j]
+            curve_data.append((node_attr, times, values))
+        animfn_list += animcurve_utils.set_anim_curves_keys_apione(
+            curve_data,
+            anim_type=anim_type)
+
+    if delete_static_anim_curves is not True:
+        return
+    static_curves = []
+    for j, animfn in enumerate(animfn_list):
+        num_keys = animfn.numKeys()
+        first_value = animfn.value(0)
+        is_static = all(
+            abs(animfn.value(i) - first_value) < STATIC_CURVE_TOLERANCE
+            for i in range(1, num_keys))
+        if is_static is False:
+            continue
+        value = channel_values[j][0]
+        if j < 3:
+            value *= to_ui_linear
+        elif j < 6:
+            value *= to_ui_angle
+        static_curves.append((animfn.name(), TRANSFORM_ATTRS[j], value))
+    if len(static_curves) > 0:
+        maya.cmds.delete([anim_curve for anim_curve, _, _ in static_curves])
+        for _, attr, value in static_curves:
+            maya.cmds.setAttr(node + '.' + attr, value)
     return
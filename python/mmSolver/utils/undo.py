@@ -71,9 +71,11 @@ def undo_chunk_context(name=None):
     undo_state = maya.cmds.undoInfo(query=True, state=True)
     if undo_state is True:
         maya.cmds.undoInfo(openChunk=True, chunkName=name)
-    yield name
-    if undo_state is True:
-        maya.cmds.undoInfo(closeChunk=True, chunkName=name)
+    try:
+        yield name
+    finally:
+        if undo_state is True:
+            maya.cmds.undoInfo(closeChunk=True, chunkName=name)
 
 
 @contextmanager
@@ -91,6 +93,8 @@ def no_undo_context():
     undo_state = maya.cmds.undoInfo(query=True, state=True)
     if undo_state is True:
         maya.cmds.undoInfo(stateWithoutFlush=False)
-    yield
-    if undo_state is True:
-        maya.cmds.undoInfo(stateWithoutFlush=undo_state)
+    try:
+        yield
+    finally:
+        if undo_state is True:
+            maya.cmds.undoInfo(stateWithoutFlush=undo_state)
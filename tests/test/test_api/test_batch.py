@@ -0,0 +1,93 @@
+# Copyright (C) 2019 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for the batch module.
+"""
+
+import os
+import json
+import logging
+import unittest
+
+import maya.cmds
+
+import test.test_api.apiutils as test_api_utils
+import mmSolver.batch as batch
+
+
+# @unittest.skip
+class TestBatch(test_api_utils.APITestCase):
+
+    def test_parse_arguments(self):
+        parser = batch._create_parser()
+        args = parser.parse_args([
+            'scene.ma',
+            '-c', 'collection1',
+            '--collection', 'collection2',
+            '--output-scene', 'scene_solved.ma',
+            '--validate-mode', 'at_runtime',
+        ])
+        self.assertEqual(args.scene, 'scene.ma')
+        self.assertEqual(args.collection, ['collection1', 'collection2'])
+        self.assertEqual(args.output_scene, 'scene_solved.ma')
+        self.assertEqual(args.results_file, None)
+        self.assertEqual(args.validate_mode, 'at_runtime')
+        self.assertEqual(args.log_level, 'info')
+
+    def test_main_exit_codes(self):
+        self.assertEqual(batch.main(['--help']), batch.EXIT_CODE_SUCCESS)
+        self.assertEqual(batch.main([]),
+                         batch.EXIT_CODE_INVALID_ARGUMENTS)
+        self.assertEqual(batch.main(['scene.ma', '--log-level', 'bad']),
+                         batch.EXIT_CODE_INVALID_ARGUMENTS)
+        path = self.get_data_path('test_batch_does_not_exist.ma')
+        self.assertEqual(batch.main([path]),
+                         batch.EXIT_CODE_INVALID_ARGUMENTS)
+
+    def test_main_log_level(self):
+        log = logging.getLogger('mmSolver')
+        old_level = log.level
+        try:
+            path = self.get_data_path('test_batch_does_not_exist.ma')
+            batch.main([path, '--log-level', 'error'])
+            self.assertEqual(log.level, logging.ERROR)
+            batch.main([path, '--log-level', 'debug'])
+            self.assertEqual(log.level, logging.DEBUG)
+        finally:
+            log.setLevel(old_level)
+
+    def test_main_no_collections(self):
+        scene_path = self.get_data_path('test_batch_no_collections.ma')
+        results_path = self.get_data_path('test_batch_no_collections.json')
+        maya.cmds.file(rename=scene_path)
+        maya.cmds.file(save=True, type='mayaAscii', force=True)
+
+        ret = batch.main([scene_path, '--results-file', results_path])
+        self.assertEqual(ret, batch.EXIT_CODE_SCENE_FAILED)
+        self.assertTrue(os.path.isfile(results_path))
+        with open(results_path, 'r') as f:
+            results = json.load(f)
+        self.assertEqual(results['success'], False)
+        self.assertEqual(results['collections'], [])
+
+        # Maya is still running after the batch solve.
+        self.assertTrue(hasattr(maya.cmds, 'about'))
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
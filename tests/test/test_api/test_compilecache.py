@@ -0,0 +1,116 @@
+# Copyright (C) 2019 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for compilecache module.
+"""
+
+import unittest
+
+import maya.cmds
+
+import mmSolver.api as mmapi
+import mmSolver.utils.animcurve as anim_utils
+import test.test_api.apiutils as test_api_utils
+import mmSolver._api.compilecache as compilecache
+
+
+# @unittest.skip
+class TestCompileCache(test_api_utils.APITestCase):
+
+    def test_collection_compile_with_cache(self):
+        cam_tfm = maya.cmds.createNode('transform', name='cam_tfm')
+        cam_shp = maya.cmds.createNode('camera', name='cam_shp',
+                                       parent=cam_tfm)
+        cam = mmapi.Camera(shape=cam_shp)
+        bnd = mmapi.Bundle().create_node()
+        bnd_node = bnd.get_node()
+        maya.cmds.setAttr(bnd_node + '.tz', -10.0)
+        mkr = mmapi.Marker().create_node(cam=cam, bnd=bnd)
+
+        sol = mmapi.Solver()
+        sol.set_frame_list([mmapi.Frame(1)])
+        col = mmapi.Collection().create_node('mySolveCollection')
+        col.add_solver(sol)
+        col.add_marker(mkr)
+        col.add_attribute(mmapi.Attribute(bnd_node + '.tx'))
+        col.add_attribute(mmapi.Attribute(bnd_node + '.ty'))
+
+        hash_a = compilecache.compute_collection_content_hash(col, True)
+        action_list_a, _ = compilecache.collection_compile_with_cache(
+            col, withtest=True)
+        action_list_b, _ = compilecache.collection_compile_with_cache(
+            col, withtest=True)
+        self.assertEqual(action_list_a, action_list_b)
+        hash_b = compilecache.compute_collection_content_hash(col, True)
+        self.assertEqual(hash_a, hash_b)
+
+        # Changing the Collection content must change the hash.
+        maya.cmds.setAttr(mkr.get_node() + '.enable', 0)
+        hash_c = compilecache.compute_collection_content_hash(col, True)
+        self.assertNotEqual(hash_b, hash_c)
+
+        col.add_attribute(mmapi.Attribute(bnd_node + '.tz'))
+        hash_d = compilecache.compute_collection_content_hash(col, True)
+        self.assertNotEqual(hash_c, hash_d)
+
+        mmapi.invalidate_collection_compile_cache()
+        hash_e = compilecache.compute_collection_content_hash(col, True)
+        self.assertNotEqual(hash_d, hash_e)
+
+        # Locking an Attribute must change the hash.
+        maya.cmds.setAttr(bnd_node + '.tz', lock=True)
+        hash_f = compilecache.compute_collection_content_hash(col, True)
+        self.assertNotEqual(hash_e, hash_f)
+
+        # Changing the minimum/maximum of an Attribute must change the
+        # hash.
+        maya.cmds.addAttr(bnd_node, longName='myAttr',
+                          attributeType='double',
+                          minValue=-1.0, keyable=True)
+        col.add_attribute(mmapi.Attribute(bnd_node + '.myAttr'))
+        hash_g = compilecache.compute_collection_content_hash(col, True)
+        maya.cmds.addAttr(bnd_node + '.myAttr', edit=True, maxValue=1.0)
+        hash_h = compilecache.compute_collection_content_hash(col, True)
+        self.assertNotEqual(hash_g, hash_h)
+
+        # Keys set with the Maya API do not run the animCurve
+        # callbacks, but must change the hash.
+        enable_plug = mkr.get_node() + '.enable'
+        anim_utils.create_anim_curve_nodes_apione(
+            [(enable_plug, [1, 2, 3], [1.0, 1.0, 1.0], None)])
+        hash_i = compilecache.compute_collection_content_hash(col, True)
+        self.assertNotEqual(hash_h, hash_i)
+        anim_utils.create_anim_curve_nodes_apione(
+            [(enable_plug, [1, 2, 3, 4], [0.0, 1.0, 1.0, 0.0], None)])
+        hash_j = compilecache.compute_collection_content_hash(col, True)
+        self.assertNotEqual(hash_i, hash_j)
+
+        # A driven key enable (an animCurve without a time input) can
+        # be hashed and compiled.
+        weight_plug = mkr.get_node() + '.weight'
+        driver = maya.cmds.createNode('transform')
+        maya.cmds.setDrivenKeyframe(
+            weight_plug, currentDriver=driver + '.translateX',
+            driverValue=0.0, value=1.0)
+        hash_k = compilecache.compute_collection_content_hash(col, True)
+        self.assertNotEqual(hash_j, hash_k)
+        compilecache.collection_compile_with_cache(col, withtest=True)
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
@@ -0,0 +1,216 @@
+# Copyright (C) 2019 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for enableindex module.
+"""
+
+import unittest
+
+import maya.cmds
+
+import test.test_api.apiutils as test_api_utils
+import mmSolver._api.marker as marker
+import mmSolver._api.bundle as bundle
+import mmSolver._api.camera as camera
+import mmSolver._api.enableindex as enableindex
+import mmSolver._api.compile as api_compile
+
+
+# @unittest.skip
+class TestEnableIndex(test_api_utils.APITestCase):
+
+    def test_get_enable(self):
+        mkr_a = marker.Marker().create_node(name='markerA1')
+        mkr_b = marker.Marker().create_node(name='markerB1')
+        plug = mkr_a.get_node() + '.enable'
+        maya.cmds.setKeyframe(plug, time=1, value=1)
+        maya.cmds.setKeyframe(plug, time=5, value=0)
+        maya.cmds.setKeyframe(plug, time=8, value=1)
+        maya.cmds.keyTangent(plug, outTangentType='step')
+        plug = mkr_b.get_node() + '.weight'
+        maya.cmds.setAttr(plug, 0.5)
+
+        mkr_list = [mkr_a, mkr_b]
+        frame_list = range(1, 11)
+        idx = enableindex.MarkerEnableIndex(mkr_list, frame_list=frame_list)
+        for f in frame_list:
+            self.assertEqual(idx.get_enable(mkr_a, f), mkr_a.get_enable(f))
+            self.assertEqual(idx.get_enable(mkr_b, f), 1)
+            self.assertAlmostEqual(idx.get_weight(mkr_b, f), 0.5)
+        # Frames outside the index range.
+        self.assertEqual(idx.get_enable(mkr_a, 20), mkr_a.get_enable(20))
+        self.assertEqual(idx.get_enable(mkr_a, 4.5), mkr_a.get_enable(4.5))
+
+        self.assertEqual(idx.get_enabled_frames(mkr_a),
+                         [1, 2, 3, 4, 8, 9, 10])
+        self.assertEqual(idx.count_enabled_frames(mkr_a, [3, 4, 5, 6]), 2)
+        self.assertEqual(idx.get_enabled_marker_list(6), [mkr_b])
+
+    def test_read_plug_values(self):
+        mkr = marker.Marker().create_node()
+        node = mkr.get_node()
+
+        # Static value.
+        plug = node + '.weight'
+        maya.cmds.setAttr(plug, 0.5)
+        values = enableindex.read_plug_values(plug, 1, 4)
+        self.assertEqual(values, [0.5] * 4)
+
+        # Stepped, constant and interpolated key spans, and frames
+        # outside of the keys.
+        maya.cmds.setKeyframe(plug, time=3, value=1.0)
+        maya.cmds.setKeyframe(plug, time=5, value=0.0)
+        maya.cmds.setKeyframe(plug, time=8, value=0.0)
+        maya.cmds.setKeyframe(plug, time=12, value=1.0)
+        maya.cmds.setKeyframe(plug, time=16, value=0.5)
+        maya.cmds.keyTangent(plug, time=(3, 3), outTangentType='step')
+        maya.cmds.keyTangent(plug, time=(5, 8),
+                             inTangentType='linear',
+                             outTangentType='linear')
+        maya.cmds.setInfinity(plug, postInfinite='linear')
+        values = enableindex.read_plug_values(plug, 1, 20)
+        frames = range(1, 21)
+        expected = [maya.cmds.getAttr(plug, time=f) for f in frames]
+        self.assertEqual(len(values), len(expected))
+        for value, expected_value in zip(values, expected):
+            self.assertAlmostEqual(value, expected_value)
+
+    def test_read_plug_values_driven(self):
+        mkr = marker.Marker().create_node()
+        node = mkr.get_node()
+        driver = maya.cmds.createNode('transform')
+        maya.cmds.setKeyframe(driver, attribute='translateX', time=1, value=0)
+        maya.cmds.setKeyframe(driver, attribute='translateX', time=10, value=9)
+
+        # Driven keys; the animCurve input is not time.
+        plug = node + '.weight'
+        maya.cmds.setDrivenKeyframe(
+            plug, currentDriver=driver + '.translateX',
+            driverValue=0.0, value=0.0)
+        maya.cmds.setDrivenKeyframe(
+            plug, currentDriver=driver + '.translateX',
+            driverValue=9.0, value=1.0)
+        values = enableindex.read_plug_values(plug, 1, 10)
+        expected = [maya.cmds.getAttr(plug, time=f) for f in range(1, 11)]
+        for value, expected_value in zip(values, expected):
+            self.assertAlmostEqual(value, expected_value)
+
+        # A time warped animCurve; the animCurve input is connected.
+        plug = node + '.enable'
+        maya.cmds.setKeyframe(plug, time=1, value=1)
+        maya.cmds.setKeyframe(plug, time=5, value=0)
+        maya.cmds.keyTangent(plug, outTangentType='step')
+        anim_curve = maya.cmds.listConnections(plug, type='animCurve')[0]
+        maya.cmds.connectAttr(driver + '.translateX', anim_curve + '.input')
+        values = enableindex.read_plug_values(plug, 1, 10)
+        expected = [maya.cmds.getAttr(plug, time=f) for f in range(1, 11)]
+        for value, expected_value in zip(values, expected):
+            self.assertAlmostEqual(value, expected_value)
+
+    def test_active_index_context(self):
+        mkr = marker.Marker().create_node()
+        plug = mkr.get_node() + '.enable'
+        maya.cmds.setAttr(plug, 0)
+        self.assertIsNone(enableindex.get_active_index())
+        with enableindex.active_index_context([mkr], [1, 2, 3]) as idx:
+            self.assertIs(enableindex.get_active_index(), idx)
+            self.assertEqual(enableindex.get_enable(mkr, 2), 0)
+            # The index is not updated when the scene changes.
+            maya.cmds.setAttr(plug, 1)
+            self.assertEqual(enableindex.get_enable(mkr, 2), 0)
+        self.assertIsNone(enableindex.get_active_index())
+        self.assertEqual(enableindex.get_enable(mkr, 2), 1)
+
+    def test_group_frames_by_signature(self):
+        mkr_a = marker.Marker().create_node(name='markerA1')
+        mkr_b = marker.Marker().create_node(name='markerB1')
+        plug = mkr_a.get_node() + '.enable'
+        maya.cmds.setKeyframe(plug, time=1, value=1)
+        maya.cmds.setKeyframe(plug, time=4, value=0)
+        maya.cmds.setKeyframe(plug, time=7, value=1)
+        maya.cmds.keyTangent(plug, outTangentType='step')
+
+        mkr_list = [mkr_a, mkr_b]
+        frame_list = range(1, 11)
+        with enableindex.active_index_context(mkr_list, frame_list):
+            groups = api_compile.group_frames_by_signature(
+                mkr_list, frame_list)
+        self.assertEqual(len(groups), 2)
+        frames = list(groups.values())
+        self.assertEqual(frames[0], [1, 2, 3, 7, 8, 9, 10])
+        self.assertEqual(frames[1], [4, 5, 6])
+
+    def test_group_frames_by_signature_weight(self):
+        mkr_a = marker.Marker().create_node(name='markerA1')
+        mkr_b = marker.Marker().create_node(name='markerB1')
+        plug = mkr_b.get_node() + '.weight'
+        maya.cmds.setKeyframe(plug, time=1, value=1.0)
+        maya.cmds.setKeyframe(plug, time=6, value=0.0)
+        maya.cmds.keyTangent(plug, outTangentType='step')
+
+        mkr_list = [mkr_a, mkr_b]
+        frame_list = range(1, 11)
+        with enableindex.active_index_context(mkr_list, frame_list):
+            groups = api_compile.group_frames_by_signature(
+                mkr_list, frame_list)
+        self.assertEqual(len(groups), 2)
+        frames = list(groups.values())
+        self.assertEqual(frames[0], [1, 2, 3, 4, 5])
+        self.assertEqual(frames[1], [6, 7, 8, 9, 10])
+
+    def test_get_enabled_frames(self):
+        cam_tfm = maya.cmds.createNode('transform', name='cam_tfm')
+        cam_shp = maya.cmds.createNode('camera', name='cam_shp',
+                                       parent=cam_tfm)
+        cam = camera.Camera(shape=cam_shp)
+        bnd = bundle.Bundle().create_node()
+        mkr_a = marker.Marker().create_node(
+            name='markerA1', cam=cam, bnd=bnd)
+        mkr_b = marker.Marker().create_node(
+            name='markerB1', cam=cam, bnd=bnd)
+        plug = mkr_a.get_node() + '.enable'
+        maya.cmds.setKeyframe(plug, time=1, value=1)
+        maya.cmds.setKeyframe(plug, time=3, value=0)
+        maya.cmds.setKeyframe(plug, time=6, value=1)
+        maya.cmds.keyTangent(plug, outTangentType='step')
+        maya.cmds.setAttr(mkr_b.get_node() + '.enable', 0)
+
+        # Without an active index.
+        frames = enableindex.get_enabled_frames(mkr_a, [1, 2, 3, 4, 7])
+        self.assertEqual(frames, [1, 2, 7])
+        self.assertEqual(mkr_a.get_enabled_frames(), [1, 2, 6])
+
+        # Frames outside the active index frame range.
+        with enableindex.active_index_context([mkr_a], [1, 2]):
+            frames = enableindex.get_enabled_frames(mkr_a, range(1, 9))
+        self.assertEqual(frames, [1, 2, 6, 7, 8])
+
+        # Markers disabled on all frames are not compiled.
+        mkr_list = [mkr_a, mkr_b]
+        with enableindex.active_index_context(mkr_list, [1, 2, 3]):
+            markers, cameras = api_compile.markersAndCameras_compile_flags(
+                mkr_list, frame_list=[1, 2, 3])
+        self.assertEqual([x[0] for x in markers], [mkr_a.get_node()])
+        self.assertEqual(len(cameras), 1)
+        markers, cameras = api_compile.markersAndCameras_compile_flags(
+            mkr_list, frame_list=[3, 4, 5])
+        self.assertEqual(markers, [])
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
@@ -0,0 +1,66 @@
+# Copyright (C) 2019 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for execute module.
+"""
+
+import unittest
+
+import test.test_api.apiutils as test_api_utils
+import mmSolver._api.execute as execute
+
+
+# @unittest.skip
+class TestExecute(test_api_utils.APITestCase):
+
+    def test_refresh_scheduler(self):
+        scheduler = execute.RefreshScheduler(interval=60.0)
+        # The first refresh always happens.
+        self.assertTrue(scheduler.should_refresh())
+        scheduler.add_refresh(0.5)
+
+        # Refreshes inside the interval are skipped, except the last.
+        self.assertFalse(scheduler.has_pending_refresh())
+        self.assertFalse(scheduler.should_refresh())
+        self.assertFalse(scheduler.should_refresh())
+        self.assertTrue(scheduler.has_pending_refresh())
+        self.assertTrue(scheduler.should_refresh(is_last=True))
+        scheduler.add_refresh(0.25)
+        self.assertFalse(scheduler.has_pending_refresh())
+
+        self.assertEqual(scheduler.get_refresh_count(), 2)
+        self.assertEqual(scheduler.get_skip_count(), 2)
+        self.assertTrue(self.approx_equal(
+            scheduler.get_refresh_duration(), 0.75))
+
+    def test_refresh_scheduler_interval(self):
+        # Without an interval, the viewport is always refreshed.
+        scheduler = execute.RefreshScheduler(interval=0.0)
+        for i in range(5):
+            self.assertTrue(scheduler.should_refresh())
+            scheduler.add_refresh(0.0)
+        self.assertEqual(scheduler.get_refresh_count(), 5)
+        self.assertEqual(scheduler.get_skip_count(), 0)
+
+        options = execute.createExecuteOptions(refresh=True)
+        self.assertEqual(options.refresh_interval,
+                         execute.REFRESH_INTERVAL_DEFAULT)
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
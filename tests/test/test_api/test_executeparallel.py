@@ -0,0 +1,207 @@
+# Copyright (C) 2019 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for executeparallel module.
+"""
+
+import unittest
+
+import maya.cmds
+
+import mmSolver.api as mmapi
+import test.test_api.apiutils as test_api_utils
+import mmSolver._api.action as api_action
+import mmSolver._api.executeparallel as executeparallel
+
+
+def _create_action(mkr_node, cam_tfm, cam_shp, bnd_node, attrs, frames):
+    kwargs = {
+        'marker': [(mkr_node, cam_shp, bnd_node)],
+        'camera': [(cam_tfm, cam_shp)],
+        'attr': [(a, 'None', 'None', 'None', 'None') for a in attrs],
+        'frame': frames,
+    }
+    return api_action.Action(
+        func='maya.cmds.mmSolver', args=[], kwargs=kwargs)
+
+
+# @unittest.skip
+class TestExecuteParallel(test_api_utils.APITestCase):
+
+    def test_encode_values(self):
+        values = [0.0, 1.5, -2.25, 1e9]
+        text = executeparallel._encode_values(values)
+        self.assertEqual(executeparallel._decode_values(text), values)
+
+    def test_compute_action_dependencies(self):
+        cam_tfm = maya.cmds.createNode('transform', name='cam_tfm')
+        cam_shp = maya.cmds.createNode('camera', name='cam_shp',
+                                       parent=cam_tfm)
+        cam = mmapi.Camera(shape=cam_shp)
+        maya.cmds.setKeyframe(cam_tfm, attribute='rotateY', time=1, value=0)
+        maya.cmds.setKeyframe(cam_tfm, attribute='rotateY', time=5, value=10)
+
+        bnd = mmapi.Bundle().create_node()
+        bnd_node = bnd.get_node()
+        mkr = mmapi.Marker().create_node(cam=cam, bnd=bnd)
+        mkr_node = mkr.get_node()
+
+        # A second Bundle and Marker, seen by a static camera.
+        cam_tfm_b = maya.cmds.createNode('transform', name='cam_tfm_b')
+        cam_shp_b = maya.cmds.createNode('camera', name='cam_shp_b',
+                                         parent=cam_tfm_b)
+        cam_b = mmapi.Camera(shape=cam_shp_b)
+        bnd_b = mmapi.Bundle().create_node()
+        bnd_node_b = bnd_b.get_node()
+        mkr_b = mmapi.Marker().create_node(cam=cam_b, bnd=bnd_b)
+        mkr_node_b = mkr_b.get_node()
+
+        static_attrs = [bnd_node + '.tx', bnd_node + '.ty']
+        anim_attrs = [cam_tfm + '.ry']
+        action_list = [
+            # Root frame solve.
+            _create_action(mkr_node, cam_tfm, cam_shp, bnd_node,
+                           static_attrs + anim_attrs, [1, 5]),
+            # Independent of all other solves.
+            _create_action(mkr_node_b, cam_tfm_b, cam_shp_b, bnd_node_b,
+                           [bnd_node_b + '.tx'], [1, 5]),
+            # Non-solver Action.
+            api_action.Action(
+                func='maya.cmds.cutKey',
+                args=anim_attrs,
+                kwargs={'time': (3, 3)}),
+            # Per-frame solves.
+            _create_action(mkr_node, cam_tfm, cam_shp, bnd_node,
+                           anim_attrs, [2]),
+            _create_action(mkr_node, cam_tfm, cam_shp, bnd_node,
+                           anim_attrs, [3]),
+            _create_action(mkr_node_b, cam_tfm_b, cam_shp_b, bnd_node_b,
+                           [bnd_node_b + '.ty'], [3]),
+            _create_action(mkr_node, cam_tfm, cam_shp, bnd_node,
+                           anim_attrs, [3]),
+            # Static Attributes are the same on all frames.
+            _create_action(mkr_node_b, cam_tfm_b, cam_shp_b, bnd_node_b,
+                           [bnd_node_b + '.ty'], [4]),
+        ]
+        deps = executeparallel.compute_action_dependencies(action_list)
+        self.assertEqual(deps[0], set())
+        self.assertEqual(deps[1], set())
+        self.assertEqual(deps[2], set([0, 1]))
+        # Single frame solves of animated Attributes only depend on
+        # each other on the same frame.
+        self.assertEqual(deps[3], set([0, 2]))
+        self.assertEqual(deps[4], set([0, 2]))
+        self.assertEqual(deps[5], set([1, 2]))
+        self.assertEqual(deps[6], set([0, 2, 4]))
+        self.assertEqual(deps[7], set([1, 2, 5]))
+        self.assertFalse(
+            executeparallel.is_dependency_chain(action_list, deps))
+
+        # Each solve depends on the solve before it.
+        chain_list = [action_list[0], action_list[2], action_list[4],
+                      action_list[6]]
+        deps = executeparallel.compute_action_dependencies(chain_list)
+        self.assertTrue(
+            executeparallel.is_dependency_chain(chain_list, deps))
+
+    def test_set_attr_values_undoable(self):
+        node = maya.cmds.createNode('transform')
+        maya.cmds.setKeyframe(node, attribute='translateX', time=1, value=0)
+        maya.cmds.setKeyframe(node, attribute='translateX', time=3, value=0)
+        values_list = [
+            (node + '.translateX', [1, 2], [1.0, 2.0]),
+            (node + '.translateY', None, [4.0]),
+            # Later values replace earlier values on the same frame.
+            (node + '.translateX', [2, 3], [5.0, 6.0]),
+        ]
+        executeparallel._set_attr_values_undoable(values_list)
+        values = [maya.cmds.getAttr(node + '.translateX', time=t)
+                  for t in [1, 2, 3]]
+        self.assertEqual(values, [1.0, 5.0, 6.0])
+        self.assertEqual(maya.cmds.getAttr(node + '.translateY'), 4.0)
+
+    def create_scene(self):
+        cam_tfm = maya.cmds.createNode('transform', name='cam_tfm')
+        cam_shp = maya.cmds.createNode('camera', name='cam_shp',
+                                       parent=cam_tfm)
+        cam = mmapi.Camera(shape=cam_shp)
+        bnd = mmapi.Bundle().create_node()
+        bnd_node = bnd.get_node()
+        maya.cmds.setAttr(bnd_node + '.tx', 5.5)
+        maya.cmds.setAttr(bnd_node + '.ty', 6.4)
+        maya.cmds.setAttr(bnd_node + '.tz', -25.0)
+        mkr = mmapi.Marker().create_node(cam=cam, bnd=bnd)
+        mkr_node = mkr.get_node()
+        maya.cmds.setAttr(mkr_node + '.tx', 0.0)
+        maya.cmds.setAttr(mkr_node + '.ty', 0.0)
+        return mkr_node, cam_tfm, cam_shp, bnd_node
+
+    def test_execute_action_list(self):
+        if executeparallel.get_mayapy_executable() is None:
+            self.skipTest('Cannot find the mayapy executable.')
+        mkr_node, cam_tfm, cam_shp, bnd_node = self.create_scene()
+        attrs = [bnd_node + '.tx', bnd_node + '.ty']
+        action_list = [
+            _create_action(mkr_node, cam_tfm, cam_shp, bnd_node,
+                           attrs[:1], [1]),
+            # Non-solver Actions are run between the solver Actions.
+            api_action.Action(
+                func='maya.cmds.setAttr',
+                args=[bnd_node + '.tz', -20.0],
+                kwargs={}),
+            _create_action(mkr_node, cam_tfm, cam_shp, bnd_node,
+                           attrs, [1]),
+        ]
+        solres_list = executeparallel.execute_action_list(action_list, 2)
+        self.assertEqual(len(solres_list), 2)
+        self.assertTrue(solres_list[0].get_success())
+        self.assertTrue(solres_list[1].get_success())
+        self.assertEqual(maya.cmds.getAttr(bnd_node + '.tz'), -20.0)
+
+        # The values solved by the worker are written into the scene.
+        self.assertAlmostEqual(
+            maya.cmds.getAttr(bnd_node + '.tx'), 0.0, places=3)
+        self.assertAlmostEqual(
+            maya.cmds.getAttr(bnd_node + '.ty'), 0.0, places=3)
+
+        # The values are written with undoable commands.
+        maya.cmds.undo()
+        self.assertNotAlmostEqual(
+            maya.cmds.getAttr(bnd_node + '.ty'), 0.0, places=3)
+
+    def test_execute_action_list_failure(self):
+        if executeparallel.get_mayapy_executable() is None:
+            self.skipTest('Cannot find the mayapy executable.')
+        mkr_node, cam_tfm, cam_shp, bnd_node = self.create_scene()
+        attrs = [bnd_node + '.tx', bnd_node + '.ty']
+        action_list = [
+            _create_action(mkr_node, cam_tfm, cam_shp, bnd_node,
+                           attrs, [1]),
+            _create_action('missing_marker', cam_tfm, cam_shp, bnd_node,
+                           attrs, [1]),
+        ]
+        with self.assertRaises(mmapi.NotValid):
+            executeparallel.execute_action_list(action_list, 2)
+
+        # A failed parallel execution must not change the scene.
+        self.assertEqual(maya.cmds.getAttr(bnd_node + '.tx'), 5.5)
+        self.assertEqual(maya.cmds.getAttr(bnd_node + '.ty'), 6.4)
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
@@ -0,0 +1,80 @@
+# Copyright (C) 2019 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test importing the 'mmSolver.api' module.
+"""
+
+import os
+import sys
+import json
+import subprocess
+import unittest
+
+import test.test_api.apiutils as test_api_utils
+import mmSolver.api as mmapi
+
+# Maximum number of seconds allowed to import 'mmSolver.api', in a new
+# Python process.
+IMPORT_TIME_BUDGET = 0.5
+
+IMPORT_SCRIPT = '''
+import sys
+import json
+import time
+s = time.time()
+import mmSolver.api
+e = time.time()
+modules = [m for m in sys.modules
+           if m.startswith('mmSolver._api') or m == 'maya.cmds']
+print(json.dumps({'duration': e - s, 'modules': modules}))
+'''
+
+
+# @unittest.skip
+class TestImport(test_api_utils.APITestCase):
+
+    def test_all_names(self):
+        for name in mmapi.__all__:
+            value = getattr(mmapi, name)
+            self.assertIsNotNone(value)
+            self.assertIn(name, dir(mmapi))
+        self.assertIs(mmapi.undo_chunk, mmapi.undo_chunk_context)
+        self.assertIs(mmapi.get_marker_name, mmapi.get_new_marker_name)
+        self.assertFalse(hasattr(mmapi, 'does_not_exist'))
+        with self.assertRaises(AttributeError):
+            mmapi.does_not_exist
+        return
+
+    def test_import_time(self):
+        exe_name = os.path.basename(sys.executable).lower()
+        if exe_name.startswith('maya') and not exe_name.startswith('mayapy'):
+            # Do not start a new Maya GUI.
+            self.skipTest('Python executable is not available.')
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join([p for p in sys.path if p])
+        output = subprocess.check_output(
+            [sys.executable, '-c', IMPORT_SCRIPT], env=env)
+        lines = output.decode('utf-8').strip().splitlines()
+        data = json.loads(lines[-1])
+        self.assertEqual(data['modules'], [])
+        self.assertLess(data['duration'], IMPORT_TIME_BUDGET)
+        return
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
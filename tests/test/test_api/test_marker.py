@@ -24,14 +24,17 @@ import os
 import unittest
 
 import maya.cmds
+import maya.OpenMayaAnim as OpenMayaAnim
 
 
 import test.test_api.apiutils as test_api_utils
 import mmSolver.utils.node as node_utils
+import mmSolver.utils.animcurve as anim_utils
 import mmSolver._api.bundle as bundle
 import mmSolver._api.camera as camera
 import mmSolver._api.markergroup as markergroup
 import mmSolver._api.marker as marker
+import mmSolver._api.constant as const
 
 
 # @unittest.skip
@@ -279,6 +282,82 @@ class TestMarker(test_api_utils.APITestCase):
         self.assertIs(mkr_grp6, None)
         self.assertEqual(mkr_grp6, None)
 
+    def test_get_deviation(self):
+        x = marker.Marker().create_node()
+        x.set_deviation([1, 2, 3], [0.5, 1.5, 1.0])
+        self.assertEqual(x.get_deviation(times=[1, 2, 3]), [0.5, 1.5, 1.0])
+        self.assertEqual(x.get_deviation_frames(), [1, 2, 3])
+
+        # Changing the deviation curve must not return cached values.
+        x.set_deviation([1, 2, 3], [2.0, 3.0, 4.0])
+        self.assertEqual(x.get_deviation(times=[1, 2, 3]), [2.0, 3.0, 4.0])
+        plug = x.get_node() + '.' + const.MARKER_ATTR_LONG_NAME_DEVIATION
+        maya.cmds.setAttr(plug, lock=False)
+        maya.cmds.keyframe(plug, time=(2, 2), valueChange=5.0)
+        self.assertEqual(x.get_deviation(times=[2]), [5.0])
+
+        # Keys added with the Maya API must not return cached values.
+        anim_utils.create_anim_curve_nodes_apione(
+            [(plug, [4], [6.0], None)],
+            OpenMayaAnim.MFnAnimCurve.kTangentStep,
+            OpenMayaAnim.MFnAnimCurve.kTangentStep)
+        self.assertEqual(x.get_deviation(times=[4]), [6.0])
+        self.assertEqual(x.get_deviation_frames(), [1, 2, 3, 4])
+
+    def test_set_deviation_undo(self):
+        maya.cmds.undoInfo(state=True)
+        x = marker.Marker().create_node()
+        plug = x.get_node() + '.' + const.MARKER_ATTR_LONG_NAME_DEVIATION
+        x.set_deviation([1, 2, 3], [0.5, 1.5, 1.0])
+        x.set_deviation([1, 2], [2.0, 3.0])
+        self.assertEqual(x.get_deviation(times=[1, 2]), [2.0, 3.0])
+        self.assertEqual(
+            maya.cmds.keyframe(plug, query=True, timeChange=True), [1.0, 2.0])
+        self.assertTrue(maya.cmds.getAttr(plug, lock=True))
+
+        # The deviation keys are set in one undo chunk.
+        maya.cmds.undo()
+        self.assertEqual(
+            maya.cmds.keyframe(plug, query=True, timeChange=True),
+            [1.0, 2.0, 3.0])
+        self.assertEqual(x.get_deviation(times=[1, 2, 3]), [0.5, 1.5, 1.0])
+
+    def test_get_average_deviation(self):
+        x = marker.Marker().create_node()
+        x.set_deviation([1, 2, 3, 4], [0.5, 1.5, 0.0, 1.0])
+        self.assertAlmostEqual(x.get_average_deviation(), 1.0)
+        self.assertEqual(x.get_maximum_deviation(), (1.5, 2.0))
+
+        # Disabled frames are not used.
+        plug = x.get_node() + '.' + const.MARKER_ATTR_LONG_NAME_ENABLE
+        maya.cmds.setKeyframe(plug, time=1, value=1)
+        maya.cmds.setKeyframe(plug, time=2, value=0)
+        maya.cmds.setKeyframe(plug, time=3, value=1)
+        maya.cmds.setKeyframe(plug, time=4, value=1)
+        maya.cmds.keyTangent(plug, outTangentType='step')
+        self.assertAlmostEqual(x.get_average_deviation(), 0.75)
+        self.assertEqual(x.get_maximum_deviation(), (1.0, 4.0))
+
+        # Frames between keys are evaluated, for example a deviation
+        # curve only keyed on root frames.
+        y = marker.Marker().create_node()
+        plug = y.get_node() + '.' + const.MARKER_ATTR_LONG_NAME_DEVIATION
+        maya.cmds.setAttr(plug, lock=False)
+        for frame, value in [(1, 1.0), (5, 5.0), (9, 1.0)]:
+            maya.cmds.setKeyframe(
+                plug, time=frame, value=value,
+                inTangentType='linear', outTangentType='linear')
+        self.assertEqual(y.get_deviation_frames(), list(range(1, 10)))
+        self.assertAlmostEqual(y.get_average_deviation(), 25.0 / 9.0)
+        self.assertEqual(y.get_maximum_deviation(), (5.0, 5.0))
+
+        # Only the frames inside the enabled frame range are used.
+        plug = y.get_node() + '.' + const.MARKER_ATTR_LONG_NAME_ENABLE
+        maya.cmds.setKeyframe(plug, time=1, value=1)
+        maya.cmds.setKeyframe(plug, time=4, value=1)
+        self.assertAlmostEqual(y.get_average_deviation(), 2.5)
+        self.assertEqual(y.get_maximum_deviation(), (4.0, 4.0))
+
 
 if __name__ == '__main__':
     prog = unittest.main()
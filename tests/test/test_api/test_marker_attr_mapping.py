@@ -10,6 +10,9 @@ import maya.cmds
 import test.test_api.apiutils as apiUtils
 import mmSolver.api as mmapi
 import mmSolver.utils.nodeaffects as affects_utils
+import mmSolver._api.compile as api_compile
+import mmSolver._api.markerutils as markerutils
+import mmSolver._api.solverstandard as solverstandard
 
 
 # @unittest.skip
@@ -163,6 +166,152 @@ class TestMarkerAttrMapping(apiUtils.APITestCase):
         maya.cmds.file(save=True, type='mayaAscii', force=True)
         return
 
+    def test_split_into_independent_components(self):
+        # Camera A and Camera B, sharing no attributes.
+        cam_tfm_a = maya.cmds.createNode('transform', name='camA_tfm')
+        cam_shp_a = maya.cmds.createNode('camera', name='camA_shp',
+                                         parent=cam_tfm_a)
+        cam_tfm_a = maya.cmds.ls(cam_tfm_a, long=True)[0]
+        cam_a = mmapi.Camera(shape=cam_shp_a)
+        cam_tfm_b = maya.cmds.createNode('transform', name='camB_tfm')
+        cam_shp_b = maya.cmds.createNode('camera', name='camB_shp',
+                                         parent=cam_tfm_b)
+        cam_b = mmapi.Camera(shape=cam_shp_b)
+
+        # One bundle per camera.
+        bnd_a = mmapi.Bundle().create_node()
+        bnd_b = mmapi.Bundle().create_node()
+        mkr_a = mmapi.Marker().create_node(cam=cam_a, bnd=bnd_a)
+        mkr_b = mmapi.Marker().create_node(cam=cam_b, bnd=bnd_b)
+        mkr_list = [mkr_a, mkr_b]
+
+        attr_bnd_a_tx = mmapi.Attribute(bnd_a.get_node() + '.tx')
+        attr_bnd_b_tx = mmapi.Attribute(bnd_b.get_node() + '.tx')
+        attr_cam_a_ty = mmapi.Attribute(cam_tfm_a + '.ty')
+        attr_list = [attr_bnd_a_tx, attr_bnd_b_tx, attr_cam_a_ty]
+
+        groups = api_compile.split_into_independent_components(
+            mkr_list, attr_list)
+        assert len(groups) == 2
+        grp_mkr_list, grp_attr_list = groups[0]
+        assert grp_mkr_list == [mkr_a]
+        assert grp_attr_list == [attr_bnd_a_tx, attr_cam_a_ty]
+        grp_mkr_list, grp_attr_list = groups[1]
+        assert grp_mkr_list == [mkr_b]
+        assert grp_attr_list == [attr_bnd_b_tx]
+
+        # Markers without a Bundle are not in any group.
+        mkr_c = mmapi.Marker().create_node(cam=cam_a)
+        mkr_attr_map = markerutils.find_marker_attr_mapping(
+            [mkr_c], attr_list)
+        assert mkr_attr_map == [[False, False, False]]
+        groups = api_compile.split_into_independent_components(
+            mkr_list + [mkr_c], attr_list)
+        assert len(groups) == 2
+        assert groups[0][0] == [mkr_a]
+
+        # Markers without a Bundle cannot be solved alone.
+        groups = solverstandard._split_mkr_attr_into_components(
+            mkr_list + [mkr_c], attr_list,
+            markerutils.find_marker_attr_mapping(
+                mkr_list + [mkr_c], attr_list))
+        assert len(groups) == 2
+        assert groups[0][0] == [mkr_a]
+        assert groups[1][0] == [mkr_b]
+        assert groups[1][1] == [attr_bnd_b_tx]
+
+        # Attributes not affecting any Marker are kept with the
+        # Markers without a Bundle, in their own group.
+        attr_bnd_c_tx = mmapi.Attribute(
+            mmapi.Bundle().create_node().get_node() + '.tx')
+        all_attr_list = attr_list + [attr_bnd_c_tx]
+        groups = solverstandard._split_mkr_attr_into_components(
+            mkr_list + [mkr_c], all_attr_list,
+            markerutils.find_marker_attr_mapping(
+                mkr_list + [mkr_c], all_attr_list))
+        assert len(groups) == 3
+        assert groups[2] == ([mkr_c], [attr_bnd_c_tx])
+
+        # Sharing an attribute joins the two groups together.
+        maya.cmds.parent(cam_tfm_b, cam_tfm_a)
+        groups = api_compile.split_into_independent_components(
+            mkr_list, attr_list)
+        assert len(groups) == 1
+        return
+
+    def test_sort_into_hierarchy_groups(self):
+        cam_tfm = maya.cmds.createNode('transform', name='cam_tfm')
+        cam_shp = maya.cmds.createNode('camera', name='cam_shp',
+                                       parent=cam_tfm)
+        cam_shp = maya.cmds.ls(cam_shp, long=True)[0]
+        cam = mmapi.Camera(shape=cam_shp)
+
+        # Hierarchy, 'top' is the parent of 'child'.
+        top = maya.cmds.createNode('transform', name='top')
+        top = maya.cmds.ls(top, long=True)[0]
+        child = maya.cmds.createNode('transform', name='child', parent=top)
+        child = maya.cmds.ls(child, long=True)[0]
+
+        # Bundle A is under 'top', Bundle B is under 'child'.
+        bnd_a = mmapi.Bundle().create_node()
+        maya.cmds.parent(bnd_a.get_node(), top)
+        bnd_b = mmapi.Bundle().create_node()
+        maya.cmds.parent(bnd_b.get_node(), child)
+        mkr_a = mmapi.Marker().create_node(cam=cam, bnd=bnd_a)
+        mkr_b = mmapi.Marker().create_node(cam=cam, bnd=bnd_b)
+
+        raw_mkr_a = (mkr_a.get_node(), cam_shp, bnd_a.get_node())
+        raw_mkr_b = (mkr_b.get_node(), cam_shp, bnd_b.get_node())
+        mkr_list = [raw_mkr_b, raw_mkr_a]
+        attr_list = [child + '.translateX', top + '.translateX']
+
+        groups = affects_utils.sort_into_hierarchy_groups(
+            mkr_list, attr_list)
+        assert len(groups) == 2
+        assert groups[0] == ([raw_mkr_a], [top + '.translateX'])
+        assert groups[1] == ([raw_mkr_b], [child + '.translateX'])
+        return
+
+    def test_dependency_index_invalidation(self):
+        bnd = mmapi.Bundle().create_node()
+        bnd_node = bnd.get_node()
+        top = maya.cmds.createNode('transform', name='top')
+        top = maya.cmds.ls(top, long=True)[0]
+
+        ret = affects_utils.find_plugs_affecting_transform(bnd_node, None)
+        assert (top + '.translateX') not in ret
+
+        # Parenting must invalidate the index.
+        maya.cmds.parent(bnd_node, top)
+        bnd_node = bnd.get_node()
+        ret = affects_utils.find_plugs_affecting_transform(bnd_node, None)
+        assert (top + '.translateX') in ret
+
+        # Connections must invalidate the index.
+        driver = maya.cmds.createNode('transform', name='driver')
+        driver = maya.cmds.ls(driver, long=True)[0]
+        maya.cmds.connectAttr(driver + '.translateY', top + '.translateX')
+        ret = affects_utils.find_plugs_affecting_transform(bnd_node, None)
+        assert (top + '.translateX') not in ret
+        assert (driver + '.translateY') in ret
+
+        # Locking must invalidate the index.
+        maya.cmds.setAttr(driver + '.translateY', lock=True)
+        ret = affects_utils.find_plugs_affecting_transform(bnd_node, None)
+        assert (driver + '.translateY') not in ret
+        maya.cmds.setAttr(driver + '.translateY', lock=False)
+        ret = affects_utils.find_plugs_affecting_transform(bnd_node, None)
+        assert (driver + '.translateY') in ret
+
+        # A new scene removes the callbacks, and the index is not used
+        # until the callbacks are added again.
+        maya.cmds.file(new=True, force=True)
+        assert affects_utils.get_dependency_index_id() is None
+        bnd = mmapi.Bundle().create_node()
+        affects_utils.find_plugs_affecting_transform(bnd.get_node(), None)
+        assert affects_utils.get_dependency_index_id() is not None
+        return
+
 
 if __name__ == '__main__':
     prog = unittest.main()
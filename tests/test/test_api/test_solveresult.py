@@ -19,7 +19,10 @@
 Test functions for API utils module.
 """
 
+import os
 import pprint
+import shutil
+import tempfile
 import unittest
 import time
 
@@ -27,6 +30,7 @@ import maya.cmds
 
 import test.test_api.apiutils as test_api_utils
 import mmSolver._api.solveresult as solveresult  # used indirectly.
+import mmSolver._api.solveresultstore as solveresultstore
 import mmSolver.api as mmapi
 
 
@@ -226,6 +230,137 @@ class TestSolveResult(test_api_utils.APITestCase):
         assert isinstance(nodes, list)
         assert len(nodes) > 0
 
+    def test_lazy_columns(self):
+        """
+        Parse the command data into columns, only when queried.
+        """
+        cmd_data = [
+            'success=1',
+            'error_final=0.5',
+            'error_per_frame=1#0.5',
+            'error_per_frame=2#0.25',
+            'error_per_marker_per_frame=marker1#1#0.2',
+            'error_per_marker_per_frame=marker2#1#0.3',
+            'error_per_marker_per_frame=marker1#2#0.4',
+        ]
+        solres = solveresult.SolveResult(cmd_data)
+        self.assertEqual(solres.get_data_raw(), cmd_data)
+        self.assertIs(solres.get_success(), True)
+        self.assertEqual(solres.get_frame_list(), [1.0, 2.0])
+        self.assertEqual(solres.get_frame_error_list(), {1.0: 0.5, 2.0: 0.25})
+
+        names, index, frames, errors = solres.get_marker_error_columns()
+        self.assertEqual(names, ['marker1', 'marker2'])
+        self.assertEqual(list(index), [0, 1, 0])
+        self.assertEqual(list(frames), [1.0, 1.0, 2.0])
+        self.assertEqual(list(errors), [0.2, 0.3, 0.4])
+
+        mkr_err_list = solres.get_marker_error_list()
+        self.assertEqual(mkr_err_list['marker1'], {1.0: 0.2, 2.0: 0.4})
+        self.assertEqual(mkr_err_list['marker2'], {1.0: 0.3})
+        self.assertEqual(solres.get_marker_error_list('marker2'), {1.0: 0.3})
+        self.assertIsNone(solres.get_marker_error_list('marker3'))
+
+        # Once parsed into columns, the command data is re-created
+        # from the columns.
+        self.assertIsNone(solres._raw_data)
+        self.assertEqual(solres.get_other_lines(), cmd_data[:2])
+        new_solres = solveresult.SolveResult(solres.get_data_raw())
+        self.assertEqual(new_solres.get_frame_error_list(),
+                         solres.get_frame_error_list())
+        self.assertEqual(new_solres.get_marker_error_list(),
+                         solres.get_marker_error_list())
+
+    def test_solve_result_set(self):
+        solres_a = solveresult.SolveResult([
+            'timer_solve=1.5',
+            'error_per_frame=1#0.5',
+            'error_per_frame=2#0.25',
+            'error_per_marker_per_frame=marker1#1#0.2',
+            'error_per_marker_per_frame=marker2#2#0.3',
+        ])
+        solres_b = solveresult.SolveResult([
+            'timer_solve=1.0',
+            'error_per_frame=2#0.75',
+            'error_per_marker_per_frame=marker2#2#0.9',
+        ])
+        solres_set = mmapi.SolveResultSet([solres_a, solres_b])
+        self.assertEqual(len(solres_set), 2)
+        self.assertEqual(solres_set.get_frame_list(), [1.0, 2.0])
+        self.assertEqual(dict(solres_set.get_frame_error_list()),
+                         {1.0: 0.5, 2.0: 0.75})
+        self.assertTrue(self.approx_equal(
+            solres_set.get_average_frame_error(), 0.625))
+        self.assertEqual(solres_set.get_max_frame_error(), (2, 0.75))
+        self.assertEqual(solres_set.get_marker_node_list(),
+                         ['marker1', 'marker2'])
+        mkr_err_list = solres_set.get_marker_error_list()
+        self.assertEqual(mkr_err_list['marker2'], {2.0: 0.9})
+        timer_stats = solres_set.get_timer_stats()
+        self.assertTrue(self.approx_equal(timer_stats['solve_seconds'], 2.5))
+
+        # The legacy functions give the same values.
+        self.assertEqual(mmapi.merge_frame_error_list([solres_a, solres_b]),
+                         solres_set.get_frame_error_list())
+
+        # Changing the list changes the merged values.
+        solres_set.append(solres_a)
+        self.assertEqual(dict(solres_set.get_frame_error_list()),
+                         {1.0: 0.5, 2.0: 0.25})
+
+    def test_encode_solve_results(self):
+        cmd_data = [
+            'success=1',
+            'error_final=0.5',
+            'error_per_frame=1#0.5',
+            'error_per_marker_per_frame=marker1#1#0.2',
+            'error_per_marker_per_frame=marker2#1#0.3',
+        ]
+        solres = solveresult.SolveResult(cmd_data)
+        data = solveresultstore.encode_solve_results([solres])
+        self.assertTrue(solveresultstore.is_encoded_solve_results(data))
+        self.assertFalse(solveresultstore.is_encoded_solve_results(cmd_data))
+
+        sidecar_dir = tempfile.mkdtemp(prefix='mmSolver_test_')
+        self.addCleanup(shutil.rmtree, sidecar_dir, True)
+        data_sidecar = solveresultstore.encode_solve_results(
+            [solres], name='test', sidecar_dir=sidecar_dir)
+        self.assertNotIn('data', data_sidecar)
+        self.assertEqual(data['hash'], data_sidecar['hash'])
+
+        for d in [data, data_sidecar]:
+            solres_list = solveresultstore.decode_solve_results(d)
+            self.assertEqual(len(solres_list), 1)
+            decoded = solres_list[0]
+            self.assertIs(decoded.get_success(), True)
+            self.assertTrue(self.approx_equal(decoded.get_final_error(), 0.5))
+            self.assertEqual(decoded.get_frame_error_list(), {1.0: 0.5})
+            self.assertEqual(decoded.get_marker_error_list('marker2'),
+                             {1.0: 0.3})
+
+        # Each decode returns a new list.
+        solres_list_a = solveresultstore.decode_solve_results(data)
+        solres_list_b = solveresultstore.decode_solve_results(data)
+        self.assertIsNot(solres_list_a, solres_list_b)
+        solres_list_a.append(solres)
+        self.assertEqual(
+            len(solveresultstore.decode_solve_results(data)), 1)
+
+        # Solving again writes a new sidecar file; the old file is not
+        # changed.
+        with open(data_sidecar['path'], 'rb') as f:
+            payload = f.read()
+        solres_b = solveresult.SolveResult(cmd_data[:2])
+        data_sidecar_b = solveresultstore.encode_solve_results(
+            [solres_b], name='test', sidecar_dir=sidecar_dir)
+        self.assertNotEqual(data_sidecar['hash'], data_sidecar_b['hash'])
+        self.assertNotEqual(data_sidecar['path'], data_sidecar_b['path'])
+        self.assertTrue(os.path.isfile(data_sidecar_b['path']))
+        with open(data_sidecar['path'], 'rb') as f:
+            self.assertEqual(f.read(), payload)
+        self.assertEqual(solres.get_other_lines(),
+                         ['success=1', 'error_final=0.5'])
+
     def test_perfect_solve(self):
         """
         Open a file and trigger a solve to get perfect results.
@@ -0,0 +1,93 @@
+# Copyright (C) 2019 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for validation module.
+"""
+
+import unittest
+
+import maya.cmds
+
+import mmSolver.api as mmapi
+import test.test_api.apiutils as test_api_utils
+import mmSolver._api.action as api_action
+import mmSolver._api.compile as api_compile
+import mmSolver._api.solveresult as solveresult
+import mmSolver._api.validation as validation
+
+
+# @unittest.skip
+class TestValidation(test_api_utils.APITestCase):
+
+    def test_count_parameters_and_errors(self):
+        """
+        The analytic counts must match the 'mmSolver' command.
+        """
+        cam_tfm = maya.cmds.createNode('transform', name='cam_tfm')
+        cam_shp = maya.cmds.createNode('camera', name='cam_shp',
+                                       parent=cam_tfm)
+        cam = mmapi.Camera(shape=cam_shp)
+        maya.cmds.setKeyframe(cam_tfm, attribute='rotateY', time=1, value=0)
+        maya.cmds.setKeyframe(cam_tfm, attribute='rotateY', time=5, value=10)
+
+        bnd = mmapi.Bundle().create_node()
+        bnd_node = bnd.get_node()
+        maya.cmds.setAttr(bnd_node + '.tz', -10.0)
+        maya.cmds.setAttr(bnd_node + '.tz', lock=True)
+
+        mkr = mmapi.Marker().create_node(cam=cam, bnd=bnd)
+        mkr_node = mkr.get_node()
+        maya.cmds.setKeyframe(mkr_node, attribute='enable', time=1, value=1)
+        maya.cmds.setKeyframe(mkr_node, attribute='enable', time=3, value=0)
+        maya.cmds.setKeyframe(mkr_node, attribute='enable', time=4, value=1)
+        maya.cmds.keyTangent(mkr_node + '.enable', outTangentType='step')
+
+        attr_list = [
+            mmapi.Attribute(bnd_node + '.tx'),
+            mmapi.Attribute(bnd_node + '.ty'),
+            mmapi.Attribute(bnd_node + '.tz'),
+            mmapi.Attribute(cam_tfm + '.ry'),
+        ]
+        frm_list = [mmapi.Frame(f) for f in range(1, 6)]
+        sol = mmapi.SolverStep()
+        sol.set_frame_list(frm_list)
+        sol.set_attributes_use_static(True)
+        sol.set_attributes_use_animated(True)
+
+        generator = api_compile.compile_solver_with_cache(
+            sol, [mkr], attr_list, True, None)
+        for action, vaction in generator:
+            func, args, kwargs = api_action.action_to_components(vaction)
+            counts = validation.count_parameters_and_errors(kwargs)
+            self.assertEqual(counts, (2 + 5, 4 * 2, 5))
+
+            solres = solveresult.SolveResult(func(*args, **kwargs))
+            print_stats = solres.get_print_stats()
+            self.assertEqual(print_stats.get('number_of_parameters'),
+                             counts[0])
+            self.assertEqual(print_stats.get('number_of_errors'),
+                             counts[1])
+
+        # Unknown nodes must be validated by the 'mmSolver' command.
+        kwargs['marker'] = [('unknownMarker', cam_shp, 'unknownBundle')]
+        counts = validation.count_parameters_and_errors(kwargs)
+        self.assertIsNone(counts)
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
@@ -0,0 +1,146 @@
+# Copyright (C) 2019 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for animCurve utilities module.
+"""
+
+import unittest
+
+import test.test_utils.utilsutils as test_utils
+
+import maya.cmds
+import maya.OpenMayaAnim as OpenMayaAnim1
+import mmSolver.utils.animcurve as mod
+
+
+# @unittest.skip
+class TestAnimCurve(test_utils.UtilsTestCase):
+    """
+    Test animCurve module.
+    """
+
+    def test_set_anim_curves_keys_apione(self):
+        node_a = maya.cmds.createNode('transform')
+        node_b = maya.cmds.createNode('transform')
+        plug_a = node_a + '.translateX'
+        plug_b = node_b + '.translateY'
+        maya.cmds.setAttr(plug_b, lock=True)
+
+        curve_data = [
+            (plug_a, [1, 2, 3], [1.0, 2.0, 3.0]),
+            (plug_b, [1, 2], [4.0, 5.0]),
+        ]
+        animfn_list = mod.set_anim_curves_keys_apione(curve_data)
+        self.assertEqual(len(animfn_list), 2)
+        self.assertTrue(maya.cmds.getAttr(plug_b, lock=True))
+        self.assertEqual(maya.cmds.keyframe(plug_a, query=True), [1, 2, 3])
+        self.assertEqual(maya.cmds.getAttr(plug_b, time=2), 5.0)
+        anim_curve_a = maya.cmds.listConnections(plug_a, type='animCurve')
+
+        # Existing animCurves are re-used, and keys are replaced.
+        curve_data = [
+            (plug_a, [1, 2, 3], [7.0, 8.0, 9.0]),
+            (plug_b, [1, 2, 3], [4.0, 5.0, 6.0]),
+        ]
+        mod.set_anim_curves_keys_apione(curve_data)
+        self.assertEqual(
+            maya.cmds.listConnections(plug_a, type='animCurve'),
+            anim_curve_a)
+        self.assertEqual(maya.cmds.getAttr(plug_a, time=2), 8.0)
+        self.assertEqual(maya.cmds.keyframe(plug_b, query=True), [1, 2, 3])
+        self.assertEqual(maya.cmds.getAttr(plug_b, time=3), 6.0)
+
+    def test_set_anim_curves_keys(self):
+        node = maya.cmds.createNode('transform')
+        plug_tx = node + '.translateX'
+        plug_rx = node + '.rotateX'
+        maya.cmds.setKeyframe(plug_tx, time=2, value=-1.0)
+        maya.cmds.setKeyframe(plug_tx, time=10, value=-1.0)
+
+        curve_data = [
+            (plug_tx, [1, 2, 3], [1.0, 2.0, 3.0]),
+            (plug_rx, [1, 2], [45.0, 90.0]),
+        ]
+        mod.set_anim_curves_keys(curve_data)
+        self.assertEqual(maya.cmds.keyframe(plug_tx, query=True),
+                         [1, 2, 3, 10])
+        self.assertEqual(
+            maya.cmds.keyframe(plug_tx, query=True, valueChange=True),
+            [1.0, 2.0, 3.0, -1.0])
+        # Values are in UI units.
+        self.assertTrue(self.approx_equal(
+            maya.cmds.getAttr(plug_rx, time=2), 90.0))
+
+        # The key values can be undone.
+        maya.cmds.undo()
+        self.assertTrue(self.approx_equal(
+            maya.cmds.getAttr(plug_rx, time=2), 0.0))
+
+    def test_create_anim_curve_nodes_apione(self):
+        node = maya.cmds.createNode('transform')
+        plug_tx = node + '.translateX'
+        plug_rx = node + '.rotateX'
+        plug_missing = node + '.missingAttribute'
+
+        curve_data = [
+            (plug_tx, [1, 2], [1.0, 2.0], None),
+            (plug_rx, [1, 2], [0.0, 0.5], None),
+            (None, [1, 2, 3], [3.0, 2.0, 1.0],
+             OpenMayaAnim1.MFnAnimCurve.kAnimCurveTU),
+        ]
+        animfn_list = mod.create_anim_curve_nodes_apione(
+            curve_data, undo_new_curves=False)
+        self.assertEqual(len(animfn_list), 3)
+        self.assertEqual(maya.cmds.getAttr(plug_tx, time=2), 2.0)
+
+        # The default animCurve type is chosen by the plug.
+        anim_curves = maya.cmds.listConnections(plug_rx, type='animCurveTA')
+        self.assertEqual(len(anim_curves), 1)
+
+        # Unconnected animCurve.
+        anim_curve = animfn_list[2].name()
+        self.assertEqual(maya.cmds.nodeType(anim_curve), 'animCurveTU')
+        self.assertEqual(maya.cmds.keyframe(anim_curve, query=True), [1, 2, 3])
+
+        with self.assertRaises(ValueError):
+            mod.create_anim_curve_nodes_apione(
+                [(plug_missing, [1], [1.0], None)])
+        with self.assertRaises(ValueError):
+            mod.create_anim_curve_nodes_apione([(plug_tx, [], [], None)])
+
+    def test_euler_filter_values(self):
+        values = [170.0, -175.0, -160.0, 900.0, 10.0]
+        x = mod.euler_filter_values(values)
+        self.assertEqual(x, [170.0, 185.0, 200.0, 180.0, 10.0])
+
+        # Must match filtering each value individually.
+        prev_value = None
+        for v, filtered in zip(values, x):
+            if prev_value is not None:
+                v = mod.euler_filter_value(prev_value, v)
+            self.assertEqual(v, filtered)
+            prev_value = v
+
+        x = mod.euler_filter_values([190.0], prev_value=0.0)
+        self.assertEqual(x, [-170.0])
+        self.assertEqual(mod.euler_filter_values([]), [])
+        return
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
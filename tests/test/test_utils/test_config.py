@@ -219,6 +219,58 @@ class TestConfig(test_utils.UtilsTestCase):
         config.write()
         return
 
+    def test_get_values(self):
+        data = {
+            'key': {'subkey': {'subsubkey': 42}},
+            'myVar': 1,
+        }
+        keys = ['myVar', 'key/subkey/subsubkey', '/key/subkey/',
+                'key/missing', 'missing']
+        values = utils_config.get_values(data, keys, default_value=-1)
+        assert values == [1, 42, {'subsubkey': 42}, -1, -1]
+        for key, value in zip(keys, values):
+            assert utils_config.get_value(data, key, default_value=-1) == value
+        assert utils_config.get_values(data, []) == []
+
+        # set_value must not modify the input data.
+        new_data = utils_config.set_value(data, 'key/subkey/other', 7)
+        assert data['key']['subkey'] == {'subsubkey': 42}
+        assert new_data['key']['subkey'] == {'subsubkey': 42, 'other': 7}
+        return
+
+    def test_read_data_cached(self):
+        original_name = 'general.json'
+        name = 'general_read_data_cached.json'
+        path = self.get_data_path('config')
+        dir_list = [path]
+
+        src = os.path.join(path, original_name)
+        dst = os.path.join(path, name)
+        shutil.copy2(src, dst)
+        file_path = utils_config.find_path(name, dir_list)
+
+        data1 = utils_config.read_data_cached(file_path)
+        data2 = utils_config.read_data_cached(file_path)
+        assert data1 is data2
+        assert data1 == utils_config.read_data(file_path)
+
+        # Writing the file removes it from the cache.
+        new_data = utils_config.set_value(data1, 'myVar', 42)
+        utils_config.write_data(new_data, file_path)
+        data3 = utils_config.read_data_cached(file_path)
+        assert data3 is not data1
+        assert data3 == new_data
+
+        config = utils_config.get_config(name, search=dir_list)
+        values = config.get_values(['myVar', 'debug', 'missing'])
+        assert values == [42, 0, None]
+
+        utils_config.clear_cache()
+        data4 = utils_config.read_data_cached(file_path)
+        assert data4 is not data3
+        assert data4 == data3
+        return
+
     def test_get_dirs(self):
         name = 'MMSOLVER_CONFIG_PATH'
         dir_list = utils_config.get_dirs(name)
@@ -52,6 +52,83 @@ class TestConfigMaya(test_utils.UtilsTestCase):
         self.assertEqual(new_value, value)
         return
 
+    def test_get_node_option_structure(self):
+        node = maya.cmds.createNode('script')
+        name = 'my_struct_attr'
+        node_attr = node + '.' + name
+        value = configmaya.get_node_option_structure(node, name)
+        self.assertIsNone(value)
+
+        data = {'key': [1, 2, 3]}
+        configmaya.set_node_option_structure(node, name, data, add_attr=True)
+        value = configmaya.get_node_option_structure(node, name)
+        self.assertEqual(value, data)
+
+        # The returned data can be modified without changing the node.
+        value['key'].append(4)
+        value = configmaya.get_node_option_structure(node, name)
+        self.assertEqual(value, data)
+
+        # Changes made outside of configmaya are seen.
+        maya.cmds.setAttr(node_attr, lock=False)
+        maya.cmds.setAttr(node_attr, '[42]', type='string')
+        value = configmaya.get_node_option_structure(node, name)
+        self.assertEqual(value, [42])
+
+        # Renamed nodes are the same node.
+        old_node = node
+        node = maya.cmds.rename(node, 'my_renamed_option_node')
+        value = configmaya.get_node_option_structure(node, name)
+        self.assertEqual(value, [42])
+
+        # A new node using the old name is not the renamed node.
+        other_node = maya.cmds.createNode('script', name=old_node)
+        self.assertEqual(other_node, old_node)
+        other_data = {'other': True}
+        configmaya.set_node_option_structure(
+            other_node, name, other_data, add_attr=True)
+        value = configmaya.get_node_option_structure(other_node, name)
+        self.assertEqual(value, other_data)
+        value = configmaya.get_node_option_structure(node, name)
+        self.assertEqual(value, [42])
+
+        configmaya.clear_node_option_cache()
+        value = configmaya.get_node_option_structure(node, name)
+        self.assertEqual(value, [42])
+        return
+
+    def test_coalesce_node_option_writes(self):
+        node = maya.cmds.createNode('script')
+        name = 'my_struct_attr'
+        node_attr = node + '.' + name
+        configmaya.set_node_option_structure(node, name, [], add_attr=True)
+
+        with configmaya.coalesce_node_option_writes():
+            configmaya.set_node_option_structure(node, name, [1])
+            with configmaya.coalesce_node_option_writes():
+                configmaya.set_node_option_structure(node, name, [1, 2])
+            # Not written to the node yet.
+            self.assertEqual(maya.cmds.getAttr(node_attr), '[]')
+            value = configmaya.get_node_option_structure(node, name)
+            self.assertEqual(value, [1, 2])
+            configmaya.set_node_option_structure(node, name, [1, 2, 3])
+        self.assertEqual(maya.cmds.getAttr(node_attr), '[1, 2, 3]')
+        value = configmaya.get_node_option_structure(node, name)
+        self.assertEqual(value, [1, 2, 3])
+
+        # Coalesced writes can be undone.
+        maya.cmds.undoInfo(state=True)
+        maya.cmds.undoInfo(openChunk=True)
+        with configmaya.coalesce_node_option_writes():
+            for i in range(10):
+                configmaya.set_node_option_structure(node, name, [i])
+        maya.cmds.undoInfo(closeChunk=True)
+        self.assertEqual(maya.cmds.getAttr(node_attr), '[9]')
+        maya.cmds.undo()
+        value = configmaya.get_node_option_structure(node, name)
+        self.assertEqual(value, [1, 2, 3])
+        return
+
     # def test_set_node_option(self):
     #     return
 
@@ -0,0 +1,122 @@
+# Copyright (C) 2019 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for FFT utils module.
+"""
+
+import sys
+import cmath
+import unittest
+
+import test.test_utils.utilsutils as test_utils
+
+if sys.version_info[0] == 2:
+    import mmSolver.utils._fft_py2 as fft
+else:
+    import mmSolver.utils._fft_py3 as fft
+
+
+def _reference_transform(vector, inverse):
+    """
+    Discrete Fourier transform, computed directly.
+    """
+    n = len(vector)
+    sign = 1.0 if inverse else -1.0
+    result = []
+    for k in range(n):
+        total = 0j
+        for j in range(n):
+            total += vector[j] * cmath.exp(sign * 2j * cmath.pi * j * k / n)
+        result.append(total)
+    return result
+
+
+def _signal(n, offset=0):
+    return [((i * 7 + offset) % 11) * 0.1 - 0.5 for i in range(n)]
+
+
+# @unittest.skip
+class TestFFT(test_utils.UtilsTestCase):
+    """
+    Test FFT module.
+    """
+
+    def test_transform(self):
+        """
+        Transforms (radix-2 and Bluestein) must match the direct DFT,
+        including when the cached plans are re-used.
+        """
+        fft.clear_plan_cache()
+        for n in [1, 2, 3, 8, 12, 16, 31]:
+            data = _signal(n)
+            for inverse in [False, True]:
+                expected = _reference_transform(data, inverse)
+                for _ in range(2):
+                    x = fft.transform(data, inverse)
+                    self.assertEqual(len(x), n)
+                    for a, b in zip(x, expected):
+                        self.assertAlmostEqual(abs(a - b), 0.0)
+        return
+
+    def test_transform_real(self):
+        """
+        Real transforms must match the complex transform and invert.
+        """
+        for n in [1, 2, 3, 4, 10, 15, 32]:
+            data = _signal(n, offset=3)
+            expected = _reference_transform(data, False)
+            x = fft.transform_real(data)
+            self.assertEqual(len(x), (n // 2) + 1)
+            for a, b in zip(x, expected):
+                self.assertAlmostEqual(abs(a - b), 0.0)
+
+            y = fft.inverse_transform_real(x, n)
+            self.assertEqual(len(y), n)
+            for a, b in zip(y, data):
+                self.assertAlmostEqual(a / n, b)
+        return
+
+    def test_convolve_many(self):
+        """
+        Batched convolution must match a direct linear convolution.
+        """
+        self.assertEqual(fft.next_power_of_two(1), 1)
+        self.assertEqual(fft.next_power_of_two(5), 8)
+        self.assertEqual(fft.next_power_of_two(8), 8)
+
+        window = [0.25, 0.5, 0.25, 0.1]
+        signals = [_signal(20, offset=i) for i in range(3)]
+        result = fft.convolve_many(signals, window)
+        self.assertEqual(len(result), len(signals))
+        for signal, x in zip(signals, result):
+            size = len(signal) + len(window) - 1
+            self.assertEqual(len(x), size)
+            for i in range(size):
+                expected = 0.0
+                for j, w in enumerate(window):
+                    if 0 <= i - j < len(signal):
+                        expected += signal[i - j] * w
+                self.assertAlmostEqual(x[i], expected)
+
+        with self.assertRaises(ValueError):
+            fft.convolve_many([[1.0, 2.0], [1.0]], window)
+        return
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
@@ -0,0 +1,172 @@
+# Copyright (C) 2019 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for line intersection utilities module.
+"""
+
+import unittest
+
+import test.test_utils.utilsutils as test_utils
+
+import maya.cmds
+import maya.OpenMaya as OpenMaya
+import mmSolver.utils.lineintersect as mod
+
+
+# @unittest.skip
+class TestLineIntersect(test_utils.UtilsTestCase):
+    """
+    Test lineintersect module.
+    """
+
+    def assertPointAlmostEqual(self, a, b, places=6):
+        self.assertIsNotNone(a)
+        for x, y in zip(a, b):
+            self.assertAlmostEqual(x, y, places=places)
+
+    def test_calculate_least_squares_intersection_point(self):
+        target = (1.0, 2.0, -3.0)
+        cameras = [
+            (10.0, 0.0, 0.0),
+            (0.0, 10.0, 5.0),
+            (-4.0, 1.0, 8.0),
+            (3.0, -7.0, 2.0),
+        ]
+        origins = []
+        directions = []
+        for cam in cameras:
+            origins.extend(cam)
+            directions.extend([t - c for t, c in zip(target, cam)])
+        pnt = mod.calculate_least_squares_intersection_point(
+            origins, directions)
+        self.assertPointAlmostEqual(pnt, target)
+
+        # Two rays must match the two line intersection function.
+        a_pnt = OpenMaya.MPoint(0.0, 0.0, 0.0)
+        a_dir = OpenMaya.MVector(1.0, 1.0, 0.0)
+        b_pnt = OpenMaya.MPoint(5.0, 0.0, 1.0)
+        b_dir = OpenMaya.MVector(-1.0, 2.0, 0.0)
+        pa, pb = mod.calculate_approx_intersection_point_between_two_3d_lines(
+            a_pnt, a_dir, b_pnt, b_dir)
+        expected = (
+            (pa.x + pb.x) * 0.5,
+            (pa.y + pb.y) * 0.5,
+            (pa.z + pb.z) * 0.5,
+        )
+        pnt = mod.calculate_least_squares_intersection_point(
+            [0.0, 0.0, 0.0, 5.0, 0.0, 1.0],
+            [1.0, 1.0, 0.0, -1.0, 2.0, 0.0])
+        self.assertPointAlmostEqual(pnt, expected)
+
+        # Parallel rays do not define a point.
+        pnt = mod.calculate_least_squares_intersection_point(
+            [0.0, 0.0, 0.0, 1.0, 0.0, 0.0],
+            [0.0, 0.0, 1.0, 0.0, 0.0, 2.0])
+        self.assertIsNone(pnt)
+
+        with self.assertRaises(ValueError):
+            mod.calculate_least_squares_intersection_point(
+                [0.0, 0.0], [1.0, 0.0])
+        with self.assertRaises(ValueError):
+            mod.calculate_least_squares_intersection_point(
+                origins, directions, weights=[1.0])
+
+    def test_calculate_least_squares_outliers(self):
+        target = (0.0, 0.0, 0.0)
+        origins = [
+            10.0, 0.0, 0.0,
+            0.0, 10.0, 0.0,
+            0.0, 0.0, 10.0,
+            -10.0, 0.0, 0.0,
+            # Outlier ray.
+            0.0, -10.0, 0.0,
+        ]
+        directions = [
+            -1.0, 0.0, 0.0,
+            0.0, -1.0, 0.0,
+            0.0, 0.0, -1.0,
+            1.0, 0.0, 0.0,
+            3.0, 1.0, 0.0,
+        ]
+        pnt = mod.calculate_least_squares_intersection_point(
+            origins, directions)
+        self.assertGreater(abs(pnt[0]) + abs(pnt[1]), 0.1)
+
+        # A weight of zero ignores the ray.
+        weights = [1.0, 1.0, 1.0, 1.0, 0.0]
+        pnt = mod.calculate_least_squares_intersection_point(
+            origins, directions, weights=weights)
+        self.assertPointAlmostEqual(pnt, target)
+
+        pnt = mod.calculate_least_squares_intersection_point(
+            origins, directions, outlier_distance=1.0)
+        self.assertPointAlmostEqual(pnt, target)
+
+        distances = mod.calculate_distances_from_rays(
+            target, origins, directions)
+        self.assertEqual(len(distances), 5)
+        self.assertAlmostEqual(distances[0], 0.0)
+        self.assertGreater(distances[4], 1.0)
+
+    def test_calculate_least_squares_intersection_points(self):
+        origins_list = [
+            [0.0, 0.0, 0.0, 1.0, 0.0, 0.0],
+            [0.0, 0.0, 0.0, 1.0, 0.0, 0.0],
+        ]
+        directions_list = [
+            [1.0, 1.0, 0.0, -1.0, 1.0, 0.0],
+            [0.0, 0.0, 1.0, 0.0, 0.0, 1.0],
+        ]
+        pnts = mod.calculate_least_squares_intersection_points(
+            origins_list, directions_list)
+        self.assertEqual(len(pnts), 2)
+        self.assertPointAlmostEqual(pnts[0], (0.5, 0.5, 0.0))
+        self.assertIsNone(pnts[1])
+
+    def test_get_camera_rays(self):
+        cam_tfm = maya.cmds.createNode('transform')
+        mkr_a = maya.cmds.createNode('transform')
+        mkr_b = maya.cmds.createNode('transform')
+        maya.cmds.setKeyframe(cam_tfm, attribute='translateX', time=1, value=0.0)
+        maya.cmds.setKeyframe(cam_tfm, attribute='translateX', time=3, value=2.0)
+        maya.cmds.setAttr(mkr_a + '.translateZ', -10.0)
+        maya.cmds.setAttr(mkr_b + '.translateY', 5.0)
+        maya.cmds.currentTime(2)
+
+        cam_mkr_frm_list = [
+            (cam_tfm, mkr_a, [1, 3]),
+            (cam_tfm, mkr_b, [1]),
+        ]
+        rays = mod.get_camera_rays(cam_mkr_frm_list)
+        self.assertEqual(maya.cmds.currentTime(query=True), 2)
+        self.assertEqual(len(rays), 2)
+        origins, directions = rays[0]
+        self.assertEqual(list(origins), [0.0, 0.0, 0.0, 2.0, 0.0, 0.0])
+        for i, frame in enumerate([1, 3]):
+            pnt, direction = mod.get_point_and_direction(
+                cam_tfm, mkr_a, frame)
+            self.assertAlmostEqual(directions[(i * 3) + 0], direction.x)
+            self.assertAlmostEqual(directions[(i * 3) + 1], direction.y)
+            self.assertAlmostEqual(directions[(i * 3) + 2], direction.z)
+        origins, directions = rays[1]
+        self.assertEqual(list(directions), [0.0, 1.0, 0.0])
+        return
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
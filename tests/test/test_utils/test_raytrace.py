@@ -0,0 +1,91 @@
+# Copyright (C) 2019 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for raytrace utilities module.
+"""
+
+import unittest
+
+import test.test_utils.utilsutils as test_utils
+
+import maya.cmds
+import mmSolver.utils.raytrace as mod
+
+
+# @unittest.skip
+class TestRaytrace(test_utils.UtilsTestCase):
+    """
+    Test raytrace module.
+    """
+
+    def test_closest_intersect_many(self):
+        mod.clear_raytrace_cache()
+        near_tfm = maya.cmds.polyPlane(width=10, height=10, axis=(0, 1, 0))[0]
+        far_tfm = maya.cmds.polyPlane(width=10, height=10, axis=(0, 1, 0))[0]
+        maya.cmds.setAttr(near_tfm + '.translateY', 5.0)
+        meshes = maya.cmds.ls(type='mesh', long=True)
+        self.assertEqual(len(meshes), 2)
+
+        sources = [
+            (0.0, 10.0, 0.0),
+            (2.0, 10.0, 2.0),
+            (20.0, 10.0, 0.0),  # misses both planes.
+            (0.0, 2.0, 0.0),  # between the planes.
+        ]
+        directions = [(0.0, -1.0, 0.0)] * len(sources)
+        hit_points = mod.closest_intersect_many(sources, directions, meshes)
+        self.assertEqual(len(hit_points), len(sources))
+        self.assertAlmostEqual(hit_points[0].y, 5.0)
+        self.assertAlmostEqual(hit_points[1].x, 2.0)
+        self.assertAlmostEqual(hit_points[1].y, 5.0)
+        self.assertIsNone(hit_points[2])
+        self.assertAlmostEqual(hit_points[3].y, 0.0)
+
+        # Single rays must give the same results.
+        for source, direction, hit_point in zip(sources, directions, hit_points):
+            point = mod.closest_intersect(source, direction, meshes)
+            if hit_point is None:
+                self.assertIsNone(point)
+            else:
+                self.assertAlmostEqual(point.y, hit_point.y)
+
+        # Moving a mesh must update the cached intersection data.
+        maya.cmds.setAttr(near_tfm + '.translateY', 7.0)
+        hit_points = mod.closest_intersect_many(sources[:1], directions[:1], meshes)
+        self.assertAlmostEqual(hit_points[0].y, 7.0)
+
+        # Rays above both planes hit the near plane, rays between the
+        # planes hit the far plane.
+        maya.cmds.setAttr(far_tfm + '.translateY', -1.0)
+        hit_points = mod.closest_intersect_many(sources, directions, meshes)
+        self.assertAlmostEqual(hit_points[0].y, 7.0)
+        self.assertAlmostEqual(hit_points[3].y, -1.0)
+
+        maya.cmds.delete(near_tfm)
+        meshes = maya.cmds.ls(type='mesh', long=True)
+        hit_points = mod.closest_intersect_many(sources[:1], directions[:1], meshes)
+        self.assertAlmostEqual(hit_points[0].y, -1.0)
+
+        self.assertEqual(mod.closest_intersect_many(sources, directions, []),
+                         [None] * len(sources))
+        mod.clear_raytrace_cache()
+        return
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
@@ -22,6 +22,7 @@ Test functions for API utils module.
 import unittest
 
 import test.test_utils.utilsutils as test_utils
+import mmSolver.utils.constant as const
 import mmSolver.utils.smooth as smooth_utils
 
 
@@ -53,6 +54,45 @@ DATA_FOUR = [
 ]
 
 
+def _reference_average_smooth(data, width):
+    """
+    Average smoothing, comparing every value with every other value.
+    """
+    sigma_val = width - 1.0
+    if sigma_val <= 0.0:
+        return list(data)
+    n = len(data)
+    result = []
+    for i in range(n):
+        start = max(0, int(i - sigma_val))
+        end = min(n, int(i + sigma_val) + 1)
+        total = 0.0
+        for j in range(start, end):
+            total += data[j]
+        result.append(total / (end - start))
+    return result
+
+
+def _reference_gaussian_smooth(data, width):
+    """
+    Gaussian smoothing, comparing every value with every other value.
+    """
+    sigma_val = (width - 1.0) * 0.5
+    if sigma_val <= 0.0:
+        return list(data)
+    n = len(data)
+    result = []
+    for i in range(n):
+        total = 0.0
+        weight_total = 0.0
+        for j in range(n):
+            weight = smooth_utils._gaussian(sigma_val, i, j)
+            total += data[j] * weight
+            weight_total += weight
+        result.append(total / weight_total)
+    return result
+
+
 # @unittest.skip
 class TestSmooth(test_utils.UtilsTestCase):
     """
@@ -242,6 +282,56 @@ class TestSmooth(test_utils.UtilsTestCase):
         self.assertIs(same_value, True)
         return
 
+    def test_smooth_reference(self):
+        """
+        Smoothing must match a direct (slow) reference implementation.
+        """
+        data = list(DATA_ONE) * 7
+        for width in [1.0, 2.0, 3.5, 10.0, 40.0, 100.0]:
+            x = smooth_utils.average_smooth(data, width)
+            y = _reference_average_smooth(data, width)
+            self.assertEqual(len(x), len(y))
+            for a, b in zip(x, y):
+                self.assertAlmostEqual(a, b)
+
+            x = smooth_utils.gaussian_smooth(data, width)
+            y = _reference_gaussian_smooth(data, width)
+            self.assertEqual(len(x), len(y))
+            for a, b in zip(x, y):
+                self.assertAlmostEqual(a, b)
+        return
+
+    def test_smooth_many(self):
+        """
+        Smoothing many arrays at once must match smoothing each array.
+        """
+        value_arrays = [
+            list(DATA_ONE),
+            list(DATA_TWO),
+            list(DATA_THREE),
+            list(DATA_FOUR),
+            list(DATA_ONE) * 3,
+        ]
+        smooth_types = [
+            const.SMOOTH_TYPE_AVERAGE,
+            const.SMOOTH_TYPE_GAUSSIAN,
+            const.SMOOTH_TYPE_FOURIER,
+        ]
+        for smooth_type in smooth_types:
+            for width in [1.0, 2.0, 3.0]:
+                xs = smooth_utils.smooth_many(
+                    smooth_type, value_arrays, width)
+                self.assertEqual(len(xs), len(value_arrays))
+                for x, data in zip(xs, value_arrays):
+                    y = smooth_utils.smooth(smooth_type, data, width)
+                    self.assertEqual(len(x), len(y))
+                    for a, b in zip(x, y):
+                        self.assertAlmostEqual(a, b)
+
+        with self.assertRaises(ValueError):
+            smooth_utils.smooth_many('invalid', value_arrays, 2.0)
+        return
+
 
 if __name__ == '__main__':
     prog = unittest.main()
@@ -26,6 +26,7 @@ import test.test_utils.utilsutils as test_utils
 import maya.cmds
 import maya.api.OpenMaya as OpenMaya2
 import mmSolver.utils.node as node_utils
+import mmSolver.utils.constant as const
 import mmSolver.utils.transform as mod
 
 
@@ -139,13 +140,44 @@ class TestTransform(test_utils.UtilsTestCase):
         tfm_cache.add_node_attr(tfm_node, 'worldMatrix[0]', frame_range)
         tfm_cache.process()
 
-        dst_node = maya.cmds.createNode('transform')
-        dst_tfm_node = mod.TransformNode(node=dst_node)
+        # With undo turned off, keys are set with the Maya API,
+        # otherwise with undoable commands.
+        for undo_state in [False, True]:
+            dst_node = maya.cmds.createNode('transform')
+            dst_tfm_node = mod.TransformNode(node=dst_node)
 
-        mod.set_transform_values(tfm_cache, frame_range,
-            tfm_node, dst_tfm_node,
-            delete_static_anim_curves=True,
-        )
+            maya.cmds.undoInfo(stateWithoutFlush=undo_state)
+            try:
+                mod.set_transform_values(tfm_cache, frame_range,
+                    tfm_node, dst_tfm_node,
+                    delete_static_anim_curves=True,
+                )
+            finally:
+                maya.cmds.undoInfo(stateWithoutFlush=True)
+
+            # The destination must follow the source.
+            for frame in [start_frame, 1050, end_frame]:
+                maya.cmds.currentTime(frame, update=True)
+                src_mat = maya.cmds.xform(node, query=True, worldSpace=True, matrix=True)
+                dst_mat = maya.cmds.xform(dst_node, query=True, worldSpace=True, matrix=True)
+                for a, b in zip(src_mat, dst_mat):
+                    self.assertAlmostEqual(a, b)
+
+            # Static channels must not have animCurves.
+            anim_curves = maya.cmds.listConnections(
+                dst_node + '.translateZ', type='animCurve') or []
+            self.assertEqual(len(anim_curves), 0)
+            anim_curves = maya.cmds.listConnections(
+                dst_node + '.translateX', type='animCurve') or []
+            self.assertEqual(len(anim_curves), 1)
+            keys = maya.cmds.keyframe(anim_curves[0], query=True, timeChange=True)
+            self.assertEqual(len(keys), len(frame_range))
+
+        # The keys set with undo turned on are removed with one undo.
+        maya.cmds.undo()
+        anim_curves = maya.cmds.listConnections(
+            dst_node + '.translateX', type='animCurve') or []
+        self.assertEqual(len(anim_curves), 0)
 
         # save the output scene file
         path = 'test_transform.ma'
@@ -193,6 +225,54 @@ class TestTransform(test_utils.UtilsTestCase):
         )
         return
 
+    def test_TransformMatrixCache_eval_modes(self):
+        """
+        Both evaluation modes must give the same values, and the DG
+        Context evaluation must not change the current time.
+        """
+        start_frame = 1001
+        end_frame = 1011
+        times = list(range(start_frame, end_frame + 1))
+        node = maya.cmds.createNode('transform')
+        maya.cmds.setKeyframe(node, attribute='translateX', time=start_frame, value=-1.0)
+        maya.cmds.setKeyframe(node, attribute='translateX', time=end_frame, value=1.0)
+        maya.cmds.setAttr(node + '.rotatePivotY', 2.0)
+        tfm_node = mod.TransformNode(node=node)
+        attr_names = ['worldMatrix[0]', 'rotatePivotY']
+
+        maya.cmds.currentTime(1, update=True)
+        caches = []
+        for eval_mode in [const.EVAL_MODE_TIME_SWITCH_GET_ATTR,
+                          const.EVAL_MODE_API_DG_CONTEXT]:
+            cache = mod.TransformMatrixCache()
+            for attr_name in attr_names:
+                cache.add_node_attr(tfm_node, attr_name, times)
+            cache.process(eval_mode=eval_mode)
+            self.assertEqual(maya.cmds.currentTime(query=True), 1)
+            caches.append(cache)
+
+        a, b = caches
+        for attr_name in attr_names:
+            values_a = a.get_node_attr(tfm_node, attr_name, times)
+            values_b = b.get_node_attr(tfm_node, attr_name, times)
+            self.assertEqual(len(values_a), len(times))
+            for value_a, value_b in zip(values_a, values_b):
+                self.assertIsNotNone(value_a)
+                self.assertEqual(value_a, value_b)
+
+        mats = a.get_node_attr(tfm_node, 'worldMatrix[0]', times)
+        self.assertAlmostEqual(mats[0][12], -1.0)
+        self.assertAlmostEqual(mats[-1][12], 1.0)
+        self.assertIsNone(a.get_node_attr(tfm_node, 'worldMatrix[0]', [1])[0])
+
+        arr = a.get_node_attr_array(tfm_node, 'worldMatrix[0]', times)
+        self.assertEqual(len(arr), len(times) * 16)
+        self.assertAlmostEqual(arr[12], -1.0)
+        self.assertIsNone(a.get_node_attr_array(tfm_node, 'worldMatrix[0]', [1]))
+        arr = a.get_node_attr_array(tfm_node, 'rotatePivotY', times)
+        self.assertEqual(list(arr), [2.0] * len(times))
+        return
+
 
 if __name__ == '__main__':
     prog = unittest.main()